@@ -2,10 +2,15 @@
 
 import argparse
 import logging
+from datetime import datetime
 from pathlib import Path
+from typing import get_args
 
 from niconico import NicoNico, __version__
-from niconico.exceptions import LoginFailureError, WatchAPIError
+from niconico.exceptions import LoginFailureError, NicoAPIError, WatchAPIError
+from niconico.objects.video.search import SnapshotSortKey, SnapshotSortOrder
+from niconico.utils import JST
+from niconico.video.snapshot import DEFAULT_SNAPSHOT_RATE, SNAPSHOT_FIELDS, SnapshotExporter, SnapshotExportFormat
 
 logger = logging.getLogger("niconico.py")
 
@@ -83,6 +88,41 @@ def command_download(args: argparse.Namespace) -> None:
     logger.info("Downloaded to %s", downloaded_path)
 
 
+def parse_time(value: str) -> datetime:
+    """Parse an ISO 8601 time, in Japan Standard Time unless an offset is given."""
+    time = datetime.fromisoformat(value)
+    return time if time.tzinfo is not None else time.replace(tzinfo=JST)
+
+
+def command_snapshot(args: argparse.Namespace) -> None:
+    """Export snapshot search results."""
+    logger.debug("Starting command: snapshot with args: %s", args)
+    parser: argparse.ArgumentParser = args.parser
+    fields = args.fields.split(",") if args.fields is not None else SNAPSHOT_FIELDS
+    try:
+        exporter = SnapshotExporter(args.output, fields, args.format)
+    except (ImportError, ValueError) as e:
+        parser.error(str(e))
+    client = NicoNico()
+    try:
+        with exporter:
+            rows_written = client.video.search.export_snapshot_search(
+                exporter,
+                args.keyword,
+                args.targets.split(","),
+                sort_key=args.sort_key,
+                sort_order=args.sort_order,
+                start_time=args.start,
+                end_time=args.end,
+                max_workers=args.workers,
+                requests_per_second=args.rate,
+            )
+    except (NicoAPIError, ValueError):
+        logger.exception("An error has occurred")
+        return
+    logger.info("Exported %d videos to %s", rows_written, args.output)
+
+
 def main() -> None:
     """Main function for niconico package."""
     parser = argparse.ArgumentParser(
@@ -118,6 +158,32 @@ def main() -> None:
     parser_download.add_argument("-a", "--audio", help="download audio only", action="store_true")
     parser_download.set_defaults(func=command_download)
 
+    parser_snapshot = subparsers.add_parser("snapshot", help="export snapshot search results")
+    parser_snapshot.add_argument("keyword", help="search keyword", type=str)
+    parser_snapshot.add_argument(
+        "-o",
+        "--output",
+        help="output file (.parquet, .arrow or .csv)",
+        required=True,
+        type=Path,
+    )
+    parser_snapshot.add_argument("--format", help="output format", choices=get_args(SnapshotExportFormat), default=None)
+    parser_snapshot.add_argument(
+        "-t",
+        "--targets",
+        help="comma separated search targets",
+        default="title,description,tags",
+        type=str,
+    )
+    parser_snapshot.add_argument("-f", "--fields", help="comma separated fields (default: all)", default=None)
+    parser_snapshot.add_argument("--sort-key", help="sort key", choices=get_args(SnapshotSortKey), default="startTime")
+    parser_snapshot.add_argument("--sort-order", help="sort order", choices=get_args(SnapshotSortOrder), default="asc")
+    parser_snapshot.add_argument("--start", help="earliest posting time (ISO 8601)", default=None, type=parse_time)
+    parser_snapshot.add_argument("--end", help="latest posting time (ISO 8601)", default=None, type=parse_time)
+    parser_snapshot.add_argument("--workers", help="requests sent at once", default=1, type=int)
+    parser_snapshot.add_argument("--rate", help="requests per second", default=DEFAULT_SNAPSHOT_RATE, type=float)
+    parser_snapshot.set_defaults(func=command_snapshot, parser=parser_snapshot)
+
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, format="%(message)s")
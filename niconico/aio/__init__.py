@@ -0,0 +1,6 @@
+"""Asynchronous API of niconico.py."""
+
+from niconico.aio.niconico import AsyncNicoNico
+from niconico.aio.video.manager import DownloadManager, DownloadTask
+
+__all__ = ("AsyncNicoNico", "DownloadManager", "DownloadTask")
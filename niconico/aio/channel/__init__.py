@@ -0,0 +1,28 @@
+"""This module provides a class that represents an asynchronous channel client."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from niconico.aio.channel.search import AsyncChannelSearchClient
+from niconico.base.client import AsyncBaseClient
+from niconico.channel import endpoints
+
+if TYPE_CHECKING:
+    from niconico.aio.niconico import AsyncNicoNico
+    from niconico.objects.channel import ChannelData
+
+
+class AsyncChannelClient(AsyncBaseClient):
+    """A client that represents an asynchronous channel client."""
+
+    search: AsyncChannelSearchClient
+
+    def __init__(self, niconico: AsyncNicoNico) -> None:
+        """Initialize the client."""
+        super().__init__(niconico)
+        self.search = AsyncChannelSearchClient(niconico)
+
+    async def get_channel(self, channel_id: str) -> ChannelData | None:
+        """Get a channel."""
+        return await self._send(endpoints.get_channel(channel_id))
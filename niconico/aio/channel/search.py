@@ -0,0 +1,37 @@
+"""Module for asynchronous channel search client."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+from niconico.base.client import AsyncBaseClient
+from niconico.channel import endpoints
+
+if TYPE_CHECKING:
+    from niconico.objects.channel.search import ChannelSearchItem
+
+
+class AsyncChannelSearchClient(AsyncBaseClient):
+    """Asynchronous client for channel search."""
+
+    async def search_channels(
+        self,
+        query: str,
+        *,
+        search_type: Literal["keyword", "tag"] = "keyword",
+        limit: int = 20,
+        offset: int = 0,
+        order: Literal["desc", "asc"] = "desc",
+        sort: Literal["updateTime"] | None = None,
+    ) -> list[ChannelSearchItem]:
+        """Asynchronous version of :meth:`~niconico.channel.search.ChannelSearchClient.search_channels`."""
+        return await self._send(
+            endpoints.search_channels(
+                query,
+                search_type=search_type,
+                limit=limit,
+                offset=offset,
+                order=order,
+                sort=sort,
+            ),
+        )
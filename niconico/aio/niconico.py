@@ -0,0 +1,366 @@
+"""A module to interact with the NicoNico API asynchronously."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from logging import Logger, getLogger
+from typing import TYPE_CHECKING, Self
+
+from niconico.aio.channel import AsyncChannelClient
+from niconico.aio.user import AsyncUserClient
+from niconico.aio.video import AsyncVideoClient
+from niconico.base.transport import DEFAULT_TIMEOUT, FRONTEND_HEADERS, MUTATION_HEADERS, httpx_timeout
+from niconico.exceptions import LoginFailureError
+from niconico.singleflight import AsyncSingleFlight
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from types import TracebackType
+
+    import httpx
+
+    from niconico.base.transport import RequestHook, Timeout
+    from niconico.ratelimit import RateLimiter
+    from niconico.retry import RetryPolicy
+
+logger = getLogger("niconico.py")
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 100
+DEFAULT_KEEPALIVE_EXPIRY = 5.0
+
+
+class AsyncNicoNico:
+    """A class to interact with the NicoNico API asynchronously.
+
+    Requests are sent through a pooled ``httpx.AsyncClient``, so many requests can be
+    in flight at once from a single event loop::
+
+        async with AsyncNicoNico() as client:
+            videos = await asyncio.gather(*(client.video.get_video(i) for i in video_ids))
+
+    Requires the optional ``async`` extra::
+
+        pip install "niconico.py[async]"
+    """
+
+    logger: Logger
+    session: httpx.AsyncClient
+    logined: bool
+    premium: bool
+    rate_limiter: RateLimiter | None
+    retry_policy: RetryPolicy | None
+    headers: dict[str, str]
+    mutation_headers: dict[str, str]
+    request_hooks: list[RequestHook]
+    single_flight: AsyncSingleFlight[httpx.Response] | None
+
+    video: AsyncVideoClient
+    user: AsyncUserClient
+    channel: AsyncChannelClient
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        transport: httpx.AsyncBaseTransport | None = None,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        keepalive_expiry: float | None = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        single_flight: bool = False,
+    ) -> None:
+        """Initialize the class.
+
+        Args:
+            max_connections (int): The maximum number of concurrent connections in the pool.
+            max_keepalive_connections (int): The maximum number of idle connections kept alive.
+            transport (httpx.AsyncBaseTransport | None): The transport to send requests with.
+                The default pooled HTTP transport is used when None.
+            rate_limiter (RateLimiter | None): The limiter that paces the requests to each host
+                and backs off when they are throttled. Requests are not limited when None.
+            retry_policy (RetryPolicy | None): The policy that retries requests failing with a
+                transient error. Requests are not retried when None.
+            timeout (Timeout): The timeout of every request in seconds, or a (connect, read) pair.
+                None waits forever.
+            keepalive_expiry (float | None): The number of seconds an idle connection is kept alive.
+            http2 (bool): Whether to use HTTP/2 with the hosts that support it, multiplexing
+                concurrent requests over the same connections. Requires the ``http2`` extra.
+            single_flight (bool): Whether concurrent identical GET requests share a single request
+                and its response object.
+        """
+        try:
+            import httpx  # noqa: PLC0415
+        except ImportError as e:  # pragma: no cover - depends on the optional extra
+            msg = 'AsyncNicoNico requires httpx. Install it with `pip install "niconico.py[async]"`.'
+            raise ImportError(msg) from e
+        self.logger = logger
+        try:
+            self.session = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                timeout=httpx_timeout(timeout),
+                transport=transport,
+                follow_redirects=True,
+                http2=http2,
+            )
+        except ImportError as e:  # pragma: no cover - depends on the optional extra
+            msg = 'HTTP/2 requires h2. Install it with `pip install "niconico.py[http2]"`.'
+            raise ImportError(msg) from e
+        self.logined = False
+        self.premium = False
+        self._auth_lock = asyncio.Lock()
+        self._auth_generation = 0
+        self.headers = dict(FRONTEND_HEADERS)
+        self.mutation_headers = dict(MUTATION_HEADERS)
+        self.request_hooks = []
+        self.single_flight = AsyncSingleFlight() if single_flight else None
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.video = AsyncVideoClient(self)
+        self.user = AsyncUserClient(self)
+        self.channel = AsyncChannelClient(self)
+
+    async def __aenter__(self) -> Self:
+        """Enter the async context manager."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the connection pool when leaving the async context manager."""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connection pool."""
+        await self.session.aclose()
+
+    async def get(self, url: str, *, headers: dict[str, str] | None = None) -> httpx.Response:
+        """Send a GET request to a URL.
+
+        When single flight is enabled, tasks requesting the same URL with the same
+        headers and session while a request is in flight wait for it and get its response.
+
+        Args:
+            url (str): The URL to send the request to.
+            headers (dict[str, str] | None): Additional headers to send with the request.
+
+        Returns:
+            httpx.Response: The response object.
+        """
+        flight = self.single_flight
+        if flight is None:
+            return await self._send("GET", url, headers=headers)
+        return await flight.do(self._request_key(url, headers), lambda: self._send("GET", url, headers=headers))
+
+    def _request_key(self, url: str, headers: dict[str, str] | None) -> str:
+        """Get a key that is equal for requests expecting the same response.
+
+        The key holds the URL, the headers and a hash of the session when logged in.
+        """
+        parts = [url]
+        if headers is not None:
+            parts.extend(f"{key}: {value}" for key, value in sorted(headers.items()))
+        session = self.get_user_session() if self.logined else None
+        if session is not None:
+            parts.append(hashlib.sha256(session.encode()).hexdigest())
+        return "\n".join(parts)
+
+    async def post(
+        self,
+        url: str,
+        *,
+        data: dict[str, str] | str | bytes | None = None,
+        json: object | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Send a POST request to a URL.
+
+        Args:
+            url (str): The URL to send the request to.
+            data (dict[str, str] | str | bytes): The data to send with the request.
+            json (object): The data to send with the request.
+            headers (dict[str, str]): The headers to send with the request.
+
+        Returns:
+            httpx.Response: The response object.
+        """
+        return await self._send("POST", url, data=data, json=json, headers=headers)
+
+    async def put(
+        self,
+        url: str,
+        *,
+        data: dict[str, str] | str | bytes | None = None,
+        json: object | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Send a PUT request to a URL.
+
+        Args:
+            url (str): The URL to send the request to.
+            data (dict[str, str] | str | bytes): The data to send with the request.
+            json (object): The JSON data to send with the request.
+            headers (dict[str, str]): The headers to send with the request.
+
+        Returns:
+            httpx.Response: The response object.
+        """
+        return await self._send("PUT", url, data=data, json=json, headers=headers)
+
+    async def delete(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Send a DELETE request to a URL.
+
+        Args:
+            url (str): The URL to send the request to.
+            headers (dict[str, str]): The headers to send with the request.
+
+        Returns:
+            httpx.Response: The response object.
+        """
+        return await self._send("DELETE", url, headers=headers)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: dict[str, str] | str | bytes | None = None,
+        json: object | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Send a request with the headers of the NicoNico web frontend.
+
+        The headers of the client are merged with the given ones, then every request
+        hook may change them before the request is sent. The ``Host`` header is left
+        to the transport.
+        """
+        base = self.headers if method == "GET" else self.mutation_headers
+        req_headers = base | headers if headers is not None else dict(base)
+        for hook in self.request_hooks:
+            hook(method, url, req_headers)
+        if json is not None:
+            return await self._dispatch(
+                method,
+                url,
+                lambda: self.session.request(method, url, headers=req_headers, json=json),
+            )
+        if isinstance(data, dict):
+            return await self._dispatch(
+                method,
+                url,
+                lambda: self.session.request(method, url, headers=req_headers, data=data),
+            )
+        return await self._dispatch(
+            method,
+            url,
+            lambda: self.session.request(method, url, headers=req_headers, content=data),
+        )
+
+    async def _dispatch(
+        self,
+        method: str,
+        url: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """Send a request under the retry policy and the rate limiter."""
+        policy = self.retry_policy
+        if policy is None:
+            return await self._limited(url, send)
+        import httpx  # noqa: PLC0415
+
+        return await policy.acall(method, url, lambda: self._limited(url, send), retry_on=(httpx.TransportError,))
+
+    async def _limited(self, url: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Send a request once the rate limiter allows it, and report the response to the limiter."""
+        limiter = self.rate_limiter
+        if limiter is None:
+            return await send()
+        await limiter.aacquire(url)
+        res = await send()
+        limiter.observe(url, res.status_code, res.headers.get("Retry-After"))
+        return res
+
+    async def login_with_session(self, session: str) -> None:
+        """Login to NicoNico with a session.
+
+        The session is checked before it is stored, so other tasks never send requests
+        with an unchecked session.
+
+        Args:
+            session (str): The session to login with.
+
+        Raises:
+            LoginFailureError: If the session is not valid. The client is logged out then.
+        """
+        async with self._auth_lock:
+            await self._login_with_session(session)
+
+    async def refresh_session(self) -> None:
+        """Check the current session again and update the login state.
+
+        Tasks that call this while another task is refreshing wait for it and reuse
+        its result instead of sending another request.
+
+        Raises:
+            LoginFailureError: If the client holds no session, or it is no longer valid.
+        """
+        generation = self._auth_generation
+        async with self._auth_lock:
+            if self._auth_generation != generation:
+                return
+            session = self.get_user_session()
+            if session is None:
+                raise LoginFailureError(message="Not logged in")
+            await self._login_with_session(session)
+
+    async def _login_with_session(self, session: str) -> None:
+        """Check a session and store it, holding the login lock."""
+        res = await self.session.get("https://www.nicovideo.jp/", headers={"Cookie": f"user_session={session}"})
+        authflag = res.headers.get("x-niconico-authflag")
+        if str(res.url) != "https://www.nicovideo.jp/" or authflag not in {"1", "3"}:
+            self._clear_login()
+            raise LoginFailureError(message="Login failed")
+        self.session.cookies.set("user_session", session)
+        self.premium = authflag == "3"
+        self.logined = True
+        self._auth_generation += 1
+
+    def _clear_login(self) -> None:
+        """Drop the session and the login state."""
+        self.session.cookies.delete("user_session")
+        self.logined = False
+        self.premium = False
+        self._auth_generation += 1
+
+    def get_user_session(self) -> str | None:
+        """Get the user session.
+
+        Returns:
+            str: The user session.
+        """
+        return self.session.cookies.get("user_session")
+
+    async def logout(self) -> None:
+        """Logout from NicoNico."""
+        async with self._auth_lock:
+            if not self.logined:
+                self.logger.warning("Not logged in, cannot logout")
+                return
+            await self.session.get("https://account.nicovideo.jp/logout")
+            self._clear_login()
+            self.logger.debug("Logged out from NicoNico")
@@ -0,0 +1,499 @@
+"""This module provides a class that represents an asynchronous user client."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+from niconico.aio.user.search import AsyncUserSearchClient
+from niconico.base.client import AsyncBaseClient
+from niconico.base.pagination import aiter_paged_items
+from niconico.decorators import login_required
+from niconico.user import endpoints
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from niconico.aio.niconico import AsyncNicoNico
+    from niconico.objects.nvapi import (
+        CopyMylistItemsData,
+        CreateMylistData,
+        FeedData,
+        FollowingMylistsData,
+        FollowingTagsData,
+        OwnMylistItemsData,
+        OwnVideosData,
+        RecommendData,
+        RelationshipUsersData,
+        ReorderMylistsData,
+        SeriesData,
+        UserVideosData,
+    )
+    from niconico.objects.user import (
+        NicoUser,
+        OwnNicoUser,
+        OwnVideoItem,
+        RecipeId,
+        RelationshipUser,
+        UserMylistItem,
+        UserSeriesItem,
+        UserVideoItem,
+        UserVideosSortKey,
+        UserVideosSortOrder,
+    )
+    from niconico.objects.video import Mylist, MylistSortKey, MylistSortOrder
+    from niconico.objects.video.search import SelectContentType
+
+
+class AsyncUserClient(AsyncBaseClient):
+    """A class that represents an asynchronous user client."""
+
+    search: AsyncUserSearchClient
+
+    def __init__(self, niconico: AsyncNicoNico) -> None:
+        """Initialize the client."""
+        super().__init__(niconico)
+        self.search = AsyncUserSearchClient(niconico)
+
+    async def get_user(self, user_id: str) -> NicoUser | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_user`."""
+        return await self._send(endpoints.get_user(user_id))
+
+    async def get_user_followers(
+        self,
+        user_id: str,
+        *,
+        page_size: int = 25,
+        page: int = 1,
+    ) -> RelationshipUsersData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_user_followers`."""
+        return await self._send(
+            endpoints.get_user_relationships(user_id, "followed-by", page_size=page_size, page=page),
+        )
+
+    def iter_user_followers(
+        self,
+        user_id: str,
+        *,
+        page_size: int = 100,
+        prefetch: int = 0,
+    ) -> AsyncIterator[RelationshipUser]:
+        """Iterate over all followers of a user, requesting the pages as needed.
+
+        Args:
+            user_id (str): The ID of the user.
+            page_size (int): The number of followers to get per request.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[RelationshipUser]: An iterator over the followers.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_user_followers(user_id, page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.summary.has_next,
+            prefetch=prefetch,
+        )
+
+    async def get_user_followings(
+        self,
+        user_id: str,
+        *,
+        page_size: int = 25,
+        page: int = 1,
+    ) -> RelationshipUsersData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_user_followings`."""
+        return await self._send(
+            endpoints.get_user_relationships(user_id, "following", page_size=page_size, page=page),
+        )
+
+    def iter_user_followings(
+        self,
+        user_id: str,
+        *,
+        page_size: int = 100,
+        prefetch: int = 0,
+    ) -> AsyncIterator[RelationshipUser]:
+        """Iterate over all followings of a user, requesting the pages as needed.
+
+        Args:
+            user_id (str): The ID of the user.
+            page_size (int): The number of followings to get per request.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[RelationshipUser]: An iterator over the followings.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_user_followings(user_id, page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.summary.has_next,
+            prefetch=prefetch,
+        )
+
+    async def get_user_videos(
+        self,
+        user_id: str,
+        *,
+        sort_key: UserVideosSortKey = "registeredAt",
+        sort_order: UserVideosSortOrder = "asc",
+        page_size: int = 30,
+        page: int = 1,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+    ) -> UserVideosData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_user_videos`."""
+        return await self._send(
+            endpoints.get_user_videos(
+                user_id,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+                select_content_type=select_content_type,
+            ),
+        )
+
+    def iter_user_videos(
+        self,
+        user_id: str,
+        *,
+        sort_key: UserVideosSortKey = "registeredAt",
+        sort_order: UserVideosSortOrder = "asc",
+        page_size: int = 100,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+        prefetch: int = 0,
+    ) -> AsyncIterator[UserVideoItem]:
+        """Iterate over all videos of a user, requesting the pages as needed.
+
+        Args:
+            user_id (str): The ID of the user.
+            sort_key (UserVideosSortKey): The key to sort the videos by.
+            sort_order (UserVideosSortOrder): The order to sort the videos by.
+            page_size (int): The number of videos to get per request.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+            select_content_type (SelectContentType | None): The content type to get.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[UserVideoItem]: An iterator over the videos of the user.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_user_videos(
+                user_id,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+                select_content_type=select_content_type,
+            ),
+            lambda data: data.items,
+            lambda data, page: page * page_size < data.total_count,
+            prefetch=prefetch,
+        )
+
+    async def get_user_mylists(self, user_id: str, *, sample_item_count: int = 0) -> list[UserMylistItem]:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_user_mylists`."""
+        return await self._send(endpoints.get_user_mylists(user_id, sample_item_count=sample_item_count))
+
+    async def get_user_series(self, user_id: str, *, page_size: int = 100, page: int = 1) -> list[UserSeriesItem]:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_user_series`."""
+        return await self._send(endpoints.get_user_series(user_id, page_size=page_size, page=page))
+
+    @login_required()
+    async def get_own(self) -> OwnNicoUser | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own`."""
+        return await self._send(endpoints.get_own())
+
+    @login_required()
+    async def get_own_followers(self, *, page_size: int = 25, page: int = 1) -> RelationshipUsersData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_followers`."""
+        return await self._send(endpoints.get_user_relationships("me", "followed-by", page_size=page_size, page=page))
+
+    @login_required()
+    def iter_own_followers(self, *, page_size: int = 100, prefetch: int = 0) -> AsyncIterator[RelationshipUser]:
+        """Iterate over all followers of the own user, requesting the pages as needed.
+
+        Args:
+            page_size (int): The number of followers to get per request.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[RelationshipUser]: An iterator over the followers.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_own_followers(page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.summary.has_next,
+            prefetch=prefetch,
+        )
+
+    @login_required()
+    async def get_own_followings(self, *, page_size: int = 25, page: int = 1) -> RelationshipUsersData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_followings`."""
+        return await self._send(endpoints.get_user_relationships("me", "following", page_size=page_size, page=page))
+
+    @login_required()
+    def iter_own_followings(self, *, page_size: int = 100, prefetch: int = 0) -> AsyncIterator[RelationshipUser]:
+        """Iterate over all followings of the own user, requesting the pages as needed.
+
+        Args:
+            page_size (int): The number of followings to get per request.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[RelationshipUser]: An iterator over the followings.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_own_followings(page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.summary.has_next,
+            prefetch=prefetch,
+        )
+
+    @login_required()
+    async def follow_user(self, user_id: str) -> bool:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.follow_user`."""
+        return await self._send(endpoints.follow_user(user_id, follow=True))
+
+    @login_required()
+    async def unfollow_user(self, user_id: str) -> bool:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.unfollow_user`."""
+        return await self._send(endpoints.follow_user(user_id, follow=False))
+
+    @login_required()
+    async def get_own_videos(
+        self,
+        *,
+        sort_key: UserVideosSortKey = "registeredAt",
+        sort_order: UserVideosSortOrder = "asc",
+        page_size: int = 30,
+        page: int = 1,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+    ) -> OwnVideosData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_videos`."""
+        return await self._send(
+            endpoints.get_own_videos(
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+            ),
+        )
+
+    @login_required()
+    def iter_own_videos(
+        self,
+        *,
+        sort_key: UserVideosSortKey = "registeredAt",
+        sort_order: UserVideosSortOrder = "asc",
+        page_size: int = 100,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        prefetch: int = 0,
+    ) -> AsyncIterator[OwnVideoItem]:
+        """Iterate over all own videos, requesting the pages as needed.
+
+        Args:
+            sort_key (UserVideosSortKey): The key to sort the videos by.
+            sort_order (UserVideosSortOrder): The order to sort the videos by.
+            page_size (int): The number of videos to get per request.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[OwnVideoItem]: An iterator over the own videos.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_own_videos(
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+            ),
+            lambda data: data.items,
+            lambda data, page: page * page_size < data.total_count,
+            prefetch=prefetch,
+        )
+
+    @login_required()
+    async def get_own_mylist(
+        self,
+        mylist_id: str,
+        *,
+        page_size: int = 20,
+        page: int = 1,
+        sort_key: MylistSortKey | None = None,
+        sort_order: MylistSortOrder | None = None,
+    ) -> Mylist | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_mylist`."""
+        return await self._send(
+            endpoints.get_own_mylist(
+                mylist_id,
+                page_size=page_size,
+                page=page,
+                sort_key=sort_key,
+                sort_order=sort_order,
+            ),
+        )
+
+    @login_required()
+    async def get_own_mylist_items(
+        self,
+        mylist_id: str,
+        *,
+        page_size: int = 20,
+        page: int = 1,
+        sort_key: MylistSortKey | None = None,
+        sort_order: MylistSortOrder | None = None,
+    ) -> OwnMylistItemsData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_mylist_items`."""
+        items = await self._send(endpoints.get_own_mylist_items(mylist_id, sort_key=sort_key, sort_order=sort_order))
+        if items is not None:
+            return items
+        mylist = await self.get_own_mylist(
+            mylist_id,
+            page_size=page_size,
+            page=page,
+            sort_key=sort_key,
+            sort_order=sort_order,
+        )
+        return endpoints.mylist_items_of(mylist)
+
+    @login_required()
+    async def get_own_mylists(self, *, sample_item_count: int = 0) -> list[UserMylistItem]:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_mylists`."""
+        return await self._send(endpoints.get_user_mylists("me", sample_item_count=sample_item_count))
+
+    @login_required()
+    async def add_mylist_item(self, mylist_id: str, item_id: str, *, description: str | None = None) -> bool:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.add_mylist_item`."""
+        return await self._send(endpoints.add_mylist_item(mylist_id, item_id, description=description))
+
+    @login_required()
+    async def remove_mylist_items(self, mylist_id: str, item_ids: list[str]) -> bool:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.remove_mylist_items`."""
+        return await self._send(endpoints.remove_mylist_items(mylist_id, item_ids))
+
+    @login_required()
+    async def create_mylist(
+        self,
+        name: str,
+        description: str = "",
+        *,
+        is_public: bool = False,
+        default_sort_key: MylistSortKey = "addedAt",
+        default_sort_order: MylistSortOrder = "desc",
+    ) -> CreateMylistData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.create_mylist`."""
+        return await self._send(
+            endpoints.create_mylist(
+                name,
+                description,
+                is_public=is_public,
+                default_sort_key=default_sort_key,
+                default_sort_order=default_sort_order,
+            ),
+        )
+
+    @login_required()
+    async def update_mylist(
+        self,
+        mylist_id: str,
+        *,
+        name: str | None = None,
+        description: str | None = None,
+        is_public: bool | None = None,
+        default_sort_key: MylistSortKey | None = None,
+        default_sort_order: MylistSortOrder | None = None,
+    ) -> Mylist | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.update_mylist`."""
+        return await self._send(
+            endpoints.update_mylist(
+                mylist_id,
+                name=name,
+                description=description,
+                is_public=is_public,
+                default_sort_key=default_sort_key,
+                default_sort_order=default_sort_order,
+            ),
+        )
+
+    @login_required()
+    async def reorder_mylists(self, mylist_ids: list[str | int]) -> ReorderMylistsData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.reorder_mylists`."""
+        return await self._send(endpoints.reorder_mylists(mylist_ids))
+
+    @login_required()
+    async def delete_mylist(self, mylist_id: str) -> bool:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.delete_mylist`."""
+        return await self._send(endpoints.delete_mylist(mylist_id))
+
+    @login_required()
+    async def copy_mylist_items(
+        self,
+        from_mylist_id: str,
+        to_mylist_id: str,
+        item_ids: list[str],
+    ) -> CopyMylistItemsData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.copy_mylist_items`."""
+        return await self._send(endpoints.copy_mylist_items(from_mylist_id, to_mylist_id, item_ids))
+
+    @login_required()
+    async def get_own_series_detail(self, series_id: str, *, page_size: int = 100, page: int = 1) -> SeriesData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_series_detail`."""
+        return await self._send(endpoints.get_own_series_detail(series_id, page_size=page_size, page=page))
+
+    @login_required()
+    async def get_own_series(self, *, page_size: int = 100, page: int = 1) -> list[UserSeriesItem]:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_series`."""
+        return await self._send(endpoints.get_own_series(page_size=page_size, page=page))
+
+    @login_required()
+    async def get_recommendations(
+        self,
+        recipe_id: RecipeId,
+        *,
+        video_id: str | None = None,
+        site: str = "nicovideo",
+        limit: int | None = None,
+        with_reason: bool | None = None,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        recipe_version: int | None = None,
+    ) -> RecommendData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_recommendations`."""
+        return await self._send(
+            endpoints.get_recommendations(
+                recipe_id,
+                video_id=video_id,
+                site=site,
+                limit=limit,
+                with_reason=with_reason,
+                sensitive_contents=sensitive_contents,
+                recipe_version=recipe_version,
+            ),
+        )
+
+    @login_required()
+    async def get_own_following_mylists(self, *, sample_item_count: int = 0) -> FollowingMylistsData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_following_mylists`."""
+        return await self._send(endpoints.get_own_following_mylists(sample_item_count=sample_item_count))
+
+    @login_required()
+    async def get_own_following_tags(self) -> FollowingTagsData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_own_following_tags`."""
+        return await self._send(endpoints.get_own_following_tags())
+
+    @login_required()
+    async def get_following_activities(
+        self,
+        *,
+        endpoint: Literal["publish", "video"] = "publish",
+        context: Literal["header_timeline", "my_timeline"] = "header_timeline",
+        cursor: str | None = None,
+    ) -> FeedData | None:
+        """Asynchronous version of :meth:`~niconico.user.UserClient.get_following_activities`."""
+        return await self._send(endpoints.get_following_activities(endpoint=endpoint, context=context, cursor=cursor))
@@ -0,0 +1,58 @@
+"""Module for asynchronous user search client."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from niconico.base.client import AsyncBaseClient
+from niconico.base.pagination import aiter_paged_items
+from niconico.user import endpoints
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from niconico.objects.nvapi import UserSearchData
+    from niconico.objects.user.search import UserSearchItem, UserSearchSortKey
+
+
+class AsyncUserSearchClient(AsyncBaseClient):
+    """Asynchronous client for user search."""
+
+    async def search_users(
+        self,
+        keyword: str,
+        *,
+        sort_key: UserSearchSortKey = "_personalized",
+        page_size: int = 100,
+        page: int = 1,
+    ) -> UserSearchData | None:
+        """Asynchronous version of :meth:`~niconico.user.search.UserSearchClient.search_users`."""
+        return await self._send(
+            endpoints.search_users(keyword, sort_key=sort_key, page_size=page_size, page=page),
+        )
+
+    def iter_users(
+        self,
+        keyword: str,
+        *,
+        sort_key: UserSearchSortKey = "_personalized",
+        page_size: int = 100,
+        prefetch: int = 0,
+    ) -> AsyncIterator[UserSearchItem]:
+        """Iterate over all users matching a keyword, requesting the pages as needed.
+
+        Args:
+            keyword (str): Keyword to search.
+            sort_key (UserSearchSortKey, optional): Sort key. Defaults to "_personalized".
+            page_size (int, optional): Page size. Defaults to 100.
+            prefetch (int, optional): Number of pages to request ahead concurrently. Defaults to 0.
+
+        Returns:
+            AsyncIterator[UserSearchItem]: Iterator over the users found.
+        """
+        return aiter_paged_items(
+            lambda page: self.search_users(keyword, sort_key=sort_key, page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.has_next,
+            prefetch=prefetch,
+        )
@@ -0,0 +1,234 @@
+"""This module provides a class that represents an asynchronous video client."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from niconico.aio.video.ranking import AsyncVideoRankingClient
+from niconico.aio.video.search import AsyncVideoSearchClient
+from niconico.aio.video.watch import AsyncVideoWatchClient
+from niconico.base.client import AsyncBaseClient
+from niconico.base.pagination import aiter_paged_items
+from niconico.decorators import login_required
+from niconico.utils import chunked
+from niconico.video import VIDEOS_BATCH_SIZE, FoundVideos, endpoints
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Sequence
+
+    from niconico.aio.niconico import AsyncNicoNico
+    from niconico.objects.nvapi import HistoryData, LikeData, LikeHistoryData, LikeHistoryItem, PlaylistData, SeriesData
+    from niconico.objects.video import (
+        EssentialVideo,
+        HistoryItem,
+        Mylist,
+        MylistItem,
+        MylistSortKey,
+        MylistSortOrder,
+        SeriesItem,
+        Tag,
+    )
+
+
+class AsyncVideoClient(AsyncBaseClient):
+    """A class that represents an asynchronous video client."""
+
+    ranking: AsyncVideoRankingClient
+    search: AsyncVideoSearchClient
+    watch: AsyncVideoWatchClient
+
+    def __init__(self, niconico: AsyncNicoNico) -> None:
+        """Initialize the client."""
+        super().__init__(niconico)
+        self.ranking = AsyncVideoRankingClient(niconico)
+        self.search = AsyncVideoSearchClient(niconico)
+        self.watch = AsyncVideoWatchClient(niconico)
+
+    async def get_video(self, video_id: str) -> EssentialVideo | None:
+        """Asynchronous version of :meth:`~niconico.video.VideoClient.get_video`."""
+        return await self._send(endpoints.get_video(video_id))
+
+    async def get_videos(self, video_ids: list[str]) -> FoundVideos:
+        """Get videos by their IDs.
+
+        The IDs are sent in batches of up to ``VIDEOS_BATCH_SIZE`` per request, and the
+        batches are requested concurrently. IDs that are not found, such as deleted or
+        private videos, are skipped, logged and listed in the ``missing`` attribute of
+        the result.
+
+        Args:
+            video_ids (list[str]): The IDs of the videos.
+
+        Returns:
+            FoundVideos: The video objects found, in the order of the IDs given.
+        """
+        unique_ids = list(dict.fromkeys(video_ids))
+        videos: dict[str, EssentialVideo] = {}
+        for batch in await asyncio.gather(
+            *(self._get_video_batch(batch) for batch in chunked(unique_ids, VIDEOS_BATCH_SIZE)),
+        ):
+            videos.update(batch)
+        missing_ids = [video_id for video_id in unique_ids if video_id not in videos]
+        if missing_ids:
+            self.log("warning", f"Videos not found: {', '.join(missing_ids)}")
+        return FoundVideos((videos[video_id] for video_id in video_ids if video_id in videos), missing_ids)
+
+    async def _get_video_batch(self, video_ids: Sequence[str]) -> dict[str, EssentialVideo]:
+        """Get a batch of videos in one request, keyed by their watch IDs."""
+        return await self._send(endpoints.get_videos(video_ids))
+
+    async def get_video_tags(self, video_id: str, edit_key: str) -> list[Tag] | None:
+        """Asynchronous version of :meth:`~niconico.video.VideoClient.get_video_tags`."""
+        return await self._send(endpoints.get_video_tags(video_id, edit_key))
+
+    async def get_mylist(
+        self,
+        mylist_id: str,
+        *,
+        page_size: int = 20,
+        page: int = 1,
+        sort_key: MylistSortKey | None = None,
+        sort_order: MylistSortOrder | None = None,
+    ) -> Mylist | None:
+        """Asynchronous version of :meth:`~niconico.video.VideoClient.get_mylist`."""
+        return await self._send(
+            endpoints.get_mylist(
+                mylist_id,
+                page_size=page_size,
+                page=page,
+                sort_key=sort_key,
+                sort_order=sort_order,
+            ),
+        )
+
+    def iter_mylist(
+        self,
+        mylist_id: str,
+        *,
+        page_size: int = 100,
+        sort_key: MylistSortKey | None = None,
+        sort_order: MylistSortOrder | None = None,
+        prefetch: int = 0,
+    ) -> AsyncIterator[MylistItem]:
+        """Iterate over all items of a mylist, requesting the pages as needed.
+
+        Args:
+            mylist_id (str): The ID of the mylist.
+            page_size (int): The number of videos to get per request.
+            sort_key (MylistSortKey | None): The sort key.
+            sort_order (MylistSortOrder | None): The sort order.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[MylistItem]: An iterator over the items of the mylist.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_mylist(
+                mylist_id,
+                page_size=page_size,
+                page=page,
+                sort_key=sort_key,
+                sort_order=sort_order,
+            ),
+            lambda mylist: mylist.items,
+            lambda mylist, _: mylist.has_next,
+            prefetch=prefetch,
+        )
+
+    async def get_series(self, series_id: str, *, page_size: int = 100, page: int = 1) -> SeriesData | None:
+        """Asynchronous version of :meth:`~niconico.video.VideoClient.get_series`."""
+        return await self._send(endpoints.get_series(series_id, page_size=page_size, page=page))
+
+    def iter_series(self, series_id: str, *, page_size: int = 100, prefetch: int = 0) -> AsyncIterator[SeriesItem]:
+        """Iterate over all videos of a series, requesting the pages as needed.
+
+        Args:
+            series_id (str): The ID of the series.
+            page_size (int): The number of videos to get per request.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[SeriesItem]: An iterator over the videos of the series.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_series(series_id, page_size=page_size, page=page),
+            lambda series: series.items,
+            lambda series, page: page * page_size < series.total_count,
+            prefetch=prefetch,
+        )
+
+    async def get_shorts_feed(
+        self,
+        video_id: str | None = None,
+        *,
+        page_size: int | None = None,
+    ) -> PlaylistData | None:
+        """Get the short video feed.
+
+        Args:
+            video_id (str | None): The ID of the short video to build the feed around.
+                A generic feed is returned when None.
+            page_size (int | None): The number of videos to get. The API default is used
+                when None.
+
+        Returns:
+            PlaylistData | None: The feed if successful, None otherwise.
+        """
+        return await self._send(endpoints.get_shorts_feed(video_id, page_size=page_size))
+
+    @login_required()
+    async def get_history(self, *, page_size: int = 100, page: int = 1) -> HistoryData | None:
+        """Asynchronous version of :meth:`~niconico.video.VideoClient.get_history`."""
+        return await self._send(endpoints.get_history(page_size=page_size, page=page))
+
+    @login_required()
+    def iter_history(self, *, page_size: int = 100, prefetch: int = 0) -> AsyncIterator[HistoryItem]:
+        """Iterate over the whole history of the authenticated user, requesting the pages as needed.
+
+        Args:
+            page_size (int): The number of videos to get per request.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[HistoryItem]: An iterator over the videos in the history.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_history(page_size=page_size, page=page),
+            lambda history: history.items,
+            lambda history, page: history.total_count is None or page * page_size < history.total_count,
+            prefetch=prefetch,
+        )
+
+    @login_required()
+    async def like_video(self, video_id: str) -> LikeData | None:
+        """Asynchronous version of :meth:`~niconico.video.VideoClient.like_video`."""
+        return await self._send(endpoints.like_video(video_id))
+
+    @login_required()
+    async def unlike_video(self, video_id: str) -> bool:
+        """Asynchronous version of :meth:`~niconico.video.VideoClient.unlike_video`."""
+        return await self._send(endpoints.unlike_video(video_id))
+
+    @login_required()
+    async def get_like_history(self, *, page_size: int = 25, page: int = 1) -> LikeHistoryData | None:
+        """Asynchronous version of :meth:`~niconico.video.VideoClient.get_like_history`."""
+        return await self._send(endpoints.get_like_history(page_size=page_size, page=page))
+
+    @login_required()
+    def iter_like_history(self, *, page_size: int = 25, prefetch: int = 0) -> AsyncIterator[LikeHistoryItem]:
+        """Iterate over the whole like history of the authenticated user, requesting the pages as needed.
+
+        Args:
+            page_size (int): The number of liked videos to get per request.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[LikeHistoryItem]: An iterator over the liked videos.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_like_history(page_size=page_size, page=page),
+            lambda history: history.items,
+            lambda history, _: history.summary.has_next,
+            prefetch=prefetch,
+        )
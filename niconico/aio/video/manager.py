@@ -0,0 +1,248 @@
+"""This module provides a manager that downloads many videos under shared limits."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+from niconico.base.throttle import HostLimiter, TokenBucket
+from niconico.exceptions import DownloadError
+from niconico.video.hls import DEFAULT_SEGMENT_WORKERS, AsyncHLSDownloader
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from niconico.aio.niconico import AsyncNicoNico
+    from niconico.objects.video.watch import WatchData
+    from niconico.video.hls import Muxer
+
+DEFAULT_CONCURRENT_DOWNLOADS = 3
+"""The default number of videos downloaded at once."""
+
+DEFAULT_CONNECTIONS_PER_HOST = 16
+"""The default number of requests sent at once to a single host, across every download."""
+
+TaskState = Literal["queued", "preparing", "downloading", "completed", "failed"]
+
+
+@dataclass
+class DownloadTask:
+    """A video queued in a download manager, and the progress of its download.
+
+    Attributes:
+        video (str | WatchData): The ID or the watch data of the video.
+        output_path (str): The path to save the video, formatted like ``download_video``.
+        output_label (str | None): The output label, or None for the first available one.
+        audio_only (bool): Whether to download the audio only.
+        priority (int): The priority. Tasks with a higher priority start first.
+        state (TaskState): The state of the task.
+        completed_segments (int): The number of segments saved.
+        total_segments (int): The number of segments of the video, once known.
+        downloaded_bytes (int): The number of bytes received for the segments.
+        result (str | None): The path of the downloaded video, once completed.
+        error (Exception | None): The exception the task failed with.
+    """
+
+    video: str | WatchData
+    output_path: str
+    output_label: str | None
+    audio_only: bool
+    priority: int
+    state: TaskState = "queued"
+    completed_segments: int = 0
+    total_segments: int = 0
+    downloaded_bytes: int = 0
+    result: str | None = None
+    error: Exception | None = None
+
+    @property
+    def video_id(self) -> str:
+        """The ID of the video."""
+        return self.video if isinstance(self.video, str) else self.video.client.watch_id
+
+
+class DownloadManager:
+    """Download many videos with a bounded number of downloads, connections and bandwidth.
+
+    Every task runs ``get_watch_data``, ``get_outputs``, ``get_hls_content_url`` and the
+    segment download in turn. The limits are shared by every task, so adding more videos
+    never opens more connections or starts more ffmpeg processes::
+
+        async with AsyncNicoNico() as client:
+            manager = DownloadManager(client, max_bytes_per_second=10 * 1024 * 1024)
+            for video_id in video_ids:
+                manager.add(video_id, "videos/%(id)s.%(ext)s")
+            for task in await manager.run():
+                print(task.video_id, task.state)
+    """
+
+    def __init__(
+        self,
+        niconico: AsyncNicoNico,
+        *,
+        max_concurrent_downloads: int = DEFAULT_CONCURRENT_DOWNLOADS,
+        max_connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST,
+        max_bytes_per_second: float | None = None,
+        segment_workers: int = DEFAULT_SEGMENT_WORKERS,
+        muxer: Muxer | None = None,
+        on_progress: Callable[[DownloadTask], None] | None = None,
+    ) -> None:
+        """Initialize the manager.
+
+        Args:
+            niconico (AsyncNicoNico): The client to download with.
+            max_concurrent_downloads (int): The number of videos downloaded at once.
+            max_connections_per_host (int): The number of requests sent at once to a single host.
+            max_bytes_per_second (float | None): The total bandwidth of the downloads, or None for no limit.
+            segment_workers (int): The number of segments downloaded at once for each video.
+            muxer (Muxer | None): The muxer combining the tracks. ``default_muxer()`` is used when None.
+            on_progress (Callable[[DownloadTask], None] | None): A function called with a task
+                whenever its state changes and after each of its segments.
+        """
+        self.niconico = niconico
+        self.max_concurrent_downloads = max_concurrent_downloads
+        self.segment_workers = segment_workers
+        self.muxer = muxer
+        self.on_progress = on_progress
+        self.host_limiter = HostLimiter(max_connections_per_host)
+        self.bandwidth = TokenBucket(max_bytes_per_second) if max_bytes_per_second is not None else None
+        self.tasks: list[DownloadTask] = []
+        self._queue: list[tuple[int, int, DownloadTask]] = []
+        self._counter = itertools.count()
+        self._running = 0
+        self._changed = asyncio.Event()
+
+    def add(
+        self,
+        video: str | WatchData,
+        output_path: str = "%(title)s.%(ext)s",
+        *,
+        output_label: str | None = None,
+        audio_only: bool = False,
+        priority: int = 0,
+    ) -> DownloadTask:
+        """Queue a video.
+
+        Videos can also be added while the manager is running.
+
+        Args:
+            video (str | WatchData): The ID or the watch data of the video.
+            output_path (str): The path to save the video, formatted like ``download_video``.
+            output_label (str | None): The output label, or None for the first available one.
+            audio_only (bool): Whether to download the audio only.
+            priority (int): The priority. Tasks with a higher priority start first.
+
+        Returns:
+            DownloadTask: The queued task.
+        """
+        task = DownloadTask(
+            video=video,
+            output_path=output_path,
+            output_label=output_label,
+            audio_only=audio_only,
+            priority=priority,
+        )
+        self.tasks.append(task)
+        heapq.heappush(self._queue, (-priority, next(self._counter), task))
+        self._changed.set()
+        return task
+
+    async def run(self) -> list[DownloadTask]:
+        """Download the queued videos until the queue is empty and no task is running.
+
+        Videos added while a task is running are started as soon as a download slot is
+        free, even when they are added after the queue ran empty. A task that fails is
+        marked as failed with its exception, and the others go on.
+
+        Returns:
+            list[DownloadTask]: Every task added to the manager.
+        """
+        workers = [asyncio.ensure_future(self._work()) for _ in range(self.max_concurrent_downloads)]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            raise
+        return list(self.tasks)
+
+    async def _work(self) -> None:
+        """Run the queued tasks one after another, by priority.
+
+        A worker finding the queue empty waits for a task to be added or to finish, and
+        stops once no task is running either.
+        """
+        while True:
+            if self._queue:
+                _, _, task = heapq.heappop(self._queue)
+                self._running += 1
+                try:
+                    await self._run_task(task)
+                finally:
+                    self._running -= 1
+                    self._changed.set()
+                continue
+            if not self._running:
+                self._changed.set()
+                return
+            self._changed.clear()
+            await self._changed.wait()
+
+    def _set_state(self, task: DownloadTask, state: TaskState) -> None:
+        """Change the state of a task and report it."""
+        task.state = state
+        if self.on_progress is not None:
+            self.on_progress(task)
+
+    def _on_segment(self, task: DownloadTask, completed: int, total: int, size: int) -> None:
+        """Record the progress of the segment download of a task."""
+        task.completed_segments = completed
+        task.total_segments = total
+        task.downloaded_bytes += size
+        if self.on_progress is not None:
+            self.on_progress(task)
+
+    async def _download(self, task: DownloadTask) -> str:
+        """Download the video of a task, returning the path it was saved to."""
+        watch = self.niconico.video.watch
+        if isinstance(task.video, str):
+            watch_data = await watch.get_watch_data(task.video, lazy=True)
+        else:
+            watch_data = task.video
+        output_label = task.output_label
+        if output_label is None:
+            outputs = watch.get_outputs(watch_data, audio_only=task.audio_only)
+            if not outputs:
+                raise DownloadError(message="No output is available.")
+            output_label = next(iter(outputs))
+        downloader = AsyncHLSDownloader(
+            self.niconico.session,
+            max_workers=self.segment_workers,
+            host_limiter=self.host_limiter,
+            bandwidth=self.bandwidth,
+            on_segment=lambda completed, total, size: self._on_segment(task, completed, total, size),
+        )
+        self._set_state(task, "downloading")
+        return await watch.download_video(
+            watch_data,
+            output_label,
+            task.output_path,
+            audio_only=task.audio_only,
+            muxer=self.muxer,
+            downloader=downloader,
+        )
+
+    async def _run_task(self, task: DownloadTask) -> None:
+        """Run a task, recording its result or the exception it failed with."""
+        self._set_state(task, "preparing")
+        try:
+            task.result = await self._download(task)
+        except Exception as e:
+            self.niconico.logger.warning("Failed to download %s", task.video_id, exc_info=True)
+            task.error = e
+            self._set_state(task, "failed")
+        else:
+            self._set_state(task, "completed")
@@ -0,0 +1,258 @@
+"""This module provides a class that represents an asynchronous video ranking client."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Literal
+
+from niconico.base.client import AsyncBaseClient
+from niconico.base.pagination import aiter_paged_items
+from niconico.video import endpoints
+from niconico.video.ranking_crawl import (
+    CRAWL_ERRORS,
+    DEFAULT_CRAWL_MAX_PAGES,
+    DEFAULT_CRAWL_WORKERS,
+    RANKING_TERMS,
+    RankingCrawl,
+    RankingPage,
+    RankingRecord,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable
+
+    from niconico.objects.nvapi import RankingData, TeibanRankingData
+    from niconico.objects.video import EssentialVideo
+    from niconico.objects.video.ranking import Genre, RankingTerm, TeibanRankingFeaturedKey
+
+
+class AsyncVideoRankingClient(AsyncBaseClient):
+    """A class that represents an asynchronous video ranking client."""
+
+    async def get_genres(self) -> list[Genre]:
+        """Asynchronous version of :meth:`~niconico.video.ranking.VideoRankingClient.get_genres`."""
+        return await self._send(endpoints.get_genres())
+
+    async def get_popular_tags(self, genre_key: str) -> list[str]:
+        """Asynchronous version of :meth:`~niconico.video.ranking.VideoRankingClient.get_popular_tags`."""
+        return await self._send(endpoints.get_popular_tags(genre_key))
+
+    async def get_ranking(
+        self,
+        genre_key: str,
+        term: Literal["hour", "24h", "week", "month", "total"],
+        *,
+        page_size: Literal[25, 100] = 100,
+        page: int = 1,
+        tag: str | None = None,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+    ) -> RankingData | None:
+        """Asynchronous version of :meth:`~niconico.video.ranking.VideoRankingClient.get_ranking`."""
+        return await self._send(
+            endpoints.get_ranking(
+                genre_key,
+                term,
+                page_size=page_size,
+                page=page,
+                tag=tag,
+                sensitive_contents=sensitive_contents,
+            ),
+        )
+
+    def iter_ranking(
+        self,
+        genre_key: str,
+        term: Literal["hour", "24h", "week", "month", "total"],
+        *,
+        page_size: Literal[25, 100] = 100,
+        tag: str | None = None,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        prefetch: int = 0,
+    ) -> AsyncIterator[EssentialVideo]:
+        """Iterate over a whole ranking, requesting the pages as needed.
+
+        Args:
+            genre_key (str): The key of the genre.
+            term (Literal["hour", "24h", "week", "month", "total"]): The term of the ranking.
+            page_size (Literal[25, 100]): The size of the page. Defaults to 100.
+            tag (str, optional): The tag. Defaults to None.
+            sensitive_contents (Literal["mask", "filter"], optional): The sensitive contents. Defaults to None.
+            prefetch (int): The number of pages to request ahead concurrently. Defaults to 0.
+
+        Returns:
+            AsyncIterator[EssentialVideo]: An iterator over the ranked videos, from the top.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_ranking(
+                genre_key,
+                term,
+                page_size=page_size,
+                page=page,
+                tag=tag,
+                sensitive_contents=sensitive_contents,
+            ),
+            lambda data: data.items,
+            lambda data, _: data.has_next,
+            prefetch=prefetch,
+        )
+
+    async def crawl_rankings(
+        self,
+        terms: Iterable[RankingTerm] = RANKING_TERMS,
+        *,
+        genre_keys: Iterable[str] | None = None,
+        include_tags: bool = True,
+        page_size: Literal[25, 100] = 100,
+        max_pages: int = DEFAULT_CRAWL_MAX_PAGES,
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+    ) -> AsyncIterator[RankingRecord]:
+        """Sweep every genre ranking, sending the requests concurrently.
+
+        The popular tags of every genre are requested, then every page of the ranking
+        of each (genre, tag, term) combination. Requests are sent as soon as they are
+        known, ``max_workers`` at a time, and go through the rate limiter of the client
+        if it has one. Records are yielded as their pages arrive, so rankings are
+        interleaved. Pages that could not be fetched, and the genres whose popular tags
+        could not be fetched, are logged and skipped.
+
+        Args:
+            terms (Iterable[RankingTerm]): The terms of the rankings. Defaults to every term.
+            genre_keys (Iterable[str] | None): The keys of the genres. Defaults to every genre.
+            include_tags (bool): Whether to fetch the ranking of each popular tag of the genres too.
+            page_size (Literal[25, 100]): The size of the page. Defaults to 100.
+            max_pages (int): The number of pages fetched at most per ranking.
+            max_workers (int): The number of requests sent at the same time.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+
+        Yields:
+            RankingRecord: The videos ranked, each video being attached to its first record only.
+        """
+        import httpx  # noqa: PLC0415
+
+        errors = (*CRAWL_ERRORS, httpx.HTTPError)
+        crawl = RankingCrawl(terms, page_size=page_size, max_pages=max_pages, errors=errors)
+        keys = list(genre_keys) if genre_keys is not None else [genre.key for genre in await self.get_genres()]
+        semaphore = asyncio.Semaphore(max_workers)
+        tag_jobs: dict[asyncio.Task[list[str]], str] = {}
+        page_jobs: dict[asyncio.Task[RankingData | None], RankingPage] = {}
+
+        def fetch(page: RankingPage) -> None:
+            task = self._crawl_page(semaphore, page, page_size=page_size, sensitive_contents=sensitive_contents)
+            page_jobs[asyncio.create_task(task)] = page
+
+        try:
+            for key in keys:
+                tag_jobs[asyncio.create_task(self._crawl_tags(semaphore, key, include_tags=include_tags))] = key
+            while tag_jobs or page_jobs:
+                pending: list[asyncio.Task[Any]] = [*tag_jobs, *page_jobs]
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for tag_task in [task for task in tag_jobs if task in done]:
+                    for page in crawl.take_genre(tag_jobs.pop(tag_task), tag_task.result):
+                        fetch(page)
+                for page_task in [task for task in page_jobs if task in done]:
+                    records, next_page = crawl.take_page(page_jobs.pop(page_task), page_task.result)
+                    if next_page is not None:
+                        fetch(next_page)
+                    for record in records:
+                        yield record
+        finally:
+            for task in [*tag_jobs, *page_jobs]:
+                task.cancel()
+
+    async def _crawl_tags(self, semaphore: asyncio.Semaphore, key: str, *, include_tags: bool) -> list[str]:
+        """Get the popular tags of a genre for a sweep, or none if tags are not swept."""
+        if not include_tags:
+            return []
+        async with semaphore:
+            return await self.get_popular_tags(key)
+
+    async def _crawl_page(
+        self,
+        semaphore: asyncio.Semaphore,
+        page: RankingPage,
+        *,
+        page_size: Literal[25, 100],
+        sensitive_contents: Literal["mask", "filter"] | None,
+    ) -> RankingData | None:
+        """Get a page of a genre ranking for a sweep."""
+        async with semaphore:
+            return await self.get_ranking(
+                page.genre_key,
+                page.term,
+                page_size=page_size,
+                page=page.page,
+                tag=page.tag,
+                sensitive_contents=sensitive_contents,
+            )
+
+    async def get_hot_topics(
+        self,
+        term: Literal["hour", "24h", "week", "month", "total"],
+        *,
+        page_size: Literal[25, 100] = 100,
+        page: int = 1,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+    ) -> RankingData | None:
+        """Asynchronous version of :meth:`~niconico.video.ranking.VideoRankingClient.get_hot_topics`."""
+        return await self._send(
+            endpoints.get_hot_topics(term, page_size=page_size, page=page, sensitive_contents=sensitive_contents),
+        )
+
+    async def get_teiban_ranking_featured_keys(self) -> list[TeibanRankingFeaturedKey]:
+        """Asynchronous version of :meth:`VideoRankingClient.get_teiban_ranking_featured_keys`."""
+        return await self._send(endpoints.get_teiban_ranking_featured_keys())
+
+    async def get_teiban_ranking(
+        self,
+        featured_key: str,
+        term: Literal["hour", "24h", "week", "month", "total"],
+        *,
+        page_size: Literal[25, 100] = 100,
+        page: int = 1,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+    ) -> TeibanRankingData | None:
+        """Asynchronous version of :meth:`~niconico.video.ranking.VideoRankingClient.get_teiban_ranking`."""
+        return await self._send(
+            endpoints.get_teiban_ranking(
+                featured_key,
+                term,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+            ),
+        )
+
+    def iter_teiban_ranking(
+        self,
+        featured_key: str,
+        term: Literal["hour", "24h", "week", "month", "total"],
+        *,
+        page_size: Literal[25, 100] = 100,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        prefetch: int = 0,
+    ) -> AsyncIterator[EssentialVideo]:
+        """Iterate over a whole teiban ranking, requesting the pages as needed.
+
+        Args:
+            featured_key (str): The featured key of the ranking.
+            term (Literal["hour", "24h", "week", "month", "total"]): The term of the ranking.
+            page_size (Literal[25, 100]): The size of the page. Defaults to 100.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+            prefetch (int): The number of pages to request ahead concurrently. Defaults to 0.
+
+        Returns:
+            AsyncIterator[EssentialVideo]: An iterator over the ranked videos, from the top.
+        """
+        return aiter_paged_items(
+            lambda page: self.get_teiban_ranking(
+                featured_key,
+                term,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+            ),
+            lambda data: data.items,
+            lambda data, _: data.has_next,
+            prefetch=prefetch,
+        )
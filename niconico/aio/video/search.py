@@ -0,0 +1,591 @@
+"""This module provides the asynchronous video search client."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Literal
+
+from niconico.base.client import AsyncBaseClient
+from niconico.base.pagination import aiter_paged_items
+from niconico.base.throttle import TokenBucket
+from niconico.objects.video.search import SnapshotSearchData, SnapshotVideoItem
+from niconico.utils import JST
+from niconico.video import endpoints
+from niconico.video.snapshot import (
+    DEFAULT_SNAPSHOT_RATE,
+    SNAPSHOT_EPOCH,
+    SNAPSHOT_MAX_LIMIT,
+    SNAPSHOT_MAX_OFFSET,
+    ShardPlanner,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Sequence
+
+    from niconico.objects.nvapi import ListSearchData, VideoSearchData
+    from niconico.objects.video import EssentialVideo
+    from niconico.objects.video.search import (
+        FacetItem,
+        ListSearchSortKey,
+        ListType,
+        SelectContentType,
+        SnapshotResponseField,
+        SnapshotSortKey,
+        SnapshotSortOrder,
+        SnapshotTargetField,
+        VideoSearchSortKey,
+        VideoSearchSortOrder,
+    )
+    from niconico.video.snapshot import SnapshotExporter
+
+
+class AsyncVideoSearchClient(AsyncBaseClient):
+    """A class that represents an asynchronous video search client."""
+
+    async def search_videos_by_keyword(
+        self,
+        keyword: str,
+        *,
+        sort_key: VideoSearchSortKey = "hot",
+        sort_order: VideoSearchSortOrder = "none",
+        page_size: int = 25,
+        page: int = 1,
+        sensitive_content: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+        channel_video_listing_status: Literal["included"] | None = None,
+        allow_future_contents: bool | None = None,
+        search_by_user: bool | None = None,
+        min_registered_at: str | None = None,
+        max_registered_at: str | None = None,
+        max_duration: int | None = None,
+    ) -> VideoSearchData | None:
+        """Asynchronous version of :meth:`~niconico.video.search.VideoSearchClient.search_videos_by_keyword`."""
+        return await self._send(
+            endpoints.search_videos(
+                "keyword",
+                keyword,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_content=sensitive_content,
+                select_content_type=select_content_type,
+                channel_video_listing_status=channel_video_listing_status,
+                allow_future_contents=allow_future_contents,
+                search_by_user=search_by_user,
+                min_registered_at=min_registered_at,
+                max_registered_at=max_registered_at,
+                max_duration=max_duration,
+            ),
+        )
+
+    def iter_videos_by_keyword(
+        self,
+        keyword: str,
+        *,
+        sort_key: VideoSearchSortKey = "hot",
+        sort_order: VideoSearchSortOrder = "none",
+        page_size: int = 100,
+        sensitive_content: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+        channel_video_listing_status: Literal["included"] | None = None,
+        allow_future_contents: bool | None = None,
+        search_by_user: bool | None = None,
+        min_registered_at: str | None = None,
+        max_registered_at: str | None = None,
+        max_duration: int | None = None,
+        prefetch: int = 0,
+    ) -> AsyncIterator[EssentialVideo]:
+        """Iterate over all videos matching a keyword, requesting the pages as needed.
+
+        The arguments are the same as :meth:`search_videos_by_keyword`.
+
+        Args:
+            keyword (str): The keyword to search.
+            sort_key (VideoSearchSortKey): The sort key.
+            sort_order (VideoSearchSortOrder): The sort order.
+            page_size (int): The number of videos to get per request.
+            sensitive_content (Literal["mask", "filter"] | None): The sensitive content.
+            select_content_type (SelectContentType | None): The content type to search for.
+            channel_video_listing_status (Literal["included"] | None): The channel video listing status.
+            allow_future_contents (bool | None): The allow future contents.
+            search_by_user (bool | None): The search by user.
+            min_registered_at (str | None): The minimum registered at.
+            max_registered_at (str | None): The maximum registered at.
+            max_duration (int | None): The maximum duration.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[EssentialVideo]: An iterator over the videos found.
+        """
+        return aiter_paged_items(
+            lambda page: self.search_videos_by_keyword(
+                keyword,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_content=sensitive_content,
+                select_content_type=select_content_type,
+                channel_video_listing_status=channel_video_listing_status,
+                allow_future_contents=allow_future_contents,
+                search_by_user=search_by_user,
+                min_registered_at=min_registered_at,
+                max_registered_at=max_registered_at,
+                max_duration=max_duration,
+            ),
+            lambda data: data.items,
+            lambda data, _: data.has_next,
+            prefetch=prefetch,
+        )
+
+    async def search_videos_by_tag(
+        self,
+        tag: str,
+        *,
+        sort_key: VideoSearchSortKey = "hot",
+        sort_order: VideoSearchSortOrder = "none",
+        page_size: int = 25,
+        page: int = 1,
+        sensitive_content: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+        channel_video_listing_status: Literal["included"] | None = None,
+        allow_future_contents: bool | None = None,
+        search_by_user: bool | None = None,
+        min_registered_at: str | None = None,
+        max_registered_at: str | None = None,
+        max_duration: int | None = None,
+    ) -> VideoSearchData | None:
+        """Asynchronous version of :meth:`~niconico.video.search.VideoSearchClient.search_videos_by_tag`."""
+        return await self._send(
+            endpoints.search_videos(
+                "tag",
+                tag,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_content=sensitive_content,
+                select_content_type=select_content_type,
+                channel_video_listing_status=channel_video_listing_status,
+                allow_future_contents=allow_future_contents,
+                search_by_user=search_by_user,
+                min_registered_at=min_registered_at,
+                max_registered_at=max_registered_at,
+                max_duration=max_duration,
+            ),
+        )
+
+    def iter_videos_by_tag(
+        self,
+        tag: str,
+        *,
+        sort_key: VideoSearchSortKey = "hot",
+        sort_order: VideoSearchSortOrder = "none",
+        page_size: int = 100,
+        sensitive_content: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+        channel_video_listing_status: Literal["included"] | None = None,
+        allow_future_contents: bool | None = None,
+        search_by_user: bool | None = None,
+        min_registered_at: str | None = None,
+        max_registered_at: str | None = None,
+        max_duration: int | None = None,
+        prefetch: int = 0,
+    ) -> AsyncIterator[EssentialVideo]:
+        """Iterate over all videos matching a tag, requesting the pages as needed.
+
+        The arguments are the same as :meth:`search_videos_by_tag`.
+
+        Args:
+            tag (str): The tag to search.
+            sort_key (VideoSearchSortKey): The sort key.
+            sort_order (VideoSearchSortOrder): The sort order.
+            page_size (int): The number of videos to get per request.
+            sensitive_content (Literal["mask", "filter"] | None): The sensitive content.
+            select_content_type (SelectContentType | None): The content type to search for.
+            channel_video_listing_status (Literal["included"] | None): The channel video listing status.
+            allow_future_contents (bool | None): The allow future contents.
+            search_by_user (bool | None): The search by user.
+            min_registered_at (str | None): The minimum registered at.
+            max_registered_at (str | None): The maximum registered at.
+            max_duration (int | None): The maximum duration.
+            prefetch (int): The number of pages to request ahead concurrently.
+
+        Returns:
+            AsyncIterator[EssentialVideo]: An iterator over the videos found.
+        """
+        return aiter_paged_items(
+            lambda page: self.search_videos_by_tag(
+                tag,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_content=sensitive_content,
+                select_content_type=select_content_type,
+                channel_video_listing_status=channel_video_listing_status,
+                allow_future_contents=allow_future_contents,
+                search_by_user=search_by_user,
+                min_registered_at=min_registered_at,
+                max_registered_at=max_registered_at,
+                max_duration=max_duration,
+            ),
+            lambda data: data.items,
+            lambda data, _: data.has_next,
+            prefetch=prefetch,
+        )
+
+    async def get_facet_by_keyword(
+        self,
+        keyword: str,
+        *,
+        sort_key: VideoSearchSortKey = "hot",
+        sort_order: VideoSearchSortOrder = "none",
+        sensitive_content: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+        channel_video_listing_status: Literal["included"] | None = None,
+        allow_future_contents: bool | None = None,
+        search_by_user: bool | None = None,
+        min_registered_at: str | None = None,
+        max_registered_at: str | None = None,
+        max_duration: int | None = None,
+    ) -> list[FacetItem]:
+        """Asynchronous version of :meth:`~niconico.video.search.VideoSearchClient.get_facet_by_keyword`."""
+        return await self._send(
+            endpoints.search_facet(
+                "keyword",
+                keyword,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                sensitive_content=sensitive_content,
+                select_content_type=select_content_type,
+                channel_video_listing_status=channel_video_listing_status,
+                allow_future_contents=allow_future_contents,
+                search_by_user=search_by_user,
+                min_registered_at=min_registered_at,
+                max_registered_at=max_registered_at,
+                max_duration=max_duration,
+            ),
+        )
+
+    async def search_facet_by_tag(
+        self,
+        tag: str,
+        *,
+        sort_key: VideoSearchSortKey = "hot",
+        sort_order: VideoSearchSortOrder = "none",
+        sensitive_content: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+        channel_video_listing_status: Literal["included"] | None = None,
+        allow_future_contents: bool | None = None,
+        search_by_user: bool | None = None,
+        min_registered_at: str | None = None,
+        max_registered_at: str | None = None,
+        max_duration: int | None = None,
+    ) -> list[FacetItem]:
+        """Asynchronous version of :meth:`~niconico.video.search.VideoSearchClient.search_facet_by_tag`."""
+        return await self._send(
+            endpoints.search_facet(
+                "tag",
+                tag,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                sensitive_content=sensitive_content,
+                select_content_type=select_content_type,
+                channel_video_listing_status=channel_video_listing_status,
+                allow_future_contents=allow_future_contents,
+                search_by_user=search_by_user,
+                min_registered_at=min_registered_at,
+                max_registered_at=max_registered_at,
+                max_duration=max_duration,
+            ),
+        )
+
+    async def search_lists(
+        self,
+        keyword: str,
+        sort_key: ListSearchSortKey = "_hotTotalScore",
+        sort_order: VideoSearchSortOrder = "desc",
+        types: list[ListType] | None = None,
+        page_size: int = 100,
+        page: int = 1,
+    ) -> ListSearchData | None:
+        """Asynchronous version of :meth:`~niconico.video.search.VideoSearchClient.search_lists`."""
+        return await self._send(
+            endpoints.search_lists(
+                keyword,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                types=types,
+                page_size=page_size,
+                page=page,
+            ),
+        )
+
+    async def search_videos_by_snapshot(
+        self,
+        keyword: str,
+        targets: list[SnapshotTargetField] | None = None,
+        *,
+        sort_key: SnapshotSortKey = "viewCounter",
+        sort_order: SnapshotSortOrder = "desc",
+        fields: list[SnapshotResponseField] | None = None,
+        filters: dict[str, dict[str, str] | list[str]] | None = None,
+        json_filter: str | None = None,
+        offset: int = 0,
+        limit: int = 10,
+        context: str = "niconico.py",
+    ) -> SnapshotSearchData | None:
+        """Asynchronous version of :meth:`~niconico.video.search.VideoSearchClient.search_videos_by_snapshot`."""
+        return await self._send(
+            endpoints.search_videos_by_snapshot(
+                keyword,
+                targets,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                fields=fields,
+                filters=filters,
+                json_filter=json_filter,
+                offset=offset,
+                limit=limit,
+                context=context,
+            ),
+        )
+
+    async def iter_snapshot_search(
+        self,
+        keyword: str,
+        targets: list[SnapshotTargetField] | None = None,
+        *,
+        sort_key: SnapshotSortKey = "viewCounter",
+        sort_order: SnapshotSortOrder = "desc",
+        fields: list[SnapshotResponseField] | None = None,
+        filters: dict[str, dict[str, str] | list[str]] | None = None,
+        json_filter: str | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        page_size: int = SNAPSHOT_MAX_LIMIT,
+        max_workers: int = 1,
+        requests_per_second: float | None = DEFAULT_SNAPSHOT_RATE,
+        max_offset: int = SNAPSHOT_MAX_OFFSET,
+        context: str = "niconico.py",
+    ) -> AsyncIterator[SnapshotVideoItem]:
+        """Iterate over every video matching a snapshot search, past the offset ceiling of the API.
+
+        The API does not accept an offset above ``max_offset``, so the search is split by
+        ``startTime`` into windows of at most ``max_offset`` videos, counted with requests
+        of ``limit=0``. The windows are then paged through with up to ``max_workers``
+        requests in flight on the event loop, and no more than ``requests_per_second``
+        requests per second. Videos are yielded window by window, and in the requested
+        order within a window, so with ``sort_key="startTime"`` the whole result is in order.
+
+        Args:
+            keyword (str): The keyword to search.
+            targets (list[SnapshotTargetField] | None): The fields to search against.
+            sort_key (SnapshotSortKey): The sort key within a window.
+            sort_order (SnapshotSortOrder): The sort order within a window.
+            fields (list[SnapshotResponseField] | None): The fields to include in the response.
+            filters (dict[str, dict[str, str] | list[str]] | None): The simple filters. ``startTime``
+                is set by the windows, so use ``start_time`` and ``end_time`` instead.
+            json_filter (str | None): A JSON encoded filter, used instead of ``filters``.
+            start_time (datetime | None): The earliest posting time, inclusive. Defaults to the launch of the site.
+            end_time (datetime | None): The latest posting time, exclusive. Defaults to now.
+            page_size (int): The number of videos to get per request.
+            max_workers (int): The number of requests sent at once.
+            requests_per_second (float | None): The number of requests sent per second, or None for no limit.
+            max_offset (int): The largest offset the API accepts.
+            context (str): The name of the service or application sending the request.
+
+        Yields:
+            SnapshotVideoItem: The videos found.
+
+        Raises:
+            ValueError: If ``filters`` contains ``startTime``.
+            NicoAPIError: If a request fails.
+        """
+        async for rows in self._iter_snapshot_pages(
+            keyword,
+            targets,
+            sort_key=sort_key,
+            sort_order=sort_order,
+            fields=fields,
+            filters=filters,
+            json_filter=json_filter,
+            start_time=start_time,
+            end_time=end_time,
+            page_size=page_size,
+            max_workers=max_workers,
+            requests_per_second=requests_per_second,
+            max_offset=max_offset,
+            context=context,
+        ):
+            for row in rows:
+                yield SnapshotVideoItem.model_validate(row)
+
+    async def export_snapshot_search(
+        self,
+        exporter: SnapshotExporter,
+        keyword: str,
+        targets: list[SnapshotTargetField] | None = None,
+        *,
+        sort_key: SnapshotSortKey = "viewCounter",
+        sort_order: SnapshotSortOrder = "desc",
+        filters: dict[str, dict[str, str] | list[str]] | None = None,
+        json_filter: str | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        page_size: int = SNAPSHOT_MAX_LIMIT,
+        max_workers: int = 1,
+        requests_per_second: float | None = DEFAULT_SNAPSHOT_RATE,
+        max_offset: int = SNAPSHOT_MAX_OFFSET,
+        context: str = "niconico.py",
+    ) -> int:
+        """Export every video matching a snapshot search to a Parquet, Arrow IPC or CSV file.
+
+        The search is walked like :meth:`iter_snapshot_search`, but the rows are written
+        from the decoded responses without building a ``SnapshotVideoItem`` for each video,
+        so the export is held in the bounded memory of the exporter::
+
+            with SnapshotExporter("videos.parquet") as exporter:
+                await client.video.search.export_snapshot_search(exporter, "ゲーム", ["tagsExact"])
+
+        Args:
+            exporter (SnapshotExporter): The exporter to write the videos to, with the fields to request.
+            keyword (str): The keyword to search.
+            targets (list[SnapshotTargetField] | None): The fields to search against.
+            sort_key (SnapshotSortKey): The sort key within a window.
+            sort_order (SnapshotSortOrder): The sort order within a window.
+            filters (dict[str, dict[str, str] | list[str]] | None): The simple filters. ``startTime``
+                is set by the windows, so use ``start_time`` and ``end_time`` instead.
+            json_filter (str | None): A JSON encoded filter, used instead of ``filters``.
+            start_time (datetime | None): The earliest posting time, inclusive. Defaults to the launch of the site.
+            end_time (datetime | None): The latest posting time, exclusive. Defaults to now.
+            page_size (int): The number of videos to get per request.
+            max_workers (int): The number of requests sent at once.
+            requests_per_second (float | None): The number of requests sent per second, or None for no limit.
+            max_offset (int): The largest offset the API accepts.
+            context (str): The name of the service or application sending the request.
+
+        Returns:
+            int: The number of videos written.
+
+        Raises:
+            ValueError: If ``filters`` contains ``startTime``.
+            NicoAPIError: If a request fails.
+        """
+        rows_written = exporter.rows_written
+        async for rows in self._iter_snapshot_pages(
+            keyword,
+            targets,
+            sort_key=sort_key,
+            sort_order=sort_order,
+            fields=exporter.fields,
+            filters=filters,
+            json_filter=json_filter,
+            start_time=start_time,
+            end_time=end_time,
+            page_size=page_size,
+            max_workers=max_workers,
+            requests_per_second=requests_per_second,
+            max_offset=max_offset,
+            context=context,
+        ):
+            exporter.write(rows)
+        exporter.flush()
+        return exporter.rows_written - rows_written
+
+    async def _iter_snapshot_pages(
+        self,
+        keyword: str,
+        targets: list[SnapshotTargetField] | None = None,
+        *,
+        sort_key: SnapshotSortKey = "viewCounter",
+        sort_order: SnapshotSortOrder = "desc",
+        fields: Sequence[SnapshotResponseField] | None = None,
+        filters: dict[str, dict[str, str] | list[str]] | None = None,
+        json_filter: str | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        page_size: int = SNAPSHOT_MAX_LIMIT,
+        max_workers: int = 1,
+        requests_per_second: float | None = DEFAULT_SNAPSHOT_RATE,
+        max_offset: int = SNAPSHOT_MAX_OFFSET,
+        context: str = "niconico.py",
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Iterate over the decoded rows of every page of a snapshot search, split by ``startTime``.
+
+        Args:
+            keyword (str): The keyword to search.
+            targets (list[SnapshotTargetField] | None): The fields to search against.
+            sort_key (SnapshotSortKey): The sort key within a window.
+            sort_order (SnapshotSortOrder): The sort order within a window.
+            fields (Sequence[SnapshotResponseField] | None): The fields to include in the response.
+            filters (dict[str, dict[str, str] | list[str]] | None): The simple filters. ``startTime``
+                is set by the windows, so use ``start_time`` and ``end_time`` instead.
+            json_filter (str | None): A JSON encoded filter, used instead of ``filters``.
+            start_time (datetime | None): The earliest posting time, inclusive. Defaults to the launch of the site.
+            end_time (datetime | None): The latest posting time, exclusive. Defaults to now.
+            page_size (int): The number of videos to get per request.
+            max_workers (int): The number of requests sent at once.
+            requests_per_second (float | None): The number of requests sent per second, or None for no limit.
+            max_offset (int): The largest offset the API accepts.
+            context (str): The name of the service or application sending the request.
+
+        Yields:
+            list[dict[str, Any]]: The rows of each page.
+
+        Raises:
+            ValueError: If ``filters`` contains ``startTime``.
+            NicoAPIError: If a request fails.
+        """
+        if filters is not None and "startTime" in filters:
+            msg = "Use start_time and end_time to limit startTime."
+            raise ValueError(msg)
+        bucket = TokenBucket(requests_per_second) if requests_per_second is not None else None
+
+        async def search(start: datetime, end: datetime, offset: int, limit: int) -> dict[str, Any]:
+            if bucket is not None:
+                await bucket.aconsume(1)
+            return await self._send(
+                endpoints.get_snapshot_window(
+                    keyword,
+                    targets,
+                    sort_key=sort_key,
+                    sort_order=sort_order,
+                    fields=fields,
+                    filters=filters,
+                    json_filter=json_filter,
+                    start=start,
+                    end=end,
+                    offset=offset,
+                    limit=limit,
+                    context=context,
+                ),
+            )
+
+        planner = ShardPlanner(start_time or SNAPSHOT_EPOCH, end_time or datetime.now(JST), max_offset)
+        while not planner.finished:
+            start, end = planner.next_window()
+            result = await search(start, end, 0, 0)
+            planner.record(result["meta"].get("totalCount") or 0)
+        for shard in planner.truncated:
+            self.log(
+                "warning",
+                f"Only the first {max_offset} of {shard.total_count} videos posted at {shard.start} can be fetched.",
+            )
+        pages = planner.pages(page_size, reverse=sort_key == "startTime" and sort_order == "desc")
+
+        async def fetch_page(page: int) -> dict[str, Any] | None:
+            if page > len(pages):
+                return None
+            shard, offset = pages[page - 1]
+            return await search(shard.start, shard.end, offset, page_size)
+
+        async for rows in aiter_paged_items(
+            fetch_page,
+            lambda data: [data["data"]],
+            lambda _, page: page < len(pages),
+            prefetch=max_workers - 1,
+        ):
+            yield rows
@@ -0,0 +1,195 @@
+"""This module provides an asynchronous client for watching videos on Niconico."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from niconico.base.client import AsyncBaseClient
+from niconico.decorators import login_required
+from niconico.exceptions import CommentAPIError, NicoAPIError
+from niconico.video import endpoints
+from niconico.video.comments import (
+    DEFAULT_MAX_FAILURES,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    CommentBackoff,
+    CommentHarvest,
+)
+from niconico.video.hls import DEFAULT_SEGMENT_WORKERS, AsyncHLSDownloader, default_muxer
+from niconico.video.watch import generate_action_track_id, get_outputs, prepare_output_path, select_output
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from niconico.objects.video.watch import Comment, NvCommentAPIData, NvCommentDataTarget, WatchData
+    from niconico.video.comments import CommentBatch
+    from niconico.video.hls import Muxer
+
+
+class AsyncVideoWatchClient(AsyncBaseClient):
+    """An asynchronous client for watching videos on Niconico."""
+
+    async def get_watch_data(self, video_id: str, *, lazy: bool = False) -> WatchData:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.get_watch_data`."""
+        return await self._send(endpoints.get_watch_data(video_id, lazy=lazy))
+
+    def generate_action_track_id(self) -> str:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.generate_action_track_id`."""
+        return generate_action_track_id()
+
+    def get_outputs(self, watch_data: WatchData, *, audio_only: bool = False) -> dict[str, list[str]]:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.get_outputs`."""
+        return get_outputs(watch_data, audio_only=audio_only)
+
+    async def get_hls_content_url(self, watch_data: WatchData, outputs: list[list[str]]) -> str | None:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.get_hls_content_url`."""
+        return await self._send(endpoints.get_hls_content_url(watch_data, outputs))
+
+    @login_required(premium=True)
+    async def get_storyboard_url(self, watch_data: WatchData) -> str | None:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.get_storyboard_url`."""
+        if not watch_data.media.domand.is_storyboard_available:
+            return None
+        return await self._send(endpoints.get_storyboard_url(watch_data))
+
+    async def _refresh_hls_content_url(self, watch_data: WatchData, output_label: str, *, audio_only: bool) -> str:
+        """Grant a new access right to the HLS content of a video whose access right has expired."""
+        fresh_watch_data = await self.get_watch_data(watch_data.client.watch_id, lazy=True)
+        output = select_output(self.get_outputs(fresh_watch_data, audio_only=audio_only), output_label)
+        hls_content_url = await self.get_hls_content_url(fresh_watch_data, [output])
+        if hls_content_url is None:
+            raise NicoAPIError(message="Failed to get the HLS content URL.")
+        return hls_content_url
+
+    async def download_video(
+        self,
+        watch_data: WatchData,
+        output_label: str,
+        output_path: str = "%(title)s.%(ext)s",
+        *,
+        audio_only: bool = False,
+        muxer: Muxer | None = None,
+        max_workers: int = DEFAULT_SEGMENT_WORKERS,
+        downloader: AsyncHLSDownloader | None = None,
+    ) -> str:
+        """Download a video.
+
+        The segments are downloaded concurrently and decrypted natively, then the tracks
+        are combined by the muxer. Without a muxer, ffmpeg is used, and a DownloadError is
+        raised before anything is fetched if it is not installed. Pass ``TrackFilesMuxer()``
+        to save the audio track next to the video without ffmpeg instead.
+
+        Progress is kept next to the output file until the download completes, so running
+        the same download again after a crash resumes from the segments already saved.
+        An expired access right is renewed with a fresh watch data.
+
+        Args:
+            watch_data: The watch data of the video.
+            output_label: The output label of the video.
+            output_path: The path to save the video.
+            audio_only: Whether to download the audio only.
+            muxer: The muxer combining the video and audio tracks. ffmpeg is used when None.
+            max_workers: The number of segments downloaded at once.
+            downloader: The downloader to use, such as one sharing limits with other downloads.
+                ``max_workers`` is ignored when it is given.
+
+        Returns:
+            str: The path of the downloaded video.
+        """
+        muxer = muxer if muxer is not None else default_muxer()
+        output = select_output(self.get_outputs(watch_data, audio_only=audio_only), output_label)
+        hls_content_url = await self.get_hls_content_url(watch_data, [output])
+        if hls_content_url is None:
+            raise NicoAPIError(message="Failed to get the HLS content URL.")
+        output_path = prepare_output_path(watch_data, output_path, audio_only=audio_only)
+        if downloader is None:
+            downloader = AsyncHLSDownloader(self.niconico.session, max_workers=max_workers)
+        await downloader.download(
+            hls_content_url,
+            output_path,
+            muxer,
+            refresh=lambda: self._refresh_hls_content_url(watch_data, output_label, audio_only=audio_only),
+        )
+        return output_path
+
+    async def get_thread_key(self, video_id: str) -> str | None:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.get_thread_key`."""
+        return await self._send(endpoints.get_thread_key(video_id))
+
+    async def get_comments(
+        self,
+        watch_data: WatchData,
+        *,
+        when: int | None = None,
+        thread_key: str | None = None,
+        targets: list[NvCommentDataTarget] | None = None,
+    ) -> NvCommentAPIData | None:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.get_comments`."""
+        return await self._send(
+            endpoints.get_comments(watch_data, when=when, thread_key=thread_key, targets=targets),
+        )
+
+    async def get_comment_batch(
+        self,
+        watch_data: WatchData,
+        *,
+        when: int | None = None,
+        thread_key: str | None = None,
+        targets: list[NvCommentDataTarget] | None = None,
+    ) -> CommentBatch | None:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.get_comment_batch`."""
+        return await self._send(
+            endpoints.get_comment_batch(watch_data, when=when, thread_key=thread_key, targets=targets),
+        )
+
+    async def iter_comment_batches(
+        self,
+        watch_data: WatchData,
+        *,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        max_failures: int = DEFAULT_MAX_FAILURES,
+    ) -> AsyncIterator[CommentBatch]:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.iter_comment_batches`."""
+        harvest = CommentHarvest(watch_data.comment.nv_comment.params.targets, int(time.time()))
+        backoff = CommentBackoff(min_interval, max_interval, max_failures)
+        thread_key: str | None = None
+        while not harvest.finished:
+            targets, when = harvest.next_request()
+            try:
+                batch = await self.get_comment_batch(watch_data, when=when, thread_key=thread_key, targets=targets)
+            except CommentAPIError as e:
+                batch, error_code = None, e.message
+            else:
+                error_code = None
+            if batch is None:
+                wait = backoff.failed(error_code)
+                if wait is None:
+                    thread_key = await self.get_thread_key(watch_data.client.watch_id)
+                else:
+                    await asyncio.sleep(wait)
+                continue
+            yield harvest.absorb(batch)
+            wait = backoff.succeeded()
+            if not harvest.finished:
+                await asyncio.sleep(wait)
+
+    async def iter_all_comments(
+        self,
+        watch_data: WatchData,
+        *,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        max_failures: int = DEFAULT_MAX_FAILURES,
+    ) -> AsyncIterator[tuple[str, Comment]]:
+        """Asynchronous version of :meth:`~niconico.video.watch.VideoWatchClient.iter_all_comments`."""
+        async for batch in self.iter_comment_batches(
+            watch_data,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            max_failures=max_failures,
+        ):
+            for index in reversed(range(len(batch))):
+                yield batch.fork_of(index), batch[index]
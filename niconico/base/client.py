@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, TypeVar
 
 if TYPE_CHECKING:
+    from niconico.aio.niconico import AsyncNicoNico
+    from niconico.base.endpoint import Endpoint
     from niconico.niconico import NicoNico
 
+T = TypeVar("T")
+
 
 class BaseClient:
     """A class that represents a base client."""
@@ -20,3 +24,27 @@ class BaseClient:
     def log(self, type_: str, message: str) -> None:
         """Log a message."""
         return getattr(self.niconico.logger, type_)(message)
+
+    def _send(self, endpoint: Endpoint[T]) -> T:
+        """Send the request of an endpoint and parse its response."""
+        res = getattr(self.niconico, endpoint.method.lower())(endpoint.url, **endpoint.send_kwargs())
+        return endpoint.parse(res)
+
+
+class AsyncBaseClient:
+    """A class that represents a base client of the asynchronous API."""
+
+    niconico: AsyncNicoNico
+
+    def __init__(self, niconico: AsyncNicoNico) -> None:
+        """Initialize the base client."""
+        self.niconico = niconico
+
+    def log(self, type_: str, message: str) -> None:
+        """Log a message."""
+        return getattr(self.niconico.logger, type_)(message)
+
+    async def _send(self, endpoint: Endpoint[T]) -> T:
+        """Send the request of an endpoint and parse its response."""
+        res = await getattr(self.niconico, endpoint.method.lower())(endpoint.url, **endpoint.send_kwargs())
+        return endpoint.parse(res)
@@ -0,0 +1,107 @@
+"""This module provides the requests shared by the synchronous and asynchronous clients."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeVar
+
+import requests
+
+from niconico.objects.nvapi import NvAPIResponse
+from niconico.utils import parse_response
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import httpx
+    from pydantic import BaseModel
+
+T = TypeVar("T")
+U = TypeVar("U")
+DataT = TypeVar("DataT", bound="BaseModel")
+
+Method = Literal["GET", "POST", "PUT", "DELETE"]
+
+
+@dataclass(frozen=True)
+class Endpoint(Generic[T]):
+    """A request to an API and the way its response is read.
+
+    The clients build endpoints with the functions of the ``endpoints`` module of their
+    package and only send them, so the synchronous and asynchronous clients share
+    everything but the transport call.
+    """
+
+    method: Method
+    url: str
+    parse: Callable[[requests.Response | httpx.Response], T] = field(repr=False)
+    data: dict[str, str] | str | bytes | None = None
+    json: object | None = None
+    headers: dict[str, str] | None = None
+
+    def send_kwargs(self) -> dict[str, Any]:
+        """Get the keyword arguments to pass to the transport method along with the URL."""
+        kwargs = {"data": self.data, "json": self.json, "headers": self.headers}
+        return {key: value for key, value in kwargs.items() if value is not None}
+
+    def map(self, func: Callable[[T], U]) -> Endpoint[U]:
+        """Get the same request with its parsed result passed through a function."""
+        parse = self.parse
+        return Endpoint(
+            self.method,
+            self.url,
+            lambda res: func(parse(res)),
+            data=self.data,
+            json=self.json,
+            headers=self.headers,
+        )
+
+
+def nvapi_data(
+    res: requests.Response | httpx.Response,
+    model: type[DataT],
+    ok: tuple[int, ...] = (requests.codes.ok,),
+) -> DataT | None:
+    """Get the data of an nvAPI response.
+
+    Args:
+        res (requests.Response | httpx.Response): The response.
+        model (type[DataT]): The model of the data.
+        ok (tuple[int, ...]): The status codes of a successful response.
+
+    Returns:
+        DataT | None: The data if the request succeeded, None otherwise.
+    """
+    if res.status_code in ok:
+        return parse_response(res, NvAPIResponse.of(model)).data
+    return None
+
+
+def nvapi(
+    method: Method,
+    url: str,
+    model: type[DataT],
+    *,
+    data: dict[str, str] | None = None,
+    json: object | None = None,
+    headers: dict[str, str] | None = None,
+    ok: tuple[int, ...] = (requests.codes.ok,),
+) -> Endpoint[DataT | None]:
+    """Build a request to nvAPI whose result is the data of its response, or None if it failed."""
+    return Endpoint(method, url, lambda res: nvapi_data(res, model, ok), data=data, json=json, headers=headers)
+
+
+def status(method: Method, url: str, ok: tuple[int, ...] = (requests.codes.ok,)) -> Endpoint[bool]:
+    """Build a request whose result is whether it succeeded."""
+    return Endpoint(method, url, lambda res: res.status_code in ok)
+
+
+def parsed(url: str, model: type[DataT]) -> Endpoint[DataT | None]:
+    """Build a GET request whose result is its whole response parsed into a model, or None if it failed."""
+
+    def parse(res: requests.Response | httpx.Response) -> DataT | None:
+        if res.status_code == requests.codes.ok:
+            return parse_response(res, model)
+        return None
+
+    return Endpoint("GET", url, parse)
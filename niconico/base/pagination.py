@@ -0,0 +1,112 @@
+"""This module contains helpers to walk paged API endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+
+PageT = TypeVar("PageT")
+ItemT = TypeVar("ItemT")
+
+
+def iter_paged_items(
+    fetch_page: Callable[[int], PageT | None],
+    get_items: Callable[[PageT], Sequence[ItemT]],
+    has_next: Callable[[PageT, int], bool],
+    *,
+    prefetch: int = 0,
+) -> Iterator[ItemT]:
+    """Iterate over the items of a paged endpoint, requesting the pages as needed.
+
+    The iteration stops when a page can not be fetched, when a page has no items or
+    when ``has_next`` returns False for the last page.
+
+    Args:
+        fetch_page (Callable[[int], PageT | None]): A function that fetches a page by its number, starting at 1.
+        get_items (Callable[[PageT], Sequence[ItemT]]): A function that returns the items of a page.
+        has_next (Callable[[PageT, int], bool]): A function that tells whether a page is followed by another one.
+        prefetch (int): The number of pages to request ahead in background threads.
+            Up to this many requests may be sent past the last page.
+
+    Yields:
+        ItemT: The items of every page, in order.
+    """
+    if prefetch <= 0:
+        page_number = 1
+        while True:
+            page = fetch_page(page_number)
+            if page is None:
+                return
+            items = get_items(page)
+            yield from items
+            if not items or not has_next(page, page_number):
+                return
+            page_number += 1
+
+    executor = ThreadPoolExecutor(max_workers=prefetch)
+    pending: deque[Future[PageT | None]] = deque()
+    next_page_number = 1
+    try:
+        page_number = 1
+        while True:
+            while len(pending) <= prefetch:
+                pending.append(executor.submit(fetch_page, next_page_number))
+                next_page_number += 1
+            page = pending.popleft().result()
+            if page is None:
+                return
+            items = get_items(page)
+            yield from items
+            if not items or not has_next(page, page_number):
+                return
+            page_number += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_paged_items(
+    fetch_page: Callable[[int], Awaitable[PageT | None]],
+    get_items: Callable[[PageT], Sequence[ItemT]],
+    has_next: Callable[[PageT, int], bool],
+    *,
+    prefetch: int = 0,
+) -> AsyncIterator[ItemT]:
+    """Iterate asynchronously over the items of a paged endpoint.
+
+    This is the asynchronous counterpart of :func:`iter_paged_items`. Prefetched pages
+    are requested as tasks on the running event loop.
+
+    Args:
+        fetch_page (Callable[[int], Awaitable[PageT | None]]): A coroutine function that fetches a page.
+        get_items (Callable[[PageT], Sequence[ItemT]]): A function that returns the items of a page.
+        has_next (Callable[[PageT, int], bool]): A function that tells whether a page is followed by another one.
+        prefetch (int): The number of pages to request ahead.
+
+    Yields:
+        ItemT: The items of every page, in order.
+    """
+    pending: deque[asyncio.Task[PageT | None]] = deque()
+    next_page_number = 1
+    try:
+        page_number = 1
+        while True:
+            while len(pending) <= max(prefetch, 0):
+                pending.append(asyncio.ensure_future(fetch_page(next_page_number)))
+                next_page_number += 1
+            page = await pending.popleft()
+            if page is None:
+                return
+            items = get_items(page)
+            for item in items:
+                yield item
+            if not items or not has_next(page, page_number):
+                return
+            page_number += 1
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,101 @@
+"""This module contains helpers to bound the rate and concurrency of requests."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+class TokenBucket:
+    """A token bucket refilled at a constant rate, shared between threads and tasks.
+
+    Tokens are taken after the amount is known, such as the size of a received body, so
+    the bucket may go into debt. The caller then waits until the debt is paid back, which
+    keeps the average rate at ``rate`` while allowing bursts of up to ``capacity``.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """Initialize the bucket, full.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            capacity (float | None): The largest number of tokens held at once. Defaults to one second of tokens.
+        """
+        if rate <= 0:
+            msg = "rate must be positive."
+            raise ValueError(msg)
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take tokens from the bucket.
+
+        Args:
+            amount (float): The number of tokens to take.
+
+        Returns:
+            float: The number of seconds to wait before the bucket is out of debt.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Take tokens from the bucket, sleeping while it is in debt.
+
+        Args:
+            amount (float): The number of tokens to take.
+        """
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aconsume(self, amount: float) -> None:
+        """Take tokens from the bucket, waiting asynchronously while it is in debt.
+
+        Args:
+            amount (float): The number of tokens to take.
+        """
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class HostLimiter:
+    """Limit the number of requests in flight to each host from an event loop."""
+
+    def __init__(self, max_per_host: int) -> None:
+        """Initialize the limiter.
+
+        Args:
+            max_per_host (int): The number of requests sent at once to a single host.
+        """
+        self.max_per_host = max_per_host
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold a connection slot of the host of a URL.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        async with semaphore:
+            yield
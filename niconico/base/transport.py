@@ -0,0 +1,252 @@
+"""This module contains the HTTP transport settings of the clients."""
+
+from __future__ import annotations
+
+import io
+from collections.abc import Callable, Mapping
+from http.client import HTTPMessage
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.cookies import extract_cookies_to_jar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+if TYPE_CHECKING:
+    import httpx
+    from requests import PreparedRequest, Response
+
+Timeout = float | tuple[float, float] | tuple[float, None] | None
+"""A timeout in seconds, or a (connect, read) pair of timeouts. None waits forever."""
+
+DEFAULT_TIMEOUT: Timeout = (10.0, 60.0)
+"""The default connect and read timeouts, in seconds."""
+
+FRONTEND_HEADERS: Mapping[str, str] = {
+    "User-Agent": "niconico.py",
+    "X-Frontend-Id": "6",
+    "X-Frontend-Version": "0",
+}
+"""The headers of the NicoNico web frontend, sent with every request."""
+
+MUTATION_HEADERS: Mapping[str, str] = {
+    **FRONTEND_HEADERS,
+    "X-Niconico-Language": "ja-jp",
+    "X-Client-Os-Type": "others",
+    "X-Request-With": "https://www.nicovideo.jp",
+    "X-Requested-With": "XMLHttpRequest",
+    "Origin": "https://www.nicovideo.jp",
+    "Referer": "https://www.nicovideo.jp/",
+}
+"""The headers sent with POST, PUT and DELETE requests, which the API checks for its CSRF protection."""
+
+RequestHook = Callable[[str, str, dict[str, str]], None]
+"""A function called with the method, URL and headers of each request before it is sent.
+
+It may change the headers in place, for example to sign requests or to add tracing headers.
+"""
+
+HTTP2_HOSTS = ("nvapi.nicovideo.jp",)
+"""The hosts requested over HTTP/2 when it is enabled."""
+
+HOP_BY_HOP_HEADERS = frozenset({"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"})
+"""The headers of a single HTTP/1.1 connection, which HTTP/2 forbids."""
+
+DEFAULT_POOL_CONNECTIONS = 16
+"""The default number of hosts whose connections are pooled."""
+
+DEFAULT_POOL_MAXSIZE = 32
+"""The default number of connections kept open to each host."""
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """An HTTP adapter that applies a default timeout to the requests sent without one.
+
+    ``requests`` waits forever by default, so a connection that stops answering would
+    hang the calling thread. Mounting this adapter on a session bounds every request,
+    including those sent by the downloaders that share the session.
+    """
+
+    def __init__(
+        self,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        *,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+    ) -> None:
+        """Initialize the adapter.
+
+        Args:
+            timeout (Timeout): The timeout of requests sent without one.
+            pool_connections (int): The number of hosts whose connections are pooled.
+            pool_maxsize (int): The number of connections kept open to each host.
+            pool_block (bool): Whether to wait for a free connection when ``pool_maxsize``
+                connections to a host are in use, instead of opening one that is discarded after use.
+        """
+        self.timeout = timeout
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,  # noqa: FBT001, FBT002
+        timeout: Timeout = None,
+        verify: bool | str = True,  # noqa: FBT001, FBT002
+        cert: bytes | str | tuple[bytes | str, bytes | str] | None = None,
+        proxies: Mapping[str, str] | None = None,
+    ) -> Response:
+        """Send a request, with the default timeout if it has none."""
+        return super().send(
+            request,
+            stream=stream,
+            timeout=timeout if timeout is not None else self.timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+
+
+def httpx_timeout(timeout: Timeout) -> httpx.Timeout:
+    """Convert a timeout to the one of httpx.
+
+    Args:
+        timeout (Timeout): The timeout in seconds, or a (connect, read) pair. None waits forever.
+
+    Returns:
+        httpx.Timeout: The timeout of httpx.
+    """
+    import httpx  # noqa: PLC0415
+
+    if isinstance(timeout, tuple):
+        return httpx.Timeout(timeout[1], connect=timeout[0])
+    return httpx.Timeout(timeout)
+
+
+class HTTP2ResponseBody(io.BytesIO):
+    """The body of a response read by httpx, with its headers where ``requests`` reads cookies from.
+
+    ``requests`` stores the cookies of a response from the headers of the response of
+    ``http.client`` that urllib3 keeps, so they are exposed the same way here.
+    """
+
+    def __init__(self, content: bytes, headers: HTTPMessage) -> None:
+        """Initialize the body.
+
+        Args:
+            content (bytes): The content of the response.
+            headers (HTTPMessage): The headers of the response, each ``Set-Cookie`` header kept apart.
+        """
+        super().__init__(content)
+        self._original_response = SimpleNamespace(msg=headers)
+
+
+class HTTP2Adapter(BaseAdapter):
+    """An HTTP adapter that sends the requests of a session over HTTP/2 with httpx.
+
+    Concurrent requests to a host are multiplexed over a few connections instead of
+    opening one connection, and TLS handshake, per request in flight. Responses are
+    read whole before they are returned, so mount it on API hosts, not on the hosts
+    streams are downloaded from. Cookies set by its responses are stored in the session
+    like those of HTTP/1.1 responses.
+
+    Requires the optional ``http2`` extra::
+
+        pip install "niconico.py[http2]"
+    """
+
+    def __init__(
+        self,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        *,
+        max_connections: int = DEFAULT_POOL_MAXSIZE,
+        transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        """Initialize the adapter.
+
+        Args:
+            timeout (Timeout): The timeout of requests sent without one.
+            max_connections (int): The number of connections kept open to all hosts together.
+            transport (httpx.BaseTransport | None): The transport to send requests with.
+                The default HTTP/2 transport is used when None.
+        """
+        super().__init__()
+        self.timeout = timeout
+        try:
+            import httpx  # noqa: PLC0415
+
+            self.client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=max_connections),
+                timeout=httpx_timeout(timeout),
+                transport=transport,
+            )
+        except ImportError as e:  # pragma: no cover - depends on the optional extra
+            msg = 'HTTP2Adapter requires httpx and h2. Install them with `pip install "niconico.py[http2]"`.'
+            raise ImportError(msg) from e
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,  # noqa: FBT001, FBT002
+        timeout: Timeout = None,
+        verify: bool | str = True,  # noqa: FBT001, FBT002
+        cert: bytes | str | tuple[bytes | str, bytes | str] | None = None,
+        proxies: Mapping[str, str] | None = None,
+    ) -> Response:
+        """Send a request over HTTP/2, with the default timeout if it has none.
+
+        TLS verification, client certificates and proxies are those of the httpx client.
+
+        Raises:
+            requests.Timeout: If the request timed out.
+            requests.ConnectionError: If the request could not be sent.
+        """
+        import httpx  # noqa: PLC0415
+
+        _ = stream, verify, cert, proxies
+        headers = [(key, value) for key, value in request.headers.items() if key.lower() not in HOP_BY_HOP_HEADERS]
+        try:
+            res = self.client.request(
+                request.method or "GET",
+                request.url or "",
+                headers=headers,
+                content=request.body,
+                timeout=httpx_timeout(timeout if timeout is not None else self.timeout),
+            )
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e, request=request) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request) from e
+        return self.build_response(request, res)
+
+    def build_response(self, request: PreparedRequest, res: httpx.Response) -> Response:
+        """Build the response of ``requests`` from the one of httpx.
+
+        Args:
+            request (PreparedRequest): The request sent.
+            res (httpx.Response): The response read by httpx.
+
+        Returns:
+            Response: The response.
+        """
+        response = requests.Response()
+        response.status_code = res.status_code
+        response.reason = res.reason_phrase
+        response.headers = CaseInsensitiveDict(res.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url or str(res.url)
+        response.request = request
+        headers = HTTPMessage()
+        for key, value in res.headers.multi_items():
+            headers[key] = value
+        response.raw = HTTP2ResponseBody(res.content, headers)
+        response._content = res.content  # noqa: SLF001
+        extract_cookies_to_jar(response.cookies, request, response.raw)
+        return response
+
+    def close(self) -> None:
+        """Close the connections of the adapter."""
+        self.client.close()
@@ -0,0 +1,298 @@
+"""This module provides the response cache used by NicoNico.get."""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+DEFAULT_TTL_RULES: tuple[tuple[str, float], ...] = (
+    (r"^https://nvapi\.nicovideo\.jp/v2/genres$", 24 * 60 * 60),
+    (r"^https://nvapi\.nicovideo\.jp/v1/ranking/teiban/featured-keys$", 24 * 60 * 60),
+    (r"^https://nvapi\.nicovideo\.jp/v1/genres/[^/]+/popular-tags$", 60 * 60),
+    (r"^https://public-api\.ch\.nicovideo\.jp/v2/open/channels/", 60 * 60),
+    (r"^https://nvapi\.nicovideo\.jp/v1/ranking/", 10 * 60),
+    (r"^https://nvapi\.nicovideo\.jp/v1/videos\?", 5 * 60),
+)
+"""The endpoints cached by default, as (URL pattern, TTL in seconds) pairs."""
+
+DEFAULT_SIGNED_URL_PATTERNS: tuple[str, ...] = (r"^https://[^/]+\.domand\.nicovideo\.jp/",)
+"""The hosts serving assets through signed URLs, such as storyboards."""
+
+VALIDATOR_HEADERS = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+"""The response headers kept to revalidate entries, with the request header sending each back."""
+
+
+@dataclass
+class CacheEntry:
+    """A stored response."""
+
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    expires_at: float
+
+    @classmethod
+    def from_response(cls, res: requests.Response, ttl: float) -> CacheEntry:
+        """Create an entry from a response that stays fresh for ttl seconds."""
+        return cls(
+            url=res.url,
+            status_code=res.status_code,
+            headers=dict(res.headers),
+            content=res.content,
+            expires_at=time.time() + ttl,
+        )
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the entry has not expired yet."""
+        return time.time() < self.expires_at
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """The conditional request headers to revalidate the entry with."""
+        headers = CaseInsensitiveDict(self.headers)
+        return {
+            request_header: headers[response_header]
+            for response_header, request_header in VALIDATOR_HEADERS.items()
+            if response_header in headers
+        }
+
+    def revalidate(self, res: requests.Response, ttl: float) -> None:
+        """Refresh the entry from a 304 Not Modified response."""
+        for header in (*VALIDATOR_HEADERS, "Date", "Cache-Control"):
+            if header in res.headers:
+                self.headers[header] = res.headers[header]
+        self.expires_at = time.time() + ttl
+
+    def to_response(self) -> CachedResponse:
+        """Rebuild a response object from the entry."""
+        res = CachedResponse()
+        res.url = self.url
+        res.status_code = self.status_code
+        res.headers = CaseInsensitiveDict(self.headers)
+        res._content = self.content  # noqa: SLF001
+        res.encoding = requests.utils.get_encoding_from_headers(res.headers)
+        res.cache_entry = self
+        return res
+
+
+class CachedResponse(requests.Response):
+    """A response that is stored in the cache, or was served from it."""
+
+    cache_entry: CacheEntry | None = None
+
+    @classmethod
+    def wrap(cls, res: requests.Response, entry: CacheEntry) -> CachedResponse:
+        """Attach a cache entry to a response received from the network."""
+        cached = cls()
+        cached.__dict__.update(res.__dict__)
+        cached.cache_entry = entry
+        return cached
+
+
+@dataclass
+class CachePolicy:
+    """Decide which GET requests are cached, and for how long.
+
+    The first rule whose pattern matches the URL gives the TTL. URLs no rule matches
+    are cached for ``default_ttl`` seconds, or not at all when it is None.
+
+    Responses carrying an ``ETag`` or ``Last-Modified`` header are also kept when
+    ``revalidate`` is set, even if they are not cached, so the next request for the URL
+    is sent conditionally and a 304 Not Modified reuses the stored body.
+
+    Attributes:
+        rules (list[tuple[str, float]]): The (URL regex, TTL in seconds) pairs.
+        default_ttl (float | None): The TTL of URLs no rule matches.
+        cache_authenticated (bool): Whether to cache requests sent while logged in.
+            Those entries are keyed by session, so users never see each other's data.
+        revalidate (bool): Whether to keep validators and send conditional requests.
+        signed_url_patterns (list[str]): The URL regexes of assets granted by a signature
+            in the query string. Their entries are keyed without the query, since it changes
+            on every access grant, and are shared between users.
+    """
+
+    rules: list[tuple[str, float]] = field(default_factory=lambda: list(DEFAULT_TTL_RULES))
+    default_ttl: float | None = None
+    cache_authenticated: bool = False
+    revalidate: bool = True
+    signed_url_patterns: list[str] = field(default_factory=lambda: list(DEFAULT_SIGNED_URL_PATTERNS))
+
+    def ttl_for(self, url: str) -> float | None:
+        """Get the TTL of a URL, or None if it must not be cached."""
+        for pattern, ttl in self.rules:
+            if re.search(pattern, url):
+                return ttl
+        return self.default_ttl
+
+    def is_signed_url(self, url: str) -> bool:
+        """Whether a URL is an asset granted by a signature in its query string."""
+        return any(re.search(pattern, url) for pattern in self.signed_url_patterns)
+
+
+class BaseCache(ABC):
+    """A storage backend of the response cache."""
+
+    @abstractmethod
+    def get(self, key: str) -> CacheEntry | None:
+        """Get an entry, or None if it is not stored."""
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used ones if the cache is full."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+
+class MemoryCache(BaseCache):
+    """An in-memory LRU cache bounded by entry count and total body size."""
+
+    def __init__(self, *, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries (int): The maximum number of stored responses.
+            max_bytes (int): The maximum total size of the stored response bodies.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of stored entries."""
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Get an entry, or None if it is not stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used ones if the cache is full."""
+        if len(entry.content) > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._size += len(entry.content)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _pop(self, key: str) -> None:
+        """Remove an entry while holding the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.content)
+
+
+class SQLiteCache(BaseCache):
+    """An on-disk LRU cache stored in a SQLite database, shared across runs."""
+
+    def __init__(self, path: str | Path, *, max_entries: int = 100_000) -> None:
+        """Initialize the cache.
+
+        Args:
+            path (str | Path): The path of the database file. It is created if missing.
+            max_entries (int): The maximum number of stored responses.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT NOT NULL, status_code INTEGER NOT NULL, "
+                "headers TEXT NOT NULL, content BLOB NOT NULL, expires_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)",
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Get an entry, or None if it is not stored."""
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT url, status_code, headers, content, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        url, status_code, headers, content, expires_at = row
+        return CacheEntry(
+            url=url,
+            status_code=status_code,
+            headers=json.loads(headers),
+            content=bytes(content),
+            expires_at=expires_at,
+        )
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used ones if the cache is full."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.url,
+                    entry.status_code,
+                    json.dumps(entry.headers),
+                    entry.content,
+                    entry.expires_at,
+                    time.time(),
+                ),
+            )
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
@@ -0,0 +1,47 @@
+"""This module provides the requests of the channel clients, shared by the synchronous and asynchronous APIs."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+from niconico.base.endpoint import parsed
+from niconico.objects.channel import ChannelData, ChAPIResponse
+from niconico.objects.channel.search import ChSearchAPIResponse
+
+if TYPE_CHECKING:
+    from niconico.base.endpoint import Endpoint
+    from niconico.objects.channel.search import ChannelSearchItem
+
+
+def get_channel(channel_id: str) -> Endpoint[ChannelData | None]:
+    """Build the request of :meth:`ChannelClient.get_channel`."""
+    channel_id = channel_id.replace("ch", "")
+    url = f"https://public-api.ch.nicovideo.jp/v2/open/channels/{channel_id}"
+    return parsed(url, ChAPIResponse.of(ChannelData)).map(lambda res_cls: res_cls.data if res_cls is not None else None)
+
+
+def search_channels(
+    query: str,
+    *,
+    search_type: Literal["keyword", "tag"],
+    limit: int,
+    offset: int,
+    order: Literal["desc", "asc"],
+    sort: Literal["updateTime"] | None,
+) -> Endpoint[list[ChannelSearchItem]]:
+    """Build the request of :meth:`ChannelSearchClient.search_channels`."""
+    query_dict = {
+        "query": query,
+        "searchType": search_type,
+        "limit": str(limit),
+        "offset": str(offset),
+        "order": order,
+        "responseGroup": "detail",
+    }
+    if sort is not None:
+        query_dict["sort"] = sort
+    query_str = "&".join(f"{key}={value}" for key, value in query_dict.items())
+    url = f"https://public-api.ch.nicovideo.jp/v1/open/search/channels?{query_str}"
+    return parsed(url, ChSearchAPIResponse).map(
+        lambda res_cls: res_cls.data if res_cls is not None and res_cls.data is not None else [],
+    )
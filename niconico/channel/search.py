@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Literal
-
-import requests
+from typing import TYPE_CHECKING, Literal
 
 from niconico.base.client import BaseClient
-from niconico.objects.channel.search import ChannelSearchItem, ChSearchAPIResponse
+from niconico.channel import endpoints
+
+if TYPE_CHECKING:
+    from niconico.objects.channel.search import ChannelSearchItem
 
 
 class ChannelSearchClient(BaseClient):
@@ -36,20 +37,13 @@ class ChannelSearchClient(BaseClient):
         Returns:
             list[ChannelSearchItem]: Channel search item list.
         """
-        query_dict = {
-            "query": query,
-            "searchType": search_type,
-            "limit": str(limit),
-            "offset": str(offset),
-            "order": order,
-            "responseGroup": "detail",
-        }
-        if sort is not None:
-            query_dict["sort"] = sort
-        query_str = "&".join(f"{key}={value}" for key, value in query_dict.items())
-        res = self.niconico.get(f"https://public-api.ch.nicovideo.jp/v1/open/search/channels?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = ChSearchAPIResponse(**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return []
+        return self._send(
+            endpoints.search_channels(
+                query,
+                search_type=search_type,
+                limit=limit,
+                offset=offset,
+                order=order,
+                sort=sort,
+            ),
+        )
@@ -0,0 +1,240 @@
+"""This module provides a local store of the counters of videos over time."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+    from types import TracebackType
+    from typing import Self
+
+    from niconico.objects.video import EssentialVideo
+
+DEFAULT_CHUNK_SAMPLES = 256
+"""The default number of samples stored in a chunk before a new one is started."""
+
+
+class CounterSample(NamedTuple):
+    """The counters of a video at a point in time."""
+
+    at: datetime
+    view: int
+    comment: int
+    mylist: int
+    like: int
+
+
+def encode_varints(values: Iterable[int]) -> bytes:
+    """Encode integers as zigzag varints.
+
+    Small values, negative ones included, take a single byte, so the deltas between
+    two samples of a video take a few bytes each.
+
+    Args:
+        values (Iterable[int]): The integers to encode.
+
+    Returns:
+        bytes: The encoded integers.
+    """
+    data = bytearray()
+    for value in values:
+        zigzag = value * 2 if value >= 0 else -value * 2 - 1
+        while zigzag >= 0x80:  # noqa: PLR2004
+            data.append((zigzag & 0x7F) | 0x80)
+            zigzag >>= 7
+        data.append(zigzag)
+    return bytes(data)
+
+
+def decode_varints(data: bytes) -> list[int]:
+    """Decode integers encoded by :func:`encode_varints`.
+
+    Args:
+        data (bytes): The encoded integers.
+
+    Returns:
+        list[int]: The integers.
+    """
+    values: list[int] = []
+    zigzag = shift = 0
+    for byte in data:
+        zigzag |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(zigzag >> 1 if not zigzag & 1 else -(zigzag >> 1) - 1)
+        zigzag = shift = 0
+    return values
+
+
+class CounterStore:
+    """An embedded store of the view, comment, mylist and like counters of videos.
+
+    Each call to :meth:`add` records the counters of videos, such as those of a
+    ranking or of a search, at a point in time. A sample whose counters did not change
+    since the previous one of the video is not stored, so the counters of a video at a
+    time are those of its latest sample up to that time::
+
+        with CounterStore("counters.db") as store:
+            store.add(client.video.ranking.get_ranking("all", "hour").items)
+            samples = store.history("sm9", start=datetime(2025, 1, 1, tzinfo=UTC))
+
+    Samples are stored per video in chunks of varint-encoded deltas from the previous
+    sample, about 10 bytes a sample, and indexed by their first time so a range of
+    time only reads the chunks it overlaps. Times are stored in whole seconds.
+    """
+
+    def __init__(self, path: str | Path, *, chunk_samples: int = DEFAULT_CHUNK_SAMPLES) -> None:
+        """Initialize the store.
+
+        Args:
+            path (str | Path): The path of the database file. It is created if missing.
+            chunk_samples (int): The number of samples stored in a chunk before a new one is started.
+        """
+        self.chunk_samples = chunk_samples
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                "id INTEGER PRIMARY KEY, video_id TEXT NOT NULL UNIQUE, at INTEGER NOT NULL, "
+                "views INTEGER NOT NULL, comments INTEGER NOT NULL, mylists INTEGER NOT NULL, "
+                "likes INTEGER NOT NULL, chunk_at INTEGER NOT NULL, chunk_size INTEGER NOT NULL)",
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "video INTEGER NOT NULL, first_at INTEGER NOT NULL, last_at INTEGER NOT NULL, "
+                "data BLOB NOT NULL, PRIMARY KEY (video, first_at)) WITHOUT ROWID",
+            )
+
+    def add(self, videos: Iterable[EssentialVideo], at: datetime | None = None) -> int:
+        """Record the counters of videos.
+
+        Args:
+            videos (Iterable[EssentialVideo]): The videos. A video listed twice keeps its first counters.
+            at (datetime | None): The time the videos were fetched, or None for now.
+                Naive datetimes are in local time.
+
+        Returns:
+            int: The number of samples stored. Videos whose counters did not change, or whose
+                latest sample is not older than ``at``, are skipped.
+        """
+        timestamp = int((at or datetime.now(tz=UTC)).timestamp())
+        counters: dict[str, tuple[int, int, int, int]] = {}
+        for video in videos:
+            count = video.count
+            counters.setdefault(video.id_, (count.view, count.comment, count.mylist, count.like))
+        stored = 0
+        with self._lock, self._connection:
+            for video_id, values in counters.items():
+                stored += self._add_sample(video_id, timestamp, values)
+        return stored
+
+    def history(self, video_id: str, start: datetime | None = None, end: datetime | None = None) -> list[CounterSample]:
+        """Get the samples of a video within a range of time.
+
+        Args:
+            video_id (str): The ID of the video.
+            start (datetime | None): The time of the first sample, or None from the first one.
+            end (datetime | None): The time of the last sample, or None up to the latest one.
+
+        Returns:
+            list[CounterSample]: The samples, oldest first.
+        """
+        first_at = int(start.timestamp()) if start is not None else -(2**63)
+        last_at = int(end.timestamp()) if end is not None else 2**63 - 1
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT data FROM chunks WHERE video = (SELECT id FROM videos WHERE video_id = ?) "
+                "AND last_at >= ? AND first_at <= ? ORDER BY first_at",
+                (video_id, first_at, last_at),
+            ).fetchall()
+        samples: list[CounterSample] = []
+        for (data,) in rows:
+            values = decode_varints(bytes(data))
+            sample = [0] * len(CounterSample._fields)
+            for offset in range(0, len(values), len(sample)):
+                deltas = values[offset : offset + len(sample)]
+                sample = [total + delta for total, delta in zip(sample, deltas, strict=True)]
+                if first_at <= sample[0] <= last_at:
+                    samples.append(CounterSample(datetime.fromtimestamp(sample[0], tz=UTC), *sample[1:]))
+        return samples
+
+    def latest(self, video_id: str) -> CounterSample | None:
+        """Get the latest sample of a video, or None if it has none."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT at, views, comments, mylists, likes FROM videos WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CounterSample(datetime.fromtimestamp(row[0], tz=UTC), *row[1:])
+
+    def video_ids(self) -> list[str]:
+        """Get the IDs of the videos with samples, in the order they were first recorded."""
+        with self._lock:
+            rows = self._connection.execute("SELECT video_id FROM videos ORDER BY id").fetchall()
+        return [video_id for (video_id,) in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def __enter__(self) -> Self:
+        """Return the store."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the database connection."""
+        self.close()
+
+    def _add_sample(self, video_id: str, timestamp: int, values: tuple[int, int, int, int]) -> int:
+        """Store a sample of a video while holding the lock, returning 1 if it was stored, else 0."""
+        row = self._connection.execute(
+            "SELECT id, at, views, comments, mylists, likes, chunk_at, chunk_size FROM videos WHERE video_id = ?",
+            (video_id,),
+        ).fetchone()
+        if row is None:
+            key = self._connection.execute(
+                "INSERT INTO videos (video_id, at, views, comments, mylists, likes, chunk_at, chunk_size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
+                (video_id, timestamp, *values, timestamp),
+            ).lastrowid
+            self._start_chunk(key, timestamp, values)
+            return 1
+        key, previous_at, *previous, chunk_at, chunk_size = row
+        if timestamp <= previous_at or tuple(previous) == values:
+            return 0
+        if chunk_size >= self.chunk_samples:
+            self._start_chunk(key, timestamp, values)
+            chunk_at, chunk_size = timestamp, 0
+        else:
+            deltas = [timestamp - previous_at, *(value - old for value, old in zip(values, previous, strict=True))]
+            self._connection.execute(
+                "UPDATE chunks SET data = CAST(data || ? AS BLOB), last_at = ? WHERE video = ? AND first_at = ?",
+                (encode_varints(deltas), timestamp, key, chunk_at),
+            )
+        self._connection.execute(
+            "UPDATE videos SET at = ?, views = ?, comments = ?, mylists = ?, likes = ?, chunk_at = ?, chunk_size = ? "
+            "WHERE id = ?",
+            (timestamp, *values, chunk_at, chunk_size + 1, key),
+        )
+        return 1
+
+    def _start_chunk(self, key: int | None, timestamp: int, values: tuple[int, int, int, int]) -> None:
+        """Start a chunk of a video with a sample stored whole."""
+        self._connection.execute(
+            "INSERT INTO chunks VALUES (?, ?, ?, ?)",
+            (key, timestamp, timestamp, encode_varints([timestamp, *values])),
+        )
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import inspect
 from collections.abc import Callable
 from functools import wraps
 from typing import TYPE_CHECKING, Any, TypeVar
@@ -9,21 +10,37 @@ from typing import TYPE_CHECKING, Any, TypeVar
 from niconico.exceptions import LoginRequiredError, PremiumRequiredError
 
 if TYPE_CHECKING:
-    from niconico.base.client import BaseClient
+    from niconico.base.client import AsyncBaseClient, BaseClient
 
 F = TypeVar("F", bound=Callable[..., Any])
 
 
 def login_required(*, premium: bool = False) -> Callable[[F], F]:
-    """A decorator that requires a login to be performed."""
+    """A decorator that requires a login to be performed.
+
+    Coroutine functions are wrapped by a coroutine function, so the decorator can be
+    used on the asynchronous clients as well.
+    """
+
+    def check(client: BaseClient | AsyncBaseClient) -> None:
+        if not client.niconico.logined:
+            raise LoginRequiredError(message="Login is required to use this function.")
+        if premium and not client.niconico.premium:
+            raise PremiumRequiredError(message="Premium account is required to use this function.")
 
     def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(self: AsyncBaseClient, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                check(self)
+                return await func(self, *args, **kwargs)
+
+            return async_wrapper  # type: ignore  # noqa: PGH003
+
         @wraps(func)
         def wrapper(self: BaseClient, *args: Any, **kwargs: Any) -> F:  # noqa: ANN401
-            if not self.niconico.logined:
-                raise LoginRequiredError(message="Login is required to use this function.")
-            if premium and not self.niconico.premium:
-                raise PremiumRequiredError(message="Premium account is required to use this function.")
+            check(self)
             return func(self, *args, **kwargs)
 
         return wrapper  # type: ignore  # noqa: PGH003
@@ -26,6 +26,10 @@ class DownloadError(Exception):
         super().__init__(message)
 
 
+class AccessRightExpiredError(DownloadError):
+    """An exception raised when the access right of a download has expired."""
+
+
 class NicoAPIError(Exception):
     """An exception raised when an error occurs in the Nico API."""
 
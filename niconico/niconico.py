@@ -2,23 +2,44 @@
 
 from __future__ import annotations
 
+import hashlib
+import threading
 import warnings
 from logging import Logger, getLogger
 from typing import TYPE_CHECKING, cast
-from urllib.parse import urlparse
 
 import requests
 
+from niconico.base.transport import (
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_TIMEOUT,
+    FRONTEND_HEADERS,
+    HTTP2_HOSTS,
+    MUTATION_HEADERS,
+    HTTP2Adapter,
+    TimeoutHTTPAdapter,
+)
+from niconico.cache import CachedResponse, CacheEntry, CachePolicy
 from niconico.channel import ChannelClient
 from niconico.exceptions import LoginFailureError
+from niconico.singleflight import SingleFlight
 from niconico.user import UserClient
 from niconico.video import VideoClient
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Iterable
+
+    from niconico.base.transport import RequestHook, Timeout
+    from niconico.cache import BaseCache
+    from niconico.ratelimit import RateLimiter
+    from niconico.retry import RetryPolicy
 
 logger = getLogger("niconico.py")
 
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout)
+"""The exceptions of requests that may succeed when sent again."""
+
 SESSION_COOKIE_NAME = "user_session"
 COOKIE_DOMAIN = "nicovideo.jp"
 SUPPORTED_BROWSERS = (
@@ -35,22 +56,104 @@ SUPPORTED_BROWSERS = (
 
 
 class NicoNico:
-    """A class to interact with the NicoNico API."""
+    """A class to interact with the NicoNico API.
+
+    One instance can be shared by the threads of a ``ThreadPoolExecutor``: the threads
+    send their requests through the same connection pool, and logging in, refreshing
+    the session and logging out are serialized, so requests sent meanwhile see either
+    the previous or the new login state, never a half-updated one.
+
+    Every request carries ``headers``, or ``mutation_headers`` for POST, PUT and DELETE,
+    merged with the headers given to the call. Functions appended to ``request_hooks``
+    are called with the method, URL and headers of each request before it is sent::
+
+        client.request_hooks.append(lambda method, url, headers: headers.update({"X-Trace-Id": new_id()}))
+    """
 
     logger: Logger
     session: requests.Session
     logined: bool
     premium: bool
+    cache: BaseCache | None
+    cache_policy: CachePolicy
+    rate_limiter: RateLimiter | None
+    retry_policy: RetryPolicy | None
+    headers: dict[str, str]
+    mutation_headers: dict[str, str]
+    request_hooks: list[RequestHook]
+    single_flight: SingleFlight[requests.Response] | None
 
     video: VideoClient
     user: UserClient
     channel: ChannelClient
 
-    def __init__(self) -> None:
-        """Initialize the class."""
+    def __init__(
+        self,
+        *,
+        cache: BaseCache | None = None,
+        cache_policy: CachePolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        http2: bool = False,
+        single_flight: bool = False,
+    ) -> None:
+        """Initialize the class.
+
+        Args:
+            cache (BaseCache | None): The cache to store GET responses in, such as a
+                ``MemoryCache`` or a ``SQLiteCache``. Responses are not cached when None.
+            cache_policy (CachePolicy | None): The policy that decides which responses are
+                cached, and for how long. The default policy is used when None.
+            rate_limiter (RateLimiter | None): The limiter that paces the requests to each host
+                and backs off when they are throttled. Requests are not limited when None.
+            retry_policy (RetryPolicy | None): The policy that retries requests failing with a
+                transient error. Requests are not retried when None.
+            timeout (Timeout): The timeout of every request in seconds, or a (connect, read) pair.
+                None waits forever.
+            pool_connections (int): The number of hosts whose connections are pooled.
+            pool_maxsize (int): The number of connections kept open to each host. Raise it to the
+                number of threads sharing the client, so they do not open and discard connections.
+            pool_block (bool): Whether threads wait for a free connection once ``pool_maxsize``
+                connections to a host are in use.
+            keep_alive (bool): Whether to reuse connections between requests.
+            http2 (bool): Whether to send the requests to the hosts in ``HTTP2_HOSTS`` over HTTP/2,
+                multiplexing concurrent requests over the same connections. Requires the ``http2`` extra.
+            single_flight (bool): Whether concurrent identical GET requests share a single request
+                and its response object.
+        """
         self.logger = logger
         self.session = requests.Session()
+        adapter = TimeoutHTTPAdapter(
+            timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if http2:
+            http2_adapter = HTTP2Adapter(timeout, max_connections=pool_maxsize)
+            for host in HTTP2_HOSTS:
+                self.session.mount(f"https://{host}/", http2_adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
         self.logined = False
+        self.premium = False
+        self._auth_lock = threading.RLock()
+        self._auth_generation = 0
+        self.cache = cache
+        self.cache_policy = cache_policy if cache_policy is not None else CachePolicy()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.headers = dict(FRONTEND_HEADERS)
+        self.mutation_headers = dict(MUTATION_HEADERS)
+        self.request_hooks = []
+        self.single_flight = SingleFlight() if single_flight else None
         self.video = VideoClient(self)
         self.user = UserClient(self)
         self.channel = ChannelClient(self)
@@ -58,6 +161,13 @@ class NicoNico:
     def get(self, url: str, *, headers: dict[str, str] | None = None) -> requests.Response:
         """Send a GET request to a URL.
 
+        When a cache is configured, a fresh stored response is returned instead of
+        sending the request, and successful responses the cache policy allows are stored.
+        Stale responses with validators are revalidated with a conditional request.
+
+        When single flight is enabled, threads requesting the same URL with the same
+        headers and session while a request is in flight wait for it and get its response.
+
         Args:
             url (str): The URL to send the request to.
             headers (dict[str, str] | None): Additional headers to send with the request.
@@ -65,16 +175,65 @@ class NicoNico:
         Returns:
             requests.Response: The response object.
         """
-        parsed_url = urlparse(url)
-        req_headers = {
-            "User-Agent": "niconico.py",
-            "X-Frontend-Id": "6",
-            "X-Frontend-Version": "0",
-            "Host": parsed_url.netloc,
-        }
+        flight = self.single_flight
+        if flight is None:
+            return self._get(url, headers)
+        return flight.do(self._request_key(url, headers), lambda: self._get(url, headers))
+
+    def _get(self, url: str, headers: dict[str, str] | None) -> requests.Response:
+        """Send a GET request to a URL through the cache."""
+        cache = self.cache
+        cache_key = self._get_cache_key(url, headers)
+        entry = cache.get(cache_key) if cache is not None and cache_key is not None else None
+        if entry is not None and entry.is_fresh:
+            return entry.to_response()
+        if entry is not None and self.cache_policy.revalidate and entry.validators:
+            headers = entry.validators | headers if headers is not None else dict(entry.validators)
+        res = self._request("GET", url, headers=headers)
+        if cache is None or cache_key is None:
+            return res
+        ttl = self.cache_policy.ttl_for(url)
+        if entry is not None and res.status_code == requests.codes.not_modified:
+            entry.revalidate(res, ttl or 0)
+            cache.set(cache_key, entry)
+            return entry.to_response()
+        if res.status_code != requests.codes.ok:
+            return res
+        new_entry = CacheEntry.from_response(res, ttl or 0)
+        if ttl is None and not (self.cache_policy.revalidate and new_entry.validators):
+            return res
+        cache.set(cache_key, new_entry)
+        return CachedResponse.wrap(res, new_entry)
+
+    def _get_cache_key(self, url: str, headers: dict[str, str] | None) -> str | None:
+        """Get the cache key of a GET request, or None if its response must not be cached.
+
+        Keys are distinct per user when logged in, except for signed asset URLs whose
+        query string is dropped instead.
+        """
+        policy = self.cache_policy
+        if self.cache is None:
+            return None
+        if policy.is_signed_url(url):
+            return url.split("?", 1)[0]
+        if self.logined and not policy.cache_authenticated:
+            return None
+        if policy.ttl_for(url) is None and not policy.revalidate:
+            return None
+        return self._request_key(url, headers)
+
+    def _request_key(self, url: str, headers: dict[str, str] | None) -> str:
+        """Get a key that is equal for requests expecting the same response.
+
+        The key holds the URL, the headers and a hash of the session when logged in.
+        """
+        parts = [url]
         if headers is not None:
-            req_headers.update(headers)
-        return self.session.get(url, headers=req_headers)
+            parts.extend(f"{key}: {value}" for key, value in sorted(headers.items()))
+        session = self.get_user_session() if self.logined else None
+        if session is not None:
+            parts.append(hashlib.sha256(session.encode()).hexdigest())
+        return "\n".join(parts)
 
     def post(
         self,
@@ -95,24 +254,7 @@ class NicoNico:
         Returns:
             requests.Response: The response object.
         """
-        parsed_url = urlparse(url)
-        req_headers = {
-            "User-Agent": "niconico.py",
-            "X-Frontend-Id": "6",
-            "X-Frontend-Version": "0",
-            "X-Niconico-Language": "ja-jp",
-            "X-Client-Os-Type": "others",
-            "X-Request-With": "https://www.nicovideo.jp",
-            "X-Requested-With": "XMLHttpRequest",
-            "Origin": "https://www.nicovideo.jp",
-            "Referer": "https://www.nicovideo.jp/",
-            "Host": parsed_url.netloc,
-        }
-        if headers is not None:
-            req_headers.update(headers)
-        if json is None:
-            return self.session.post(url, headers=req_headers, data=data)
-        return self.session.post(url, headers=req_headers, json=json)
+        return self._request("POST", url, data=data, json=json, headers=headers)
 
     def put(
         self,
@@ -133,24 +275,7 @@ class NicoNico:
         Returns:
             requests.Response: The response object.
         """
-        parsed_url = urlparse(url)
-        req_headers = {
-            "User-Agent": "niconico.py",
-            "X-Frontend-Id": "6",
-            "X-Frontend-Version": "0",
-            "X-Niconico-Language": "ja-jp",
-            "X-Client-Os-Type": "others",
-            "X-Request-With": "https://www.nicovideo.jp",
-            "X-Requested-With": "XMLHttpRequest",
-            "Origin": "https://www.nicovideo.jp",
-            "Referer": "https://www.nicovideo.jp/",
-            "Host": parsed_url.netloc,
-        }
-        if headers is not None:
-            req_headers.update(headers)
-        if json is None:
-            return self.session.put(url, headers=req_headers, data=data)
-        return self.session.put(url, headers=req_headers, json=json)
+        return self._request("PUT", url, data=data, json=json, headers=headers)
 
     def delete(
         self,
@@ -167,22 +292,50 @@ class NicoNico:
         Returns:
             requests.Response: The response object.
         """
-        parsed_url = urlparse(url)
-        req_headers = {
-            "User-Agent": "niconico.py",
-            "X-Frontend-Id": "6",
-            "X-Frontend-Version": "0",
-            "X-Niconico-Language": "ja-jp",
-            "X-Client-Os-Type": "others",
-            "X-Request-With": "https://www.nicovideo.jp",
-            "X-Requested-With": "XMLHttpRequest",
-            "Origin": "https://www.nicovideo.jp",
-            "Referer": "https://www.nicovideo.jp/",
-            "Host": parsed_url.netloc,
-        }
-        if headers is not None:
-            req_headers.update(headers)
-        return self.session.delete(url, headers=req_headers)
+        return self._request("DELETE", url, headers=headers)
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: dict[str, str] | str | bytes | None = None,
+        json: object | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> requests.Response:
+        """Send a request with the headers of the NicoNico web frontend.
+
+        The headers of the client are merged with the given ones, then every request
+        hook may change them before the request is sent. The ``Host`` header is left
+        to the transport.
+        """
+        base = self.headers if method == "GET" else self.mutation_headers
+        req_headers = base | headers if headers is not None else dict(base)
+        for hook in self.request_hooks:
+            hook(method, url, req_headers)
+        send = getattr(self.session, method.lower())
+        if method in {"GET", "DELETE"}:
+            return self._dispatch(method, url, lambda: send(url, headers=req_headers))
+        if json is None:
+            return self._dispatch(method, url, lambda: send(url, headers=req_headers, data=data))
+        return self._dispatch(method, url, lambda: send(url, headers=req_headers, json=json))
+
+    def _dispatch(self, method: str, url: str, send: Callable[[], requests.Response]) -> requests.Response:
+        """Send a request under the retry policy and the rate limiter."""
+        policy = self.retry_policy
+        if policy is None:
+            return self._limited(url, send)
+        return policy.call(method, url, lambda: self._limited(url, send), retry_on=TRANSIENT_ERRORS)
+
+    def _limited(self, url: str, send: Callable[[], requests.Response]) -> requests.Response:
+        """Send a request once the rate limiter allows it, and report the response to the limiter."""
+        limiter = self.rate_limiter
+        if limiter is None:
+            return send()
+        limiter.acquire(url)
+        res = send()
+        limiter.observe(url, res.status_code, res.headers.get("Retry-After"))
+        return res
 
     def login_with_mail(self, mail: str, password: str, mfa: str | None = None) -> None:
         """Login to NicoNico with a mail and password.
@@ -296,28 +449,52 @@ class NicoNico:
     def login_with_session(self, session: str) -> None:
         """Login to NicoNico with a session.
 
+        The session is checked before it is stored, and the login state is updated at
+        once, so other threads never send requests with an unchecked session.
+
         Args:
             session (str): The session to login with.
-        """
-        self.logined = False
-
-        self.session.cookies.set("user_session", session)
-
-        res = self.session.get("https://www.nicovideo.jp/")
 
-        if res.url != "https://www.nicovideo.jp/":
-            self.session.cookies.clear("", "/", "user_session")
-            raise LoginFailureError(message="Login failed")
+        Raises:
+            LoginFailureError: If the session is not valid. The client is logged out then.
+        """
+        with self._auth_lock:
+            res = self.session.get("https://www.nicovideo.jp/", cookies={SESSION_COOKIE_NAME: session})
+            authflag = res.headers.get("x-niconico-authflag")
+            if res.url != "https://www.nicovideo.jp/" or authflag not in {"1", "3"}:
+                self._clear_login()
+                raise LoginFailureError(message="Login failed")
+            self.session.cookies.set(SESSION_COOKIE_NAME, session)
+            self.premium = authflag == "3"
+            self.logined = True
+            self._auth_generation += 1
+
+    def refresh_session(self) -> None:
+        """Check the current session again and update the login state.
+
+        Threads that call this while another thread is refreshing wait for it and reuse
+        its result instead of sending another request.
 
-        if res.headers.get("x-niconico-authflag") == "1":
+        Raises:
+            LoginFailureError: If the client holds no session, or it is no longer valid.
+        """
+        generation = self._auth_generation
+        with self._auth_lock:
+            if self._auth_generation != generation:
+                return
+            session = self.get_user_session()
+            if session is None:
+                raise LoginFailureError(message="Not logged in")
+            self.login_with_session(session)
+
+    def _clear_login(self) -> None:
+        """Drop the session and the login state."""
+        with self._auth_lock:
+            if self.get_user_session() is not None:
+                self.session.cookies.clear("", "/", SESSION_COOKIE_NAME)
+            self.logined = False
             self.premium = False
-        elif res.headers.get("x-niconico-authflag") == "3":
-            self.premium = True
-        else:
-            self.session.cookies.clear("", "/", "user_session")
-            raise LoginFailureError(message="Login failed")
-
-        self.logined = True
+            self._auth_generation += 1
 
     def get_user_session(self) -> str | None:
         """Get the user session.
@@ -333,11 +510,10 @@ class NicoNico:
         Properly logs out by calling logout endpoint and clearing session data.
         Updates authentication state to reflect logged out status.
         """
-        if self.logined:
+        with self._auth_lock:
+            if not self.logined:
+                self.logger.warning("Not logged in, cannot logout")
+                return
             self.session.get("https://account.nicovideo.jp/logout")
-            self.session.cookies.clear("", "/", "user_session")
-            self.logined = False
-            self.premium = False
+            self._clear_login()
             self.logger.debug("Logged out from NicoNico")
-        else:
-            self.logger.warning("Not logged in, cannot logout")
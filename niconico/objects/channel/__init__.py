@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
-from typing import Generic, TypeVar
+from typing import Generic, TypeVar, cast
 
 from pydantic import BaseModel, Field
 
+from niconico.objects.common import parametrize
+
 T = TypeVar("T")
+DataT = TypeVar("DataT")
 
 
 class ChAPIMeta(BaseModel):
@@ -24,6 +27,18 @@ class ChAPIResponse(BaseModel, Generic[T]):
     meta: ChAPIMeta
     data: T | None
 
+    @classmethod
+    def of(cls, data_type: type[DataT]) -> type[ChAPIResponse[DataT]]:
+        """Get the channel API response model parametrized with a payload type, cached across calls.
+
+        Args:
+            data_type (type[DataT]): The type of the ``data`` field.
+
+        Returns:
+            type[ChAPIResponse[DataT]]: The parametrized model.
+        """
+        return cast("type[ChAPIResponse[DataT]]", parametrize(cls, data_type))
+
 
 class ChannelStatus(BaseModel):
     """Represents the status of a channel API response."""
@@ -2,11 +2,29 @@
 
 from __future__ import annotations
 
-from typing import Literal
+from functools import cache
+from typing import Literal, cast
 
 from pydantic import BaseModel, Field
 
 
+@cache
+def parametrize(model: type[BaseModel], argument: type) -> type[BaseModel]:
+    """Get a generic model parametrized with a type, building it only on first use.
+
+    Subscripting a generic model looks up or builds the parametrized class every time,
+    so the response models keep them in this registry keyed by their payload type.
+
+    Args:
+        model (type[BaseModel]): The generic model.
+        argument (type): The type to parametrize the model with.
+
+    Returns:
+        type[BaseModel]: The parametrized model, with its validator already built.
+    """
+    return cast("type[BaseModel]", model.__class_getitem__(argument))
+
+
 class UserIcon(BaseModel):
     """A class that represents the icons of a user."""
 
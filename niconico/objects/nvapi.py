@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
-from typing import Any, Generic, TypeVar
+from typing import Any, Generic, TypeVar, cast
 
 from pydantic import BaseModel, Field
 
+from niconico.objects.common import parametrize
 from niconico.objects.user import (
     NicoUser,
     OwnNicoUser,
@@ -41,6 +42,7 @@ from niconico.objects.video.ranking import (
 from niconico.objects.video.search import EssentialMylist, EssentialSeries, FacetItem, VideoSearchAdditionals
 
 T = TypeVar("T")
+DataT = TypeVar("DataT")
 
 
 class NvAPIMeta(BaseModel):
@@ -56,6 +58,18 @@ class NvAPIResponse(BaseModel, Generic[T]):
     meta: NvAPIMeta
     data: T | None
 
+    @classmethod
+    def of(cls, data_type: type[DataT]) -> type[NvAPIResponse[DataT]]:
+        """Get the NvAPI response model parametrized with a payload type, cached across calls.
+
+        Args:
+            data_type (type[DataT]): The type of the ``data`` field.
+
+        Returns:
+            type[NvAPIResponse[DataT]]: The parametrized model.
+        """
+        return cast("type[NvAPIResponse[DataT]]", parametrize(cls, data_type))
+
 
 class VideoItem(BaseModel):
     """A class that represents an item of a videos response from the NvAPI."""
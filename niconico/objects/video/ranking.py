@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+RankingTerm = Literal["hour", "24h", "week", "month", "total"]
+
 
 class Genre(BaseModel):
     """A class that represents a genre."""
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Any, Generic, TypeVar
+from functools import cache
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, SerializerFunctionWrapHandler, TypeAdapter, model_serializer
 
+from niconico.objects.common import parametrize
 from niconico.objects.video import EssentialVideo
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 
 class WatchAPIMeta(BaseModel):
     """Meta data of the watch API response."""
@@ -592,6 +597,70 @@ class WatchData(BaseModel):
     waku: Any
 
 
+@cache
+def _section_adapter(name: str) -> TypeAdapter[Any]:
+    """Get the validator of a top-level section of the watch data."""
+    return TypeAdapter(cast("type[Any]", WatchData.model_fields[name].annotation))
+
+
+class LazyWatchData(WatchData):
+    """Watch data that keeps the raw JSON and validates each section on first access.
+
+    Only the sections that are read are validated, so a download that only needs
+    ``client``, ``media`` and ``video`` skips the comments, tags, ranking and the rest.
+    A section that does not validate raises ``ValidationError`` when it is read.
+
+    ``model_dump``, ``model_dump_json`` and ``repr`` validate every section first, so
+    the sections not read yet are not left out.
+    """
+
+    _raw: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def from_raw(cls, raw: dict[str, Any]) -> LazyWatchData:
+        """Wrap the raw ``data.response`` object of the watch API response.
+
+        Args:
+            raw (dict[str, Any]): The decoded JSON object.
+
+        Returns:
+            LazyWatchData: The watch data, with no section validated yet.
+        """
+        data = cls.model_construct()
+        data._raw = raw  # noqa: SLF001
+        return data
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Validate a section the first time it is read."""
+        field = type(self).model_fields.get(name)
+        if field is None:
+            return super().__getattr__(name)  # pyright: ignore[reportAttributeAccessIssue]
+        value = _section_adapter(name).validate_python(self._raw.get(field.alias or name))
+        object.__setattr__(self, name, value)
+        return value
+
+    def validate_sections(self) -> None:
+        """Validate every section that was not read yet.
+
+        Raises:
+            ValidationError: If a section does not validate.
+        """
+        for name in type(self).model_fields:
+            if name not in self.__dict__:
+                getattr(self, name)
+
+    @model_serializer(mode="wrap")
+    def _serialize_sections(self, handler: SerializerFunctionWrapHandler) -> dict[str, Any]:
+        """Validate every section before the watch data is serialized."""
+        self.validate_sections()
+        return handler(self)
+
+    def __repr_args__(self) -> Iterable[tuple[str | None, Any]]:
+        """Validate every section before the watch data is represented."""
+        self.validate_sections()
+        return super().__repr_args__()
+
+
 class WatchResponseError(BaseModel):
     """Data model of the error response of the watch API."""
 
@@ -621,6 +690,7 @@ class WatchAPIErrorData(BaseModel):
 
 
 T = TypeVar("T")
+DataT = TypeVar("DataT")
 
 
 class WatchAPIResponse(BaseModel, Generic[T]):
@@ -632,6 +702,18 @@ class WatchAPIResponse(BaseModel, Generic[T]):
     meta: WatchAPIMeta
     data: T
 
+    @classmethod
+    def of(cls, data_type: type[DataT]) -> type[WatchAPIResponse[DataT]]:
+        """Get the watch API response model parametrized with a payload type, cached across calls.
+
+        Args:
+            data_type (type[DataT]): The type of the ``data`` field.
+
+        Returns:
+            type[WatchAPIResponse[DataT]]: The parametrized model.
+        """
+        return cast("type[WatchAPIResponse[DataT]]", parametrize(cls, data_type))
+
 
 class StoryboardImage(BaseModel):
     """Data model of an image of a storyboard."""
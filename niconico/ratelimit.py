@@ -0,0 +1,321 @@
+"""This module provides a per-host rate limiter that backs off when NicoNico throttles requests."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
+    from contextlib import AbstractContextManager
+
+DEFAULT_HOST_RATES: dict[str, float] = {
+    "nvapi.nicovideo.jp": 10.0,
+    "public.nvcomment.nicovideo.jp": 5.0,
+    "snapshot.search.nicovideo.jp": 2.0,
+    "public-api.ch.nicovideo.jp": 5.0,
+    "www.nicovideo.jp": 5.0,
+}
+"""The default number of requests sent per second to each API host."""
+
+THROTTLED_STATUS_CODES = frozenset({429, 503})
+"""The status codes the API answers with when requests are sent too fast."""
+
+DEFAULT_MIN_RATE = 0.1
+"""The default lowest rate a host is slowed down to, in requests per second."""
+
+DEFAULT_DECREASE_FACTOR = 0.5
+"""The default factor the rate of a host is multiplied by when it throttles a request."""
+
+DEFAULT_INCREASE_STEP = 0.1
+"""The default number of requests per second the rate of a host regains after each success."""
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Parse a ``Retry-After`` header into the number of seconds to wait.
+
+    Args:
+        value (str | None): The header value, either a number of seconds or an HTTP date.
+        now (float | None): The current time as a UNIX timestamp. Defaults to ``time.time()``.
+
+    Returns:
+        float | None: The number of seconds to wait, or None if the header is absent or invalid.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, retry_at.timestamp() - (now if now is not None else time.time()))
+
+
+@dataclass
+class HostState:
+    """The state of the token bucket of a host.
+
+    Times are UNIX timestamps, so the state can be shared between processes.
+
+    Attributes:
+        rate (float): The current number of requests per second.
+        tokens (float): The number of requests that can be sent without waiting. Negative when in debt.
+        updated_at (float): When the tokens were last refilled.
+        blocked_until (float): The time before which no request is sent, from a ``Retry-After`` header.
+    """
+
+    rate: float
+    tokens: float
+    updated_at: float
+    blocked_until: float = 0.0
+
+
+class BaseLimiterState(ABC):
+    """A base class for the stores that hold the state of every host."""
+
+    @abstractmethod
+    def transaction(self, host: str, default: Callable[[], HostState]) -> AbstractContextManager[HostState]:
+        """Hold the state of a host exclusively, saving the changes made to it.
+
+        Args:
+            host (str): The host.
+            default (Callable[[], HostState]): A function creating the state of a host seen for the first time.
+        """
+
+
+class MemoryLimiterState(BaseLimiterState):
+    """A store that holds the state of every host in memory, shared by the threads of a process."""
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        self._states: dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self, host: str, default: Callable[[], HostState]) -> Iterator[HostState]:
+        """Hold the state of a host exclusively.
+
+        Args:
+            host (str): The host.
+            default (Callable[[], HostState]): A function creating the state of a host seen for the first time.
+
+        Yields:
+            HostState: The state of the host.
+        """
+        with self._lock:
+            state = self._states.get(host)
+            if state is None:
+                state = self._states[host] = default()
+            yield state
+
+
+class FileLimiterState(BaseLimiterState):
+    """A store that keeps the state of every host in a JSON file, shared by processes.
+
+    Every access holds an exclusive lock on the file, so workers started as separate
+    processes, or on separate machines sharing a file system with working locks, share
+    the same limits.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize the store.
+
+        Args:
+            path (str | Path): The path of the state file. It is created when missing.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self, host: str, default: Callable[[], HostState]) -> Iterator[HostState]:
+        """Hold the state of a host exclusively, across processes.
+
+        Args:
+            host (str): The host.
+            default (Callable[[], HostState]): A function creating the state of a host seen for the first time.
+
+        Yields:
+            HostState: The state of the host.
+        """
+        with self._lock, self.path.open("a+", encoding="utf-8") as f:
+            _lock_file(f)
+            try:
+                f.seek(0)
+                content = f.read()
+                states = json.loads(content) if content else {}
+                state = HostState(**states[host]) if host in states else default()
+                yield state
+                states[host] = asdict(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(states, f)
+                f.flush()
+            finally:
+                _unlock_file(f)
+
+
+def _lock_file(f: IO[str]) -> None:
+    """Take an exclusive lock on an open file, waiting for other processes."""
+    if sys.platform == "win32":
+        import msvcrt  # noqa: PLC0415
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        import fcntl  # noqa: PLC0415
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(f: IO[str]) -> None:
+    """Release the lock taken by :func:`_lock_file`."""
+    if sys.platform == "win32":
+        import msvcrt  # noqa: PLC0415
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl  # noqa: PLC0415
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """Limit the rate of requests to each host, backing off when the host throttles them.
+
+    Each host has a token bucket refilled at its current rate. When a host answers with
+    429 or 503, its rate is multiplied by ``decrease_factor`` and a ``Retry-After`` header
+    blocks it for the time given. Every other response raises the rate by ``increase_step``,
+    up to the configured rate (AIMD)::
+
+        limiter = RateLimiter({"nvapi.nicovideo.jp": 5.0}, state=FileLimiterState("limits.json"))
+        client = NicoNico(rate_limiter=limiter)
+
+    A limiter can be shared by several clients and threads. Give it a ``FileLimiterState``
+    to share the limits between processes too.
+    """
+
+    def __init__(
+        self,
+        rates: Mapping[str, float] | None = None,
+        *,
+        default_rate: float | None = None,
+        min_rate: float = DEFAULT_MIN_RATE,
+        decrease_factor: float = DEFAULT_DECREASE_FACTOR,
+        increase_step: float = DEFAULT_INCREASE_STEP,
+        state: BaseLimiterState | None = None,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            rates (Mapping[str, float] | None): The number of requests sent per second to each host.
+                ``DEFAULT_HOST_RATES`` is used when None.
+            default_rate (float | None): The rate of the other hosts, or None to leave them unlimited.
+            min_rate (float): The lowest rate a host is slowed down to.
+            decrease_factor (float): The factor the rate is multiplied by when a host throttles a request.
+            increase_step (float): The number of requests per second regained after each other response.
+            state (BaseLimiterState | None): The store of the state of every host.
+                A ``MemoryLimiterState`` is used when None.
+
+        Raises:
+            ValueError: If a rate is not positive.
+        """
+        self.rates = dict(rates if rates is not None else DEFAULT_HOST_RATES)
+        if any(rate <= 0 for rate in self.rates.values()) or (default_rate is not None and default_rate <= 0):
+            msg = "rates must be positive."
+            raise ValueError(msg)
+        self.default_rate = default_rate
+        self.min_rate = min_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.state = state if state is not None else MemoryLimiterState()
+
+    def rate_for(self, url: str) -> tuple[str, float] | None:
+        """Get the host of a URL and its configured rate.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            tuple[str, float] | None: The host and its rate, or None if the host is not limited.
+        """
+        host = urlparse(url).hostname or ""
+        rate = self.rates.get(host, self.default_rate)
+        return (host, rate) if rate is not None else None
+
+    def reserve(self, url: str) -> float:
+        """Take a token for a request to a URL.
+
+        Args:
+            url (str): The URL about to be requested.
+
+        Returns:
+            float: The number of seconds to wait before sending the request.
+        """
+        limit = self.rate_for(url)
+        if limit is None:
+            return 0.0
+        host, rate = limit
+        now = time.time()
+        with self.state.transaction(host, lambda: HostState(rate=rate, tokens=rate, updated_at=now)) as state:
+            state.tokens = min(rate, state.tokens + max(0.0, now - state.updated_at) * state.rate)
+            state.updated_at = now
+            state.tokens -= 1
+            return max(0.0, -state.tokens / state.rate, state.blocked_until - now)
+
+    def acquire(self, url: str) -> None:
+        """Wait until a request to a URL may be sent.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, url: str) -> None:
+        """Wait asynchronously until a request to a URL may be sent.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, url: str, status_code: int, retry_after: str | None = None) -> None:
+        """Adjust the rate of a host to the response it sent.
+
+        Args:
+            url (str): The requested URL.
+            status_code (int): The status code of the response.
+            retry_after (str | None): The ``Retry-After`` header of the response.
+        """
+        limit = self.rate_for(url)
+        if limit is None:
+            return
+        host, rate = limit
+        now = time.time()
+        with self.state.transaction(host, lambda: HostState(rate=rate, tokens=rate, updated_at=now)) as state:
+            if status_code not in THROTTLED_STATUS_CODES:
+                state.rate = min(rate, state.rate + self.increase_step)
+                return
+            state.rate = max(min(self.min_rate, rate), state.rate * self.decrease_factor)
+            delay = parse_retry_after(retry_after, now)
+            if delay is not None:
+                state.blocked_until = max(state.blocked_until, now + delay)
@@ -0,0 +1,258 @@
+"""This module provides the retry policy of requests that fail transiently."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Protocol, TypeVar
+
+from niconico.ratelimit import parse_retry_after
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Mapping
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+"""The status codes of transient failures."""
+
+DEFAULT_RETRY_METHODS = frozenset({"GET"})
+"""The methods retried by default. Mutations are only retried when a rule opts in."""
+
+
+class RetryableResponse(Protocol):
+    """The part of a response the retry policy reads."""
+
+    status_code: int
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """The headers of the response."""
+        ...
+
+
+ResponseT = TypeVar("ResponseT", bound=RetryableResponse)
+
+
+@dataclass(frozen=True)
+class RetrySettings:
+    """How a class of requests is retried.
+
+    The delay before the n-th retry is drawn uniformly between 0 and
+    ``min(max_delay, base_delay * 2 ** (n - 1))`` (full jitter), or is the ``Retry-After``
+    of the response when that is longer. A retry that would end past ``deadline``
+    seconds after the first attempt is not made.
+
+    Attributes:
+        max_attempts (int): The number of attempts, including the first one.
+        base_delay (float): The upper bound of the first delay, in seconds.
+        max_delay (float): The largest delay, in seconds.
+        deadline (float | None): The time allowed for every attempt together, or None for no limit.
+        methods (frozenset[str]): The methods retried.
+        status_codes (frozenset[int]): The status codes retried.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    deadline: float | None = None
+    methods: frozenset[str] = DEFAULT_RETRY_METHODS
+    status_codes: frozenset[int] = RETRYABLE_STATUS_CODES
+
+    def next_delay(self, attempt: int, started_at: float, retry_after: float | None = None) -> float | None:
+        """Get the delay before the next attempt.
+
+        Args:
+            attempt (int): The number of the attempt that failed, starting at 1.
+            started_at (float): When the first attempt started, from ``time.monotonic()``.
+            retry_after (float | None): The ``Retry-After`` of the response, in seconds.
+
+        Returns:
+            float | None: The number of seconds to wait, or None to give up.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))  # noqa: S311
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if self.deadline is not None and time.monotonic() + delay - started_at > self.deadline:
+            return None
+        return delay
+
+
+@dataclass
+class RetryMetrics:
+    """Counters of the retries made under a policy, shared by threads.
+
+    Attributes:
+        attempts (int): The number of requests sent, including retries.
+        retries (int): The number of retries.
+        recovered (int): The number of requests that succeeded after a retry.
+        exhausted (int): The number of requests that were given up on.
+        reasons (Counter[str]): The number of retries by status code or exception name.
+    """
+
+    attempts: int = 0
+    retries: int = 0
+    recovered: int = 0
+    exhausted: int = 0
+    reasons: Counter[str] = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, event: str, reason: str | None = None) -> None:
+        """Count an event.
+
+        Args:
+            event (str): The counter to increment.
+            reason (str | None): The reason of a retry.
+        """
+        with self._lock:
+            setattr(self, event, getattr(self, event) + 1)
+            if reason is not None:
+                self.reasons[reason] += 1
+
+
+@dataclass
+class RetryPolicy:
+    """Decide which requests are retried, and how.
+
+    The first rule whose pattern matches the URL gives the settings. URLs no rule
+    matches use ``default``, or are not retried when it is None. A rule with None
+    settings turns retries off for its URLs::
+
+        policy = RetryPolicy(
+            rules=[
+                (r"/v1/users/me/mylists", RetrySettings(methods=frozenset({"GET", "POST"}))),
+                (r"/access-rights/hls", None),
+            ],
+        )
+        client = NicoNico(retry_policy=policy)
+        ...
+        print(policy.metrics.retries, policy.metrics.reasons)
+
+    Attributes:
+        rules (list[tuple[str, RetrySettings | None]]): The (URL regex, settings) pairs.
+        default (RetrySettings | None): The settings of URLs no rule matches.
+        metrics (RetryMetrics): The counters of the retries made under the policy.
+    """
+
+    rules: list[tuple[str, RetrySettings | None]] = field(default_factory=list)
+    default: RetrySettings | None = field(default_factory=RetrySettings)
+    metrics: RetryMetrics = field(default_factory=RetryMetrics)
+
+    def settings_for(self, method: str, url: str) -> RetrySettings | None:
+        """Get the settings of a request, or None if it must not be retried."""
+        settings = self.default
+        for pattern, rule in self.rules:
+            if re.search(pattern, url):
+                settings = rule
+                break
+        if settings is None or method.upper() not in settings.methods:
+            return None
+        return settings
+
+    def call(
+        self,
+        method: str,
+        url: str,
+        send: Callable[[], ResponseT],
+        *,
+        retry_on: tuple[type[BaseException], ...] = (),
+    ) -> ResponseT:
+        """Send a request, retrying it on transient failures.
+
+        Args:
+            method (str): The method of the request.
+            url (str): The URL of the request.
+            send (Callable[[], ResponseT]): A function sending the request.
+            retry_on (tuple[type[BaseException], ...]): The exceptions of transient failures.
+
+        Returns:
+            ResponseT: The first response that is not retried, or the last one.
+        """
+        settings = self.settings_for(method, url)
+        if settings is None:
+            return send()
+        started_at = time.monotonic()
+        attempt = 1
+        while True:
+            self.metrics.record("attempts")
+            try:
+                res = send()
+            except retry_on as e:
+                delay = self._next_delay(settings, attempt, started_at, None, type(e).__name__)
+                if delay is None:
+                    raise
+            else:
+                if res.status_code not in settings.status_codes:
+                    if attempt > 1:
+                        self.metrics.record("recovered")
+                    return res
+                delay = self._next_delay(settings, attempt, started_at, res, str(res.status_code))
+                if delay is None:
+                    return res
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(
+        self,
+        method: str,
+        url: str,
+        send: Callable[[], Awaitable[ResponseT]],
+        *,
+        retry_on: tuple[type[BaseException], ...] = (),
+    ) -> ResponseT:
+        """Send a request asynchronously, retrying it on transient failures.
+
+        Args:
+            method (str): The method of the request.
+            url (str): The URL of the request.
+            send (Callable[[], Awaitable[ResponseT]]): A coroutine function sending the request.
+            retry_on (tuple[type[BaseException], ...]): The exceptions of transient failures.
+
+        Returns:
+            ResponseT: The first response that is not retried, or the last one.
+        """
+        settings = self.settings_for(method, url)
+        if settings is None:
+            return await send()
+        started_at = time.monotonic()
+        attempt = 1
+        while True:
+            self.metrics.record("attempts")
+            try:
+                res = await send()
+            except retry_on as e:
+                delay = self._next_delay(settings, attempt, started_at, None, type(e).__name__)
+                if delay is None:
+                    raise
+            else:
+                if res.status_code not in settings.status_codes:
+                    if attempt > 1:
+                        self.metrics.record("recovered")
+                    return res
+                delay = self._next_delay(settings, attempt, started_at, res, str(res.status_code))
+                if delay is None:
+                    return res
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _next_delay(
+        self,
+        settings: RetrySettings,
+        attempt: int,
+        started_at: float,
+        res: RetryableResponse | None,
+        reason: str,
+    ) -> float | None:
+        """Get the delay before retrying a failed attempt and count it, or None to give up."""
+        retry_after = parse_retry_after(res.headers.get("Retry-After")) if res is not None else None
+        delay = settings.next_delay(attempt, started_at, retry_after)
+        if delay is None:
+            self.metrics.record("exhausted")
+        else:
+            self.metrics.record("retries", reason)
+        return delay
@@ -0,0 +1,131 @@
+"""This module provides the coalescing of identical requests that are in flight at the same time."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    """A call in flight, and its outcome once it is done."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    result: T | None = None
+    error: BaseException | None = None
+
+
+@dataclass
+class _AsyncCall(Generic[T]):
+    """A coroutine in flight, and the number of tasks awaiting it."""
+
+    task: asyncio.Future[T]
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """Let concurrent calls with the same key share a single call.
+
+    The first thread to call with a key runs the function. Threads calling with the
+    same key before it returns wait for it and get the same result, or the same
+    exception. A call made after it returned runs the function again::
+
+        flight = SingleFlight()
+        res = flight.do(url, lambda: session.get(url))
+
+    Attributes:
+        coalesced (int): The number of calls that shared the result of another call.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the calls in flight."""
+        self._calls: dict[Hashable, _Call[T]] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run a function, unless a call with the same key is in flight.
+
+        Args:
+            key (Hashable): The key of the call.
+            fn (Callable[[], T]): The function to run.
+
+        Returns:
+            T: The result of the function, or of the call in flight.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+        try:
+            result = call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return result
+
+
+class AsyncSingleFlight(Generic[T]):
+    """Let concurrent tasks awaiting the same key share a single coroutine.
+
+    The asynchronous counterpart of :class:`SingleFlight`, for the tasks of one event loop.
+    The coroutine runs in a task of its own, so a caller that is cancelled, the first one
+    included, stops waiting without cancelling it for the others. It is cancelled once
+    no caller awaits it anymore.
+
+    Attributes:
+        coalesced (int): The number of calls that shared the result of another call.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the calls in flight."""
+        self._calls: dict[Hashable, _AsyncCall[T]] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await a coroutine function, unless a call with the same key is in flight.
+
+        Args:
+            key (Hashable): The key of the call.
+            fn (Callable[[], Awaitable[T]]): The coroutine function to await.
+
+        Returns:
+            T: The result of the coroutine, or of the call in flight.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _AsyncCall(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _AsyncCall[T]) -> None:
+        """Remove a call that is done, so the next call with its key runs the coroutine again."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
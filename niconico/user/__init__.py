@@ -3,44 +3,40 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING, Literal
-from urllib.parse import urlencode
-
-import requests
 
 from niconico.base.client import BaseClient
+from niconico.base.pagination import iter_paged_items
 from niconico.decorators import login_required
-from niconico.objects.nvapi import (
-    CopyMylistItemsData,
-    CreateMylistData,
-    FeedData,
-    FollowingMylistsData,
-    FollowingTagsData,
-    MylistData,
-    NvAPIResponse,
-    OwnMylistItemsData,
-    OwnSeriesData,
-    OwnUserData,
-    OwnVideosData,
-    RecommendData,
-    RelationshipUsersData,
-    ReorderMylistsData,
-    SeriesData,
-    UserData,
-    UserMylistsData,
-    UserSeriesData,
-    UserVideosData,
-)
+from niconico.user import endpoints
 from niconico.user.search import UserSearchClient
-from niconico.utils import add_optional_param
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from niconico.niconico import NicoNico
+    from niconico.objects.nvapi import (
+        CopyMylistItemsData,
+        CreateMylistData,
+        FeedData,
+        FollowingMylistsData,
+        FollowingTagsData,
+        OwnMylistItemsData,
+        OwnVideosData,
+        RecommendData,
+        RelationshipUsersData,
+        ReorderMylistsData,
+        SeriesData,
+        UserVideosData,
+    )
     from niconico.objects.user import (
         NicoUser,
         OwnNicoUser,
+        OwnVideoItem,
         RecipeId,
+        RelationshipUser,
         UserMylistItem,
         UserSeriesItem,
+        UserVideoItem,
         UserVideosSortKey,
         UserVideosSortOrder,
     )
@@ -67,12 +63,7 @@ class UserClient(BaseClient):
         Returns:
             NicoUser | None: The user object if found, None otherwise.
         """
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/{user_id}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[UserData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.user
-        return None
+        return self._send(endpoints.get_user(user_id))
 
     def get_user_followers(self, user_id: str, *, page_size: int = 25, page: int = 1) -> RelationshipUsersData | None:
         """Get the followers of a user by its ID.
@@ -85,14 +76,33 @@ class UserClient(BaseClient):
         Returns:
             RelationshipUsersData | None: The list of followers if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/{user_id}/followed-by/users?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[RelationshipUsersData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.get_user_relationships(user_id, "followed-by", page_size=page_size, page=page),
+        )
+
+    def iter_user_followers(
+        self,
+        user_id: str,
+        *,
+        page_size: int = 100,
+        prefetch: int = 0,
+    ) -> Iterator[RelationshipUser]:
+        """Iterate over all followers of a user, requesting the pages as needed.
+
+        Args:
+            user_id (str): The ID of the user.
+            page_size (int): The number of followers to get per request.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[RelationshipUser]: An iterator over the followers.
+        """
+        return iter_paged_items(
+            lambda page: self.get_user_followers(user_id, page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.summary.has_next,
+            prefetch=prefetch,
+        )
 
     def get_user_followings(self, user_id: str, *, page_size: int = 25, page: int = 1) -> RelationshipUsersData | None:
         """Get the followings of a user by its ID.
@@ -105,14 +115,33 @@ class UserClient(BaseClient):
         Returns:
             RelationshipUsersData | None: The list of followings if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/{user_id}/following/users?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[RelationshipUsersData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.get_user_relationships(user_id, "following", page_size=page_size, page=page),
+        )
+
+    def iter_user_followings(
+        self,
+        user_id: str,
+        *,
+        page_size: int = 100,
+        prefetch: int = 0,
+    ) -> Iterator[RelationshipUser]:
+        """Iterate over all followings of a user, requesting the pages as needed.
+
+        Args:
+            user_id (str): The ID of the user.
+            page_size (int): The number of followings to get per request.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[RelationshipUser]: An iterator over the followings.
+        """
+        return iter_paged_items(
+            lambda page: self.get_user_followings(user_id, page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.summary.has_next,
+            prefetch=prefetch,
+        )
 
     def get_user_videos(
         self,
@@ -140,23 +169,57 @@ class UserClient(BaseClient):
         Returns:
             UserVideosData | None: The list of videos if found, None otherwise.
         """
-        query = {
-            "sortKey": sort_key,
-            "sortOrder": sort_order,
-            "pageSize": str(page_size),
-            "page": str(page),
-        }
-        if sensitive_contents is not None:
-            query["sensitiveContents"] = sensitive_contents
-        if select_content_type is not None:
-            query["selectContentType"] = select_content_type
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v3/users/{user_id}/videos?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[UserVideosData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.get_user_videos(
+                user_id,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+                select_content_type=select_content_type,
+            ),
+        )
+
+    def iter_user_videos(
+        self,
+        user_id: str,
+        *,
+        sort_key: UserVideosSortKey = "registeredAt",
+        sort_order: UserVideosSortOrder = "asc",
+        page_size: int = 100,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        select_content_type: SelectContentType | None = None,
+        prefetch: int = 0,
+    ) -> Iterator[UserVideoItem]:
+        """Iterate over all videos of a user, requesting the pages as needed.
+
+        Args:
+            user_id (str): The ID of the user.
+            sort_key (UserVideosSortKey): The key to sort the videos by.
+            sort_order (UserVideosSortOrder): The order to sort the videos by.
+            page_size (int): The number of videos to get per request.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+            select_content_type (SelectContentType | None): The content type to get.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[UserVideoItem]: An iterator over the videos of the user.
+        """
+        return iter_paged_items(
+            lambda page: self.get_user_videos(
+                user_id,
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+                select_content_type=select_content_type,
+            ),
+            lambda data: data.items,
+            lambda data, page: page * page_size < data.total_count,
+            prefetch=prefetch,
+        )
 
     def get_user_mylists(self, user_id: str, *, sample_item_count: int = 0) -> list[UserMylistItem]:
         """Get the mylists of a user by its ID.
@@ -168,14 +231,7 @@ class UserClient(BaseClient):
         Returns:
             list[UserMylistItem]: The list of mylists if found, an empty list otherwise.
         """
-        query = {"sampleItemCount": str(sample_item_count)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/{user_id}/mylists?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[UserMylistsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.mylists
-        return []
+        return self._send(endpoints.get_user_mylists(user_id, sample_item_count=sample_item_count))
 
     def get_user_series(self, user_id: str, *, page_size: int = 100, page: int = 1) -> list[UserSeriesItem]:
         """Get the series of a user by its ID.
@@ -188,14 +244,7 @@ class UserClient(BaseClient):
         Returns:
             list[UserSeriesData] | None: The list of series if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/{user_id}/series?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[UserSeriesData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.items
-        return []
+        return self._send(endpoints.get_user_series(user_id, page_size=page_size, page=page))
 
     @login_required()
     def get_own(self) -> OwnNicoUser | None:
@@ -204,12 +253,7 @@ class UserClient(BaseClient):
         Returns:
             OwnNicoUser | None: The own user object if found, None otherwise.
         """
-        res = self.niconico.get("https://nvapi.nicovideo.jp/v1/users/me")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[OwnUserData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.user
-        return None
+        return self._send(endpoints.get_own())
 
     @login_required()
     def get_own_followers(self, *, page_size: int = 25, page: int = 1) -> RelationshipUsersData | None:
@@ -222,14 +266,25 @@ class UserClient(BaseClient):
         Returns:
             RelationshipUsersData | None: The list of followers if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/me/followed-by/users?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[RelationshipUsersData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_user_relationships("me", "followed-by", page_size=page_size, page=page))
+
+    @login_required()
+    def iter_own_followers(self, *, page_size: int = 100, prefetch: int = 0) -> Iterator[RelationshipUser]:
+        """Iterate over all followers of the own user, requesting the pages as needed.
+
+        Args:
+            page_size (int): The number of followers to get per request.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[RelationshipUser]: An iterator over the followers.
+        """
+        return iter_paged_items(
+            lambda page: self.get_own_followers(page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.summary.has_next,
+            prefetch=prefetch,
+        )
 
     @login_required()
     def get_own_followings(self, *, page_size: int = 25, page: int = 1) -> RelationshipUsersData | None:
@@ -242,14 +297,25 @@ class UserClient(BaseClient):
         Returns:
             RelationshipUsersData | None: The list of followings if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/me/following/users?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[RelationshipUsersData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_user_relationships("me", "following", page_size=page_size, page=page))
+
+    @login_required()
+    def iter_own_followings(self, *, page_size: int = 100, prefetch: int = 0) -> Iterator[RelationshipUser]:
+        """Iterate over all followings of the own user, requesting the pages as needed.
+
+        Args:
+            page_size (int): The number of followings to get per request.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[RelationshipUser]: An iterator over the followings.
+        """
+        return iter_paged_items(
+            lambda page: self.get_own_followings(page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.summary.has_next,
+            prefetch=prefetch,
+        )
 
     @login_required()
     def follow_user(self, user_id: str) -> bool:
@@ -261,8 +327,7 @@ class UserClient(BaseClient):
         Returns:
             bool: True if the user was successfully followed, False otherwise.
         """
-        res = self.niconico.post(f"https://user-follow-api.nicovideo.jp/v1/user/followees/niconico-users/{user_id}.json")
-        return res.status_code == requests.codes.ok
+        return self._send(endpoints.follow_user(user_id, follow=True))
 
     @login_required()
     def unfollow_user(self, user_id: str) -> bool:
@@ -274,8 +339,7 @@ class UserClient(BaseClient):
         Returns:
             bool: True if the user was successfully unfollowed, False otherwise.
         """
-        res = self.niconico.delete(f"https://user-follow-api.nicovideo.jp/v1/user/followees/niconico-users/{user_id}.json")
-        return res.status_code == requests.codes.ok
+        return self._send(endpoints.follow_user(user_id, follow=False))
 
     @login_required()
     def get_own_videos(
@@ -299,21 +363,50 @@ class UserClient(BaseClient):
         Returns:
             OwnVideosData | None: The list of own videos if found, None otherwise.
         """
-        query = {
-            "sortKey": sort_key,
-            "sortOrder": sort_order,
-            "pageSize": str(page_size),
-            "page": str(page),
-        }
-        if sensitive_contents is not None:
-            query["sensitiveContents"] = sensitive_contents
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v2/users/me/videos?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[OwnVideosData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.get_own_videos(
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+            ),
+        )
+
+    @login_required()
+    def iter_own_videos(
+        self,
+        *,
+        sort_key: UserVideosSortKey = "registeredAt",
+        sort_order: UserVideosSortOrder = "asc",
+        page_size: int = 100,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        prefetch: int = 0,
+    ) -> Iterator[OwnVideoItem]:
+        """Iterate over all own videos, requesting the pages as needed.
+
+        Args:
+            sort_key (UserVideosSortKey): The key to sort the videos by.
+            sort_order (UserVideosSortOrder): The order to sort the videos by.
+            page_size (int): The number of videos to get per request.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[OwnVideoItem]: An iterator over the own videos.
+        """
+        return iter_paged_items(
+            lambda page: self.get_own_videos(
+                sort_key=sort_key,
+                sort_order=sort_order,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+            ),
+            lambda data: data.items,
+            lambda data, page: page * page_size < data.total_count,
+            prefetch=prefetch,
+        )
 
     @login_required()
     def get_own_mylist(
@@ -337,16 +430,15 @@ class UserClient(BaseClient):
         Returns:
             Mylist | None: The mylist object if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        add_optional_param(query, "sortKey", sort_key)
-        add_optional_param(query, "sortOrder", sort_order)
-        query_str = urlencode(query)
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[MylistData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.mylist
-        return None
+        return self._send(
+            endpoints.get_own_mylist(
+                mylist_id,
+                page_size=page_size,
+                page=page,
+                sort_key=sort_key,
+                sort_order=sort_order,
+            ),
+        )
 
     @login_required()
     def get_own_mylist_items(
@@ -370,18 +462,9 @@ class UserClient(BaseClient):
         Returns:
             OwnMylistItemsData | None: The mylist items data if found, None otherwise.
         """
-        query: dict[str, str] = {}
-        add_optional_param(query, "sortKey", sort_key)
-        add_optional_param(query, "sortOrder", sort_order)
-        query_str = urlencode(query)
-        url = f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}/items"
-        if query_str:
-            url = f"{url}?{query_str}"
-        res = self.niconico.get(url)
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[OwnMylistItemsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
+        items = self._send(endpoints.get_own_mylist_items(mylist_id, sort_key=sort_key, sort_order=sort_order))
+        if items is not None:
+            return items
         mylist = self.get_own_mylist(
             mylist_id,
             page_size=page_size,
@@ -389,9 +472,7 @@ class UserClient(BaseClient):
             sort_key=sort_key,
             sort_order=sort_order,
         )
-        if mylist is not None:
-            return OwnMylistItemsData.model_validate(mylist.model_dump(by_alias=True))
-        return None
+        return endpoints.mylist_items_of(mylist)
 
     @login_required()
     def get_own_mylists(self, *, sample_item_count: int = 0) -> list[UserMylistItem]:
@@ -403,14 +484,7 @@ class UserClient(BaseClient):
         Returns:
             list[UserMylistItem]: The list of own mylists if found, an empty list otherwise.
         """
-        query = {"sampleItemCount": str(sample_item_count)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/me/mylists?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[UserMylistsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.mylists
-        return []
+        return self._send(endpoints.get_user_mylists("me", sample_item_count=sample_item_count))
 
     @login_required()
     def add_mylist_item(self, mylist_id: str, item_id: str, *, description: str | None = None) -> bool:
@@ -424,11 +498,7 @@ class UserClient(BaseClient):
         Returns:
             bool: True if the video was successfully added, False otherwise.
         """
-        query = {"itemId": item_id}
-        add_optional_param(query, "description", description)
-        query_str = urlencode(query)
-        res = self.niconico.post(f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}/items?{query_str}")
-        return res.status_code in (requests.codes.ok, requests.codes.created)
+        return self._send(endpoints.add_mylist_item(mylist_id, item_id, description=description))
 
     @login_required()
     def remove_mylist_items(self, mylist_id: str, item_ids: list[str]) -> bool:
@@ -441,9 +511,7 @@ class UserClient(BaseClient):
         Returns:
             bool: True if the videos were successfully removed, False otherwise.
         """
-        item_ids_str = ",".join(item_ids)
-        res = self.niconico.delete(f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}/items?itemIds={item_ids_str}")
-        return res.status_code == requests.codes.ok
+        return self._send(endpoints.remove_mylist_items(mylist_id, item_ids))
 
     @login_required()
     def create_mylist(
@@ -467,19 +535,15 @@ class UserClient(BaseClient):
         Returns:
             CreateMylistData | None: The created mylist data if successful, None otherwise.
         """
-        data = {
-            "name": name,
-            "description": description,
-            "isPublic": "true" if is_public else "false",
-            "defaultSortKey": default_sort_key,
-            "defaultSortOrder": default_sort_order,
-        }
-        res = self.niconico.post("https://nvapi.nicovideo.jp/v1/users/me/mylists", data=data)
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[CreateMylistData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.create_mylist(
+                name,
+                description,
+                is_public=is_public,
+                default_sort_key=default_sort_key,
+                default_sort_order=default_sort_order,
+            ),
+        )
 
     @login_required()
     def update_mylist(
@@ -505,20 +569,16 @@ class UserClient(BaseClient):
         Returns:
             Mylist | None: The updated mylist if successful, None otherwise.
         """
-        data: dict[str, str] = {}
-        add_optional_param(data, "name", name)
-        add_optional_param(data, "description", description)
-        if is_public is not None:
-            data["isPublic"] = "true" if is_public else "false"
-        add_optional_param(data, "defaultSortKey", default_sort_key)
-        add_optional_param(data, "defaultSortOrder", default_sort_order)
-
-        res = self.niconico.put(f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}", data=data)
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[MylistData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.mylist
-        return None
+        return self._send(
+            endpoints.update_mylist(
+                mylist_id,
+                name=name,
+                description=description,
+                is_public=is_public,
+                default_sort_key=default_sort_key,
+                default_sort_order=default_sort_order,
+            ),
+        )
 
     @login_required()
     def reorder_mylists(self, mylist_ids: list[str | int]) -> ReorderMylistsData | None:
@@ -530,13 +590,7 @@ class UserClient(BaseClient):
         Returns:
             ReorderMylistsData | None: The reordered mylist IDs if successful, None otherwise.
         """
-        data = {"order": ",".join(str(mylist_id) for mylist_id in mylist_ids)}
-        res = self.niconico.put("https://nvapi.nicovideo.jp/v1/users/me/mylists/order", data=data)
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[ReorderMylistsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.reorder_mylists(mylist_ids))
 
     @login_required()
     def delete_mylist(self, mylist_id: str) -> bool:
@@ -548,8 +602,7 @@ class UserClient(BaseClient):
         Returns:
             bool: True if the mylist was successfully deleted, False otherwise.
         """
-        res = self.niconico.delete(f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}")
-        return res.status_code == requests.codes.ok
+        return self._send(endpoints.delete_mylist(mylist_id))
 
     @login_required()
     def copy_mylist_items(
@@ -568,18 +621,7 @@ class UserClient(BaseClient):
         Returns:
             CopyMylistItemsData | None: The copied item result if successful, None otherwise.
         """
-        query = {
-            "from": from_mylist_id,
-            "to": to_mylist_id,
-            "itemIds": ",".join(item_ids),
-        }
-        query_str = urlencode(query, safe=",")
-        res = self.niconico.post(f"https://nvapi.nicovideo.jp/v1/users/me/copy-mylist-items?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[CopyMylistItemsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.copy_mylist_items(from_mylist_id, to_mylist_id, item_ids))
 
     @login_required()
     def get_own_series_detail(self, series_id: str, *, page_size: int = 100, page: int = 1) -> SeriesData | None:
@@ -593,14 +635,7 @@ class UserClient(BaseClient):
         Returns:
             SeriesData | None: The series object if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/me/series/{series_id}?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[SeriesData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_own_series_detail(series_id, page_size=page_size, page=page))
 
     @login_required()
     def get_own_series(self, *, page_size: int = 100, page: int = 1) -> list[UserSeriesItem]:
@@ -613,14 +648,7 @@ class UserClient(BaseClient):
         Returns:
             list[UserSeriesItem]: The list of series if found, an empty list otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/me/series?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[OwnSeriesData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.items
-        return []
+        return self._send(endpoints.get_own_series(page_size=page_size, page=page))
 
     @login_required()
     def get_recommendations(
@@ -651,26 +679,17 @@ class UserClient(BaseClient):
         Returns:
             RecommendData | None: The recommendation data if found, None otherwise.
         """
-        query: dict[str, str] = {"recipeId": recipe_id, "site": site}
-
-        # Set defaults and add video_id if provided
-        if video_id is not None:
-            query["videoId"] = video_id
-            limit = limit or 25
-
-        # Build query parameters
-        add_optional_param(query, "recipeVersion", recipe_version)
-        add_optional_param(query, "limit", limit)
-        add_optional_param(query, "with_reason", "true" if with_reason else None)
-        add_optional_param(query, "sensitiveContents", sensitive_contents)
-
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/recommend?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[RecommendData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.get_recommendations(
+                recipe_id,
+                video_id=video_id,
+                site=site,
+                limit=limit,
+                with_reason=with_reason,
+                sensitive_contents=sensitive_contents,
+                recipe_version=recipe_version,
+            ),
+        )
 
     @login_required()
     def get_own_following_mylists(self, *, sample_item_count: int = 0) -> FollowingMylistsData | None:
@@ -682,14 +701,7 @@ class UserClient(BaseClient):
         Returns:
             FollowingMylistsData | None: The following mylists data if found, None otherwise.
         """
-        query = {"sampleItemCount": str(sample_item_count)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/me/following/mylists?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[FollowingMylistsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_own_following_mylists(sample_item_count=sample_item_count))
 
     @login_required()
     def get_own_following_tags(self) -> FollowingTagsData | None:
@@ -698,12 +710,7 @@ class UserClient(BaseClient):
         Returns:
             FollowingTagsData | None: The following tags data if found, None otherwise.
         """
-        res = self.niconico.get("https://nvapi.nicovideo.jp/v1/users/me/following/tags")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[FollowingTagsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_own_following_tags())
 
     @login_required()
     def get_following_activities(
@@ -725,15 +732,4 @@ class UserClient(BaseClient):
         Returns:
             FeedData | None: The feed data if successful, None otherwise.
         """
-        base_url = "https://api.feed.nicovideo.jp/v1/activities/followings"
-        url = f"{base_url}/{endpoint}"
-
-        query: dict[str, str] = {"context": context}
-        if cursor is not None:
-            query["cursor"] = cursor
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-
-        res = self.niconico.get(f"{url}?{query_str}")
-        if res.status_code == requests.codes.ok:
-            return FeedData(**res.json())
-        return None
+        return self._send(endpoints.get_following_activities(endpoint=endpoint, context=context, cursor=cursor))
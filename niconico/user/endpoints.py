@@ -0,0 +1,344 @@
+"""This module provides the requests of the user clients, shared by the synchronous and asynchronous APIs."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+from urllib.parse import urlencode
+
+import requests
+
+from niconico.base.endpoint import nvapi, parsed, status
+from niconico.objects.nvapi import (
+    CopyMylistItemsData,
+    CreateMylistData,
+    FeedData,
+    FollowingMylistsData,
+    FollowingTagsData,
+    MylistData,
+    OwnMylistItemsData,
+    OwnSeriesData,
+    OwnUserData,
+    OwnVideosData,
+    RecommendData,
+    RelationshipUsersData,
+    ReorderMylistsData,
+    SeriesData,
+    UserData,
+    UserMylistsData,
+    UserSearchData,
+    UserSeriesData,
+    UserVideosData,
+)
+from niconico.utils import add_optional_param
+
+if TYPE_CHECKING:
+    from niconico.base.endpoint import Endpoint
+    from niconico.objects.user import (
+        NicoUser,
+        OwnNicoUser,
+        RecipeId,
+        UserMylistItem,
+        UserSeriesItem,
+        UserVideosSortKey,
+        UserVideosSortOrder,
+    )
+    from niconico.objects.user.search import UserSearchSortKey
+    from niconico.objects.video import Mylist, MylistSortKey, MylistSortOrder
+    from niconico.objects.video.search import SelectContentType
+
+
+def _join_query(query: dict[str, str]) -> str:
+    """Join a query without escaping its values, as the user endpoints have always been requested."""
+    return "&".join([f"{key}={value}" for key, value in query.items()])
+
+
+def get_user(user_id: str) -> Endpoint[NicoUser | None]:
+    """Build the request of :meth:`UserClient.get_user`."""
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/users/{user_id}", UserData).map(
+        lambda data: data.user if data is not None else None,
+    )
+
+
+def get_user_relationships(
+    user_id: str,
+    relation: Literal["followed-by", "following"],
+    *,
+    page_size: int,
+    page: int,
+) -> Endpoint[RelationshipUsersData | None]:
+    """Build the request of the followers or followings of a user, or of the own user when the ID is "me"."""
+    query_str = _join_query({"pageSize": str(page_size), "page": str(page)})
+    url = f"https://nvapi.nicovideo.jp/v1/users/{user_id}/{relation}/users?{query_str}"
+    return nvapi("GET", url, RelationshipUsersData)
+
+
+def get_user_videos(
+    user_id: str,
+    *,
+    sort_key: UserVideosSortKey,
+    sort_order: UserVideosSortOrder,
+    page_size: int,
+    page: int,
+    sensitive_contents: Literal["mask", "filter"] | None,
+    select_content_type: SelectContentType | None,
+) -> Endpoint[UserVideosData | None]:
+    """Build the request of :meth:`UserClient.get_user_videos`."""
+    query = {
+        "sortKey": sort_key,
+        "sortOrder": sort_order,
+        "pageSize": str(page_size),
+        "page": str(page),
+    }
+    add_optional_param(query, "sensitiveContents", sensitive_contents)
+    add_optional_param(query, "selectContentType", select_content_type)
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v3/users/{user_id}/videos?{_join_query(query)}", UserVideosData)
+
+
+def get_user_mylists(user_id: str, *, sample_item_count: int) -> Endpoint[list[UserMylistItem]]:
+    """Build the request of the mylists of a user, or of the own user when the ID is "me"."""
+    query_str = _join_query({"sampleItemCount": str(sample_item_count)})
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/users/{user_id}/mylists?{query_str}", UserMylistsData).map(
+        lambda data: data.mylists if data is not None else [],
+    )
+
+
+def get_user_series(user_id: str, *, page_size: int, page: int) -> Endpoint[list[UserSeriesItem]]:
+    """Build the request of :meth:`UserClient.get_user_series`."""
+    query_str = _join_query({"pageSize": str(page_size), "page": str(page)})
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/users/{user_id}/series?{query_str}", UserSeriesData).map(
+        lambda data: data.items if data is not None else [],
+    )
+
+
+def get_own() -> Endpoint[OwnNicoUser | None]:
+    """Build the request of :meth:`UserClient.get_own`."""
+    return nvapi("GET", "https://nvapi.nicovideo.jp/v1/users/me", OwnUserData).map(
+        lambda data: data.user if data is not None else None,
+    )
+
+
+def follow_user(user_id: str, *, follow: bool) -> Endpoint[bool]:
+    """Build the request of :meth:`UserClient.follow_user`, or of :meth:`UserClient.unfollow_user`."""
+    url = f"https://user-follow-api.nicovideo.jp/v1/user/followees/niconico-users/{user_id}.json"
+    return status("POST" if follow else "DELETE", url)
+
+
+def get_own_videos(
+    *,
+    sort_key: UserVideosSortKey,
+    sort_order: UserVideosSortOrder,
+    page_size: int,
+    page: int,
+    sensitive_contents: Literal["mask", "filter"] | None,
+) -> Endpoint[OwnVideosData | None]:
+    """Build the request of :meth:`UserClient.get_own_videos`."""
+    query = {
+        "sortKey": sort_key,
+        "sortOrder": sort_order,
+        "pageSize": str(page_size),
+        "page": str(page),
+    }
+    add_optional_param(query, "sensitiveContents", sensitive_contents)
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v2/users/me/videos?{_join_query(query)}", OwnVideosData)
+
+
+def get_own_mylist(
+    mylist_id: str,
+    *,
+    page_size: int,
+    page: int,
+    sort_key: MylistSortKey | None,
+    sort_order: MylistSortOrder | None,
+) -> Endpoint[Mylist | None]:
+    """Build the request of :meth:`UserClient.get_own_mylist`."""
+    query = {"pageSize": str(page_size), "page": str(page)}
+    add_optional_param(query, "sortKey", sort_key)
+    add_optional_param(query, "sortOrder", sort_order)
+    url = f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}?{urlencode(query)}"
+    return nvapi("GET", url, MylistData).map(lambda data: data.mylist if data is not None else None)
+
+
+def get_own_mylist_items(
+    mylist_id: str,
+    *,
+    sort_key: MylistSortKey | None,
+    sort_order: MylistSortOrder | None,
+) -> Endpoint[OwnMylistItemsData | None]:
+    """Build the request of the items endpoint used by :meth:`UserClient.get_own_mylist_items`."""
+    query: dict[str, str] = {}
+    add_optional_param(query, "sortKey", sort_key)
+    add_optional_param(query, "sortOrder", sort_order)
+    query_str = urlencode(query)
+    url = f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}/items"
+    if query_str:
+        url = f"{url}?{query_str}"
+    return nvapi("GET", url, OwnMylistItemsData)
+
+
+def mylist_items_of(mylist: Mylist | None) -> OwnMylistItemsData | None:
+    """Convert a mylist into its item-focused data, for when the items endpoint is unavailable."""
+    if mylist is not None:
+        return OwnMylistItemsData.model_validate(mylist.model_dump(by_alias=True))
+    return None
+
+
+def add_mylist_item(mylist_id: str, item_id: str, *, description: str | None) -> Endpoint[bool]:
+    """Build the request of :meth:`UserClient.add_mylist_item`."""
+    query = {"itemId": item_id}
+    add_optional_param(query, "description", description)
+    url = f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}/items?{urlencode(query)}"
+    return status("POST", url, (requests.codes.ok, requests.codes.created))
+
+
+def remove_mylist_items(mylist_id: str, item_ids: list[str]) -> Endpoint[bool]:
+    """Build the request of :meth:`UserClient.remove_mylist_items`."""
+    item_ids_str = ",".join(item_ids)
+    return status("DELETE", f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}/items?itemIds={item_ids_str}")
+
+
+def create_mylist(
+    name: str,
+    description: str,
+    *,
+    is_public: bool,
+    default_sort_key: MylistSortKey,
+    default_sort_order: MylistSortOrder,
+) -> Endpoint[CreateMylistData | None]:
+    """Build the request of :meth:`UserClient.create_mylist`."""
+    data = {
+        "name": name,
+        "description": description,
+        "isPublic": "true" if is_public else "false",
+        "defaultSortKey": default_sort_key,
+        "defaultSortOrder": default_sort_order,
+    }
+    return nvapi("POST", "https://nvapi.nicovideo.jp/v1/users/me/mylists", CreateMylistData, data=data)
+
+
+def update_mylist(
+    mylist_id: str,
+    *,
+    name: str | None,
+    description: str | None,
+    is_public: bool | None,
+    default_sort_key: MylistSortKey | None,
+    default_sort_order: MylistSortOrder | None,
+) -> Endpoint[Mylist | None]:
+    """Build the request of :meth:`UserClient.update_mylist`."""
+    data: dict[str, str] = {}
+    add_optional_param(data, "name", name)
+    add_optional_param(data, "description", description)
+    if is_public is not None:
+        data["isPublic"] = "true" if is_public else "false"
+    add_optional_param(data, "defaultSortKey", default_sort_key)
+    add_optional_param(data, "defaultSortOrder", default_sort_order)
+    url = f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}"
+    return nvapi("PUT", url, MylistData, data=data).map(lambda data: data.mylist if data is not None else None)
+
+
+def reorder_mylists(mylist_ids: list[str | int]) -> Endpoint[ReorderMylistsData | None]:
+    """Build the request of :meth:`UserClient.reorder_mylists`."""
+    data = {"order": ",".join(str(mylist_id) for mylist_id in mylist_ids)}
+    return nvapi("PUT", "https://nvapi.nicovideo.jp/v1/users/me/mylists/order", ReorderMylistsData, data=data)
+
+
+def delete_mylist(mylist_id: str) -> Endpoint[bool]:
+    """Build the request of :meth:`UserClient.delete_mylist`."""
+    return status("DELETE", f"https://nvapi.nicovideo.jp/v1/users/me/mylists/{mylist_id}")
+
+
+def copy_mylist_items(
+    from_mylist_id: str,
+    to_mylist_id: str,
+    item_ids: list[str],
+) -> Endpoint[CopyMylistItemsData | None]:
+    """Build the request of :meth:`UserClient.copy_mylist_items`."""
+    query = {
+        "from": from_mylist_id,
+        "to": to_mylist_id,
+        "itemIds": ",".join(item_ids),
+    }
+    url = f"https://nvapi.nicovideo.jp/v1/users/me/copy-mylist-items?{urlencode(query, safe=',')}"
+    return nvapi("POST", url, CopyMylistItemsData)
+
+
+def get_own_series_detail(series_id: str, *, page_size: int, page: int) -> Endpoint[SeriesData | None]:
+    """Build the request of :meth:`UserClient.get_own_series_detail`."""
+    query_str = _join_query({"pageSize": str(page_size), "page": str(page)})
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/users/me/series/{series_id}?{query_str}", SeriesData)
+
+
+def get_own_series(*, page_size: int, page: int) -> Endpoint[list[UserSeriesItem]]:
+    """Build the request of :meth:`UserClient.get_own_series`."""
+    query_str = _join_query({"pageSize": str(page_size), "page": str(page)})
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/users/me/series?{query_str}", OwnSeriesData).map(
+        lambda data: data.items if data is not None else [],
+    )
+
+
+def get_recommendations(
+    recipe_id: RecipeId,
+    *,
+    video_id: str | None,
+    site: str,
+    limit: int | None,
+    with_reason: bool | None,
+    sensitive_contents: Literal["mask", "filter"] | None,
+    recipe_version: int | None,
+) -> Endpoint[RecommendData | None]:
+    """Build the request of :meth:`UserClient.get_recommendations`."""
+    query: dict[str, str] = {"recipeId": recipe_id, "site": site}
+
+    # Set defaults and add video_id if provided
+    if video_id is not None:
+        query["videoId"] = video_id
+        limit = limit or 25
+
+    # Build query parameters
+    add_optional_param(query, "recipeVersion", recipe_version)
+    add_optional_param(query, "limit", limit)
+    add_optional_param(query, "with_reason", "true" if with_reason else None)
+    add_optional_param(query, "sensitiveContents", sensitive_contents)
+
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/recommend?{_join_query(query)}", RecommendData)
+
+
+def get_own_following_mylists(*, sample_item_count: int) -> Endpoint[FollowingMylistsData | None]:
+    """Build the request of :meth:`UserClient.get_own_following_mylists`."""
+    query_str = _join_query({"sampleItemCount": str(sample_item_count)})
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/users/me/following/mylists?{query_str}", FollowingMylistsData)
+
+
+def get_own_following_tags() -> Endpoint[FollowingTagsData | None]:
+    """Build the request of :meth:`UserClient.get_own_following_tags`."""
+    return nvapi("GET", "https://nvapi.nicovideo.jp/v1/users/me/following/tags", FollowingTagsData)
+
+
+def get_following_activities(
+    *,
+    endpoint: Literal["publish", "video"],
+    context: Literal["header_timeline", "my_timeline"],
+    cursor: str | None,
+) -> Endpoint[FeedData | None]:
+    """Build the request of :meth:`UserClient.get_following_activities`."""
+    query: dict[str, str] = {"context": context}
+    add_optional_param(query, "cursor", cursor)
+    url = f"https://api.feed.nicovideo.jp/v1/activities/followings/{endpoint}?{_join_query(query)}"
+    return parsed(url, FeedData)
+
+
+def search_users(
+    keyword: str,
+    *,
+    sort_key: UserSearchSortKey,
+    page_size: int,
+    page: int,
+) -> Endpoint[UserSearchData | None]:
+    """Build the request of :meth:`UserSearchClient.search_users`."""
+    query = {
+        "keyword": keyword,
+        "sortKey": sort_key,
+        "pageSize": str(page_size),
+        "page": str(page),
+    }
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/search/user?{_join_query(query)}", UserSearchData)
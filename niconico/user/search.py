@@ -4,13 +4,15 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import requests
-
 from niconico.base.client import BaseClient
-from niconico.objects.nvapi import NvAPIResponse, UserSearchData
+from niconico.base.pagination import iter_paged_items
+from niconico.user import endpoints
 
 if TYPE_CHECKING:
-    from niconico.objects.user.search import UserSearchSortKey
+    from collections.abc import Iterator
+
+    from niconico.objects.nvapi import UserSearchData
+    from niconico.objects.user.search import UserSearchItem, UserSearchSortKey
 
 
 class UserSearchClient(BaseClient):
@@ -35,16 +37,32 @@ class UserSearchClient(BaseClient):
         Returns:
             UserSearchData | None: User search data.
         """
-        query = {
-            "keyword": keyword,
-            "sortKey": sort_key,
-            "pageSize": page_size,
-            "page": page,
-        }
-        query_str = "&".join(f"{key}={value}" for key, value in query.items())
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/search/user?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[UserSearchData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.search_users(keyword, sort_key=sort_key, page_size=page_size, page=page),
+        )
+
+    def iter_users(
+        self,
+        keyword: str,
+        *,
+        sort_key: UserSearchSortKey = "_personalized",
+        page_size: int = 100,
+        prefetch: int = 0,
+    ) -> Iterator[UserSearchItem]:
+        """Iterate over all users matching a keyword, requesting the pages as needed.
+
+        Args:
+            keyword (str): Keyword to search.
+            sort_key (UserSearchSortKey, optional): Sort key. Defaults to "_personalized".
+            page_size (int, optional): Page size. Defaults to 100.
+            prefetch (int, optional): Number of pages to request ahead in the background. Defaults to 0.
+
+        Returns:
+            Iterator[UserSearchItem]: Iterator over the users found.
+        """
+        return iter_paged_items(
+            lambda page: self.search_users(keyword, sort_key=sort_key, page_size=page_size, page=page),
+            lambda data: data.items,
+            lambda data, _: data.has_next,
+            prefetch=prefetch,
+        )
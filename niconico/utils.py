@@ -2,7 +2,24 @@
 
 from __future__ import annotations
 
+import json
 import re
+from datetime import timedelta, timezone
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    import httpx
+    import requests
+
+T = TypeVar("T")
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+JST = timezone(timedelta(hours=9), "JST")
+"""Japan Standard Time, the time zone of the times returned by the APIs."""
 
 
 def extract_video_id_from_url(url: str) -> str | None:
@@ -30,3 +47,55 @@ def add_optional_flag(query: dict[str, str], key: str, *, value: bool | None) ->
     """Add an optional boolean parameter to the query dict as "true"/"false" if value is not None."""
     if value is not None:
         query[key] = "true" if value else "false"
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """Split a sequence into consecutive chunks of at most size items."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _load_orjson() -> Callable[[bytes], Any] | None:
+    """Get the decoder of orjson, or None if it is not installed."""
+    try:
+        import orjson  # noqa: PLC0415
+    except ImportError:  # pragma: no cover - depends on the optional extra
+        return None
+    return orjson.loads
+
+
+_orjson_loads = _load_orjson()
+
+
+def loads_json(content: bytes) -> Any:  # noqa: ANN401
+    """Decode a JSON body for untyped access.
+
+    orjson is used when the optional ``orjson`` extra is installed, and the standard
+    library decoder otherwise.
+
+    Args:
+        content (bytes): The raw body.
+
+    Returns:
+        Any: The decoded value.
+    """
+    if _orjson_loads is not None:
+        return _orjson_loads(content)
+    return json.loads(content)
+
+
+def parse_response(res: requests.Response | httpx.Response, model: type[ModelT]) -> ModelT:
+    """Parse the JSON body of a response into a model.
+
+    The raw body is validated directly, without decoding it into Python objects first.
+    The body is parsed again on each call, so callers sharing a response, served from
+    the cache or coalesced by single flight, each get their own object.
+
+    Args:
+        res (requests.Response | httpx.Response): The response to parse.
+        model (type[ModelT]): The model to parse the body into.
+
+    Returns:
+        ModelT: The parsed object.
+    """
+    return model.model_validate_json(res.content)
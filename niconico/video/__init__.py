@@ -3,31 +3,53 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
-from urllib.parse import urlencode
-
-import requests
 
 from niconico.base.client import BaseClient
+from niconico.base.pagination import iter_paged_items
 from niconico.decorators import login_required
-from niconico.objects.nvapi import (
-    HistoryData,
-    LikeData,
-    LikeHistoryData,
-    MylistData,
-    NvAPIResponse,
-    PlaylistData,
-    SeriesData,
-    TagsData,
-    VideosData,
-)
-from niconico.utils import add_optional_param
+from niconico.utils import chunked
+from niconico.video import endpoints
 from niconico.video.ranking import VideoRankingClient
 from niconico.video.search import VideoSearchClient
 from niconico.video.watch import VideoWatchClient
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
     from niconico.niconico import NicoNico
-    from niconico.objects.video import EssentialVideo, Mylist, MylistSortKey, MylistSortOrder, Tag
+    from niconico.objects.nvapi import HistoryData, LikeData, LikeHistoryData, LikeHistoryItem, PlaylistData, SeriesData
+    from niconico.objects.video import (
+        EssentialVideo,
+        HistoryItem,
+        Mylist,
+        MylistItem,
+        MylistSortKey,
+        MylistSortOrder,
+        SeriesItem,
+        Tag,
+    )
+
+VIDEOS_BATCH_SIZE = 100
+"""The largest number of IDs the videos endpoint accepts in a single request."""
+
+
+class FoundVideos(list["EssentialVideo"]):
+    """The videos found by ``get_videos``, in the order of the IDs given.
+
+    Attributes:
+        missing (list[str]): The IDs no video was returned for, such as those of deleted
+            or private videos, in the order given.
+    """
+
+    def __init__(self, videos: Iterable[EssentialVideo] = (), missing: Iterable[str] = ()) -> None:
+        """Initialize the videos found.
+
+        Args:
+            videos (Iterable[EssentialVideo]): The videos found.
+            missing (Iterable[str]): The IDs no video was returned for.
+        """
+        super().__init__(videos)
+        self.missing = list(missing)
 
 
 class VideoClient(BaseClient):
@@ -53,28 +75,33 @@ class VideoClient(BaseClient):
         Returns:
             EssentialVideo | None: The video object if found, None otherwise.
         """
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/videos?watchIds={video_id}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[VideosData](**res.json())
-            if res_cls.data is not None and len(res_cls.data.items) >= 1:
-                return res_cls.data.items[0].video
-        return None
-
-    def get_videos(self, video_ids: list[str]) -> list[EssentialVideo]:
+        return self._send(endpoints.get_video(video_id))
+
+    def get_videos(self, video_ids: list[str]) -> FoundVideos:
         """Get videos by their IDs.
 
+        The IDs are sent in batches of up to ``VIDEOS_BATCH_SIZE`` per request. IDs that
+        are not found, such as deleted or private videos, are skipped, logged and listed
+        in the ``missing`` attribute of the result.
+
         Args:
             video_ids (list[str]): The IDs of the videos.
 
         Returns:
-            list[EssentialVideo]: The video objects if found, an empty list otherwise.
+            FoundVideos: The video objects found, in the order of the IDs given.
         """
-        videos = []
-        for video_id in video_ids:
-            video = self.get_video(video_id)
-            if video is not None:
-                videos.append(video)
-        return videos
+        unique_ids = list(dict.fromkeys(video_ids))
+        videos: dict[str, EssentialVideo] = {}
+        for batch in chunked(unique_ids, VIDEOS_BATCH_SIZE):
+            videos.update(self._get_video_batch(batch))
+        missing_ids = [video_id for video_id in unique_ids if video_id not in videos]
+        if missing_ids:
+            self.log("warning", f"Videos not found: {', '.join(missing_ids)}")
+        return FoundVideos((videos[video_id] for video_id in video_ids if video_id in videos), missing_ids)
+
+    def _get_video_batch(self, video_ids: Sequence[str]) -> dict[str, EssentialVideo]:
+        """Get a batch of videos in one request, keyed by their watch IDs."""
+        return self._send(endpoints.get_videos(video_ids))
 
     def get_video_tags(self, video_id: str, edit_key: str) -> list[Tag] | None:
         """Get the tags of a video by its ID.
@@ -87,16 +114,7 @@ class VideoClient(BaseClient):
         Returns:
             list[Tag] | None: The tags of the video if found, None otherwise.
         """
-        headers = {}
-        if edit_key is not None:
-            headers["X-Tag-Edit-Key"] = edit_key
-
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v2/videos/{video_id}/tags", headers=headers)
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[TagsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.tags
-        return None
+        return self._send(endpoints.get_video_tags(video_id, edit_key))
 
     def get_mylist(
         self,
@@ -119,18 +137,49 @@ class VideoClient(BaseClient):
         Returns:
             Mylist | None: The mylist object if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        if sort_key is not None:
-            query["sortKey"] = sort_key
-        if sort_order is not None:
-            query["sortOrder"] = sort_order
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v2/mylists/{mylist_id}?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[MylistData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.mylist
-        return None
+        return self._send(
+            endpoints.get_mylist(
+                mylist_id,
+                page_size=page_size,
+                page=page,
+                sort_key=sort_key,
+                sort_order=sort_order,
+            ),
+        )
+
+    def iter_mylist(
+        self,
+        mylist_id: str,
+        *,
+        page_size: int = 100,
+        sort_key: MylistSortKey | None = None,
+        sort_order: MylistSortOrder | None = None,
+        prefetch: int = 0,
+    ) -> Iterator[MylistItem]:
+        """Iterate over all items of a mylist, requesting the pages as needed.
+
+        Args:
+            mylist_id (str): The ID of the mylist.
+            page_size (int): The number of videos to get per request.
+            sort_key (MylistSortKey | None): The sort key.
+            sort_order (MylistSortOrder | None): The sort order.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[MylistItem]: An iterator over the items of the mylist.
+        """
+        return iter_paged_items(
+            lambda page: self.get_mylist(
+                mylist_id,
+                page_size=page_size,
+                page=page,
+                sort_key=sort_key,
+                sort_order=sort_order,
+            ),
+            lambda mylist: mylist.items,
+            lambda mylist, _: mylist.has_next,
+            prefetch=prefetch,
+        )
 
     def get_series(self, series_id: str, *, page_size: int = 100, page: int = 1) -> SeriesData | None:
         """Get a series by its ID.
@@ -143,14 +192,25 @@ class VideoClient(BaseClient):
         Returns:
             SeriesData | None: The series object if found, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/series/{series_id}?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[SeriesData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_series(series_id, page_size=page_size, page=page))
+
+    def iter_series(self, series_id: str, *, page_size: int = 100, prefetch: int = 0) -> Iterator[SeriesItem]:
+        """Iterate over all videos of a series, requesting the pages as needed.
+
+        Args:
+            series_id (str): The ID of the series.
+            page_size (int): The number of videos to get per request.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[SeriesItem]: An iterator over the videos of the series.
+        """
+        return iter_paged_items(
+            lambda page: self.get_series(series_id, page_size=page_size, page=page),
+            lambda series: series.items,
+            lambda series, page: page * page_size < series.total_count,
+            prefetch=prefetch,
+        )
 
     def get_shorts_feed(
         self,
@@ -172,22 +232,7 @@ class VideoClient(BaseClient):
         Returns:
             PlaylistData | None: The feed if successful, None otherwise.
         """
-        query = {
-            "recipeId": "video_short_watch_recommendation",
-            "recipeVersion": "1",
-            "site": "nicovideo",
-        }
-        if video_id is not None:
-            query["videoId"] = video_id
-            query["currentVideoId"] = video_id
-        add_optional_param(query, "pageSize", page_size)
-        query_str = urlencode(query)
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/playlist/recipe-id?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[PlaylistData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_shorts_feed(video_id, page_size=page_size))
 
     @login_required()
     def get_history(self, *, page_size: int = 100, page: int = 1) -> HistoryData | None:
@@ -200,14 +245,25 @@ class VideoClient(BaseClient):
         Returns:
             HistoryData | None: The history data if successful, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v2/users/me/watch/history?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[HistoryData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_history(page_size=page_size, page=page))
+
+    @login_required()
+    def iter_history(self, *, page_size: int = 100, prefetch: int = 0) -> Iterator[HistoryItem]:
+        """Iterate over the whole history of the authenticated user, requesting the pages as needed.
+
+        Args:
+            page_size (int): The number of videos to get per request.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[HistoryItem]: An iterator over the videos in the history.
+        """
+        return iter_paged_items(
+            lambda page: self.get_history(page_size=page_size, page=page),
+            lambda history: history.items,
+            lambda history, page: history.total_count is None or page * page_size < history.total_count,
+            prefetch=prefetch,
+        )
 
     @login_required()
     def like_video(self, video_id: str) -> LikeData | None:
@@ -219,12 +275,7 @@ class VideoClient(BaseClient):
         Returns:
             LikeData | None: The like data if successful, None otherwise.
         """
-        res = self.niconico.post(f"https://nvapi.nicovideo.jp/v1/users/me/likes/items?videoId={video_id}")
-        if res.status_code in (requests.codes.ok, requests.codes.created):
-            res_cls = NvAPIResponse[LikeData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.like_video(video_id))
 
     @login_required()
     def unlike_video(self, video_id: str) -> bool:
@@ -236,8 +287,7 @@ class VideoClient(BaseClient):
         Returns:
             bool: True if the like was successfully removed, False otherwise.
         """
-        res = self.niconico.delete(f"https://nvapi.nicovideo.jp/v1/users/me/likes/items?videoId={video_id}")
-        return res.status_code == requests.codes.ok
+        return self._send(endpoints.unlike_video(video_id))
 
     @login_required()
     def get_like_history(self, *, page_size: int = 25, page: int = 1) -> LikeHistoryData | None:
@@ -250,11 +300,22 @@ class VideoClient(BaseClient):
         Returns:
             LikeHistoryData | None: The like history data if successful, None otherwise.
         """
-        query = {"pageSize": str(page_size), "page": str(page)}
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/users/me/likes?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[LikeHistoryData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(endpoints.get_like_history(page_size=page_size, page=page))
+
+    @login_required()
+    def iter_like_history(self, *, page_size: int = 25, prefetch: int = 0) -> Iterator[LikeHistoryItem]:
+        """Iterate over the whole like history of the authenticated user, requesting the pages as needed.
+
+        Args:
+            page_size (int): The number of liked videos to get per request.
+            prefetch (int): The number of pages to request ahead in the background.
+
+        Returns:
+            Iterator[LikeHistoryItem]: An iterator over the liked videos.
+        """
+        return iter_paged_items(
+            lambda page: self.get_like_history(page_size=page_size, page=page),
+            lambda history: history.items,
+            lambda history, _: history.summary.has_next,
+            prefetch=prefetch,
+        )
@@ -0,0 +1,399 @@
+"""This module provides helpers to page through the comments of a video."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from niconico.exceptions import CommentAPIError
+from niconico.objects.video.watch import Comment
+from niconico.utils import JST
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Iterator
+
+    import numpy as np
+    import pyarrow as pa
+
+    from niconico.objects.video.watch import NvCommentDataTarget
+
+T = TypeVar("T", bound="Hashable")
+
+OWNER_FORK = "owner"
+"""The fork of the comments of the uploader, which are returned at once rather than paged."""
+
+DEFAULT_MIN_INTERVAL = 1.0
+"""The default number of seconds waited between two comment requests."""
+
+DEFAULT_MAX_INTERVAL = 60.0
+"""The longest number of seconds waited between two comment requests after failures."""
+
+DEFAULT_MAX_FAILURES = 5
+"""The default number of consecutive failed comment requests before giving up."""
+
+EXPIRED_TOKEN = "EXPIRED_TOKEN"  # noqa: S105
+"""The error code of the comment API when the thread key has expired."""
+
+
+@dataclass
+class _ForkCursor:
+    """The position reached while paging back through a fork."""
+
+    target: NvCommentDataTarget
+    when: int
+    seen: set[int] = field(default_factory=set)
+    done: bool = False
+
+
+class CommentHarvest:
+    """The state of a walk back through every comment of a video, one fork at a time.
+
+    The first request asks for every fork at once, which returns the whole owner thread
+    and the latest page of the other forks. Each other fork then pages back on its own
+    ``when`` cursor, skipping comments already yielded by their number, until a request
+    returns no comment posted before the cursor.
+    """
+
+    def __init__(self, targets: list[NvCommentDataTarget], when: int) -> None:
+        """Initialize the walk.
+
+        Args:
+            targets (list[NvCommentDataTarget]): The forks of the video.
+            when (int): The UNIX time to start paging back from.
+        """
+        self._targets = targets
+        self._cursors = {target.fork: _ForkCursor(target=target, when=when) for target in targets}
+        self._started = False
+
+    @property
+    def finished(self) -> bool:
+        """Whether every fork has been walked through."""
+        return (self._started or not self._cursors) and all(cursor.done for cursor in self._cursors.values())
+
+    def next_request(self) -> tuple[list[NvCommentDataTarget], int | None]:
+        """Get the forks and the ``when`` cursor of the next request."""
+        if not self._started:
+            return self._targets, next(iter(self._cursors.values())).when
+        cursor = next(cursor for cursor in self._cursors.values() if not cursor.done)
+        return [cursor.target], cursor.when
+
+    def absorb(self, batch: CommentBatch) -> CommentBatch:
+        """Take in a response, advancing the cursors.
+
+        Args:
+            batch (CommentBatch): The comments returned for the request from ``next_request``.
+
+        Returns:
+            CommentBatch: The comments not seen before, in the order they were returned.
+        """
+        requested = [fork for fork, cursor in self._cursors.items() if not cursor.done]
+        if self._started:
+            requested = requested[:1]
+        self._started = True
+        new: list[int] = []
+        oldest: dict[str, int] = {}
+        for index in range(len(batch)):
+            fork = batch.fork_of(index)
+            if fork not in requested:
+                continue
+            posted_at = batch.posted_at[index] // 1000
+            oldest[fork] = min(oldest.get(fork, posted_at), posted_at)
+            seen = self._cursors[fork].seen
+            if batch.no[index] not in seen:
+                seen.add(batch.no[index])
+                new.append(index)
+        for fork in requested:
+            cursor = self._cursors[fork]
+            if fork == OWNER_FORK or fork not in oldest:
+                cursor.done = True
+            else:
+                cursor.when = oldest[fork] if oldest[fork] < cursor.when else cursor.when - 1
+        return batch.take(new)
+
+
+class CommentBackoff:
+    """The pacing of the requests of a walk through the comments of a video.
+
+    Requests are spaced by the minimum interval, and the wait doubles after each failed
+    request up to the maximum interval, shrinking back once requests succeed again.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, max_failures: int) -> None:
+        """Initialize the pacing.
+
+        Args:
+            min_interval (float): The number of seconds waited between two requests.
+            max_interval (float): The longest number of seconds waited after failed requests.
+            max_failures (int): The number of consecutive failed requests before giving up.
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_failures = max_failures
+        self.interval = min_interval
+        self.failures = 0
+
+    def failed(self, error_code: str | None) -> float | None:
+        """Record a failed request.
+
+        Args:
+            error_code (str | None): The error code of the comment API, or None if no comment was returned.
+
+        Returns:
+            float | None: The number of seconds to wait before retrying, or None if the thread key
+                expired and must be refreshed first.
+
+        Raises:
+            CommentAPIError: If too many requests failed in a row.
+        """
+        if self.failures >= self.max_failures:
+            message = error_code or f"The comment batch was unavailable after {self.failures + 1} attempts."
+            raise CommentAPIError(message=message)
+        self.failures += 1
+        if error_code == EXPIRED_TOKEN:
+            return None
+        self.interval = min(self.max_interval, max(self.interval * 2, DEFAULT_MIN_INTERVAL))
+        return self.interval
+
+    def succeeded(self) -> float:
+        """Record a successful request, returning the number of seconds to wait before the next one."""
+        self.failures = 0
+        self.interval = max(self.min_interval, self.interval / 2)
+        return self.interval
+
+
+class InternTable(Generic[T]):
+    """A table of distinct values, each stored once and referred to by its index."""
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self.values: list[T] = []
+        self._codes: dict[T, int] = {}
+
+    def __len__(self) -> int:
+        """Get the number of distinct values."""
+        return len(self.values)
+
+    def add(self, value: T) -> int:
+        """Get the index of a value, adding it to the table if it is new."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class CommentBatch:
+    """Comments stored column by column rather than as one model per comment.
+
+    Numbers are kept in ``array`` columns, ``posted_at`` as milliseconds since the epoch,
+    and the values that repeat across comments (``fork``, ``user_id``, ``source`` and
+    ``commands``) as indexes into an :class:`InternTable`. Indexing a batch builds a
+    :class:`Comment` for that row only.
+    """
+
+    INT_COLUMNS = ("no", "vpos_ms", "score", "nicoru_count", "posted_at")
+    """The integer columns, in the order they are exported."""
+
+    INTERNED_COLUMNS = ("fork", "user_id", "source", "commands")
+    """The columns holding indexes into an intern table, in the order they are exported."""
+
+    def __init__(self) -> None:
+        """Initialize an empty batch."""
+        self.no = array("q")
+        self.vpos_ms = array("q")
+        self.score = array("q")
+        self.nicoru_count = array("q")
+        self.posted_at = array("q")
+        self.is_my_post = bytearray()
+        self.is_premium = bytearray()
+        self.fork = array("i")
+        self.user_id = array("i")
+        self.source = array("i")
+        self.commands = array("i")
+        self.body: list[str] = []
+        self.id_: list[str] = []
+        self.nicoru_id: list[str | None] = []
+        self.forks: InternTable[str] = InternTable()
+        self.user_ids: InternTable[str] = InternTable()
+        self.sources: InternTable[str] = InternTable()
+        self.command_sets: InternTable[tuple[str, ...]] = InternTable()
+
+    @classmethod
+    def from_threads(cls, threads: list[dict[str, Any]]) -> CommentBatch:
+        """Build a batch from the raw threads of a ``/v1/threads`` response.
+
+        Args:
+            threads (list[dict[str, Any]]): The ``data.threads`` list of the decoded response.
+
+        Returns:
+            CommentBatch: The comments of every thread, in the order they were returned.
+        """
+        batch = cls()
+        for thread in threads:
+            fork = batch.forks.add(thread["fork"])
+            for comment in thread["comments"]:
+                batch._append(fork, comment)
+        return batch
+
+    def _append(self, fork: int, comment: dict[str, Any]) -> None:
+        """Append a raw comment of a fork."""
+        self.no.append(comment["no"])
+        self.vpos_ms.append(comment["vposMs"])
+        self.score.append(comment["score"])
+        self.nicoru_count.append(comment["nicoruCount"])
+        self.posted_at.append(round(datetime.fromisoformat(comment["postedAt"]).timestamp() * 1000))
+        self.is_my_post.append(comment["isMyPost"])
+        self.is_premium.append(comment["isPremium"])
+        self.fork.append(fork)
+        self.user_id.append(self.user_ids.add(comment["userId"]))
+        self.source.append(self.sources.add(comment["source"]))
+        self.commands.append(self.command_sets.add(tuple(comment["commands"])))
+        self.body.append(comment["body"])
+        self.id_.append(comment["id"])
+        self.nicoru_id.append(comment.get("nicoruId"))
+
+    def __len__(self) -> int:
+        """Get the number of comments."""
+        return len(self.no)
+
+    def __getitem__(self, index: int) -> Comment:
+        """Build the comment of a row.
+
+        ``posted_at`` is rendered in Japan Standard Time, like the comment API does.
+        """
+        return Comment.model_construct(
+            body=self.body[index],
+            commands=list(self.command_sets.values[self.commands[index]]),
+            id_=self.id_[index],
+            is_my_post=bool(self.is_my_post[index]),
+            is_premium=bool(self.is_premium[index]),
+            nicoru_count=self.nicoru_count[index],
+            nicoru_id=self.nicoru_id[index],
+            no=self.no[index],
+            posted_at=datetime.fromtimestamp(self.posted_at[index] / 1000, tz=JST).isoformat(),
+            score=self.score[index],
+            source=self.sources.values[self.source[index]],
+            user_id=self.user_ids.values[self.user_id[index]],
+            vpos_ms=self.vpos_ms[index],
+        )
+
+    def __iter__(self) -> Iterator[Comment]:
+        """Iterate over the comments of every row."""
+        return (self[index] for index in range(len(self)))
+
+    def fork_of(self, index: int) -> str:
+        """Get the fork of a row."""
+        return self.forks.values[self.fork[index]]
+
+    def take(self, indexes: Iterable[int]) -> CommentBatch:
+        """Build a batch from some rows of this one.
+
+        Args:
+            indexes (Iterable[int]): The rows to keep, in order.
+
+        Returns:
+            CommentBatch: The new batch. Its intern tables only hold the values it uses.
+        """
+        batch = CommentBatch()
+        for index in indexes:
+            batch._append_row(self, index)
+        return batch
+
+    def extend(self, other: CommentBatch) -> None:
+        """Append every row of another batch.
+
+        Args:
+            other (CommentBatch): The batch to append.
+        """
+        for index in range(len(other)):
+            self._append_row(other, index)
+
+    def _append_row(self, other: CommentBatch, index: int) -> None:
+        """Append a row of another batch, interning its values into this one."""
+        for name in self.INT_COLUMNS:
+            getattr(self, name).append(getattr(other, name)[index])
+        self.is_my_post.append(other.is_my_post[index])
+        self.is_premium.append(other.is_premium[index])
+        self.fork.append(self.forks.add(other.forks.values[other.fork[index]]))
+        self.user_id.append(self.user_ids.add(other.user_ids.values[other.user_id[index]]))
+        self.source.append(self.sources.add(other.sources.values[other.source[index]]))
+        self.commands.append(self.command_sets.add(other.command_sets.values[other.commands[index]]))
+        self.body.append(other.body[index])
+        self.id_.append(other.id_[index])
+        self.nicoru_id.append(other.nicoru_id[index])
+
+    def _tables(self) -> dict[str, list[Any]]:
+        """Get the intern table of every interned column."""
+        return {
+            "fork": self.forks.values,
+            "user_id": self.user_ids.values,
+            "source": self.sources.values,
+            "commands": self.command_sets.values,
+        }
+
+    def to_numpy(self) -> dict[str, np.ndarray]:
+        """Export the columns as NumPy arrays.
+
+        Integer columns are ``int64`` arrays, ``posted_at`` is ``datetime64[ms]``, flags
+        are ``bool`` arrays and the other columns are ``object`` arrays sharing the
+        interned values. Requires the optional ``numpy`` extra.
+
+        Returns:
+            dict[str, np.ndarray]: The arrays, by column name.
+        """
+        try:
+            import numpy as np  # noqa: PLC0415
+        except ImportError as e:  # pragma: no cover - depends on the optional extra
+            msg = 'CommentBatch.to_numpy requires numpy. Install it with `pip install "niconico.py[numpy]"`.'
+            raise ImportError(msg) from e
+        columns: dict[str, np.ndarray] = {
+            name: np.frombuffer(getattr(self, name), dtype=np.int64).copy() for name in self.INT_COLUMNS
+        }
+        columns["posted_at"] = columns["posted_at"].astype("datetime64[ms]")
+        columns["is_my_post"] = np.frombuffer(self.is_my_post, dtype=np.bool_).copy()
+        columns["is_premium"] = np.frombuffer(self.is_premium, dtype=np.bool_).copy()
+        for name, values in self._tables().items():
+            table = np.empty(len(values), dtype=object)
+            table[:] = values
+            columns[name] = table[np.asarray(getattr(self, name), dtype=np.intp)]
+        for name, values in (("body", self.body), ("id", self.id_), ("nicoru_id", self.nicoru_id)):
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            columns[name] = column
+        return columns
+
+    def to_arrow(self) -> pa.Table:
+        """Export the columns as an Arrow table.
+
+        Interned columns become dictionary-encoded columns, so the repeated values are
+        not copied. Requires the optional ``arrow`` extra.
+
+        Returns:
+            pa.Table: The table, with one row per comment.
+        """
+        try:
+            import pyarrow as pa  # noqa: PLC0415
+        except ImportError as e:  # pragma: no cover - depends on the optional extra
+            msg = 'CommentBatch.to_arrow requires pyarrow. Install it with `pip install "niconico.py[arrow]"`.'
+            raise ImportError(msg) from e
+
+        def from_buffer(values: array[int] | bytearray, value_type: pa.DataType) -> pa.Array:
+            return pa.Array.from_buffers(value_type, len(values), [None, pa.py_buffer(bytes(values))])
+
+        columns: dict[str, pa.Array] = {name: from_buffer(getattr(self, name), pa.int64()) for name in self.INT_COLUMNS}
+        columns["posted_at"] = columns["posted_at"].cast(pa.timestamp("ms", tz="UTC"))
+        columns["is_my_post"] = from_buffer(self.is_my_post, pa.uint8()).cast(pa.bool_())
+        columns["is_premium"] = from_buffer(self.is_premium, pa.uint8()).cast(pa.bool_())
+        for name, values in self._tables().items():
+            dictionary = (
+                pa.array([list(value) for value in values], pa.list_(pa.string()))
+                if name == "commands"
+                else pa.array(values, pa.string())
+            )
+            columns[name] = pa.DictionaryArray.from_arrays(from_buffer(getattr(self, name), pa.int32()), dictionary)
+        columns["body"] = pa.array(self.body, pa.string())
+        columns["id"] = pa.array(self.id_, pa.string())
+        columns["nicoru_id"] = pa.array(self.nicoru_id, pa.string())
+        return pa.table(columns)
@@ -0,0 +1,561 @@
+"""This module provides the requests of the video clients, shared by the synchronous and asynchronous APIs."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
+from urllib.parse import urlencode
+
+import requests
+
+from niconico.base.endpoint import Endpoint, nvapi, parsed, status
+from niconico.exceptions import CommentAPIError, NicoAPIError, WatchAPIError
+from niconico.objects.nvapi import (
+    AccessRightsData,
+    FacetData,
+    GenresData,
+    HistoryData,
+    LikeData,
+    LikeHistoryData,
+    ListSearchData,
+    MylistData,
+    PlaylistData,
+    PopularTagsData,
+    RankingData,
+    SeriesData,
+    TagsData,
+    TeibanRankingData,
+    TeibanRankingFeaturedKeysData,
+    ThreadKeyData,
+    VideosData,
+    VideoSearchData,
+)
+from niconico.objects.video.search import SnapshotSearchData
+from niconico.objects.video.watch import (
+    LazyWatchData,
+    NvCommentAPIMeta,
+    NvCommentAPIResponse,
+    WatchAPIData,
+    WatchAPIErrorData,
+    WatchAPIResponse,
+)
+from niconico.utils import add_optional_flag, add_optional_param, loads_json, parse_response
+from niconico.video.comments import CommentBatch
+from niconico.video.snapshot import snapshot_search_url, window_filters
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from datetime import datetime
+
+    import httpx
+
+    from niconico.objects.video import EssentialVideo, Mylist, MylistSortKey, MylistSortOrder, Tag
+    from niconico.objects.video.ranking import Genre, RankingTerm, TeibanRankingFeaturedKey
+    from niconico.objects.video.search import (
+        FacetItem,
+        ListSearchSortKey,
+        ListType,
+        SelectContentType,
+        SnapshotResponseField,
+        SnapshotSortKey,
+        SnapshotSortOrder,
+        SnapshotTargetField,
+        VideoSearchSortKey,
+        VideoSearchSortOrder,
+    )
+    from niconico.objects.video.watch import NvCommentAPIData, NvCommentDataTarget, WatchData
+
+T = TypeVar("T")
+
+
+def _join_query(query: dict[str, str]) -> str:
+    """Join a query without escaping its values, as the video endpoints have always been requested."""
+    return "&".join([f"{key}={value}" for key, value in query.items()])
+
+
+def get_video(video_id: str) -> Endpoint[EssentialVideo | None]:
+    """Build the request of :meth:`VideoClient.get_video`."""
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/videos?watchIds={video_id}", VideosData).map(
+        lambda data: data.items[0].video if data is not None and len(data.items) >= 1 else None,
+    )
+
+
+def get_videos(video_ids: Sequence[str]) -> Endpoint[dict[str, EssentialVideo]]:
+    """Build the request of a batch of videos, whose result is the videos found keyed by their watch IDs."""
+    url = f"https://nvapi.nicovideo.jp/v1/videos?watchIds={','.join(video_ids)}"
+    return nvapi("GET", url, VideosData).map(
+        lambda data: {item.watch_id: item.video for item in data.items} if data is not None else {},
+    )
+
+
+def get_video_tags(video_id: str, edit_key: str) -> Endpoint[list[Tag] | None]:
+    """Build the request of :meth:`VideoClient.get_video_tags`."""
+    headers = {}
+    if edit_key is not None:
+        headers["X-Tag-Edit-Key"] = edit_key
+    url = f"https://nvapi.nicovideo.jp/v2/videos/{video_id}/tags"
+    return nvapi("GET", url, TagsData, headers=headers).map(lambda data: data.tags if data is not None else None)
+
+
+def get_mylist(
+    mylist_id: str,
+    *,
+    page_size: int,
+    page: int,
+    sort_key: MylistSortKey | None,
+    sort_order: MylistSortOrder | None,
+) -> Endpoint[Mylist | None]:
+    """Build the request of :meth:`VideoClient.get_mylist`."""
+    query = {"pageSize": str(page_size), "page": str(page)}
+    add_optional_param(query, "sortKey", sort_key)
+    add_optional_param(query, "sortOrder", sort_order)
+    url = f"https://nvapi.nicovideo.jp/v2/mylists/{mylist_id}?{_join_query(query)}"
+    return nvapi("GET", url, MylistData).map(lambda data: data.mylist if data is not None else None)
+
+
+def get_series(series_id: str, *, page_size: int, page: int) -> Endpoint[SeriesData | None]:
+    """Build the request of :meth:`VideoClient.get_series`."""
+    query_str = _join_query({"pageSize": str(page_size), "page": str(page)})
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/series/{series_id}?{query_str}", SeriesData)
+
+
+def get_shorts_feed(video_id: str | None, *, page_size: int | None) -> Endpoint[PlaylistData | None]:
+    """Build the request of :meth:`VideoClient.get_shorts_feed`."""
+    query = {
+        "recipeId": "video_short_watch_recommendation",
+        "recipeVersion": "1",
+        "site": "nicovideo",
+    }
+    if video_id is not None:
+        query["videoId"] = video_id
+        query["currentVideoId"] = video_id
+    add_optional_param(query, "pageSize", page_size)
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/playlist/recipe-id?{urlencode(query)}", PlaylistData)
+
+
+def get_history(*, page_size: int, page: int) -> Endpoint[HistoryData | None]:
+    """Build the request of :meth:`VideoClient.get_history`."""
+    query_str = _join_query({"pageSize": str(page_size), "page": str(page)})
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v2/users/me/watch/history?{query_str}", HistoryData)
+
+
+def like_video(video_id: str) -> Endpoint[LikeData | None]:
+    """Build the request of :meth:`VideoClient.like_video`."""
+    url = f"https://nvapi.nicovideo.jp/v1/users/me/likes/items?videoId={video_id}"
+    return nvapi("POST", url, LikeData, ok=(requests.codes.ok, requests.codes.created))
+
+
+def unlike_video(video_id: str) -> Endpoint[bool]:
+    """Build the request of :meth:`VideoClient.unlike_video`."""
+    return status("DELETE", f"https://nvapi.nicovideo.jp/v1/users/me/likes/items?videoId={video_id}")
+
+
+def get_like_history(*, page_size: int, page: int) -> Endpoint[LikeHistoryData | None]:
+    """Build the request of :meth:`VideoClient.get_like_history`."""
+    query_str = _join_query({"pageSize": str(page_size), "page": str(page)})
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/users/me/likes?{query_str}", LikeHistoryData)
+
+
+def get_genres() -> Endpoint[list[Genre]]:
+    """Build the request of :meth:`VideoRankingClient.get_genres`."""
+    return nvapi("GET", "https://nvapi.nicovideo.jp/v2/genres", GenresData).map(
+        lambda data: data.genres if data is not None else [],
+    )
+
+
+def get_popular_tags(genre_key: str) -> Endpoint[list[str]]:
+    """Build the request of :meth:`VideoRankingClient.get_popular_tags`."""
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/genres/{genre_key}/popular-tags", PopularTagsData).map(
+        lambda data: data.tags if data is not None else [],
+    )
+
+
+def get_ranking(
+    genre_key: str,
+    term: RankingTerm,
+    *,
+    page_size: Literal[25, 100],
+    page: int,
+    tag: str | None,
+    sensitive_contents: Literal["mask", "filter"] | None,
+) -> Endpoint[RankingData | None]:
+    """Build the request of :meth:`VideoRankingClient.get_ranking`."""
+    query = {
+        "term": term,
+        "pageSize": str(page_size),
+        "page": str(page),
+    }
+    add_optional_param(query, "tag", tag)
+    add_optional_param(query, "sensitiveContents", sensitive_contents)
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/ranking/genre/{genre_key}?{_join_query(query)}", RankingData)
+
+
+def get_hot_topics(
+    term: RankingTerm,
+    *,
+    page_size: Literal[25, 100],
+    page: int,
+    sensitive_contents: Literal["mask", "filter"] | None,
+) -> Endpoint[RankingData | None]:
+    """Build the request of :meth:`VideoRankingClient.get_hot_topics`."""
+    query = {
+        "term": term,
+        "page": str(page),
+        "responseType": "json",
+    }
+    add_optional_param(query, "sensitiveContents", sensitive_contents)
+
+    def parse(res: requests.Response | httpx.Response) -> RankingData | None:
+        if res.status_code != requests.codes.ok:
+            return None
+        ranking = loads_json(res.content)["data"]["response"]["$getTeibanRanking"]["data"]
+        return RankingData.model_validate(
+            {
+                "items": ranking["items"][:page_size],
+                "hasNext": ranking["hasNext"],
+            },
+        )
+
+    return Endpoint("GET", f"https://www.nicovideo.jp/ranking/hot_topic?{_join_query(query)}", parse)
+
+
+def get_teiban_ranking_featured_keys() -> Endpoint[list[TeibanRankingFeaturedKey]]:
+    """Build the request of :meth:`VideoRankingClient.get_teiban_ranking_featured_keys`."""
+    url = "https://nvapi.nicovideo.jp/v1/ranking/teiban/featured-keys"
+    return nvapi("GET", url, TeibanRankingFeaturedKeysData).map(lambda data: data.items if data is not None else [])
+
+
+def get_teiban_ranking(
+    featured_key: str,
+    term: RankingTerm,
+    *,
+    page_size: Literal[25, 100],
+    page: int,
+    sensitive_contents: Literal["mask", "filter"] | None,
+) -> Endpoint[TeibanRankingData | None]:
+    """Build the request of :meth:`VideoRankingClient.get_teiban_ranking`."""
+    query = {
+        "term": term,
+        "pageSize": str(page_size),
+        "page": str(page),
+    }
+    add_optional_param(query, "sensitiveContents", sensitive_contents)
+    url = f"https://nvapi.nicovideo.jp/v1/ranking/teiban/{featured_key}?{_join_query(query)}"
+    return nvapi("GET", url, TeibanRankingData)
+
+
+def _video_search_query(
+    search_by: Literal["keyword", "tag"],
+    value: str,
+    *,
+    sort_key: VideoSearchSortKey,
+    sort_order: VideoSearchSortOrder,
+    page_size: int | None,
+    page: int | None,
+    sensitive_content: Literal["mask", "filter"] | None,
+    select_content_type: SelectContentType | None,
+    channel_video_listing_status: Literal["included"] | None,
+    allow_future_contents: bool | None,
+    search_by_user: bool | None,
+    min_registered_at: str | None,
+    max_registered_at: str | None,
+    max_duration: int | None,
+) -> str:
+    """Build the query of a video or facet search, without the page for a facet search."""
+    query = {search_by: value, "sortKey": sort_key, "sortOrder": sort_order}
+    add_optional_param(query, "pageSize", page_size)
+    add_optional_param(query, "page", page)
+    add_optional_param(query, "sensitiveContents", sensitive_content)
+    add_optional_param(query, "selectContentType", select_content_type)
+    add_optional_param(query, "channelVideoListingStatus", channel_video_listing_status)
+    add_optional_flag(query, "allowFutureContents", value=allow_future_contents)
+    add_optional_flag(query, "searchByUser", value=search_by_user)
+    add_optional_param(query, "minRegisteredAt", min_registered_at)
+    add_optional_param(query, "maxRegisteredAt", max_registered_at)
+    add_optional_param(query, "maxDuration", max_duration)
+    return _join_query(query)
+
+
+def search_videos(
+    search_by: Literal["keyword", "tag"],
+    value: str,
+    *,
+    sort_key: VideoSearchSortKey,
+    sort_order: VideoSearchSortOrder,
+    page_size: int,
+    page: int,
+    sensitive_content: Literal["mask", "filter"] | None,
+    select_content_type: SelectContentType | None,
+    channel_video_listing_status: Literal["included"] | None,
+    allow_future_contents: bool | None,
+    search_by_user: bool | None,
+    min_registered_at: str | None,
+    max_registered_at: str | None,
+    max_duration: int | None,
+) -> Endpoint[VideoSearchData | None]:
+    """Build the request of :meth:`VideoSearchClient.search_videos_by_keyword` or of its tag counterpart."""
+    query_str = _video_search_query(
+        search_by,
+        value,
+        sort_key=sort_key,
+        sort_order=sort_order,
+        page_size=page_size,
+        page=page,
+        sensitive_content=sensitive_content,
+        select_content_type=select_content_type,
+        channel_video_listing_status=channel_video_listing_status,
+        allow_future_contents=allow_future_contents,
+        search_by_user=search_by_user,
+        min_registered_at=min_registered_at,
+        max_registered_at=max_registered_at,
+        max_duration=max_duration,
+    )
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v2/search/video?{query_str}", VideoSearchData)
+
+
+def search_facet(
+    search_by: Literal["keyword", "tag"],
+    value: str,
+    *,
+    sort_key: VideoSearchSortKey,
+    sort_order: VideoSearchSortOrder,
+    sensitive_content: Literal["mask", "filter"] | None,
+    select_content_type: SelectContentType | None,
+    channel_video_listing_status: Literal["included"] | None,
+    allow_future_contents: bool | None,
+    search_by_user: bool | None,
+    min_registered_at: str | None,
+    max_registered_at: str | None,
+    max_duration: int | None,
+) -> Endpoint[list[FacetItem]]:
+    """Build the request of :meth:`VideoSearchClient.get_facet_by_keyword` or of its tag counterpart."""
+    query_str = _video_search_query(
+        search_by,
+        value,
+        sort_key=sort_key,
+        sort_order=sort_order,
+        page_size=None,
+        page=None,
+        sensitive_content=sensitive_content,
+        select_content_type=select_content_type,
+        channel_video_listing_status=channel_video_listing_status,
+        allow_future_contents=allow_future_contents,
+        search_by_user=search_by_user,
+        min_registered_at=min_registered_at,
+        max_registered_at=max_registered_at,
+        max_duration=max_duration,
+    )
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v2/search/facet?{query_str}", FacetData).map(
+        lambda data: data.items if data is not None else [],
+    )
+
+
+def search_lists(
+    keyword: str,
+    *,
+    sort_key: ListSearchSortKey,
+    sort_order: VideoSearchSortOrder,
+    types: list[ListType] | None,
+    page_size: int,
+    page: int,
+) -> Endpoint[ListSearchData | None]:
+    """Build the request of :meth:`VideoSearchClient.search_lists`."""
+    query = {
+        "keyword": keyword,
+        "sortKey": sort_key,
+        "sortOrder": sort_order,
+        "pageSize": str(page_size),
+        "page": str(page),
+    }
+    if types is not None and len(types) == 1:
+        query["types"] = types[0]
+    return nvapi("GET", f"https://nvapi.nicovideo.jp/v1/search/list?{_join_query(query)}", ListSearchData)
+
+
+def search_videos_by_snapshot(
+    keyword: str,
+    targets: list[SnapshotTargetField] | None,
+    *,
+    sort_key: SnapshotSortKey,
+    sort_order: SnapshotSortOrder,
+    fields: Sequence[SnapshotResponseField] | None,
+    filters: dict[str, dict[str, str] | list[str]] | None,
+    json_filter: str | None,
+    offset: int,
+    limit: int,
+    context: str,
+) -> Endpoint[SnapshotSearchData | None]:
+    """Build the request of :meth:`VideoSearchClient.search_videos_by_snapshot`."""
+    url = snapshot_search_url(
+        keyword,
+        targets,
+        sort_key=sort_key,
+        sort_order=sort_order,
+        fields=fields,
+        filters=filters,
+        json_filter=json_filter,
+        offset=offset,
+        limit=limit,
+        context=context,
+    )
+    return parsed(url, SnapshotSearchData)
+
+
+def get_snapshot_window(
+    keyword: str,
+    targets: list[SnapshotTargetField] | None,
+    *,
+    sort_key: SnapshotSortKey,
+    sort_order: SnapshotSortOrder,
+    fields: Sequence[SnapshotResponseField] | None,
+    filters: dict[str, dict[str, str] | list[str]] | None,
+    json_filter: str | None,
+    start: datetime,
+    end: datetime,
+    offset: int,
+    limit: int,
+    context: str,
+) -> Endpoint[dict[str, Any]]:
+    """Build the request of a page of the videos posted within a window of a snapshot search sweep.
+
+    The result is the decoded body, and parsing it raises :class:`NicoAPIError` if the request failed.
+    """
+    window_filter, window_json_filter = window_filters(filters, json_filter, start, end)
+    url = snapshot_search_url(
+        keyword,
+        targets,
+        sort_key=sort_key,
+        sort_order=sort_order,
+        fields=fields,
+        filters=window_filter,
+        json_filter=window_json_filter,
+        offset=offset,
+        limit=limit,
+        context=context,
+    )
+
+    def parse(res: requests.Response | httpx.Response) -> dict[str, Any]:
+        if res.status_code != requests.codes.ok:
+            message = f"Failed to search videos with the snapshot search API: {res.status_code}"
+            raise NicoAPIError(message=message)
+        return loads_json(res.content)
+
+    return Endpoint("GET", url, parse)
+
+
+def get_watch_data(video_id: str, *, lazy: bool) -> Endpoint[WatchData]:
+    """Build the request of :meth:`VideoWatchClient.get_watch_data`.
+
+    Parsing the response raises :class:`WatchAPIError` if the watch page returned an error.
+    """
+
+    def parse(res: requests.Response | httpx.Response) -> WatchData:
+        if res.status_code == requests.codes.ok:
+            if lazy:
+                return LazyWatchData.from_raw(loads_json(res.content)["data"]["response"])
+            res_cls_data = parse_response(res, WatchAPIResponse.of(WatchAPIData))
+            return res_cls_data.data.response
+        res_cls_error = parse_response(res, WatchAPIResponse.of(WatchAPIErrorData))
+        raise WatchAPIError(response=res_cls_error.data.response)
+
+    return Endpoint("GET", f"https://www.nicovideo.jp/watch/{video_id}?responseType=json", parse)
+
+
+def _get_access_right(
+    watch_data: WatchData,
+    kind: Literal["hls", "storyboard"],
+    outputs: list[list[str]] | None = None,
+) -> Endpoint[str | None]:
+    """Build the request granting an access right to the HLS content or the storyboards of a video."""
+    video_id = watch_data.client.watch_id
+    action_track_id = watch_data.client.watch_track_id
+    url = f"https://nvapi.nicovideo.jp/v1/watch/{video_id}/access-rights/{kind}?actionTrackId={action_track_id}"
+    return nvapi(
+        "POST",
+        url,
+        AccessRightsData,
+        json={"outputs": outputs} if outputs is not None else None,
+        headers={"X-Access-Right-Key": watch_data.media.domand.access_right_key},
+        ok=(requests.codes.created,),
+    ).map(lambda data: data.content_url if data is not None else None)
+
+
+def get_hls_content_url(watch_data: WatchData, outputs: list[list[str]]) -> Endpoint[str | None]:
+    """Build the request of :meth:`VideoWatchClient.get_hls_content_url`."""
+    return _get_access_right(watch_data, "hls", outputs)
+
+
+def get_storyboard_url(watch_data: WatchData) -> Endpoint[str | None]:
+    """Build the request of :meth:`VideoWatchClient.get_storyboard_url`, for a video whose storyboards are available."""
+    return _get_access_right(watch_data, "storyboard")
+
+
+def get_thread_key(video_id: str) -> Endpoint[str | None]:
+    """Build the request of :meth:`VideoWatchClient.get_thread_key`."""
+    url = f"https://nvapi.nicovideo.jp/v1/comment/keys/thread?videoId={video_id}"
+    return nvapi("GET", url, ThreadKeyData).map(lambda data: data.thread_key if data is not None else None)
+
+
+def _post_threads(
+    watch_data: WatchData,
+    parse: Callable[[requests.Response | httpx.Response], T],
+    *,
+    when: int | None,
+    thread_key: str | None,
+    targets: list[NvCommentDataTarget] | None,
+) -> Endpoint[T]:
+    """Build a request to the threads endpoint of the comment API."""
+    params = watch_data.comment.nv_comment.params
+    if targets is not None:
+        params = params.model_copy(update={"targets": targets})
+    payload = {
+        "threadKey": watch_data.comment.nv_comment.thread_key,
+        "params": params.model_dump(by_alias=True),
+        "additionals": {},
+    }
+    if when is not None:
+        payload["additionals"] = {"when": when}
+    if thread_key is not None:
+        payload["threadKey"] = thread_key
+    return Endpoint("POST", watch_data.comment.nv_comment.server + "/v1/threads", parse, data=json.dumps(payload))
+
+
+def _parse_comments(res: requests.Response | httpx.Response) -> NvCommentAPIData | None:
+    """Parse the comments of a response of the comment API, raising CommentAPIError if it failed."""
+    res_cls = parse_response(res, NvCommentAPIResponse)
+    if res_cls.meta.status == requests.codes.ok:
+        return res_cls.data
+    raise CommentAPIError(message=res_cls.meta.error_code)
+
+
+def _parse_comment_batch(res: requests.Response | httpx.Response) -> CommentBatch | None:
+    """Parse the comments of a response of the comment API into a batch, raising CommentAPIError if it failed."""
+    body = loads_json(res.content)
+    meta = NvCommentAPIMeta.model_validate(body["meta"])
+    if meta.status != requests.codes.ok:
+        raise CommentAPIError(message=meta.error_code)
+    if body.get("data") is None:
+        return None
+    return CommentBatch.from_threads(body["data"]["threads"])
+
+
+def get_comments(
+    watch_data: WatchData,
+    *,
+    when: int | None,
+    thread_key: str | None,
+    targets: list[NvCommentDataTarget] | None,
+) -> Endpoint[NvCommentAPIData | None]:
+    """Build the request of :meth:`VideoWatchClient.get_comments`."""
+    return _post_threads(watch_data, _parse_comments, when=when, thread_key=thread_key, targets=targets)
+
+
+def get_comment_batch(
+    watch_data: WatchData,
+    *,
+    when: int | None,
+    thread_key: str | None,
+    targets: list[NvCommentDataTarget] | None,
+) -> Endpoint[CommentBatch | None]:
+    """Build the request of :meth:`VideoWatchClient.get_comment_batch`."""
+    return _post_threads(watch_data, _parse_comment_batch, when=when, thread_key=thread_key, targets=targets)
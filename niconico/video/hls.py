@@ -0,0 +1,688 @@
+"""This module provides a native HLS downloader for the domand delivery of Niconico."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from niconico.exceptions import AccessRightExpiredError, DownloadError
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    import httpx
+
+    from niconico.base.throttle import HostLimiter, TokenBucket
+
+DEFAULT_SEGMENT_WORKERS = 8
+"""The default number of segments downloaded at once."""
+
+MAX_ACCESS_REFRESHES = 3
+"""The number of times an expired access right is renewed during a download."""
+
+ACCESS_EXPIRED_STATUS_CODES = (requests.codes.forbidden, requests.codes.gone)
+
+MANIFEST_NAME = "manifest.json"
+JOURNAL_NAME = "segments.jsonl"
+
+TRACK_EXTENSIONS = {"video": ".mp4", "audio": ".m4a"}
+
+_ATTRIBUTE_PATTERN = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+_AES_BLOCK_SIZE = 16
+
+
+@dataclass(frozen=True)
+class HLSKey:
+    """An encryption key declared by an ``EXT-X-KEY`` tag."""
+
+    method: str
+    uri: str | None
+    iv: bytes | None
+
+
+@dataclass(frozen=True)
+class HLSSegment:
+    """A media segment, or the initialization section of a media playlist."""
+
+    uri: str
+    sequence: int
+    key: HLSKey | None
+
+    @property
+    def iv(self) -> bytes:
+        """The IV to decrypt the segment with, derived from the sequence number if not declared."""
+        if self.key is not None and self.key.iv is not None:
+            return self.key.iv
+        return self.sequence.to_bytes(_AES_BLOCK_SIZE, "big")
+
+
+@dataclass(frozen=True)
+class MediaPlaylist:
+    """A media playlist, listing the segments of a track."""
+
+    init: HLSSegment | None
+    segments: list[HLSSegment]
+
+
+@dataclass(frozen=True)
+class HLSTrack:
+    """A track to download, pointing to its media playlist."""
+
+    kind: Literal["video", "audio"]
+    uri: str
+
+
+@dataclass(frozen=True)
+class TrackFile:
+    """A downloaded track, stored as a fragmented MP4 file."""
+
+    kind: Literal["video", "audio"]
+    path: Path
+
+
+def parse_attributes(value: str) -> dict[str, str]:
+    """Parse the attribute list of a playlist tag.
+
+    Args:
+        value (str): The text following the colon of the tag.
+
+    Returns:
+        dict[str, str]: The attributes, with the quotes of quoted strings removed.
+    """
+    return {key: raw.strip('"') for key, raw in _ATTRIBUTE_PATTERN.findall(value)}
+
+
+def _parse_key(value: str, base_url: str) -> HLSKey | None:
+    """Parse an ``EXT-X-KEY`` tag, returning None for unencrypted segments."""
+    attributes = parse_attributes(value)
+    method = attributes.get("METHOD", "NONE")
+    if method == "NONE":
+        return None
+    if method != "AES-128":
+        raise DownloadError(message=f"Unsupported HLS encryption method: {method}")
+    iv = attributes.get("IV")
+    return HLSKey(
+        method=method,
+        uri=urljoin(base_url, attributes["URI"]) if "URI" in attributes else None,
+        iv=bytes.fromhex(iv[2:] if iv.lower().startswith("0x") else iv) if iv is not None else None,
+    )
+
+
+def parse_master_playlist(text: str, base_url: str) -> list[HLSTrack]:
+    """Parse a master playlist into the tracks of its best variant.
+
+    The variant with the highest bandwidth is picked, along with the audio rendition it
+    refers to. A media playlist is returned as a single track.
+
+    Args:
+        text (str): The playlist.
+        base_url (str): The URL the playlist was fetched from, to resolve relative URIs.
+
+    Returns:
+        list[HLSTrack]: The tracks to download, the video track first.
+    """
+    audio_groups: dict[str, str] = {}
+    variants: list[tuple[int, dict[str, str], str]] = []
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for index, line in enumerate(lines):
+        if line.startswith("#EXT-X-MEDIA:"):
+            attributes = parse_attributes(line.partition(":")[2])
+            if attributes.get("TYPE") == "AUDIO" and "URI" in attributes:
+                audio_groups.setdefault(attributes.get("GROUP-ID", ""), urljoin(base_url, attributes["URI"]))
+        elif line.startswith("#EXT-X-STREAM-INF:"):
+            attributes = parse_attributes(line.partition(":")[2])
+            uri = next((candidate for candidate in lines[index + 1 :] if not candidate.startswith("#")), None)
+            if uri is not None:
+                variants.append((int(attributes.get("BANDWIDTH", "0")), attributes, urljoin(base_url, uri)))
+    if not variants:
+        return [HLSTrack(kind="video", uri=base_url)]
+    _, attributes, uri = max(variants, key=lambda variant: variant[0])
+    codecs = [codec.strip() for codec in attributes.get("CODECS", "").split(",") if codec.strip()]
+    audio_only = "AUDIO" not in attributes and bool(codecs) and all(codec.startswith("mp4a") for codec in codecs)
+    tracks = [HLSTrack(kind="audio" if audio_only else "video", uri=uri)]
+    audio_uri = audio_groups.get(attributes.get("AUDIO", ""))
+    if audio_uri is not None and not audio_only:
+        tracks.append(HLSTrack(kind="audio", uri=audio_uri))
+    return tracks
+
+
+def parse_media_playlist(text: str, base_url: str) -> MediaPlaylist:
+    """Parse a media playlist.
+
+    Args:
+        text (str): The playlist.
+        base_url (str): The URL the playlist was fetched from, to resolve relative URIs.
+
+    Returns:
+        MediaPlaylist: The initialization section and the segments of the playlist.
+    """
+    key: HLSKey | None = None
+    init: HLSSegment | None = None
+    segments: list[HLSSegment] = []
+    sequence = 0
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        if line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            sequence = int(line.partition(":")[2])
+        elif line.startswith("#EXT-X-KEY:"):
+            key = _parse_key(line.partition(":")[2], base_url)
+        elif line.startswith("#EXT-X-MAP:"):
+            attributes = parse_attributes(line.partition(":")[2])
+            init = HLSSegment(uri=urljoin(base_url, attributes["URI"]), sequence=0, key=key)
+        elif not line.startswith("#"):
+            segments.append(HLSSegment(uri=urljoin(base_url, line), sequence=sequence, key=key))
+            sequence += 1
+    return MediaPlaylist(init=init, segments=segments)
+
+
+def decrypt_segment(data: bytes, key: bytes, iv: bytes) -> bytes:
+    """Decrypt a segment encrypted with AES-128 in CBC mode and PKCS#7 padding.
+
+    Requires the optional ``hls`` extra::
+
+        pip install "niconico.py[hls]"
+
+    Args:
+        data (bytes): The encrypted segment.
+        key (bytes): The 16-byte key.
+        iv (bytes): The 16-byte IV.
+
+    Returns:
+        bytes: The decrypted segment.
+    """
+    try:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes  # noqa: PLC0415
+    except ImportError as e:  # pragma: no cover - depends on the optional extra
+        msg = 'Decrypting HLS segments requires cryptography. Install it with `pip install "niconico.py[hls]"`.'
+        raise DownloadError(message=msg) from e
+    if not data or len(data) % _AES_BLOCK_SIZE != 0:
+        raise DownloadError(message="The encrypted segment is truncated.")
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    padded = decryptor.update(data) + decryptor.finalize()
+    padding = padded[-1]
+    if not 1 <= padding <= _AES_BLOCK_SIZE:
+        raise DownloadError(message="The segment could not be decrypted.")
+    return padded[:-padding]
+
+
+class Muxer(ABC):
+    """Combine the downloaded tracks into the output file."""
+
+    @abstractmethod
+    def mux(self, tracks: list[TrackFile], output_path: Path) -> Path:
+        """Combine the tracks into the output file.
+
+        Args:
+            tracks (list[TrackFile]): The downloaded tracks, the video track first.
+            output_path (Path): The path of the output file.
+
+        Returns:
+            Path: The path of the output file.
+        """
+
+
+class FFmpegMuxer(Muxer):
+    """Combine the tracks with a local ``ffmpeg``, copying the streams without re-encoding."""
+
+    def __init__(self, executable: str = "ffmpeg") -> None:
+        """Initialize the muxer.
+
+        Args:
+            executable (str): The ffmpeg executable to run.
+        """
+        self.executable = executable
+
+    def mux(self, tracks: list[TrackFile], output_path: Path) -> Path:
+        """Combine the tracks into the output file."""
+        command = [self.executable, "-loglevel", "error"]
+        for track in tracks:
+            command.extend(["-i", str(track.path)])
+        for index in range(len(tracks)):
+            command.extend(["-map", str(index)])
+        muxing_path = output_path.with_name(f".{output_path.stem}.muxing{output_path.suffix}")
+        command.extend(["-c", "copy", "-y", str(muxing_path)])
+        try:
+            result = subprocess.run(command, capture_output=True, check=False)  # noqa: S603
+        except OSError as e:
+            raise DownloadError(message="Failed to run ffmpeg.") from e
+        if result.returncode != 0:
+            detail = result.stderr.decode(errors="replace").strip()
+            raise DownloadError(message=f"Failed to mux the video: {detail}")
+        muxing_path.replace(output_path)
+        return output_path
+
+
+class TrackFilesMuxer(Muxer):
+    """Keep every track as its own fragmented MP4 file, without any external tool.
+
+    The first track is written to the output path. Further tracks are written next to
+    it, named after their kind, for example ``video.audio.m4a`` for ``video.mp4``.
+    """
+
+    def mux(self, tracks: list[TrackFile], output_path: Path) -> Path:
+        """Move the tracks to their output paths."""
+        for index, track in enumerate(tracks):
+            if index == 0:
+                path = output_path
+            else:
+                path = output_path.with_name(f"{output_path.stem}.{track.kind}{TRACK_EXTENSIONS[track.kind]}")
+            shutil.move(track.path, path)
+        return output_path
+
+
+def default_muxer() -> Muxer:
+    """Get the muxer used when none is given, which combines the tracks with ffmpeg.
+
+    Returns:
+        Muxer: The ffmpeg muxer.
+
+    Raises:
+        DownloadError: If ffmpeg is not installed.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise DownloadError(
+            message="ffmpeg was not found on PATH. Install it, or pass muxer=TrackFilesMuxer() "
+            "to save the video and audio tracks as separate files.",
+        )
+    return FFmpegMuxer()
+
+
+@dataclass(frozen=True)
+class _SegmentJob:
+    """A segment to download into the work directory."""
+
+    segment: HLSSegment
+    path: Path
+
+
+@dataclass(frozen=True)
+class _TrackPlan:
+    """A track and the segments to download for it."""
+
+    track: HLSTrack
+    track_dir: Path
+    jobs: list[_SegmentJob]
+
+
+class Checkpoint:
+    """The record of the segments downloaded into a work directory, to resume from.
+
+    The work directory holds a manifest describing the tracks, and a journal with the
+    size and SHA-256 digest of every segment written. A segment is only skipped on resume
+    if its file still matches the journal, and the whole directory is discarded if the
+    tracks no longer match the manifest.
+    """
+
+    def __init__(self, work_dir: Path, layout: list[dict[str, object]]) -> None:
+        """Open the checkpoint of a work directory, creating it if needed.
+
+        Args:
+            work_dir (Path): The work directory.
+            layout (list[dict[str, object]]): The description of the tracks to download.
+        """
+        self.work_dir = work_dir
+        self._lock = threading.Lock()
+        manifest_path = work_dir / MANIFEST_NAME
+        manifest = {"version": 1, "tracks": layout}
+        if manifest_path.exists() and self._read_manifest(manifest_path) != manifest:
+            shutil.rmtree(work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps(manifest))
+        self._journal_path = work_dir / JOURNAL_NAME
+        self._records = self._read_journal()
+
+    @staticmethod
+    def _read_manifest(path: Path) -> object:
+        """Read a manifest, returning None if it is damaged."""
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _read_journal(self) -> dict[str, dict[str, object]]:
+        """Read the journal, ignoring a line cut short by a crash."""
+        records: dict[str, dict[str, object]] = {}
+        if not self._journal_path.exists():
+            return records
+        for line in self._journal_path.read_text().splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["file"]] = record
+        return records
+
+    def _name(self, path: Path) -> str:
+        """Get the name of a segment file in the journal."""
+        return path.relative_to(self.work_dir).as_posix()
+
+    def is_complete(self, path: Path) -> bool:
+        """Whether a segment file was fully written and has not been altered since.
+
+        Args:
+            path (Path): The path of the segment file.
+
+        Returns:
+            bool: True if the segment does not need to be downloaded again.
+        """
+        record = self._records.get(self._name(path))
+        if record is None or not path.exists() or path.stat().st_size != record["size"]:
+            return False
+        return hashlib.sha256(path.read_bytes()).hexdigest() == record["sha256"]
+
+    def write(self, path: Path, data: bytes) -> None:
+        """Write a segment file and record it in the journal.
+
+        Args:
+            path (Path): The path of the segment file.
+            data (bytes): The decrypted segment.
+        """
+        path.write_bytes(data)
+        record = {"file": self._name(path), "size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+        with self._lock, self._journal_path.open("a") as journal:
+            journal.write(json.dumps(record) + "\n")
+        self._records[record["file"]] = record
+
+
+class _BaseHLSDownloader:
+    """The planning and assembly shared by the HLS downloaders."""
+
+    def __init__(self, *, max_workers: int) -> None:
+        """Initialize the downloader."""
+        self.max_workers = max_workers
+        self._keys: dict[str, bytes] = {}
+
+    @staticmethod
+    def work_dir_for(output_path: Path) -> Path:
+        """Get the work directory a download keeps its progress in until it completes."""
+        return output_path.with_name(f".{output_path.name}.part")
+
+    @staticmethod
+    def _plan(tracks: list[tuple[HLSTrack, MediaPlaylist]], work_dir: Path) -> tuple[list[_TrackPlan], Checkpoint]:
+        """List the files to download for every track, and open the checkpoint of the work directory."""
+        plans: list[_TrackPlan] = []
+        layout: list[dict[str, object]] = []
+        for index, (track, playlist) in enumerate(tracks):
+            track_dir = work_dir / f"{index}-{track.kind}"
+            segments = ([playlist.init] if playlist.init is not None else []) + playlist.segments
+            jobs = [
+                _SegmentJob(segment=segment, path=track_dir / f"{number:06d}.seg")
+                for number, segment in enumerate(segments)
+            ]
+            plans.append(_TrackPlan(track=track, track_dir=track_dir, jobs=jobs))
+            layout.append({"kind": track.kind, "playlist": urlparse(track.uri).path, "segments": len(jobs)})
+        checkpoint = Checkpoint(work_dir, layout)
+        for plan in plans:
+            plan.track_dir.mkdir(exist_ok=True)
+        return plans, checkpoint
+
+    @staticmethod
+    def _pending(plans: list[_TrackPlan], checkpoint: Checkpoint) -> list[_SegmentJob]:
+        """List the segments that still have to be downloaded."""
+        return [job for plan in plans for job in plan.jobs if not checkpoint.is_complete(job.path)]
+
+    def _decode(self, job: _SegmentJob, data: bytes) -> bytes:
+        """Decrypt the data of a segment if it is encrypted."""
+        key = job.segment.key
+        if key is None or key.uri is None:
+            return data
+        return decrypt_segment(data, self._keys[key.uri], job.segment.iv)
+
+    @staticmethod
+    def _key_uris(jobs: list[_SegmentJob]) -> set[str]:
+        """Collect the URIs of the keys the segments are encrypted with."""
+        return {job.segment.key.uri for job in jobs if job.segment.key is not None and job.segment.key.uri is not None}
+
+    @staticmethod
+    def _check_response(url: str, status_code: int) -> None:
+        """Raise if a fetch failed, telling an expired access right apart."""
+        if status_code in ACCESS_EXPIRED_STATUS_CODES:
+            raise AccessRightExpiredError(message=f"The access right has expired: HTTP {status_code}")
+        if status_code != requests.codes.ok:
+            raise DownloadError(message=f"Failed to fetch {url}: HTTP {status_code}")
+
+    @staticmethod
+    def _assemble(plan: _TrackPlan) -> TrackFile:
+        """Concatenate the downloaded segments of a track into a single file."""
+        path = plan.track_dir.with_suffix(TRACK_EXTENSIONS[plan.track.kind])
+        with path.open("wb") as output:
+            for job in plan.jobs:
+                with job.path.open("rb") as segment:
+                    shutil.copyfileobj(segment, output)
+        return TrackFile(kind=plan.track.kind, path=path)
+
+
+class HLSDownloader(_BaseHLSDownloader):
+    """Download an HLS stream by fetching its segments concurrently over a thread pool.
+
+    Progress is kept in a work directory next to the output file, so a download that was
+    interrupted resumes from the segments already written when it is started again.
+    """
+
+    def __init__(self, session: requests.Session, *, max_workers: int = DEFAULT_SEGMENT_WORKERS) -> None:
+        """Initialize the downloader.
+
+        Args:
+            session (requests.Session): The session holding the cookies of the access right.
+            max_workers (int): The number of segments downloaded at once.
+        """
+        super().__init__(max_workers=max_workers)
+        self.session = session
+
+    def _fetch(self, url: str) -> bytes:
+        """Fetch a playlist, a key or a segment."""
+        try:
+            res = self.session.get(url, headers={"User-Agent": "niconico.py"})
+        except requests.RequestException as e:
+            raise DownloadError(message=f"Failed to fetch {url}: {e}") from e
+        self._check_response(url, res.status_code)
+        return res.content
+
+    def _download_segment(self, job: _SegmentJob, checkpoint: Checkpoint) -> None:
+        """Download, decrypt and store a segment."""
+        checkpoint.write(job.path, self._decode(job, self._fetch(job.segment.uri)))
+
+    def _download_tracks(self, master_url: str, work_dir: Path) -> list[TrackFile]:
+        """Download the segments still missing from the work directory, then assemble the tracks."""
+        tracks = [
+            (track, parse_media_playlist(self._fetch(track.uri).decode(), track.uri))
+            for track in parse_master_playlist(self._fetch(master_url).decode(), master_url)
+        ]
+        plans, checkpoint = self._plan(tracks, work_dir)
+        jobs = self._pending(plans, checkpoint)
+        for uri in self._key_uris(jobs):
+            self._keys[uri] = self._fetch(uri)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._download_segment, job, checkpoint) for job in jobs]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+        return [self._assemble(plan) for plan in plans]
+
+    def download(
+        self,
+        master_url: str,
+        output_path: str | Path,
+        muxer: Muxer | None = None,
+        *,
+        refresh: Callable[[], str] | None = None,
+    ) -> Path:
+        """Download a stream and mux it into the output file.
+
+        Args:
+            master_url (str): The URL of the master playlist.
+            output_path (str | Path): The path of the output file.
+            muxer (Muxer | None): The muxer combining the tracks. ``default_muxer()`` is used when None.
+            refresh (Callable[[], str] | None): A function that grants a new access right and
+                returns the new master playlist URL, called when the current one expires.
+
+        Returns:
+            Path: The path of the output file.
+
+        Raises:
+            DownloadError: If no muxer is given and ffmpeg is not installed.
+        """
+        muxer = muxer if muxer is not None else default_muxer()
+        output_path = Path(output_path)
+        work_dir = self.work_dir_for(output_path)
+        for attempt in range(MAX_ACCESS_REFRESHES + 1):
+            try:
+                track_files = self._download_tracks(master_url, work_dir)
+                break
+            except AccessRightExpiredError:
+                if refresh is None or attempt == MAX_ACCESS_REFRESHES:
+                    raise
+                master_url = refresh()
+        else:  # pragma: no cover - the loop either breaks or raises
+            raise DownloadError(message="Failed to download the video.")
+        result = muxer.mux(track_files, output_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return result
+
+
+class AsyncHLSDownloader(_BaseHLSDownloader):
+    """Download an HLS stream by fetching its segments concurrently on the event loop.
+
+    Progress is kept in a work directory next to the output file, like :class:`HLSDownloader`.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        max_workers: int = DEFAULT_SEGMENT_WORKERS,
+        host_limiter: HostLimiter | None = None,
+        bandwidth: TokenBucket | None = None,
+        on_segment: Callable[[int, int, int], None] | None = None,
+    ) -> None:
+        """Initialize the downloader.
+
+        Args:
+            client (httpx.AsyncClient): The client holding the cookies of the access right.
+            max_workers (int): The number of segments downloaded at once.
+            host_limiter (HostLimiter | None): The limiter bounding the requests sent to each host,
+                shared with other downloaders.
+            bandwidth (TokenBucket | None): The bucket the received bytes are taken from,
+                shared with other downloaders to bound their total bandwidth.
+            on_segment (Callable[[int, int, int], None] | None): A function called with the number
+                of segments saved, the total number of segments and the size of the last segment,
+                once when the download starts and after every segment.
+        """
+        super().__init__(max_workers=max_workers)
+        self.client = client
+        self.host_limiter = host_limiter
+        self.bandwidth = bandwidth
+        self.on_segment = on_segment
+        self._completed = 0
+        self._total = 0
+
+    async def _fetch(self, url: str) -> bytes:
+        """Fetch a playlist, a key or a segment."""
+        import httpx  # noqa: PLC0415
+
+        try:
+            if self.host_limiter is None:
+                res = await self.client.get(url, headers={"User-Agent": "niconico.py"})
+            else:
+                async with self.host_limiter.slot(url):
+                    res = await self.client.get(url, headers={"User-Agent": "niconico.py"})
+        except httpx.HTTPError as e:
+            raise DownloadError(message=f"Failed to fetch {url}: {e}") from e
+        self._check_response(url, res.status_code)
+        if self.bandwidth is not None:
+            await self.bandwidth.aconsume(len(res.content))
+        return res.content
+
+    def _report(self, size: int) -> None:
+        """Tell the progress callback about a saved segment."""
+        if self.on_segment is not None:
+            self.on_segment(self._completed, self._total, size)
+
+    async def _download_segment(self, job: _SegmentJob, checkpoint: Checkpoint, semaphore: asyncio.Semaphore) -> None:
+        """Download, decrypt and store a segment."""
+        async with semaphore:
+            data = await self._fetch(job.segment.uri)
+        await asyncio.to_thread(checkpoint.write, job.path, self._decode(job, data))
+        self._completed += 1
+        self._report(len(data))
+
+    async def _download_tracks(self, master_url: str, work_dir: Path) -> list[TrackFile]:
+        """Download the segments still missing from the work directory, then assemble the tracks."""
+        tracks = [
+            (track, parse_media_playlist((await self._fetch(track.uri)).decode(), track.uri))
+            for track in parse_master_playlist((await self._fetch(master_url)).decode(), master_url)
+        ]
+        plans, checkpoint = await asyncio.to_thread(self._plan, tracks, work_dir)
+        jobs = await asyncio.to_thread(self._pending, plans, checkpoint)
+        self._total = sum(len(plan.jobs) for plan in plans)
+        self._completed = self._total - len(jobs)
+        self._report(0)
+        for uri in self._key_uris(jobs):
+            self._keys[uri] = await self._fetch(uri)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        tasks = [asyncio.ensure_future(self._download_segment(job, checkpoint, semaphore)) for job in jobs]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return [await asyncio.to_thread(self._assemble, plan) for plan in plans]
+
+    async def download(
+        self,
+        master_url: str,
+        output_path: str | Path,
+        muxer: Muxer | None = None,
+        *,
+        refresh: Callable[[], Awaitable[str]] | None = None,
+    ) -> Path:
+        """Download a stream and mux it into the output file.
+
+        Args:
+            master_url (str): The URL of the master playlist.
+            output_path (str | Path): The path of the output file.
+            muxer (Muxer | None): The muxer combining the tracks. ``default_muxer()`` is used when None.
+            refresh (Callable[[], Awaitable[str]] | None): A coroutine function that grants a new
+                access right and returns the new master playlist URL, called when the current one expires.
+
+        Returns:
+            Path: The path of the output file.
+
+        Raises:
+            DownloadError: If no muxer is given and ffmpeg is not installed.
+        """
+        muxer = muxer if muxer is not None else default_muxer()
+        output_path = Path(output_path)
+        work_dir = self.work_dir_for(output_path)
+        for attempt in range(MAX_ACCESS_REFRESHES + 1):
+            try:
+                track_files = await self._download_tracks(master_url, work_dir)
+                break
+            except AccessRightExpiredError:
+                if refresh is None or attempt == MAX_ACCESS_REFRESHES:
+                    raise
+                master_url = await refresh()
+        else:  # pragma: no cover - the loop either breaks or raises
+            raise DownloadError(message="Failed to download the video.")
+        result = await asyncio.to_thread(muxer.mux, track_files, output_path)
+        await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+        return result
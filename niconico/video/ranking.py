@@ -2,23 +2,27 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Literal
-
-import requests
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Literal
 
 from niconico.base.client import BaseClient
-from niconico.objects.nvapi import (
-    GenresData,
-    NvAPIResponse,
-    PopularTagsData,
-    RankingData,
-    TeibanRankingData,
-    TeibanRankingFeaturedKeysData,
+from niconico.base.pagination import iter_paged_items
+from niconico.video import endpoints
+from niconico.video.ranking_crawl import (
+    DEFAULT_CRAWL_MAX_PAGES,
+    DEFAULT_CRAWL_WORKERS,
+    RANKING_TERMS,
+    RankingCrawl,
+    RankingPage,
+    RankingRecord,
 )
-from niconico.utils import add_optional_param
 
 if TYPE_CHECKING:
-    from niconico.objects.video.ranking import Genre, TeibanRankingFeaturedKey
+    from collections.abc import Iterable, Iterator
+
+    from niconico.objects.nvapi import RankingData, TeibanRankingData
+    from niconico.objects.video import EssentialVideo
+    from niconico.objects.video.ranking import Genre, RankingTerm, TeibanRankingFeaturedKey
 
 
 class VideoRankingClient(BaseClient):
@@ -30,12 +34,7 @@ class VideoRankingClient(BaseClient):
         Returns:
             list[Genre]: A list of available genres.
         """
-        res = self.niconico.get("https://nvapi.nicovideo.jp/v2/genres")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[GenresData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.genres
-        return []
+        return self._send(endpoints.get_genres())
 
     def get_popular_tags(self, genre_key: str) -> list[str]:
         """Get popular tags of a genre.
@@ -46,12 +45,7 @@ class VideoRankingClient(BaseClient):
         Returns:
             list[str]: A list of popular tags of the genre.
         """
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/genres/{genre_key}/popular-tags")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[PopularTagsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.tags
-        return []
+        return self._send(endpoints.get_popular_tags(genre_key))
 
     def get_ranking(
         self,
@@ -76,22 +70,123 @@ class VideoRankingClient(BaseClient):
         Returns:
             RankingData | None: The ranking data.
         """
-        query = {
-            "term": term,
-            "pageSize": str(page_size),
-            "page": str(page),
-        }
-        if tag is not None:
-            query["tag"] = tag
-        if sensitive_contents is not None:
-            query["sensitiveContents"] = sensitive_contents
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/ranking/genre/{genre_key}?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[RankingData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.get_ranking(
+                genre_key,
+                term,
+                page_size=page_size,
+                page=page,
+                tag=tag,
+                sensitive_contents=sensitive_contents,
+            ),
+        )
+
+    def iter_ranking(
+        self,
+        genre_key: str,
+        term: Literal["hour", "24h", "week", "month", "total"],
+        *,
+        page_size: Literal[25, 100] = 100,
+        tag: str | None = None,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        prefetch: int = 0,
+    ) -> Iterator[EssentialVideo]:
+        """Iterate over a whole ranking, requesting the pages as needed.
+
+        Args:
+            genre_key (str): The key of the genre.
+            term (Literal["hour", "24h", "week", "month", "total"]): The term of the ranking.
+            page_size (Literal[25, 100]): The size of the page. Defaults to 100.
+            tag (str, optional): The tag. Defaults to None.
+            sensitive_contents (Literal["mask", "filter"], optional): The sensitive contents. Defaults to None.
+            prefetch (int): The number of pages to request ahead in the background. Defaults to 0.
+
+        Returns:
+            Iterator[EssentialVideo]: An iterator over the ranked videos, from the top.
+        """
+        return iter_paged_items(
+            lambda page: self.get_ranking(
+                genre_key,
+                term,
+                page_size=page_size,
+                page=page,
+                tag=tag,
+                sensitive_contents=sensitive_contents,
+            ),
+            lambda data: data.items,
+            lambda data, _: data.has_next,
+            prefetch=prefetch,
+        )
+
+    def crawl_rankings(
+        self,
+        terms: Iterable[RankingTerm] = RANKING_TERMS,
+        *,
+        genre_keys: Iterable[str] | None = None,
+        include_tags: bool = True,
+        page_size: Literal[25, 100] = 100,
+        max_pages: int = DEFAULT_CRAWL_MAX_PAGES,
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+    ) -> Iterator[RankingRecord]:
+        """Sweep every genre ranking, sending the requests concurrently.
+
+        The popular tags of every genre are requested, then every page of the ranking
+        of each (genre, tag, term) combination. Requests are sent as soon as they are
+        known, on ``max_workers`` threads, and go through the rate limiter of the client
+        if it has one. Records are yielded as their pages arrive, so rankings are
+        interleaved. Pages that could not be fetched, and the genres whose popular tags
+        could not be fetched, are logged and skipped.
+
+        Args:
+            terms (Iterable[RankingTerm]): The terms of the rankings. Defaults to every term.
+            genre_keys (Iterable[str] | None): The keys of the genres. Defaults to every genre.
+            include_tags (bool): Whether to fetch the ranking of each popular tag of the genres too.
+            page_size (Literal[25, 100]): The size of the page. Defaults to 100.
+            max_pages (int): The number of pages fetched at most per ranking.
+            max_workers (int): The number of requests sent at the same time.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+
+        Yields:
+            RankingRecord: The videos ranked, each video being attached to its first record only.
+        """
+        crawl = RankingCrawl(terms, page_size=page_size, max_pages=max_pages)
+        keys = list(genre_keys) if genre_keys is not None else [genre.key for genre in self.get_genres()]
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        tag_jobs: dict[Future[list[str]], str] = {}
+        page_jobs: dict[Future[RankingData | None], RankingPage] = {}
+
+        def get_tags(key: str) -> list[str]:
+            return self.get_popular_tags(key) if include_tags else []
+
+        def fetch(page: RankingPage) -> None:
+            future = executor.submit(
+                self.get_ranking,
+                page.genre_key,
+                page.term,
+                page_size=page_size,
+                page=page.page,
+                tag=page.tag,
+                sensitive_contents=sensitive_contents,
+            )
+            page_jobs[future] = page
+
+        try:
+            for key in keys:
+                tag_jobs[executor.submit(get_tags, key)] = key
+            while tag_jobs or page_jobs:
+                pending: list[Future[Any]] = [*tag_jobs, *page_jobs]
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for tag_future in [future for future in tag_jobs if future in done]:
+                    for page in crawl.take_genre(tag_jobs.pop(tag_future), tag_future.result):
+                        fetch(page)
+                for page_future in [future for future in page_jobs if future in done]:
+                    records, next_page = crawl.take_page(page_jobs.pop(page_future), page_future.result)
+                    if next_page is not None:
+                        fetch(next_page)
+                    yield from records
+        finally:
+            executor.shutdown(cancel_futures=True)
 
     def get_hot_topics(
         self,
@@ -112,24 +207,9 @@ class VideoRankingClient(BaseClient):
         Returns:
             list[str]: A list of hot topics.
         """
-        query = {
-            "term": term,
-            "page": str(page),
-            "responseType": "json",
-        }
-        if sensitive_contents is not None:
-            query["sensitiveContents"] = sensitive_contents
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://www.nicovideo.jp/ranking/hot_topic?{query_str}")
-        if res.status_code == requests.codes.ok:
-            ranking = res.json()["data"]["response"]["$getTeibanRanking"]["data"]
-            return RankingData.model_validate(
-                {
-                    "items": ranking["items"][:page_size],
-                    "hasNext": ranking["hasNext"],
-                },
-            )
-        return None
+        return self._send(
+            endpoints.get_hot_topics(term, page_size=page_size, page=page, sensitive_contents=sensitive_contents),
+        )
 
     def get_teiban_ranking_featured_keys(self) -> list[TeibanRankingFeaturedKey]:
         """Get the featured keys of the teiban rankings.
@@ -139,12 +219,7 @@ class VideoRankingClient(BaseClient):
         Returns:
             list[TeibanRankingFeaturedKey]: A list of available featured keys.
         """
-        res = self.niconico.get("https://nvapi.nicovideo.jp/v1/ranking/teiban/featured-keys")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[TeibanRankingFeaturedKeysData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.items
-        return []
+        return self._send(endpoints.get_teiban_ranking_featured_keys())
 
     def get_teiban_ranking(
         self,
@@ -168,16 +243,46 @@ class VideoRankingClient(BaseClient):
         Returns:
             TeibanRankingData | None: The ranking data.
         """
-        query = {
-            "term": term,
-            "pageSize": str(page_size),
-            "page": str(page),
-        }
-        add_optional_param(query, "sensitiveContents", sensitive_contents)
-        query_str = "&".join([f"{key}={value}" for key, value in query.items()])
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/ranking/teiban/{featured_key}?{query_str}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[TeibanRankingData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data
-        return None
+        return self._send(
+            endpoints.get_teiban_ranking(
+                featured_key,
+                term,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+            ),
+        )
+
+    def iter_teiban_ranking(
+        self,
+        featured_key: str,
+        term: Literal["hour", "24h", "week", "month", "total"],
+        *,
+        page_size: Literal[25, 100] = 100,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        prefetch: int = 0,
+    ) -> Iterator[EssentialVideo]:
+        """Iterate over a whole teiban ranking, requesting the pages as needed.
+
+        Args:
+            featured_key (str): The featured key of the ranking.
+            term (Literal["hour", "24h", "week", "month", "total"]): The term of the ranking.
+            page_size (Literal[25, 100]): The size of the page. Defaults to 100.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+            prefetch (int): The number of pages to request ahead in the background. Defaults to 0.
+
+        Returns:
+            Iterator[EssentialVideo]: An iterator over the ranked videos, from the top.
+        """
+        return iter_paged_items(
+            lambda page: self.get_teiban_ranking(
+                featured_key,
+                term,
+                page_size=page_size,
+                page=page,
+                sensitive_contents=sensitive_contents,
+            ),
+            lambda data: data.items,
+            lambda data, _: data.has_next,
+            prefetch=prefetch,
+        )
@@ -0,0 +1,188 @@
+"""This module provides the planning of a sweep over every genre ranking."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from logging import getLogger
+from typing import TYPE_CHECKING, get_args
+
+import requests
+from pydantic import ValidationError
+
+from niconico.exceptions import NicoAPIError
+from niconico.objects.video.ranking import RankingTerm
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from niconico.objects.nvapi import RankingData
+    from niconico.objects.video import EssentialVideo
+
+logger = getLogger("niconico.py")
+
+RANKING_TERMS: tuple[RankingTerm, ...] = get_args(RankingTerm)
+"""Every term of the rankings."""
+
+DEFAULT_CRAWL_MAX_PAGES = 10
+"""The default number of pages fetched at most per ranking."""
+
+DEFAULT_CRAWL_WORKERS = 8
+"""The default number of requests sent at the same time."""
+
+CRAWL_ERRORS: tuple[type[Exception], ...] = (requests.RequestException, NicoAPIError, ValidationError)
+"""The errors of a request that are logged and skipped instead of ending a sweep."""
+
+
+@dataclass(frozen=True)
+class RankingPage:
+    """A page of a genre ranking to request.
+
+    Attributes:
+        genre_key (str): The key of the genre.
+        term (RankingTerm): The term of the ranking.
+        page (int): The page number, starting at 1.
+        tag (str | None): The popular tag of the ranking, or None for the whole genre.
+    """
+
+    genre_key: str
+    term: RankingTerm
+    page: int
+    tag: str | None = None
+
+
+@dataclass(frozen=True)
+class RankingRecord:
+    """A video ranked in a genre ranking.
+
+    Attributes:
+        genre_key (str): The key of the genre.
+        tag (str | None): The popular tag of the ranking, or None for the whole genre.
+        term (RankingTerm): The term of the ranking.
+        rank (int): The rank of the video, starting at 1.
+        video_id (str): The ID of the video.
+        video (EssentialVideo | None): The video, only in the first record of each video of the sweep.
+    """
+
+    genre_key: str
+    tag: str | None
+    term: RankingTerm
+    rank: int
+    video_id: str
+    video: EssentialVideo | None
+
+
+class RankingCrawl:
+    """The state of a sweep over the genre rankings.
+
+    Each genre yields the first page of the ranking of every term, for the whole
+    genre and for each of its popular tags. Each page that has a next one yields the
+    request of that page, so the requests of every ranking can be sent at the same
+    time. Videos are kept once: only the first record of a video carries it. Requests
+    that fail are logged, recorded in ``failed`` or ``failed_genres``, and skipped.
+    """
+
+    def __init__(
+        self,
+        terms: Iterable[RankingTerm] = RANKING_TERMS,
+        *,
+        page_size: int = 100,
+        max_pages: int = DEFAULT_CRAWL_MAX_PAGES,
+        errors: tuple[type[Exception], ...] = CRAWL_ERRORS,
+    ) -> None:
+        """Initialize the sweep.
+
+        Args:
+            terms (Iterable[RankingTerm]): The terms of the rankings to fetch.
+            page_size (int): The number of videos per page.
+            max_pages (int): The number of pages fetched at most per ranking.
+            errors (tuple[type[Exception], ...]): The errors of a request that skip it
+                instead of ending the sweep.
+        """
+        self.terms = list(terms)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.errors = errors
+        self.seen: set[str] = set()
+        self.failed: list[RankingPage] = []
+        self.failed_genres: list[str] = []
+
+    def plan_genre(self, genre_key: str, tags: Iterable[str | None] = (None,)) -> list[RankingPage]:
+        """Get the first page of every ranking of a genre.
+
+        Args:
+            genre_key (str): The key of the genre.
+            tags (Iterable[str | None]): The tags to rank by, None for the whole genre.
+
+        Returns:
+            list[RankingPage]: The requests to send.
+        """
+        return [RankingPage(genre_key, term, 1, tag) for tag in dict.fromkeys(tags) for term in self.terms]
+
+    def take_genre(self, genre_key: str, result: Callable[[], list[str]]) -> list[RankingPage]:
+        """Take in the outcome of the request of the popular tags of a genre.
+
+        Args:
+            genre_key (str): The key of the genre.
+            result (Callable[[], list[str]]): A function returning the tags, or raising the error
+                of the request, such as ``Future.result``.
+
+        Returns:
+            list[RankingPage]: The first page of every ranking of the genre, or none if the
+                request failed.
+        """
+        try:
+            tags = result()
+        except self.errors as e:
+            logger.warning("Could not fetch the popular tags of the genre %s: %s", genre_key, e)
+            self.failed_genres.append(genre_key)
+            return []
+        return self.plan_genre(genre_key, [None, *tags])
+
+    def take_page(
+        self,
+        page: RankingPage,
+        result: Callable[[], RankingData | None],
+    ) -> tuple[list[RankingRecord], RankingPage | None]:
+        """Take in the outcome of a request, which may have raised an error.
+
+        Args:
+            page (RankingPage): The request.
+            result (Callable[[], RankingData | None]): A function returning the page, or raising
+                the error of the request, such as ``Future.result``.
+
+        Returns:
+            tuple[list[RankingRecord], RankingPage | None]: The records of the page, and the
+                request of the next page, if any.
+        """
+        try:
+            data = result()
+        except self.errors as e:
+            logger.warning("Could not fetch %s: %s", page, e)
+            self.failed.append(page)
+            return [], None
+        return self.absorb(page, data)
+
+    def absorb(self, page: RankingPage, data: RankingData | None) -> tuple[list[RankingRecord], RankingPage | None]:
+        """Take in the response to a request.
+
+        Args:
+            page (RankingPage): The request.
+            data (RankingData | None): The page returned, or None if the request failed.
+
+        Returns:
+            tuple[list[RankingRecord], RankingPage | None]: The records of the page, and the
+                request of the next page, if any.
+        """
+        if data is None:
+            logger.warning("Could not fetch %s.", page)
+            self.failed.append(page)
+            return [], None
+        records: list[RankingRecord] = []
+        first_rank = (page.page - 1) * self.page_size + 1
+        for rank, video in enumerate(data.items, first_rank):
+            new = video.id_ not in self.seen
+            self.seen.add(video.id_)
+            records.append(RankingRecord(page.genre_key, page.tag, page.term, rank, video.id_, video if new else None))
+        if not data.has_next or page.page >= self.max_pages:
+            return records, None
+        return records, RankingPage(page.genre_key, page.term, page.page + 1, page.tag)
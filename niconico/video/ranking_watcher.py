@@ -0,0 +1,337 @@
+"""This module provides a poller that reports the changes of rankings between snapshots."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+from niconico.video.ranking_crawl import CRAWL_ERRORS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from niconico.objects.video import EssentialVideo
+    from niconico.objects.video.ranking import RankingTerm
+    from niconico.video.ranking import VideoRankingClient
+
+logger = getLogger("niconico.py")
+
+RankingKind = Literal["genre", "teiban", "hot_topics"]
+RankingChangeKind = Literal["entered", "left", "moved", "counters"]
+
+RANKING_PAGE_SIZE = 100
+"""The number of videos requested per page."""
+
+DEFAULT_POLL_INTERVAL = 60.0
+"""The default number of seconds between two polls."""
+
+DEFAULT_MAX_PAGES = 10
+"""The default number of pages fetched at most per ranking."""
+
+DEFAULT_WATCHER_WORKERS = 4
+"""The default number of pages fetched at the same time."""
+
+COUNTER_FIELDS = ("view", "comment", "mylist", "like")
+"""The counters of a video compared between snapshots."""
+
+
+@dataclass(frozen=True)
+class RankingTarget:
+    """A ranking to watch.
+
+    Attributes:
+        kind (RankingKind): The kind of the ranking.
+        term (RankingTerm): The term of the ranking.
+        key (str): The genre key, or the featured key of a teiban ranking. Unused for hot topics.
+        tag (str | None): The tag of a genre ranking.
+    """
+
+    kind: RankingKind
+    term: RankingTerm
+    key: str = ""
+    tag: str | None = None
+
+    @classmethod
+    def genre(cls, genre_key: str, term: RankingTerm, tag: str | None = None) -> RankingTarget:
+        """Watch a genre ranking, as returned by ``VideoRankingClient.get_ranking``."""
+        return cls("genre", term, genre_key, tag)
+
+    @classmethod
+    def teiban(cls, featured_key: str, term: RankingTerm) -> RankingTarget:
+        """Watch a teiban ranking, as returned by ``VideoRankingClient.get_teiban_ranking``."""
+        return cls("teiban", term, featured_key)
+
+    @classmethod
+    def hot_topics(cls, term: RankingTerm) -> RankingTarget:
+        """Watch the hot topics, as returned by ``VideoRankingClient.get_hot_topics``."""
+        return cls("hot_topics", term)
+
+
+class RankEntry(NamedTuple):
+    """The rank and counters of a video in a snapshot."""
+
+    rank: int
+    view: int
+    comment: int
+    mylist: int
+    like: int
+
+
+RankingSnapshot = dict[str, RankEntry]
+"""The entries of a ranking by video ID."""
+
+
+@dataclass(frozen=True)
+class RankingChange:
+    """A change of a video between two snapshots of a ranking.
+
+    Attributes:
+        target (RankingTarget): The ranking.
+        kind (RankingChangeKind): ``entered`` or ``left`` the ranking, ``moved`` to another rank,
+            or ``counters`` changed.
+        video_id (str): The ID of the video.
+        rank (int | None): The current rank, or None if the video left the ranking.
+        previous_rank (int | None): The previous rank, or None if the video entered the ranking.
+        counters (dict[str, int]): The change of each counter that changed, for ``counters`` changes.
+    """
+
+    target: RankingTarget
+    kind: RankingChangeKind
+    video_id: str
+    rank: int | None
+    previous_rank: int | None
+    counters: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def moved(self) -> int:
+        """The number of ranks the video went up, negative when it went down."""
+        if self.rank is None or self.previous_rank is None:
+            return 0
+        return self.previous_rank - self.rank
+
+
+def snapshot_of(videos: Iterable[EssentialVideo]) -> RankingSnapshot:
+    """Make the snapshot of a ranking.
+
+    Args:
+        videos (Iterable[EssentialVideo]): The videos of the ranking, from the top.
+            A video listed twice, as happens when the ranking changes between two pages,
+            keeps its first rank.
+
+    Returns:
+        RankingSnapshot: The snapshot.
+    """
+    snapshot: RankingSnapshot = {}
+    for video in videos:
+        if video.id_ not in snapshot:
+            count = video.count
+            snapshot[video.id_] = RankEntry(len(snapshot) + 1, count.view, count.comment, count.mylist, count.like)
+    return snapshot
+
+
+def diff_rankings(target: RankingTarget, previous: RankingSnapshot, current: RankingSnapshot) -> list[RankingChange]:
+    """Compare two snapshots of a ranking.
+
+    Args:
+        target (RankingTarget): The ranking.
+        previous (RankingSnapshot): The older snapshot.
+        current (RankingSnapshot): The newer snapshot.
+
+    Returns:
+        list[RankingChange]: The changes, ordered by current rank, then the videos that left.
+    """
+    changes: list[RankingChange] = []
+    for video_id, entry in current.items():
+        before = previous.get(video_id)
+        if before is None:
+            changes.append(RankingChange(target, "entered", video_id, entry.rank, None))
+            continue
+        if entry.rank != before.rank:
+            changes.append(RankingChange(target, "moved", video_id, entry.rank, before.rank))
+        counters = {
+            name: getattr(entry, name) - getattr(before, name)
+            for name in COUNTER_FIELDS
+            if getattr(entry, name) != getattr(before, name)
+        }
+        if counters:
+            changes.append(RankingChange(target, "counters", video_id, entry.rank, before.rank, counters))
+    changes.extend(
+        RankingChange(target, "left", video_id, None, before.rank)
+        for video_id, before in previous.items()
+        if video_id not in current
+    )
+    return changes
+
+
+class RankingWatcher:
+    """Poll rankings and report what changed since the previous poll.
+
+    Each poll fetches the pages of every ranking at the same time, keeping the number
+    of pages each ranking had at the previous poll, then compares the result with the
+    snapshot kept from that poll. Only the snapshots, the rank and counters of each
+    video, are kept::
+
+        watcher = RankingWatcher(
+            client.video.ranking,
+            [RankingTarget.genre("all", "hour"), RankingTarget.hot_topics("24h")],
+        )
+        for changes in watcher.watch():
+            for change in changes:
+                print(change.kind, change.video_id, change.moved, change.counters)
+
+    Every video of a ranking is reported as ``entered`` at the first poll. A ranking
+    that could not be fetched whole, because a page was missing or its request raised
+    one of ``errors``, keeps its snapshot and reports nothing until a later poll
+    succeeds. The rankings that failed at the last poll are listed in ``failed``.
+    """
+
+    def __init__(
+        self,
+        client: VideoRankingClient,
+        targets: Iterable[RankingTarget],
+        *,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        max_workers: int = DEFAULT_WATCHER_WORKERS,
+        sensitive_contents: Literal["mask", "filter"] | None = None,
+        errors: tuple[type[Exception], ...] = CRAWL_ERRORS,
+    ) -> None:
+        """Initialize the watcher.
+
+        Args:
+            client (VideoRankingClient): The client to fetch the rankings with.
+            targets (Iterable[RankingTarget]): The rankings to watch.
+            interval (float): The number of seconds between the starts of two polls.
+            max_pages (int): The number of pages fetched at most per ranking.
+            max_workers (int): The number of pages fetched at the same time.
+            sensitive_contents (Literal["mask", "filter"] | None): The sensitive contents to get.
+            errors (tuple[type[Exception], ...]): The errors of a request that fail its ranking
+                for the poll instead of ending it.
+        """
+        self.client = client
+        self.targets = list(dict.fromkeys(targets))
+        self.interval = interval
+        self.max_pages = max_pages
+        self.max_workers = max_workers
+        self.sensitive_contents: Literal["mask", "filter"] | None = sensitive_contents
+        self.errors = errors
+        self.snapshots: dict[RankingTarget, RankingSnapshot] = {}
+        self.failed: list[RankingTarget] = []
+        self._page_counts: dict[RankingTarget, int] = {}
+
+    def poll(self) -> list[RankingChange]:
+        """Fetch every ranking once and compare it with the previous snapshot.
+
+        Returns:
+            list[RankingChange]: The changes of every ranking, in the order of the targets.
+        """
+        pages: dict[RankingTarget, dict[int, tuple[list[EssentialVideo], bool] | None]] = {
+            target: {} for target in self.targets
+        }
+        pending = [(target, page) for target in self.targets for page in range(1, self._page_counts.get(target, 1) + 1)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending:
+                results = executor.map(lambda job: self._try_fetch_page(*job), pending)
+                for (target, page), result in zip(pending, results, strict=True):
+                    pages[target][page] = result
+                pending = [
+                    (target, len(fetched) + 1)
+                    for target, fetched in pages.items()
+                    if self._needs_next_page(fetched) and len(fetched) < self.max_pages
+                ]
+        changes: list[RankingChange] = []
+        self.failed = []
+        for target, fetched in pages.items():
+            videos = self._join_pages(target, fetched)
+            if videos is None:
+                self.failed.append(target)
+                continue
+            snapshot = snapshot_of(videos)
+            changes.extend(diff_rankings(target, self.snapshots.get(target, {}), snapshot))
+            self.snapshots[target] = snapshot
+        return changes
+
+    def watch(self, *, polls: int | None = None) -> Iterator[list[RankingChange]]:
+        """Poll the rankings on a fixed schedule.
+
+        Args:
+            polls (int | None): The number of polls to make, or None to poll forever.
+
+        Yields:
+            list[RankingChange]: The changes found by each poll.
+        """
+        count = 0
+        next_at = time.monotonic()
+        while polls is None or count < polls:
+            if count:
+                time.sleep(max(0.0, next_at - time.monotonic()))
+            next_at += self.interval
+            count += 1
+            yield self.poll()
+
+    def _try_fetch_page(self, target: RankingTarget, page: int) -> tuple[list[EssentialVideo], bool] | None:
+        """Fetch a page of a ranking, returning None if its request raised one of ``errors``."""
+        try:
+            return self._fetch_page(target, page)
+        except self.errors as e:
+            logger.warning("Could not fetch page %d of the ranking %s: %s", page, target, e)
+            return None
+
+    def _fetch_page(self, target: RankingTarget, page: int) -> tuple[list[EssentialVideo], bool] | None:
+        """Fetch a page of a ranking, returning its videos and whether a next page exists."""
+        if target.kind == "genre":
+            data = self.client.get_ranking(
+                target.key,
+                target.term,
+                page_size=RANKING_PAGE_SIZE,
+                page=page,
+                tag=target.tag,
+                sensitive_contents=self.sensitive_contents,
+            )
+        elif target.kind == "teiban":
+            data = self.client.get_teiban_ranking(
+                target.key,
+                target.term,
+                page_size=RANKING_PAGE_SIZE,
+                page=page,
+                sensitive_contents=self.sensitive_contents,
+            )
+        else:
+            data = self.client.get_hot_topics(
+                target.term,
+                page_size=RANKING_PAGE_SIZE,
+                page=page,
+                sensitive_contents=self.sensitive_contents,
+            )
+        return (data.items, data.has_next) if data is not None else None
+
+    @staticmethod
+    def _needs_next_page(fetched: dict[int, tuple[list[EssentialVideo], bool] | None]) -> bool:
+        """Whether every page fetched so far succeeded and has a next page."""
+        return all(result is not None and result[1] for result in fetched.values())
+
+    def _join_pages(
+        self,
+        target: RankingTarget,
+        fetched: dict[int, tuple[list[EssentialVideo], bool] | None],
+    ) -> list[EssentialVideo] | None:
+        """Join the pages of a ranking up to its last one, or return None if one of them failed.
+
+        Pages past the last one, requested because the ranking was longer at the
+        previous poll, are ignored.
+        """
+        videos: list[EssentialVideo] = []
+        for page in range(1, len(fetched) + 1):
+            result = fetched[page]
+            if result is None:
+                logger.warning("Could not fetch page %d of the ranking %s; keeping its snapshot.", page, target)
+                return None
+            videos.extend(result[0])
+            if not result[1]:
+                self._page_counts[target] = page
+                return videos
+        self._page_counts[target] = len(fetched)
+        return videos
@@ -0,0 +1,401 @@
+"""This module contains helpers to split a snapshot search into shards the API can page through."""
+
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, get_args
+from urllib.parse import urlencode
+
+from niconico.objects.video.search import SnapshotResponseField, SnapshotVideoItem
+from niconico.utils import JST
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+    from types import TracebackType
+    from typing import Self, TextIO
+
+    import pyarrow as pa
+
+    from niconico.objects.video.search import SnapshotSortKey, SnapshotSortOrder, SnapshotTargetField
+
+SnapshotExportFormat = Literal["parquet", "arrow", "csv"]
+
+SNAPSHOT_SEARCH_URL = "https://snapshot.search.nicovideo.jp/api/v2/snapshot/video/contents/search"
+
+SNAPSHOT_MAX_OFFSET = 100_000
+"""The largest offset the snapshot search API accepts."""
+
+SNAPSHOT_MAX_LIMIT = 100
+"""The largest number of items the snapshot search API returns per request."""
+
+SNAPSHOT_EPOCH = datetime(2007, 3, 1, tzinfo=JST)
+"""A time before the first video was posted, the default start of a full search."""
+
+DEFAULT_SNAPSHOT_RATE = 2.0
+"""The default number of snapshot search requests sent per second."""
+
+MIN_SHARD_DURATION = timedelta(seconds=1)
+"""The shortest window a shard is split into, the precision of ``startTime``."""
+
+DEFAULT_EXPORT_BATCH_SIZE = 10_000
+"""The default number of rows held in memory before they are written to an export."""
+
+SNAPSHOT_FIELDS: tuple[SnapshotResponseField, ...] = get_args(SnapshotResponseField)
+"""Every field the snapshot search API can return."""
+
+INT_FIELDS = frozenset(
+    {"userId", "channelId", "viewCounter", "mylistCounter", "likeCounter", "lengthSeconds", "commentCounter"},
+)
+"""The fields exported as 64-bit integers."""
+
+TIME_FIELDS = frozenset({"startTime", "lastCommentTime"})
+"""The fields exported as timestamps."""
+
+LIST_FIELDS = frozenset({"tags", "categoryTags"})
+"""The space separated fields exported as lists of strings."""
+
+EXPORT_FORMATS: dict[str, SnapshotExportFormat] = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".csv": "csv",
+}
+"""The export formats guessed from the suffix of a path."""
+
+COLUMN_NAMES: dict[str, str] = {field.alias or name: name for name, field in SnapshotVideoItem.model_fields.items()}
+"""The snake case column names of the fields, as named in ``SnapshotVideoItem``."""
+
+
+def snapshot_search_url(
+    keyword: str,
+    targets: list[SnapshotTargetField] | None = None,
+    *,
+    sort_key: SnapshotSortKey = "viewCounter",
+    sort_order: SnapshotSortOrder = "desc",
+    fields: Sequence[SnapshotResponseField] | None = None,
+    filters: dict[str, dict[str, str] | list[str]] | None = None,
+    json_filter: str | None = None,
+    offset: int = 0,
+    limit: int = 10,
+    context: str = "niconico.py",
+) -> str:
+    """Build the URL of a snapshot search.
+
+    The arguments are the same as ``search_videos_by_snapshot``.
+
+    Returns:
+        str: The URL to request.
+    """
+    query: list[tuple[str, str]] = [
+        ("q", keyword),
+        ("targets", ",".join(targets if targets is not None else ["title", "description", "tags"])),
+        ("fields", ",".join(fields if fields is not None else ["contentId", "title"])),
+        ("_sort", f"{'-' if sort_order == 'desc' else '+'}{sort_key}"),
+        ("_offset", str(offset)),
+        ("_limit", str(limit)),
+        ("_context", context),
+    ]
+    if json_filter is not None:
+        query.append(("jsonFilter", json_filter))
+    elif filters is not None:
+        for field, condition in filters.items():
+            if isinstance(condition, dict):
+                query.extend((f"filters[{field}][{operator}]", value) for operator, value in condition.items())
+            else:
+                query.extend((f"filters[{field}][{index}]", value) for index, value in enumerate(condition))
+    return f"{SNAPSHOT_SEARCH_URL}?{urlencode(query)}"
+
+
+@dataclass(frozen=True)
+class SnapshotShard:
+    """A ``startTime`` window of a snapshot search.
+
+    Attributes:
+        start (datetime): The start of the window, inclusive.
+        end (datetime): The end of the window, exclusive.
+        total_count (int): The number of videos posted in the window.
+    """
+
+    start: datetime
+    end: datetime
+    total_count: int
+
+
+def window_filters(
+    filters: dict[str, dict[str, str] | list[str]] | None,
+    json_filter: str | None,
+    start: datetime,
+    end: datetime,
+) -> tuple[dict[str, dict[str, str] | list[str]] | None, str | None]:
+    """Restrict the filters of a snapshot search to a ``startTime`` window.
+
+    Args:
+        filters (dict[str, dict[str, str] | list[str]] | None): The simple filters of the search.
+        json_filter (str | None): The JSON encoded filter of the search.
+        start (datetime): The start of the window, inclusive.
+        end (datetime): The end of the window, exclusive.
+
+    Returns:
+        tuple[dict[str, dict[str, str] | list[str]] | None, str | None]: The simple filters and the
+            JSON encoded filter to send, in the form ``search_videos_by_snapshot`` takes them.
+    """
+    start_str = start.astimezone(JST).isoformat(timespec="seconds")
+    end_str = end.astimezone(JST).isoformat(timespec="seconds")
+    if json_filter is not None:
+        window = {
+            "type": "range",
+            "field": "startTime",
+            "from": start_str,
+            "to": end_str,
+            "include_lower": True,
+            "include_upper": False,
+        }
+        return None, json.dumps({"type": "and", "filters": [json.loads(json_filter), window]})
+    return {**(filters or {}), "startTime": {"gte": start_str, "lt": end_str}}, None
+
+
+class ShardPlanner:
+    """Split a ``startTime`` window in halves until every part fits under the offset ceiling.
+
+    The planner does not send requests itself, so the synchronous and the asynchronous
+    clients share it. Ask for the total count of :meth:`next_window` and pass it to
+    :meth:`record` until :attr:`finished`.
+    """
+
+    def __init__(self, start: datetime, end: datetime, max_offset: int = SNAPSHOT_MAX_OFFSET) -> None:
+        """Initialize the planner.
+
+        Args:
+            start (datetime): The start of the search, inclusive.
+            end (datetime): The end of the search, exclusive.
+            max_offset (int): The largest offset the API accepts.
+        """
+        self.max_offset = max_offset
+        self.shards: list[SnapshotShard] = []
+        self.truncated: list[SnapshotShard] = []
+        self._windows: list[tuple[datetime, datetime]] = [(start, end)] if start < end else []
+
+    @property
+    def finished(self) -> bool:
+        """Whether every window has been counted."""
+        return not self._windows
+
+    def next_window(self) -> tuple[datetime, datetime]:
+        """Return the window to count next, earliest first.
+
+        Returns:
+            tuple[datetime, datetime]: The start and the end of the window.
+        """
+        return self._windows[-1]
+
+    def record(self, total_count: int) -> None:
+        """Record the total count of the window returned by :meth:`next_window`.
+
+        Args:
+            total_count (int): The number of videos posted in the window.
+        """
+        start, end = self._windows.pop()
+        if total_count == 0:
+            return
+        if total_count <= self.max_offset:
+            self.shards.append(SnapshotShard(start, end, total_count))
+            return
+        middle = start + (end - start) / 2
+        middle = middle.replace(microsecond=0)
+        if middle <= start or end - start <= MIN_SHARD_DURATION:
+            shard = SnapshotShard(start, end, total_count)
+            self.shards.append(shard)
+            self.truncated.append(shard)
+            return
+        self._windows.append((middle, end))
+        self._windows.append((start, middle))
+
+    def pages(self, page_size: int, *, reverse: bool = False) -> list[tuple[SnapshotShard, int]]:
+        """Return the requests covering every shard.
+
+        Args:
+            page_size (int): The number of items to get per request.
+            reverse (bool): Whether to walk the shards from the latest one.
+
+        Returns:
+            list[tuple[SnapshotShard, int]]: The shard and the offset of each request.
+        """
+        shards: Iterator[SnapshotShard] = reversed(self.shards) if reverse else iter(self.shards)
+        return [
+            (shard, offset)
+            for shard in shards
+            for offset in range(0, min(shard.total_count, self.max_offset + 1), page_size)
+        ]
+
+
+class SnapshotExporter:
+    """Write raw snapshot search rows to a Parquet, Arrow IPC or CSV file with typed columns.
+
+    Rows are buffered up to ``batch_size`` and written as a batch, so an export of any
+    size is held in bounded memory. In the Parquet and Arrow files, counters are 64-bit
+    integers, times are timestamps in Japan Standard Time, and ``tags`` and ``categoryTags``
+    are lists of strings. The CSV file keeps the values as the API returns them. The
+    columns are named like the attributes of ``SnapshotVideoItem``. The rows are written
+    to a hidden file next to the path, which replaces the path when the exporter is
+    closed. If the ``with`` block raises, the hidden file is deleted instead, so a failed
+    export leaves neither a partial file nor a truncated earlier one::
+
+        with SnapshotExporter("videos.parquet", ["contentId", "startTime", "tags"]) as exporter:
+            exporter.write(rows)
+
+    The Parquet and Arrow formats require the optional ``arrow`` extra.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        fields: Sequence[SnapshotResponseField] = SNAPSHOT_FIELDS,
+        file_format: SnapshotExportFormat | None = None,
+        *,
+        batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    ) -> None:
+        """Open the file to export to.
+
+        Args:
+            path (str | Path): The path of the file.
+            fields (Sequence[SnapshotResponseField]): The fields to export, in order.
+            file_format (SnapshotExportFormat | None): The format. Guessed from the suffix of the path if None.
+            batch_size (int): The number of rows held in memory before they are written.
+
+        Raises:
+            ValueError: If a field is unknown, or the format cannot be guessed from the path.
+            ImportError: If the format is Parquet or Arrow and pyarrow is not installed.
+        """
+        unknown = [field for field in fields if field not in SNAPSHOT_FIELDS]
+        if unknown:
+            msg = f"Unknown snapshot fields: {', '.join(unknown)}."
+            raise ValueError(msg)
+        self.path = Path(path)
+        if file_format is None:
+            file_format = EXPORT_FORMATS.get(self.path.suffix.lower())
+            if file_format is None:
+                msg = f"Cannot guess the export format of {self.path.name}. Pass file_format explicitly."
+                raise ValueError(msg)
+        self.fields = list(fields)
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._rows: list[Mapping[str, Any]] = []
+        self._partial_path = self.path.with_name(f".{self.path.name}.part")
+        self._file: TextIO | None = None
+        self._writer: Any = None
+        if file_format == "csv":
+            self._file = self._partial_path.open("w", encoding="utf-8", newline="")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow([COLUMN_NAMES[field] for field in self.fields])
+            return
+        try:
+            import pyarrow as pa  # noqa: PLC0415
+            import pyarrow.parquet as pq  # noqa: PLC0415
+        except ImportError as e:  # pragma: no cover - depends on the optional extra
+            msg = f'Exporting to {file_format} requires pyarrow. Install it with `pip install "niconico.py[arrow]"`.'
+            raise ImportError(msg) from e
+        self._schema = self.schema()
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(self._partial_path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(self._partial_path, self._schema)
+
+    def __enter__(self) -> Self:
+        """Return the exporter."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the file, or discard it if the block raised."""
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def schema(self) -> pa.Schema:
+        """Return the Arrow schema of the exported fields.
+
+        Returns:
+            pa.Schema: The schema, with one column per field.
+        """
+        import pyarrow as pa  # noqa: PLC0415
+
+        def column_type(field: str) -> pa.DataType:
+            if field in INT_FIELDS:
+                return pa.int64()
+            if field in TIME_FIELDS:
+                return pa.timestamp("s", tz="Asia/Tokyo")
+            if field in LIST_FIELDS:
+                return pa.list_(pa.string())
+            return pa.string()
+
+        return pa.schema([(COLUMN_NAMES[field], column_type(field)) for field in self.fields])
+
+    def write(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Write rows, as decoded from the ``data`` of a response.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): The rows to write.
+        """
+        if self._file is not None:
+            for row in rows:
+                self._csv.writerow([row.get(field) for field in self.fields])
+                self.rows_written += 1
+            return
+        self._rows.extend(rows)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows as a batch."""
+        if self._file is not None:
+            self._file.flush()
+            return
+        if not self._rows:
+            return
+        import pyarrow as pa  # noqa: PLC0415
+
+        def convert(field: str, value: Any) -> Any:  # noqa: ANN401
+            if value is None:
+                return None
+            if field in TIME_FIELDS:
+                return datetime.fromisoformat(value)
+            if field in LIST_FIELDS:
+                return value.split()
+            return value
+
+        arrays = [
+            pa.array([convert(field, row.get(field)) for row in self._rows], self._schema.field(index).type)
+            for index, field in enumerate(self.fields)
+        ]
+        self._writer.write_batch(pa.record_batch(arrays, schema=self._schema))
+        self.rows_written += len(self._rows)
+        self._rows.clear()
+
+    def close(self) -> None:
+        """Write the buffered rows, close the file and move it to the path."""
+        self.flush()
+        self._close_file()
+        self._partial_path.replace(self.path)
+
+    def discard(self) -> None:
+        """Close the file without writing the buffered rows, and delete it."""
+        self._rows.clear()
+        self._close_file()
+        self._partial_path.unlink(missing_ok=True)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
@@ -3,68 +3,109 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import re
 import secrets
 import string
-import subprocess
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import requests
 
 from niconico.base.client import BaseClient
 from niconico.decorators import login_required
-from niconico.exceptions import CommentAPIError, DownloadError, NicoAPIError, WatchAPIError
-from niconico.objects.nvapi import AccessRightsData, NvAPIResponse, ThreadKeyData
-from niconico.objects.video.watch import (
-    NvCommentAPIData,
-    NvCommentAPIResponse,
-    StoryboardResponse,
-    WatchAPIData,
-    WatchAPIErrorData,
-    WatchAPIResponse,
-    WatchData,
+from niconico.exceptions import CommentAPIError, DownloadError, NicoAPIError
+from niconico.objects.video.watch import StoryboardResponse
+from niconico.utils import parse_response
+from niconico.video import endpoints
+from niconico.video.comments import (
+    DEFAULT_MAX_FAILURES,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    CommentBackoff,
+    CommentHarvest,
 )
+from niconico.video.hls import DEFAULT_SEGMENT_WORKERS, HLSDownloader, default_muxer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from niconico.objects.video.watch import Comment, NvCommentAPIData, NvCommentDataTarget, WatchData
+    from niconico.video.comments import CommentBatch
+    from niconico.video.hls import Muxer
+
+
+def generate_action_track_id() -> str:
+    """Generate a random action track ID."""
+    fh_chars = string.ascii_letters + string.digits
+    fh = "".join(secrets.choice(fh_chars) for _ in range(10))
+    lh = int(time.time() * 1000)
+    return f"{fh}_{lh}"
+
+
+def get_outputs(watch_data: WatchData, *, audio_only: bool = False) -> dict[str, list[str]]:
+    """Get the outputs of a video, each available video paired with the best available audio."""
+    outputs: dict[str, list[str]] = {}
+    top_audio_id = None
+    top_audio_quality = -1
+    for audio in watch_data.media.domand.audios:
+        if audio.is_available and audio.quality_level > top_audio_quality:
+            top_audio_id = audio.id_
+            top_audio_quality = audio.quality_level
+    if top_audio_id is None:
+        return outputs
+    for video in watch_data.media.domand.videos:
+        if video.is_available:
+            outputs[video.label] = [top_audio_id] if audio_only else [video.id_, top_audio_id]
+    return outputs
+
+
+def select_output(outputs: dict[str, list[str]], output_label: str) -> list[str]:
+    """Get the output of a label, raising DownloadError if the video has none."""
+    if output_label not in outputs:
+        raise DownloadError(message="The output label is not available.")
+    return outputs[output_label]
+
+
+def prepare_output_path(watch_data: WatchData, output_path: str, *, audio_only: bool) -> str:
+    """Fill in the placeholders of the path to save a video to, and create its folder.
+
+    Raises:
+        DownloadError: If the file already exists.
+    """
+    output_path = output_path % {
+        "id": watch_data.video.id_,
+        "title": watch_data.video.title,
+        "owner": watch_data.owner.nickname if watch_data.owner else "Unknown",
+        "owner_id": str(watch_data.owner.id_) if watch_data.owner else "0",
+        "timestamp": str(int(time.time())),
+        "ext": "m4a" if audio_only else "mp4",
+    }
+    if not Path(output_path).parent.exists():
+        Path(output_path).parent.mkdir(parents=True)
+    if Path(output_path).exists():
+        raise DownloadError(message="The video file already exists.")
+    return output_path
 
 
 class VideoWatchClient(BaseClient):
     """A client for watching videos on Niconico."""
 
-    def _build_ffmpeg_command(self, hls_content_url: str, output_path: str) -> list[str]:
-        """Build a safe FFmpeg command argument list."""
-        cookies = {
-            "domand_bid": self.niconico.session.cookies.get("domand_bid"),
-        }
-        cookie_header = "cookie: " + ";".join(f"{k}={v}" for k, v in cookies.items() if v is not None)
-        return [
-            "ffmpeg",
-            "-headers",
-            cookie_header,
-            "-protocol_whitelist",
-            "file,http,https,tcp,tls,crypto",
-            "-i",
-            hls_content_url,
-            "-c",
-            "copy",
-            output_path,
-        ]
-
-    def get_watch_data(self, video_id: str) -> WatchData:
+    def get_watch_data(self, video_id: str, *, lazy: bool = False) -> WatchData:
         """Get the watch data of a video.
 
         Args:
             video_id: The ID of the video.
+            lazy: Whether to validate each section of the watch data only when it is first read.
+                Jobs that only read a few sections, such as downloads, parse faster and keep less in memory.
 
         Returns:
-            WatchData | WatchResponseError: The watch data of the video if successful, WatchResponseError
+            WatchData: The watch data of the video.
+
+        Raises:
+            WatchAPIError: If the watch page returned an error.
         """
-        res = self.niconico.get(f"https://www.nicovideo.jp/watch/{video_id}?responseType=json")
-        if res.status_code == requests.codes.ok:
-            res_cls_data = WatchAPIResponse[WatchAPIData](**res.json())
-            return res_cls_data.data.response
-        res_cls_error = WatchAPIResponse[WatchAPIErrorData](**res.json())
-        raise WatchAPIError(response=res_cls_error.data.response)
+        return self._send(endpoints.get_watch_data(video_id, lazy=lazy))
 
     def generate_action_track_id(self) -> str:
         """Generate a random action track ID.
@@ -72,10 +113,7 @@ class VideoWatchClient(BaseClient):
         Returns:
             str: The generated action track ID.
         """
-        fh_chars = string.ascii_letters + string.digits
-        fh = "".join(secrets.choice(fh_chars) for _ in range(10))
-        lh = int(time.time() * 1000)
-        return f"{fh}_{lh}"
+        return generate_action_track_id()
 
     def get_outputs(self, watch_data: WatchData, *, audio_only: bool = False) -> dict[str, list[str]]:
         """Get the outputs of a video.
@@ -87,19 +125,7 @@ class VideoWatchClient(BaseClient):
         Returns:
             dict[str, list[str]]: The outputs of the video.
         """
-        outputs: dict[str, list[str]] = {}
-        top_audio_id = None
-        top_audio_quality = -1
-        for audio in watch_data.media.domand.audios:
-            if audio.is_available and audio.quality_level > top_audio_quality:
-                top_audio_id = audio.id_
-                top_audio_quality = audio.quality_level
-        if top_audio_id is None:
-            return outputs
-        for video in watch_data.media.domand.videos:
-            if video.is_available:
-                outputs[video.label] = [top_audio_id] if audio_only else [video.id_, top_audio_id]
-        return outputs
+        return get_outputs(watch_data, audio_only=audio_only)
 
     def get_hls_content_url(self, watch_data: WatchData, outputs: list[list[str]]) -> str | None:
         """Get the HLS content URL of a video.
@@ -111,19 +137,7 @@ class VideoWatchClient(BaseClient):
         Returns:
             str | None: The HLS content URL of the video if successful, None otherwise.
         """
-        video_id = watch_data.client.watch_id
-        action_track_id = watch_data.client.watch_track_id
-        access_right_key = watch_data.media.domand.access_right_key
-        res = self.niconico.post(
-            f"https://nvapi.nicovideo.jp/v1/watch/{video_id}/access-rights/hls?actionTrackId={action_track_id}",
-            json={"outputs": outputs},
-            headers={"X-Access-Right-Key": access_right_key},
-        )
-        if res.status_code == requests.codes.created:
-            res_cls = NvAPIResponse[AccessRightsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.content_url
-        return None
+        return self._send(endpoints.get_hls_content_url(watch_data, outputs))
 
     @login_required(premium=True)
     def get_storyboard_url(self, watch_data: WatchData) -> str | None:
@@ -137,18 +151,7 @@ class VideoWatchClient(BaseClient):
         """
         if not watch_data.media.domand.is_storyboard_available:
             return None
-        video_id = watch_data.client.watch_id
-        action_track_id = watch_data.client.watch_track_id
-        access_right_key = watch_data.media.domand.access_right_key
-        res = self.niconico.post(
-            f"https://nvapi.nicovideo.jp/v1/watch/{video_id}/access-rights/storyboard?actionTrackId={action_track_id}",
-            headers={"X-Access-Right-Key": access_right_key},
-        )
-        if res.status_code == requests.codes.created:
-            res_cls = NvAPIResponse[AccessRightsData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.content_url
-        return None
+        return self._send(endpoints.get_storyboard_url(watch_data))
 
     @login_required(premium=True)
     def download_storyboards(self, watch_data: WatchData, output_path: str) -> str:
@@ -173,7 +176,7 @@ class VideoWatchClient(BaseClient):
         }
         res = self.niconico.get(storyboard_url)
         if res.status_code == requests.codes.ok:
-            res_cls = StoryboardResponse(**res.json())
+            res_cls = parse_response(res, StoryboardResponse)
             if not Path(output_path).is_dir():
                 Path(output_path).mkdir(parents=True)
             if Path(f"{output_path}/storyboard.json").exists():
@@ -193,6 +196,30 @@ class VideoWatchClient(BaseClient):
             raise DownloadError(message="Failed to download the storyboards.")
         return output_path
 
+    def _prepare_download(
+        self,
+        watch_data: WatchData,
+        output_label: str,
+        output_path: str,
+        *,
+        audio_only: bool,
+    ) -> tuple[str, str]:
+        """Get the HLS content URL of a video and the path to save it to."""
+        output = select_output(self.get_outputs(watch_data, audio_only=audio_only), output_label)
+        hls_content_url = self.get_hls_content_url(watch_data, [output])
+        if hls_content_url is None:
+            raise NicoAPIError(message="Failed to get the HLS content URL.")
+        return hls_content_url, prepare_output_path(watch_data, output_path, audio_only=audio_only)
+
+    def _refresh_hls_content_url(self, watch_data: WatchData, output_label: str, *, audio_only: bool) -> str:
+        """Grant a new access right to the HLS content of a video whose access right has expired."""
+        fresh_watch_data = self.get_watch_data(watch_data.client.watch_id, lazy=True)
+        output = select_output(self.get_outputs(fresh_watch_data, audio_only=audio_only), output_label)
+        hls_content_url = self.get_hls_content_url(fresh_watch_data, [output])
+        if hls_content_url is None:
+            raise NicoAPIError(message="Failed to get the HLS content URL.")
+        return hls_content_url
+
     def download_video(
         self,
         watch_data: WatchData,
@@ -200,51 +227,45 @@ class VideoWatchClient(BaseClient):
         output_path: str = "%(title)s.%(ext)s",
         *,
         audio_only: bool = False,
+        muxer: Muxer | None = None,
+        max_workers: int = DEFAULT_SEGMENT_WORKERS,
     ) -> str:
         """Download a video.
 
+        The segments are downloaded concurrently and decrypted natively, then the tracks
+        are combined by the muxer. Without a muxer, ffmpeg is used, and a DownloadError is
+        raised before anything is fetched if it is not installed. Pass ``TrackFilesMuxer()``
+        to save the audio track next to the video without ffmpeg instead.
+
+        Progress is kept next to the output file until the download completes, so running
+        the same download again after a crash resumes from the segments already saved.
+        An expired access right is renewed with a fresh watch data.
+
         Args:
             watch_data: The watch data of the video.
             output_label: The output label of the video.
             output_path: The path to save the video.
             audio_only: Whether to download the audio only.
+            muxer: The muxer combining the video and audio tracks. ffmpeg is used when None.
+            max_workers: The number of segments downloaded at once.
 
         Returns:
             str: The path of the downloaded video.
         """
-        outputs = self.get_outputs(watch_data, audio_only=audio_only)
-        if output_label not in outputs:
-            raise DownloadError(message="The output label is not available.")
-        hls_content_url = self.get_hls_content_url(watch_data, [outputs[output_label]])
-        if hls_content_url is None:
-            raise NicoAPIError(message="Failed to get the HLS content URL.")
-        output_path = output_path % {
-            "id": watch_data.video.id_,
-            "title": watch_data.video.title,
-            "owner": watch_data.owner.nickname if watch_data.owner else "Unknown",
-            "owner_id": str(watch_data.owner.id_) if watch_data.owner else "0",
-            "timestamp": str(int(time.time())),
-            "ext": "m4a" if audio_only else "mp4",
-        }
-        if not Path(output_path).parent.exists():
-            Path(output_path).parent.mkdir(parents=True)
-        if Path(output_path).exists():
-            raise DownloadError(message="The video file already exists.")
-        command = self._build_ffmpeg_command(hls_content_url, output_path)
-        try:
-            with subprocess.Popen(  # noqa: S603
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-            ) as p:
-                if p.stdout is not None:
-                    for line in iter(p.stdout.readline, b""):
-                        self.log("debug", line.rstrip().decode("utf-8", errors="replace"))
-                return_code = p.wait()
-                if return_code != 0:
-                    raise DownloadError(message="Failed to download the video.")
-        except OSError as e:
-            raise DownloadError(message="Failed to download the video.") from e
+        muxer = muxer if muxer is not None else default_muxer()
+        hls_content_url, output_path = self._prepare_download(
+            watch_data,
+            output_label,
+            output_path,
+            audio_only=audio_only,
+        )
+        downloader = HLSDownloader(self.niconico.session, max_workers=max_workers)
+        downloader.download(
+            hls_content_url,
+            output_path,
+            muxer,
+            refresh=lambda: self._refresh_hls_content_url(watch_data, output_label, audio_only=audio_only),
+        )
         return output_path
 
     async def download_video_async(
@@ -254,51 +275,41 @@ class VideoWatchClient(BaseClient):
         output_path: str = "%(title)s.%(ext)s",
         *,
         audio_only: bool = False,
+        muxer: Muxer | None = None,
+        max_workers: int = DEFAULT_SEGMENT_WORKERS,
     ) -> str:
         """Asynchronously download a video.
 
+        The access right is granted and the segments are downloaded in a worker thread,
+        so the event loop is not blocked by the requests of the synchronous client.
+
         Args:
             watch_data: The watch data of the video.
             output_label: The output label of the video.
             output_path: The path to save the video.
             audio_only: Whether to download the audio only.
+            muxer: The muxer combining the video and audio tracks. ffmpeg is used when None.
+            max_workers: The number of segments downloaded at once.
 
         Returns:
             str: The path of the downloaded video.
         """
-        outputs = self.get_outputs(watch_data, audio_only=audio_only)
-        if output_label not in outputs:
-            raise DownloadError(message="The output label is not available.")
-        hls_content_url = self.get_hls_content_url(watch_data, [outputs[output_label]])
-        if hls_content_url is None:
-            raise NicoAPIError(message="Failed to get the HLS content URL.")
-        output_path = output_path % {
-            "id": watch_data.video.id_,
-            "title": watch_data.video.title,
-            "owner": watch_data.owner.nickname if watch_data.owner else "Unknown",
-            "owner_id": str(watch_data.owner.id_) if watch_data.owner else "0",
-            "timestamp": str(int(time.time())),
-            "ext": "m4a" if audio_only else "mp4",
-        }
-        if not Path(output_path).parent.exists():
-            Path(output_path).parent.mkdir(parents=True)
-        if Path(output_path).exists():  # noqa: ASYNC240
-            raise DownloadError(message="The video file already exists.")
-        command = self._build_ffmpeg_command(hls_content_url, output_path)
-        try:
-            process = await asyncio.create_subprocess_exec(
-                *command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.STDOUT,
-            )
-        except OSError as e:
-            raise DownloadError(message="Failed to download the video.") from e
-        if process.stdout is not None:
-            async for line in process.stdout:
-                self.log("debug", line.decode().rstrip())
-        return_code = await process.wait()
-        if return_code != 0:
-            raise DownloadError(message="Failed to download the video.")
+        muxer = muxer if muxer is not None else default_muxer()
+        hls_content_url, output_path = await asyncio.to_thread(
+            self._prepare_download,
+            watch_data,
+            output_label,
+            output_path,
+            audio_only=audio_only,
+        )
+        downloader = HLSDownloader(self.niconico.session, max_workers=max_workers)
+        await asyncio.to_thread(
+            downloader.download,
+            hls_content_url,
+            output_path,
+            muxer,
+            refresh=lambda: self._refresh_hls_content_url(watch_data, output_label, audio_only=audio_only),
+        )
         return output_path
 
     def get_thread_key(self, video_id: str) -> str | None:
@@ -310,12 +321,7 @@ class VideoWatchClient(BaseClient):
         Returns:
             str: The thread key of the video.
         """
-        res = self.niconico.get(f"https://nvapi.nicovideo.jp/v1/comment/keys/thread?videoId={video_id}")
-        if res.status_code == requests.codes.ok:
-            res_cls = NvAPIResponse[ThreadKeyData](**res.json())
-            if res_cls.data is not None:
-                return res_cls.data.thread_key
-        return None
+        return self._send(endpoints.get_thread_key(video_id))
 
     def get_comments(
         self,
@@ -323,6 +329,7 @@ class VideoWatchClient(BaseClient):
         *,
         when: int | None = None,
         thread_key: str | None = None,
+        targets: list[NvCommentDataTarget] | None = None,
     ) -> NvCommentAPIData | None:
         """Get the comments of a video.
 
@@ -330,24 +337,119 @@ class VideoWatchClient(BaseClient):
             watch_data: The watch data of the video.
             when: The time to get the comments.
             thread_key: The thread key of the video.
+            targets: The forks to get the comments of. Every fork of the video is requested when None.
 
         Returns:
-            list[Any]: The comments of the video.
+            NvCommentAPIData | None: The comments of the video.
         """
-        payload = {
-            "threadKey": watch_data.comment.nv_comment.thread_key,
-            "params": watch_data.comment.nv_comment.params.model_dump(by_alias=True),
-            "additionals": {},
-        }
-        if when is not None:
-            payload["additionals"] = {"when": when}
-        if thread_key is not None:
-            payload["threadKey"] = thread_key
-        res = self.niconico.post(
-            watch_data.comment.nv_comment.server + "/v1/threads",
-            data=json.dumps(payload),
+        return self._send(
+            endpoints.get_comments(watch_data, when=when, thread_key=thread_key, targets=targets),
+        )
+
+    def get_comment_batch(
+        self,
+        watch_data: WatchData,
+        *,
+        when: int | None = None,
+        thread_key: str | None = None,
+        targets: list[NvCommentDataTarget] | None = None,
+    ) -> CommentBatch | None:
+        """Get the comments of a video as a columnar batch, without a model per comment.
+
+        Args:
+            watch_data: The watch data of the video.
+            when: The time to get the comments.
+            thread_key: The thread key of the video.
+            targets: The forks to get the comments of. Every fork of the video is requested when None.
+
+        Returns:
+            CommentBatch | None: The comments of every requested fork.
+        """
+        return self._send(
+            endpoints.get_comment_batch(watch_data, when=when, thread_key=thread_key, targets=targets),
         )
-        res_cls = NvCommentAPIResponse(**res.json())
-        if res_cls.meta.status == requests.codes.ok:
-            return res_cls.data
-        raise CommentAPIError(message=res_cls.meta.error_code)
+
+    def iter_comment_batches(
+        self,
+        watch_data: WatchData,
+        *,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        max_failures: int = DEFAULT_MAX_FAILURES,
+    ) -> Iterator[CommentBatch]:
+        """Iterate over every comment of a video in columnar batches, paging back through each fork.
+
+        The owner thread is fetched once, and the other forks are walked back in time
+        until their first comment, skipping comments already yielded by their number.
+        An expired thread key is refreshed with ``get_thread_key``. Requests are spaced by
+        ``min_interval`` seconds, and the wait doubles after each failed request up to
+        ``max_interval`` seconds, shrinking back once requests succeed again.
+
+        Args:
+            watch_data: The watch data of the video.
+            min_interval: The number of seconds waited between two requests.
+            max_interval: The longest number of seconds waited after failed requests.
+            max_failures: The number of consecutive failed requests before giving up.
+
+        Yields:
+            CommentBatch: The comments of each response that were not yielded before.
+
+        Raises:
+            CommentAPIError: If the comment API kept failing.
+        """
+        harvest = CommentHarvest(watch_data.comment.nv_comment.params.targets, int(time.time()))
+        backoff = CommentBackoff(min_interval, max_interval, max_failures)
+        thread_key: str | None = None
+        while not harvest.finished:
+            targets, when = harvest.next_request()
+            try:
+                batch = self.get_comment_batch(watch_data, when=when, thread_key=thread_key, targets=targets)
+            except CommentAPIError as e:
+                batch, error_code = None, e.message
+            else:
+                error_code = None
+            if batch is None:
+                wait = backoff.failed(error_code)
+                if wait is None:
+                    thread_key = self.get_thread_key(watch_data.client.watch_id)
+                else:
+                    time.sleep(wait)
+                continue
+            yield harvest.absorb(batch)
+            wait = backoff.succeeded()
+            if not harvest.finished:
+                time.sleep(wait)
+
+    def iter_all_comments(
+        self,
+        watch_data: WatchData,
+        *,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        max_failures: int = DEFAULT_MAX_FAILURES,
+    ) -> Iterator[tuple[str, Comment]]:
+        """Iterate over every comment of a video, paging back through each fork.
+
+        The comments are walked like ``iter_comment_batches``, and each is built as a
+        ``Comment`` only when it is yielded.
+
+        Args:
+            watch_data: The watch data of the video.
+            min_interval: The number of seconds waited between two requests.
+            max_interval: The longest number of seconds waited after failed requests.
+            max_failures: The number of consecutive failed requests before giving up.
+
+        Yields:
+            tuple[str, Comment]: The fork and the comment, newest first within each fork.
+
+        Raises:
+            CommentAPIError: If the comment API kept failing.
+        """
+        for batch in self.iter_comment_batches(
+            watch_data,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            max_failures=max_failures,
+        ):
+            for index in reversed(range(len(batch))):
+                yield batch.fork_of(index), batch[index]
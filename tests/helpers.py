@@ -0,0 +1,40 @@
+"""Helpers shared by the unit tests."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def video_payload(video_id: str, view: int = 1) -> dict[str, Any]:
+    """Return a minimal essential video payload, with 2 comments, 3 mylists and 4 likes."""
+    return {
+        "type": "essential",
+        "id": video_id,
+        "title": f"sample {video_id}",
+        "registeredAt": "2007-03-06T00:33:00+09:00",
+        "count": {"view": view, "comment": 2, "mylist": 3, "like": 4},
+        "thumbnail": {
+            "url": "https://example.com/thumb.jpg",
+            "middleUrl": None,
+            "largeUrl": None,
+            "listingUrl": "https://example.com/thumb_list.jpg",
+            "nHdUrl": "https://example.com/thumb_nhd.jpg",
+        },
+        "duration": 1,
+        "shortDescription": "",
+        "latestCommentSummary": "",
+        "isChannelVideo": False,
+        "isPaymentRequired": False,
+        "playbackPosition": None,
+        "owner": {
+            "ownerType": "user",
+            "type": "user",
+            "visibility": "visible",
+            "id": "4",
+            "name": "sample",
+            "iconUrl": "https://example.com/icon.jpg",
+        },
+        "requireSensitiveMasking": False,
+        "videoLive": None,
+        "isMuted": False,
+    }
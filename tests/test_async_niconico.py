@@ -0,0 +1,161 @@
+"""Tests for the asynchronous client."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import httpx
+import pytest
+
+from niconico.aio import AsyncNicoNico
+from niconico.exceptions import LoginRequiredError
+
+RANKING_PAGES = 2
+
+
+def _video_payload(video_id: str) -> dict[str, Any]:
+    """Return a minimal essential video payload."""
+    return {
+        "type": "essential",
+        "id": video_id,
+        "title": f"sample {video_id}",
+        "registeredAt": "2007-03-06T00:33:00+09:00",
+        "count": {"view": 1, "comment": 2, "mylist": 3, "like": 4},
+        "thumbnail": {
+            "url": "https://example.com/thumb.jpg",
+            "middleUrl": None,
+            "largeUrl": None,
+            "listingUrl": "https://example.com/thumb_list.jpg",
+            "nHdUrl": "https://example.com/thumb_nhd.jpg",
+        },
+        "duration": 1,
+        "shortDescription": "",
+        "latestCommentSummary": "",
+        "isChannelVideo": False,
+        "isPaymentRequired": False,
+        "playbackPosition": None,
+        "owner": {
+            "ownerType": "user",
+            "type": "user",
+            "visibility": "visible",
+            "id": "4",
+            "name": "sample",
+            "iconUrl": "https://example.com/icon.jpg",
+        },
+        "requireSensitiveMasking": False,
+        "videoLive": None,
+        "isMuted": False,
+    }
+
+
+class Recorder:
+    """Answer requests with video payloads and record what was sent."""
+
+    def __init__(self) -> None:
+        """Initialize the recorded requests."""
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        """Record a request and answer it with a video payload."""
+        self.requests.append(request)
+        video_id = request.url.params.get("watchIds", "sm9")
+        payload = {
+            "meta": {"status": 200},
+            "data": {"items": [{"watchId": video_id, "video": _video_payload(video_id)}]},
+        }
+        return httpx.Response(200, json=payload)
+
+
+def test_get_video_is_sent_through_the_async_transport() -> None:
+    """The async video client parses the same models as the sync client."""
+    recorder = Recorder()
+
+    async def run() -> str | None:
+        async with AsyncNicoNico(transport=httpx.MockTransport(recorder)) as client:
+            video = await client.video.get_video("sm9")
+            return video.id_ if video is not None else None
+
+    assert asyncio.run(run()) == "sm9"
+    request = recorder.requests[0]
+    assert str(request.url) == "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9"
+    assert request.headers["User-Agent"] == "niconico.py"
+    assert request.headers["X-Frontend-Id"] == "6"
+
+
+def test_requests_can_be_in_flight_concurrently() -> None:
+    """Many lookups share one client and run concurrently."""
+    recorder = Recorder()
+    video_ids = [f"sm{i}" for i in range(1, 21)]
+
+    async def run() -> list[str]:
+        async with AsyncNicoNico(transport=httpx.MockTransport(recorder)) as client:
+            videos = await asyncio.gather(*(client.video.get_video(video_id) for video_id in video_ids))
+            return [video.id_ for video in videos if video is not None]
+
+    assert asyncio.run(run()) == video_ids
+    assert len(recorder.requests) == len(video_ids)
+
+
+def test_post_sends_json_with_frontend_headers() -> None:
+    """POST requests carry the frontend headers and a JSON body."""
+    sent: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(201, json={"meta": {"status": 201}, "data": {"contentUrl": "https://example.com/a.m3u8"}})
+
+    async def run() -> None:
+        async with AsyncNicoNico(transport=httpx.MockTransport(handler)) as client:
+            await client.post("https://nvapi.nicovideo.jp/v1/watch/sm9/access-rights/hls", json={"outputs": []})
+
+    asyncio.run(run())
+    assert json.loads(sent[0].content) == {"outputs": []}
+    assert sent[0].headers["X-Niconico-Language"] == "ja-jp"
+
+
+def test_login_required_guards_coroutines() -> None:
+    """Authenticated coroutines refuse to run without a login."""
+
+    async def run() -> None:
+        async with AsyncNicoNico(transport=httpx.MockTransport(Recorder())) as client:
+            await client.video.get_history()
+
+    with pytest.raises(LoginRequiredError):
+        asyncio.run(run())
+
+
+def test_crawl_rankings_follows_pages_concurrently() -> None:
+    """The async sweep follows each ranking to its last page."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        data = {"items": [_video_payload(f"sm{page}")], "hasNext": page < RANKING_PAGES}
+        return httpx.Response(200, json={"meta": {"status": 200}, "data": data})
+
+    async def run() -> list[tuple[str, int, str]]:
+        async with AsyncNicoNico(transport=httpx.MockTransport(handler)) as client:
+            crawl = client.video.ranking.crawl_rankings(["hour", "24h"], genre_keys=["game"], include_tags=False)
+            return sorted([(record.term, record.rank, record.video_id) async for record in crawl])
+
+    assert asyncio.run(run()) == [("24h", 1, "sm1"), ("24h", 101, "sm2"), ("hour", 1, "sm1"), ("hour", 101, "sm2")]
+
+
+def test_crawl_rankings_skips_pages_that_raise() -> None:
+    """A page whose request raises is skipped without ending the async sweep."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        if request.url.params["term"] == "24h" and page == RANKING_PAGES:
+            msg = "Connection reset"
+            raise httpx.ConnectError(msg, request=request)
+        data = {"items": [_video_payload(f"sm{page}")], "hasNext": page < RANKING_PAGES}
+        return httpx.Response(200, json={"meta": {"status": 200}, "data": data})
+
+    async def run() -> list[tuple[str, int, str]]:
+        async with AsyncNicoNico(transport=httpx.MockTransport(handler)) as client:
+            crawl = client.video.ranking.crawl_rankings(["hour", "24h"], genre_keys=["game"], include_tags=False)
+            return sorted([(record.term, record.rank, record.video_id) async for record in crawl])
+
+    assert asyncio.run(run()) == [("24h", 1, "sm1"), ("hour", 1, "sm1"), ("hour", 101, "sm2")]
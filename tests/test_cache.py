@@ -0,0 +1,175 @@
+"""Tests for the response cache."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import requests
+
+from niconico import NicoNico
+from niconico.cache import CacheEntry, CachePolicy, MemoryCache, SQLiteCache
+from niconico.objects.nvapi import NvAPIResponse
+from niconico.utils import parse_response
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+GENRES_URL = "https://nvapi.nicovideo.jp/v2/genres"
+USER_URL = "https://nvapi.nicovideo.jp/v1/users/4"
+
+
+def _entry(content: bytes = b"{}", *, ttl: float = 60) -> CacheEntry:
+    """Return a JSON response entry."""
+    return CacheEntry(
+        url=GENRES_URL,
+        status_code=requests.codes.ok,
+        headers={"Content-Type": "application/json; charset=utf-8"},
+        content=content,
+        expires_at=time.time() + ttl,
+    )
+
+
+class DummySession:
+    """Answer GET requests with a JSON body and record them."""
+
+    def __init__(self, status_code: int = requests.codes.ok, *, etag: str | None = None) -> None:
+        """Initialize the recorded requests."""
+        self.status_code = status_code
+        self.etag = etag
+        self.urls: list[str] = []
+        self.headers: list[dict[str, str]] = []
+
+    def get(self, url: str, *, headers: dict[str, str]) -> requests.Response:
+        """Return a JSON response, or 304 Not Modified if the ETag matches."""
+        self.urls.append(url)
+        self.headers.append(headers)
+        res = requests.Response()
+        res.url = url
+        if self.etag is not None:
+            res.headers["ETag"] = self.etag
+            if headers.get("If-None-Match") == self.etag:
+                res.status_code = requests.codes.not_modified
+                res._content = b""  # noqa: SLF001
+                return res
+        res.status_code = self.status_code
+        res.headers["Content-Type"] = "application/json"
+        res._content = b'{"meta": {"status": 200}, "data": null}'  # noqa: SLF001
+        return res
+
+
+def test_memory_cache_evicts_least_recently_used_entries() -> None:
+    """Reading an entry keeps it, the least recently used one is evicted."""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", _entry())
+    cache.set("b", _entry())
+    cache.get("a")
+    cache.set("c", _entry())
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_memory_cache_is_bounded_by_body_size() -> None:
+    """Entries are evicted once the stored bodies exceed max_bytes."""
+    cache = MemoryCache(max_bytes=10)
+    cache.set("a", _entry(b"x" * 6))
+    cache.set("b", _entry(b"x" * 6))
+    cache.set("huge", _entry(b"x" * 11))
+
+    assert len(cache) == 1
+    assert cache.get("b") is not None
+
+
+def test_sqlite_cache_round_trips_and_evicts(tmp_path: Path) -> None:
+    """Entries survive reopening the database and the oldest one is evicted."""
+    path = tmp_path / "cache.sqlite3"
+    cache = SQLiteCache(path, max_entries=1)
+    cache.set("a", _entry())
+    cache.set("b", _entry(b'{"b": 1}'))
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    entry = reopened.get("b")
+    assert reopened.get("a") is None
+    assert entry is not None
+    assert entry.to_response().json() == {"b": 1}
+    reopened.close()
+
+
+def test_get_serves_repeated_requests_from_the_cache() -> None:
+    """A cached endpoint is requested once while its entry is fresh."""
+    client = NicoNico(cache=MemoryCache())
+    session = DummySession()
+    client.session = session  # type: ignore[assignment]
+
+    first = client.get(GENRES_URL)
+    second = client.get(GENRES_URL)
+
+    assert session.urls == [GENRES_URL]
+    assert second.json() == first.json()
+
+
+def test_changing_a_cached_result_does_not_change_the_next_one() -> None:
+    """Each cache hit is parsed into its own object, so callers cannot see each other's changes."""
+    client = NicoNico(cache=MemoryCache())
+    session = DummySession()
+    client.session = session  # type: ignore[assignment]
+
+    first = parse_response(client.get(GENRES_URL), NvAPIResponse[None])
+    first.meta.status = requests.codes.not_found
+    second = parse_response(client.get(GENRES_URL), NvAPIResponse[None])
+
+    assert session.urls == [GENRES_URL]
+    assert second.meta.status == requests.codes.ok
+
+
+def test_get_skips_uncached_endpoints_errors_and_logged_in_requests() -> None:
+    """Endpoints without a rule, failed responses and logged in requests are not cached."""
+    client = NicoNico(cache=MemoryCache(), cache_policy=CachePolicy(rules=[(r"/v2/genres$", 60)]))
+    session = DummySession()
+    client.session = session  # type: ignore[assignment]
+
+    client.get(USER_URL)
+    client.get(USER_URL)
+    client.logined = True
+    client.get(GENRES_URL)
+    client.get(GENRES_URL)
+    client.logined = False
+    session.status_code = requests.codes.not_found
+    client.get(GENRES_URL)
+    client.get(GENRES_URL)
+
+    assert session.urls == [USER_URL] * 2 + [GENRES_URL] * 4
+
+
+def test_stale_entries_are_revalidated_and_serve_the_stored_body() -> None:
+    """A 304 answer to a conditional request serves the stored body."""
+    client = NicoNico(cache=MemoryCache(), cache_policy=CachePolicy(rules=[]))
+    session = DummySession(etag='"v1"')
+    client.session = session  # type: ignore[assignment]
+
+    first = parse_response(client.get(USER_URL), NvAPIResponse[None])
+    res = client.get(USER_URL)
+    second = parse_response(res, NvAPIResponse[None])
+
+    assert res.status_code == requests.codes.ok
+    assert second == first
+    assert "If-None-Match" not in session.headers[0]
+    assert session.headers[1]["If-None-Match"] == '"v1"'
+
+
+def test_signed_asset_urls_share_validators_across_signatures() -> None:
+    """Signed asset URLs are keyed without their query string, even when logged in."""
+    client = NicoNico(cache=MemoryCache())
+    client.logined = True
+    session = DummySession(etag='"board"')
+    client.session = session  # type: ignore[assignment]
+    base_url = "https://asset.domand.nicovideo.jp/storyboard/sm9.json"
+
+    client.get(f"{base_url}?Signature=first")
+    res = client.get(f"{base_url}?Signature=second")
+
+    assert res.json() == {"meta": {"status": 200}, "data": None}
+    assert session.headers[1]["If-None-Match"] == '"board"'
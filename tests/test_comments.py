@@ -0,0 +1,217 @@
+"""Tests for walking through every comment of a video."""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import requests
+
+from niconico.exceptions import CommentAPIError
+from niconico.objects.video.watch import Comment, NvCommentData
+from niconico.video.comments import CommentBatch
+from niconico.video.watch import VideoWatchClient
+
+SERVER = "https://public.nvcomment.nicovideo.jp"
+PAGE_SIZE = 100
+FORK_SIZES = {"owner": 3, "main": 250, "easy": 30}
+POSTED_AT = int(datetime(2024, 1, 1, tzinfo=UTC).timestamp())
+
+
+def _comment(no: int) -> dict[str, Any]:
+    """Return a comment payload posted two comments per second."""
+    return {
+        "body": f"comment {no}",
+        "commands": [],
+        "id": str(no),
+        "isMyPost": False,
+        "isPremium": False,
+        "nicoruCount": 0,
+        "no": no,
+        "postedAt": datetime.fromtimestamp(POSTED_AT + no // 2, tz=UTC).isoformat(),
+        "score": 0,
+        "source": "leaf",
+        "userId": "user",
+        "vposMs": 0,
+    }
+
+
+class DummyResponse:
+    """Minimal response object for client tests."""
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        """Initialize the response payload."""
+        self._payload = payload
+        self.status_code = requests.codes.ok
+
+    def json(self) -> dict[str, Any]:
+        """Return a JSON payload."""
+        return self._payload
+
+    @property
+    def content(self) -> bytes:
+        """Return the encoded JSON payload."""
+        return json.dumps(self._payload).encode()
+
+
+class DummyNicoNico:
+    """Answer the comment API like the server, paging back with the when parameter."""
+
+    logined = False
+    premium = False
+    logger = logging.getLogger("niconico.py")
+
+    def __init__(self, *, expire_at: int | None = None, fail: bool = False, empty: bool = False) -> None:
+        """Initialize the requests sent and the failures to simulate."""
+        self.requests: list[dict[str, Any]] = []
+        self.expire_at = expire_at
+        self.fail = fail
+        self.empty = empty
+
+    def get(self, url: str, *, headers: dict[str, str] | None = None) -> DummyResponse:
+        """Answer the thread key endpoint."""
+        _ = url, headers
+        return DummyResponse({"meta": {"status": 200}, "data": {"threadKey": "refreshed"}})
+
+    def post(self, url: str, *, data: str, headers: dict[str, str] | None = None) -> DummyResponse:
+        """Answer the threads endpoint."""
+        _ = url, headers
+        payload = json.loads(data)
+        self.requests.append(payload)
+        if self.fail:
+            return DummyResponse({"meta": {"status": 503, "errorCode": "SERVICE_UNAVAILABLE"}, "data": None})
+        if self.empty:
+            return DummyResponse({"meta": {"status": 200}, "data": None})
+        if len(self.requests) == self.expire_at and payload["threadKey"] != "refreshed":
+            return DummyResponse({"meta": {"status": 400, "errorCode": "EXPIRED_TOKEN"}, "data": None})
+        when = payload["additionals"]["when"]
+        threads = []
+        for target in payload["params"]["targets"]:
+            comments = [_comment(no) for no in range(1, FORK_SIZES[target["fork"]] + 1)]
+            if target["fork"] != "owner":
+                comments = [comment for comment in comments if POSTED_AT + comment["no"] // 2 <= when][-PAGE_SIZE:]
+            threads.append({"id": "1", "fork": target["fork"], "commentCount": len(comments), "comments": comments})
+        return DummyResponse({"meta": {"status": 200}, "data": {"globalComments": [], "threads": threads}})
+
+
+def _watch_data() -> SimpleNamespace:
+    """Return the part of the watch data the comment API needs."""
+    nv_comment = NvCommentData.model_validate(
+        {
+            "threadKey": "initial",
+            "server": SERVER,
+            "params": {
+                "targets": [{"id": "1", "fork": "owner"}, {"id": "1", "fork": "main"}, {"id": "1", "fork": "easy"}],
+                "language": "ja-jp",
+            },
+        },
+    )
+    return SimpleNamespace(comment=SimpleNamespace(nv_comment=nv_comment), client=SimpleNamespace(watch_id="sm9"))
+
+
+def test_iter_all_comments_walks_every_fork_once() -> None:
+    """Every comment of every fork is yielded exactly once, and the owner thread is fetched once."""
+    niconico = DummyNicoNico()
+    client = VideoWatchClient(niconico)  # type: ignore[arg-type]
+
+    comments = list(client.iter_all_comments(_watch_data(), min_interval=0))  # type: ignore[arg-type]
+
+    for fork, size in FORK_SIZES.items():
+        numbers = [comment.no for comment_fork, comment in comments if comment_fork == fork]
+        assert sorted(numbers) == list(range(1, size + 1))
+        assert numbers == sorted(numbers, reverse=True)
+    assert sum(1 for request in niconico.requests if {"id": "1", "fork": "owner"} in request["params"]["targets"]) == 1
+
+
+def test_iter_all_comments_refreshes_an_expired_thread_key() -> None:
+    """An EXPIRED_TOKEN error fetches a new thread key and retries the request."""
+    niconico = DummyNicoNico(expire_at=2)
+    client = VideoWatchClient(niconico)  # type: ignore[arg-type]
+
+    comments = list(client.iter_all_comments(_watch_data(), min_interval=0))  # type: ignore[arg-type]
+
+    assert len(comments) == sum(FORK_SIZES.values())
+    assert niconico.requests[-1]["threadKey"] == "refreshed"
+
+
+def test_iter_all_comments_gives_up_after_repeated_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The last error is raised once the failures run out, after backing off."""
+    sleeps: list[float] = []
+    monkeypatch.setattr("niconico.video.watch.time.sleep", sleeps.append)
+    client = VideoWatchClient(DummyNicoNico(fail=True))  # type: ignore[arg-type]
+
+    with pytest.raises(CommentAPIError, match="SERVICE_UNAVAILABLE"):
+        list(client.iter_all_comments(_watch_data(), min_interval=0, max_interval=4, max_failures=3))  # type: ignore[arg-type]
+
+    assert sleeps == [1.0, 2.0, 4.0]
+
+
+def test_iter_all_comments_explains_batches_missing_without_an_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Responses without data and without an error code still give up with a message."""
+    monkeypatch.setattr("niconico.video.watch.time.sleep", lambda _: None)
+    client = VideoWatchClient(DummyNicoNico(empty=True))  # type: ignore[arg-type]
+
+    with pytest.raises(CommentAPIError, match="unavailable after 3 attempts") as excinfo:
+        list(client.iter_all_comments(_watch_data(), min_interval=0, max_failures=2))  # type: ignore[arg-type]
+
+    assert excinfo.value.message is not None
+
+
+def _threads() -> list[dict[str, Any]]:
+    """Return raw threads posted in Japan Standard Time, with repeated users and commands."""
+    comments = [
+        _comment(no) | {"postedAt": f"2024-01-01T09:00:0{no}+09:00", "userId": f"user{no % 2}", "commands": ["big"]}
+        for no in range(1, 4)
+    ]
+    return [{"id": "1", "fork": "main", "commentCount": len(comments), "comments": comments}]
+
+
+def test_comment_batch_stores_columns_and_builds_rows() -> None:
+    """Rows rebuild the same comments the model parses, and repeated values are interned."""
+    threads = _threads()
+    batch = CommentBatch.from_threads(threads)
+
+    assert len(batch) == len(threads[0]["comments"])
+    assert list(batch.no) == [1, 2, 3]
+    assert batch.posted_at[0] == POSTED_AT * 1000 + 1000
+    assert len(batch.user_ids) == len({"user0", "user1"})
+    assert len(batch.command_sets) == 1
+    assert list(batch) == [Comment.model_validate(comment) for comment in threads[0]["comments"]]
+    assert batch.fork_of(0) == "main"
+
+
+def test_comment_batch_take_and_extend_reintern_values() -> None:
+    """Rows copied between batches keep their values."""
+    batch = CommentBatch.from_threads(_threads())
+    picked = batch.take([2, 0])
+    picked.extend(batch.take([1]))
+
+    assert [comment.no for comment in picked] == [3, 1, 2]
+    assert [comment.user_id for comment in picked] == ["user1", "user1", "user0"]
+
+
+def test_comment_batch_exports_to_numpy() -> None:
+    """Columns become typed NumPy arrays."""
+    np = pytest.importorskip("numpy")
+    columns = CommentBatch.from_threads(_threads()).to_numpy()
+
+    assert columns["no"].dtype == np.int64
+    assert columns["posted_at"][0] == np.datetime64("2024-01-01T00:00:01", "ms")
+    assert list(columns["user_id"]) == ["user1", "user0", "user1"]
+    assert list(columns["id"]) == ["1", "2", "3"]
+
+
+def test_comment_batch_exports_to_arrow() -> None:
+    """Interned columns become dictionary-encoded Arrow columns."""
+    pa = pytest.importorskip("pyarrow")
+    table = CommentBatch.from_threads(_threads()).to_arrow()
+
+    assert table.num_rows == len(_threads()[0]["comments"])
+    assert table.column("no").to_pylist() == [1, 2, 3]
+    assert pa.types.is_dictionary(table.column("user_id").type)
+    assert table.column("commands").to_pylist() == [["big"], ["big"], ["big"]]
+    assert table.column("is_premium").to_pylist() == [False, False, False]
@@ -0,0 +1,61 @@
+"""Tests for the store of video counters."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from niconico.counters import CounterSample, CounterStore, decode_varints, encode_varints
+from niconico.objects.video import EssentialVideo
+from tests.helpers import video_payload
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+STEP = timedelta(minutes=10)
+CHUNK_SAMPLES = 2
+POLLS = 5
+
+
+def _video(video_id: str, view: int) -> EssentialVideo:
+    """Return a video with the given view count."""
+    return EssentialVideo.model_validate(video_payload(video_id, view))
+
+
+def test_varints_round_trip() -> None:
+    """Negative and large integers are decoded back."""
+    values = [0, 1, -1, 63, -64, 64, 300, -300, 2**40, -(2**40)]
+
+    assert decode_varints(encode_varints(values)) == values
+    assert len(encode_varints([0, 1, -1])) == len([0, 1, -1])
+
+
+def test_unchanged_counters_are_not_stored(tmp_path: Path) -> None:
+    """Only the samples whose counters changed are stored, and older samples are skipped."""
+    with CounterStore(tmp_path / "counters.db") as store:
+        assert store.add([_video("sm9", 1), _video("sm10", 1), _video("sm9", 2)], START) == len(["sm9", "sm10"])
+        assert store.add([_video("sm9", 1), _video("sm10", 2)], START + STEP) == 1
+        assert store.add([_video("sm9", 3)], START) == 0
+
+        assert store.video_ids() == ["sm9", "sm10"]
+        assert store.history("sm10") == [
+            CounterSample(START, 1, 2, 3, 4),
+            CounterSample(START + STEP, 2, 2, 3, 4),
+        ]
+        assert store.latest("sm9") == CounterSample(START, 1, 2, 3, 4)
+        assert store.latest("sm1") is None
+
+
+def test_history_reads_a_range_across_chunks(tmp_path: Path) -> None:
+    """Samples split into several chunks are read back within the range, and kept across runs."""
+    path = tmp_path / "counters.db"
+    with CounterStore(path, chunk_samples=CHUNK_SAMPLES) as store:
+        for poll in range(POLLS):
+            store.add([_video("sm9", 100 + poll * 1000)], START + STEP * poll)
+
+    with CounterStore(path, chunk_samples=CHUNK_SAMPLES) as store:
+        views = [sample.view for sample in store.history("sm9", START + STEP, START + STEP * 3)]
+        assert views == [1100, 2100, 3100]
+        assert len(store.history("sm9")) == POLLS
+        assert store.history("sm1") == []
@@ -0,0 +1,210 @@
+"""Tests for the bulk download manager and its limits."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+import requests
+
+from niconico.aio import DownloadManager, DownloadTask
+from niconico.base.throttle import HostLimiter, TokenBucket
+from niconico.exceptions import NicoAPIError
+from niconico.video.hls import TrackFilesMuxer
+
+if TYPE_CHECKING:
+    from niconico.video.hls import AsyncHLSDownloader
+
+BASE_URL = "https://delivery.domand.nicovideo.jp/hlsbid/"
+SEGMENT_COUNT = 3
+RATE = 100.0
+MAX_PER_HOST = 2
+
+
+def _contents(video_id: str) -> dict[str, bytes]:
+    """Return the files of an unencrypted audio-only stream."""
+    segments = "".join(f"#EXTINF:6.0,\n{number}.cmf\n" for number in range(SEGMENT_COUNT))
+    contents = {
+        f"{BASE_URL}{video_id}/master.m3u8": (
+            b'#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=64000,CODECS="mp4a.40.2"\naudio.m3u8\n'
+        ),
+        f"{BASE_URL}{video_id}/audio.m3u8": f"#EXTM3U\n{segments}#EXT-X-ENDLIST\n".encode(),
+    }
+    for number in range(SEGMENT_COUNT):
+        contents[f"{BASE_URL}{video_id}/{number}.cmf"] = f"{video_id}-{number};".encode()
+    return contents
+
+
+class DummyWatchClient:
+    """Stand in for the watch client, downloading from the served streams."""
+
+    def __init__(self, started: list[str]) -> None:
+        """Initialize the order the videos are started in."""
+        self.started = started
+        self.gates: dict[str, asyncio.Event] = {}
+
+    async def get_watch_data(self, video_id: str, *, lazy: bool = False) -> str:
+        """Return the video ID as the watch data once its gate opens, or fail for a deleted video."""
+        assert lazy
+        self.started.append(video_id)
+        if video_id in self.gates:
+            await self.gates[video_id].wait()
+        if video_id == "sm0":
+            message = "The video was deleted."
+            raise NicoAPIError(message=message)
+        return video_id
+
+    def get_outputs(self, watch_data: str, *, audio_only: bool = False) -> dict[str, list[str]]:
+        """Return a single output."""
+        _ = watch_data, audio_only
+        return {"64kbps": ["audio-aac-64kbps"]}
+
+    async def download_video(
+        self,
+        watch_data: str,
+        output_label: str,
+        output_path: str,
+        *,
+        audio_only: bool,
+        muxer: TrackFilesMuxer,
+        downloader: AsyncHLSDownloader,
+    ) -> str:
+        """Download the served stream of a video."""
+        _ = output_label, audio_only
+        output_path = output_path % {"id": watch_data, "ext": "m4a"}
+        await downloader.download(f"{BASE_URL}{watch_data}/master.m3u8", output_path, muxer)
+        return output_path
+
+
+class DummyNicoNico:
+    """Serve the streams of a few videos."""
+
+    def __init__(self, video_ids: list[str]) -> None:
+        """Initialize the served streams."""
+        contents: dict[str, bytes] = {}
+        for video_id in video_ids:
+            contents.update(_contents(video_id))
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            url = str(request.url)
+            if url not in contents:
+                return httpx.Response(requests.codes.not_found)
+            return httpx.Response(requests.codes.ok, content=contents[url])
+
+        self.started: list[str] = []
+        self.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.watch = DummyWatchClient(self.started)
+        self.video = type("DummyVideoClient", (), {"watch": self.watch})()
+        self.logger = type("DummyLogger", (), {"warning": lambda *_args, **_kwargs: None})()
+
+
+def test_manager_runs_tasks_by_priority_and_reports_progress(tmp_path: Path) -> None:
+    """Higher priority tasks start first, and every segment is reported."""
+    niconico = DummyNicoNico(["sm1", "sm2"])
+    events: list[tuple[str, str, int]] = []
+
+    def on_progress(task: DownloadTask) -> None:
+        events.append((task.video_id, task.state, task.completed_segments))
+
+    manager = DownloadManager(
+        niconico,  # type: ignore[arg-type]
+        max_concurrent_downloads=1,
+        muxer=TrackFilesMuxer(),
+        on_progress=on_progress,
+    )
+    low = manager.add("sm1", str(tmp_path / "%(id)s.%(ext)s"))
+    high = manager.add("sm2", str(tmp_path / "%(id)s.%(ext)s"), priority=1)
+
+    tasks = asyncio.run(manager.run())
+
+    assert tasks == [low, high]
+    assert niconico.started == ["sm2", "sm1"]
+    assert [task.state for task in tasks] == ["completed", "completed"]
+    assert high.completed_segments == high.total_segments == SEGMENT_COUNT
+    assert Path(str(high.result)).read_bytes() == b"sm2-0;sm2-1;sm2-2;"
+    assert high.downloaded_bytes == len(b"sm2-0;sm2-1;sm2-2;")
+    assert ("sm2", "downloading", SEGMENT_COUNT) in events
+    assert events[-1] == ("sm1", "completed", SEGMENT_COUNT)
+
+
+def test_manager_keeps_going_after_a_failed_task(tmp_path: Path) -> None:
+    """A failure is recorded on its task without stopping the others."""
+    niconico = DummyNicoNico(["sm1"])
+    manager = DownloadManager(niconico, muxer=TrackFilesMuxer())  # type: ignore[arg-type]
+    deleted = manager.add("sm0", str(tmp_path / "%(id)s.%(ext)s"))
+    available = manager.add("sm1", str(tmp_path / "%(id)s.%(ext)s"))
+
+    asyncio.run(manager.run())
+
+    assert deleted.state == "failed"
+    assert isinstance(deleted.error, NicoAPIError)
+    assert available.state == "completed"
+
+
+def test_manager_starts_videos_added_while_running(tmp_path: Path) -> None:
+    """A video added after the queue ran empty starts on an idle slot, without waiting for the others."""
+    niconico = DummyNicoNico(["sm1", "sm2"])
+    gate = niconico.watch.gates["sm1"] = asyncio.Event()
+
+    def on_progress(task: DownloadTask) -> None:
+        if task.video_id == "sm2" and task.state == "preparing":
+            gate.set()
+
+    manager = DownloadManager(
+        niconico,  # type: ignore[arg-type]
+        max_concurrent_downloads=2,
+        muxer=TrackFilesMuxer(),
+        on_progress=on_progress,
+    )
+    manager.add("sm1", str(tmp_path / "%(id)s.%(ext)s"))
+
+    async def run() -> list[DownloadTask]:
+        running = asyncio.ensure_future(manager.run())
+        await asyncio.sleep(0.01)
+        manager.add("sm2", str(tmp_path / "%(id)s.%(ext)s"))
+        return await asyncio.wait_for(running, timeout=5)
+
+    tasks = asyncio.run(run())
+
+    assert niconico.started == ["sm1", "sm2"]
+    assert [task.state for task in tasks] == ["completed", "completed"]
+
+
+def test_token_bucket_goes_into_debt() -> None:
+    """Taking more tokens than held asks the caller to wait for the difference."""
+    bucket = TokenBucket(RATE)
+
+    assert bucket.reserve(RATE) == 0
+    assert bucket.reserve(RATE / 2) == pytest.approx(0.5, abs=0.01)
+
+
+def test_token_bucket_rejects_a_non_positive_rate() -> None:
+    """A bucket that is never refilled is a configuration error."""
+    with pytest.raises(ValueError, match="rate"):
+        TokenBucket(0)
+
+
+def test_host_limiter_bounds_requests_to_a_host() -> None:
+    """No more than max_per_host slots of a host are held at once."""
+    limiter = HostLimiter(MAX_PER_HOST)
+    in_flight: dict[str, int] = {}
+    peaks: dict[str, int] = {}
+
+    async def request(url: str) -> None:
+        host = httpx.URL(url).host
+        async with limiter.slot(url):
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peaks[host] = max(peaks.get(host, 0), in_flight[host])
+            await asyncio.sleep(0)
+            in_flight[host] -= 1
+
+    async def run() -> None:
+        urls = [f"https://{host}.example.com/{number}" for host in ("a", "b") for number in range(5)]
+        await asyncio.gather(*(request(url) for url in urls))
+
+    asyncio.run(run())
+
+    assert peaks == {"a.example.com": MAX_PER_HOST, "b.example.com": MAX_PER_HOST}
@@ -0,0 +1,300 @@
+"""Tests for the native HLS downloader."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+import requests
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from niconico import NicoNico
+from niconico.exceptions import AccessRightExpiredError, DownloadError
+from niconico.video.hls import (
+    AsyncHLSDownloader,
+    HLSDownloader,
+    TrackFilesMuxer,
+    decrypt_segment,
+    parse_master_playlist,
+    parse_media_playlist,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+BASE_URL = "https://delivery.domand.nicovideo.jp/hlsbid/sm9/"
+KEY = bytes(range(16))
+IV = bytes(16)
+SEGMENT_COUNT = 6
+SERVED_BEFORE_CRASH = 3
+
+MASTER_PLAYLIST = """#EXTM3U
+#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="audio-aac-64kbps",NAME="Main Audio",URI="audio.m3u8"
+#EXT-X-STREAM-INF:BANDWIDTH=300000,CODECS="avc1.4d401e,mp4a.40.2",AUDIO="audio-aac-64kbps"
+low.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=900000,CODECS="avc1.4d401f,mp4a.40.2",AUDIO="audio-aac-64kbps"
+high.m3u8
+"""
+
+
+def _media_playlist(name: str) -> str:
+    """Return an encrypted fragmented MP4 media playlist."""
+    return f"""#EXTM3U
+#EXT-X-MEDIA-SEQUENCE:1
+#EXT-X-KEY:METHOD=AES-128,URI="key",IV=0x{IV.hex()}
+#EXT-X-MAP:URI="{name}/init.cmf"
+#EXTINF:6.0,
+{name}/1.cmf
+#EXTINF:6.0,
+{name}/2.cmf
+#EXT-X-ENDLIST
+"""
+
+
+def _encrypt(data: bytes) -> bytes:
+    """Encrypt data the way the delivery server does."""
+    padder = padding.PKCS7(128).padder()
+    encryptor = Cipher(algorithms.AES(KEY), modes.CBC(IV)).encryptor()
+    return encryptor.update(padder.update(data) + padder.finalize()) + encryptor.finalize()
+
+
+def _contents() -> dict[str, bytes]:
+    """Return the files served for the master playlist."""
+    contents = {
+        f"{BASE_URL}high.m3u8": _media_playlist("video").encode(),
+        f"{BASE_URL}audio.m3u8": _media_playlist("audio").encode(),
+        f"{BASE_URL}key": KEY,
+        f"{BASE_URL}master.m3u8": MASTER_PLAYLIST.encode(),
+    }
+    for track in ("video", "audio"):
+        for name in ("init", "1", "2"):
+            contents[f"{BASE_URL}{track}/{name}.cmf"] = _encrypt(f"{track}-{name};".encode())
+    return contents
+
+
+class DummySession:
+    """Serve the files of a stream."""
+
+    def __init__(self) -> None:
+        """Initialize the served files."""
+        self.contents = _contents()
+        self.urls: list[str] = []
+
+    def get(self, url: str, *, headers: dict[str, str]) -> requests.Response:
+        """Return a served file, or 404."""
+        _ = headers
+        self.urls.append(url)
+        res = requests.Response()
+        res.status_code = requests.codes.ok if url in self.contents else requests.codes.not_found
+        res._content = self.contents.get(url, b"")  # noqa: SLF001
+        return res
+
+
+def test_parse_master_playlist_picks_the_best_variant_and_its_audio() -> None:
+    """The highest bandwidth variant is downloaded with its audio rendition."""
+    tracks = parse_master_playlist(MASTER_PLAYLIST, f"{BASE_URL}master.m3u8")
+
+    assert [(track.kind, track.uri) for track in tracks] == [
+        ("video", f"{BASE_URL}high.m3u8"),
+        ("audio", f"{BASE_URL}audio.m3u8"),
+    ]
+
+
+def test_parse_media_playlist_resolves_segments_and_keys() -> None:
+    """Segments keep the key declared before them, and the map is the init section."""
+    playlist = parse_media_playlist(_media_playlist("video"), f"{BASE_URL}high.m3u8")
+
+    assert playlist.init is not None
+    assert playlist.init.uri == f"{BASE_URL}video/init.cmf"
+    assert [segment.uri for segment in playlist.segments] == [f"{BASE_URL}video/1.cmf", f"{BASE_URL}video/2.cmf"]
+    assert [segment.sequence for segment in playlist.segments] == [1, 2]
+    assert all(segment.key is not None and segment.key.uri == f"{BASE_URL}key" for segment in playlist.segments)
+    assert playlist.segments[0].iv == IV
+
+
+def test_decrypt_segment_removes_padding() -> None:
+    """AES-128 segments decrypt to their original bytes."""
+    assert decrypt_segment(_encrypt(b"segment"), KEY, IV) == b"segment"
+
+
+def test_download_writes_decrypted_tracks(tmp_path: Path) -> None:
+    """Every segment is fetched, decrypted and concatenated after the init section."""
+    session = DummySession()
+    output_path = tmp_path / "sm9.mp4"
+
+    result = HLSDownloader(session, max_workers=4).download(  # type: ignore[arg-type]
+        f"{BASE_URL}master.m3u8",
+        output_path,
+        TrackFilesMuxer(),
+    )
+
+    assert result == output_path
+    assert output_path.read_bytes() == b"video-init;video-1;video-2;"
+    assert (tmp_path / "sm9.audio.m4a").read_bytes() == b"audio-init;audio-1;audio-2;"
+    assert session.urls.count(f"{BASE_URL}key") == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["sm9.audio.m4a", "sm9.mp4"]
+
+
+def test_download_without_ffmpeg_needs_an_explicit_muxer(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a muxer and without ffmpeg, the download fails before anything is fetched."""
+    monkeypatch.setattr("niconico.video.hls.shutil.which", lambda _: None)
+    session = DummySession()
+
+    with pytest.raises(DownloadError, match="ffmpeg"):
+        HLSDownloader(session).download(f"{BASE_URL}master.m3u8", tmp_path / "sm9.mp4")  # type: ignore[arg-type]
+
+    assert session.urls == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_video_async_prepares_the_download_off_the_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The blocking requests granting the access right are not sent from the event loop thread."""
+    client = NicoNico()
+    threads: list[threading.Thread] = []
+
+    def prepare(*_: object, **__: object) -> tuple[str, str]:
+        threads.append(threading.current_thread())
+        msg = "The output label is not available."
+        raise DownloadError(message=msg)
+
+    monkeypatch.setattr(client.video.watch, "_prepare_download", prepare)
+
+    with pytest.raises(DownloadError):
+        asyncio.run(client.video.watch.download_video_async(object(), "1080p", muxer=TrackFilesMuxer()))  # type: ignore[arg-type]
+
+    assert threads
+    assert threads[0] is not threading.main_thread()
+
+
+def test_async_download_writes_decrypted_tracks(tmp_path: Path) -> None:
+    """The asynchronous downloader produces the same files."""
+    contents = _contents()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        if url not in contents:
+            return httpx.Response(requests.codes.not_found)
+        return httpx.Response(requests.codes.ok, content=contents[url])
+
+    async def run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await AsyncHLSDownloader(client).download(f"{BASE_URL}master.m3u8", tmp_path / "sm9.mp4", TrackFilesMuxer())
+
+    asyncio.run(run())
+
+    assert (tmp_path / "sm9.mp4").read_bytes() == b"video-init;video-1;video-2;"
+    assert (tmp_path / "sm9.audio.m4a").read_bytes() == b"audio-init;audio-1;audio-2;"
+
+
+def test_async_download_wraps_transport_errors(tmp_path: Path) -> None:
+    """A connection error is raised as a DownloadError, like the synchronous downloader does."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        msg = "Connection reset"
+        raise httpx.ConnectError(msg, request=request)
+
+    async def run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await AsyncHLSDownloader(client).download(f"{BASE_URL}master.m3u8", tmp_path / "sm9.mp4", TrackFilesMuxer())
+
+    with pytest.raises(DownloadError, match="Connection reset"):
+        asyncio.run(run())
+
+
+class InterruptedSession(DummySession):
+    """Fail once a number of segments were served, like a preempted job."""
+
+    def __init__(self, served_segments: int) -> None:
+        """Initialize the number of segments served before failing."""
+        super().__init__()
+        self.served_segments = served_segments
+
+    def get(self, url: str, *, headers: dict[str, str]) -> requests.Response:
+        """Return a served file, or fail once the budget is spent."""
+        if url.endswith(".cmf"):
+            if self.served_segments == 0:
+                message = "connection reset"
+                raise requests.ConnectionError(message)
+            self.served_segments -= 1
+        return super().get(url, headers=headers)
+
+
+def test_download_resumes_from_verified_segments(tmp_path: Path) -> None:
+    """A restarted download only fetches the segments that were not saved intact."""
+    output_path = tmp_path / "sm9.mp4"
+    with pytest.raises(DownloadError):
+        HLSDownloader(InterruptedSession(SERVED_BEFORE_CRASH), max_workers=1).download(  # type: ignore[arg-type]
+            f"{BASE_URL}master.m3u8",
+            output_path,
+            TrackFilesMuxer(),
+        )
+    work_dir = HLSDownloader.work_dir_for(output_path)
+    assert (work_dir / "manifest.json").exists()
+    saved = sorted(work_dir.glob("*/*.seg"))
+    assert len(saved) == SERVED_BEFORE_CRASH
+    saved[0].write_bytes(b"corrupted")
+
+    session = DummySession()
+    HLSDownloader(session, max_workers=1).download(  # type: ignore[arg-type]
+        f"{BASE_URL}master.m3u8",
+        output_path,
+        TrackFilesMuxer(),
+    )
+
+    assert output_path.read_bytes() == b"video-init;video-1;video-2;"
+    assert (tmp_path / "sm9.audio.m4a").read_bytes() == b"audio-init;audio-1;audio-2;"
+    segment_urls = [url for url in session.urls if url.endswith(".cmf")]
+    assert len(segment_urls) == SEGMENT_COUNT - SERVED_BEFORE_CRASH + 1
+    assert not work_dir.exists()
+
+
+def test_download_refreshes_an_expired_access_right(tmp_path: Path) -> None:
+    """Segments answered with 403 make the downloader ask for a new master playlist URL."""
+    session = DummySession()
+    expired = {url: content for url, content in session.contents.items() if url.endswith(".cmf")}
+    session.contents = {url: content for url, content in session.contents.items() if url not in expired}
+    refreshed_url = f"{BASE_URL}master.m3u8?refreshed"
+
+    class ExpiringSession(DummySession):
+        def get(self, url: str, *, headers: dict[str, str]) -> requests.Response:
+            res = session.get(url.replace("?refreshed", ""), headers=headers)
+            if url.endswith(".cmf") and res.status_code == requests.codes.not_found:
+                res.status_code = requests.codes.forbidden
+            return res
+
+    def refresh() -> str:
+        session.contents.update(expired)
+        return refreshed_url
+
+    HLSDownloader(ExpiringSession(), max_workers=1).download(  # type: ignore[arg-type]
+        f"{BASE_URL}master.m3u8",
+        tmp_path / "sm9.mp4",
+        TrackFilesMuxer(),
+        refresh=refresh,
+    )
+
+    assert (tmp_path / "sm9.mp4").read_bytes() == b"video-init;video-1;video-2;"
+    assert f"{BASE_URL}master.m3u8" in session.urls
+
+
+def test_download_raises_when_the_access_right_cannot_be_refreshed(tmp_path: Path) -> None:
+    """Without a refresh function, an expired access right is reported to the caller."""
+    session = DummySession()
+
+    class ExpiredSession(DummySession):
+        def get(self, url: str, *, headers: dict[str, str]) -> requests.Response:
+            res = session.get(url, headers=headers)
+            if url.endswith(".cmf"):
+                res.status_code = requests.codes.forbidden
+            return res
+
+    with pytest.raises(AccessRightExpiredError):
+        HLSDownloader(ExpiredSession()).download(  # type: ignore[arg-type]
+            f"{BASE_URL}master.m3u8",
+            tmp_path / "sm9.mp4",
+            TrackFilesMuxer(),
+        )
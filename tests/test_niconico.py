@@ -2,13 +2,26 @@
 
 from __future__ import annotations
 
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+import httpx
 import pytest
+import requests
+from requests.adapters import HTTPAdapter
 
 from niconico import NicoNico
+from niconico.base.transport import HTTP2Adapter, TimeoutHTTPAdapter
 from niconico.exceptions import LoginFailureError
 
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 20.0
+POOL_MAXSIZE = 64
+THREADS = 8
+
 
 class DummySession:
     """Capture requests issued by NicoNico."""
@@ -65,7 +78,7 @@ def test_get_sets_frontend_headers_and_allows_overrides() -> None:
     assert url == "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9"
     assert kwargs["headers"]["User-Agent"] == "niconico.py"
     assert kwargs["headers"]["X-Frontend-Id"] == "6"
-    assert kwargs["headers"]["Host"] == "nvapi.nicovideo.jp"
+    assert "Host" not in kwargs["headers"]
     assert kwargs["headers"]["X-Test"] == "1"
 
 
@@ -102,6 +115,34 @@ def test_put_sends_form_data_when_json_is_absent() -> None:
     assert kwargs["headers"]["X-Niconico-Language"] == "ja-jp"
 
 
+def test_request_hooks_see_the_merged_headers() -> None:
+    """Hooks run on every request with the client headers merged, and may change them."""
+    client = NicoNico()
+    session = DummySession()
+    client.session = session  # type: ignore[assignment]
+    client.mutation_headers["X-Niconico-Language"] = "en-us"
+    seen: list[tuple[str, str]] = []
+
+    def hook(method: str, url: str, headers: dict[str, str]) -> None:
+        seen.append((method, url))
+        headers["X-Trace-Id"] = "trace"
+
+    client.request_hooks.append(hook)
+    client.delete("https://nvapi.nicovideo.jp/v1/users/me/mylists/1", headers={"X-Test": "1"})
+    client.get("https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9")
+
+    assert seen == [
+        ("DELETE", "https://nvapi.nicovideo.jp/v1/users/me/mylists/1"),
+        ("GET", "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9"),
+    ]
+    delete_headers = session.calls[0][2]["headers"]
+    assert delete_headers["X-Niconico-Language"] == "en-us"
+    assert delete_headers["X-Test"] == "1"
+    assert delete_headers["X-Trace-Id"] == "trace"
+    assert "X-Niconico-Language" not in session.calls[1][2]["headers"]
+    assert client.mutation_headers.get("X-Trace-Id") is None
+
+
 class DummyCookie:
     """A minimal stand-in for a cookie in a browser cookie jar."""
 
@@ -202,3 +243,151 @@ def test_find_session_cookie_propagates_errors_for_a_named_browser(monkeypatch:
 
     with pytest.raises(LoginFailureError, match="is locked"):
         NicoNico._find_session_cookie("safari")  # noqa: SLF001
+
+
+def test_session_pools_connections_with_a_default_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The session adapter is sized by the constructor and bounds requests sent without a timeout."""
+    sent: list[object] = []
+    monkeypatch.setattr(HTTPAdapter, "send", lambda _self, _request, **kwargs: sent.append(kwargs["timeout"]))
+    client = NicoNico(timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), pool_maxsize=POOL_MAXSIZE)
+    adapter = client.session.get_adapter("https://nvapi.nicovideo.jp/")
+    assert isinstance(adapter, TimeoutHTTPAdapter)
+    assert adapter._pool_maxsize == POOL_MAXSIZE  # type: ignore[attr-defined]  # noqa: SLF001
+
+    request = requests.Request("GET", "https://nvapi.nicovideo.jp/").prepare()
+    adapter.send(request)
+    adapter.send(request, timeout=READ_TIMEOUT)
+
+    assert sent == [(CONNECT_TIMEOUT, READ_TIMEOUT), READ_TIMEOUT]
+
+
+def test_keep_alive_can_be_turned_off() -> None:
+    """Disabling keep-alive asks the server to close each connection."""
+    assert NicoNico().session.headers.get("Connection") != "close"
+    assert NicoNico(keep_alive=False).session.headers["Connection"] == "close"
+
+
+class DummyLoginSession:
+    """Answer the login check with a fixed auth flag, once released."""
+
+    def __init__(self, authflag: str) -> None:
+        """Initialize the cookie jar and the auth flag to answer with."""
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self.authflag = authflag
+        self.release = threading.Event()
+        self.release.set()
+        self.checked: list[str] = []
+
+    def get(self, url: str, *, cookies: dict[str, str]) -> requests.Response:
+        """Record the checked session and answer with the auth flag."""
+        self.release.wait(timeout=5)
+        self.checked.append(cookies["user_session"])
+        res = requests.Response()
+        res.url = url
+        res.status_code = requests.codes.ok
+        res.headers["x-niconico-authflag"] = self.authflag
+        return res
+
+
+def test_login_with_session_stores_the_session_once_checked() -> None:
+    """A valid session is stored with the premium flag, and an invalid one logs out."""
+    client = NicoNico()
+    session = DummyLoginSession("3")
+    client.session = session  # type: ignore[assignment]
+
+    client.login_with_session("user_session_sample")
+    assert (client.logined, client.premium) == (True, True)
+    assert client.get_user_session() == "user_session_sample"
+
+    session.authflag = "0"
+    with pytest.raises(LoginFailureError):
+        client.login_with_session("user_session_expired")
+    assert (client.logined, client.premium) == (False, False)
+    assert client.get_user_session() is None
+
+
+def test_refresh_session_is_sent_once_for_concurrent_threads() -> None:
+    """Threads refreshing the session together share a single check."""
+    client = NicoNico()
+    session = DummyLoginSession("1")
+    client.session = session  # type: ignore[assignment]
+    client.login_with_session("user_session_sample")
+    session.release.clear()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        futures = [executor.submit(client.refresh_session) for _ in range(THREADS)]
+        time.sleep(0.05)
+        session.release.set()
+        for future in futures:
+            future.result()
+
+    assert session.checked == ["user_session_sample"] * 2
+    assert client.logined is True
+
+
+def test_http2_adapter_sends_requests_through_httpx() -> None:
+    """The adapter strips HTTP/1.1 connection headers and returns a requests response."""
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(requests.codes.ok, json={"meta": {"status": 200}}, headers={"X-Test": "1"})
+
+    client = NicoNico(keep_alive=False)
+    client.session.mount("https://nvapi.nicovideo.jp/", HTTP2Adapter(transport=httpx.MockTransport(handler)))
+
+    res = client.post("https://nvapi.nicovideo.jp/v1/users/me/mylists", json={"name": "sample"})
+
+    assert res.status_code == requests.codes.ok
+    assert res.json() == {"meta": {"status": 200}}
+    assert res.headers["x-test"] == "1"
+    assert seen[0].headers["X-Frontend-Id"] == "6"
+    assert seen[0].headers.get("connection") != "close"
+    assert json.loads(seen[0].content) == {"name": "sample"}
+
+
+def test_http2_adapter_stores_response_cookies_in_the_session() -> None:
+    """Cookies set over HTTP/2, such as the one of the HLS access rights, reach the session."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        _ = request
+        return httpx.Response(
+            requests.codes.created,
+            headers=[
+                ("Set-Cookie", "domand_bid=sample; Domain=.nicovideo.jp; Path=/"),
+                ("Set-Cookie", "nicosid=1.2; Domain=.nicovideo.jp; Path=/"),
+            ],
+            json={"meta": {"status": 201}},
+        )
+
+    client = NicoNico()
+    client.session.mount("https://nvapi.nicovideo.jp/", HTTP2Adapter(transport=httpx.MockTransport(handler)))
+
+    res = client.post("https://nvapi.nicovideo.jp/v1/watch/sm9/access-rights/hls?actionTrackId=sample")
+
+    assert res.cookies.get("domand_bid") == "sample"
+    assert client.session.cookies.get("domand_bid") == "sample"
+    assert client.session.cookies.get("nicosid") == "1.2"
+
+
+def test_http2_adapter_raises_requests_errors() -> None:
+    """Transport failures surface as requests exceptions, so retries treat them alike."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        msg = "timed out"
+        raise httpx.ConnectTimeout(msg, request=request)
+
+    client = NicoNico()
+    client.session.mount("https://nvapi.nicovideo.jp/", HTTP2Adapter(transport=httpx.MockTransport(handler)))
+
+    with pytest.raises(requests.Timeout):
+        client.get("https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9")
+
+
+def test_http2_is_mounted_on_the_api_hosts() -> None:
+    """Only the API hosts are requested over HTTP/2."""
+    pytest.importorskip("h2")
+    client = NicoNico(http2=True)
+
+    assert isinstance(client.session.get_adapter("https://nvapi.nicovideo.jp/v1/videos"), HTTP2Adapter)
+    assert isinstance(client.session.get_adapter("https://www.nicovideo.jp/"), TimeoutHTTPAdapter)
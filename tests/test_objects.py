@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
+import pytest
+from pydantic import ValidationError
+from pydantic_core import PydanticSerializationError
+
+from niconico.objects.channel import ChannelData, ChAPIResponse
 from niconico.objects.nvapi import NvAPIResponse, RelationshipUsersData
+from niconico.objects.video.watch import LazyWatchData, WatchAPIErrorData, WatchAPIResponse, WatchData
 
 
 def test_relationship_response_accepts_anonymous_relationships() -> None:
@@ -36,3 +42,46 @@ def test_relationship_response_accepts_anonymous_relationships() -> None:
     assert response.data is not None
     assert response.data.items[0].relationships.session_user is None
     assert response.data.items[0].relationships.is_me is False
+
+
+def test_parametrized_responses_are_cached() -> None:
+    """The parametrized response models are built once and reused."""
+    model = NvAPIResponse.of(RelationshipUsersData)
+
+    assert model is NvAPIResponse.of(RelationshipUsersData)
+    assert model is NvAPIResponse[RelationshipUsersData]
+    assert WatchAPIResponse.of(WatchAPIErrorData) is WatchAPIResponse.of(WatchAPIErrorData)
+    assert ChAPIResponse.of(ChannelData) is ChAPIResponse.of(ChannelData)
+
+
+def test_lazy_watch_data_validates_sections_on_first_access() -> None:
+    """Sections are validated when read, and the ones never read are never validated."""
+    raw = {
+        "client": {"nicosid": None, "watchId": "sm9", "watchTrackId": "track"},
+        "genre": {"key": "music", "label": "Music", "isImmoral": False, "isDisabled": False, "isNotSet": False},
+        "comment": {"broken": True},
+    }
+
+    watch_data = LazyWatchData.from_raw(raw)
+
+    assert isinstance(watch_data, WatchData)
+    assert "client" not in watch_data.__dict__
+    assert watch_data.client.watch_id == "sm9"
+    assert watch_data.client is watch_data.client
+    assert watch_data.genre.key == "music"
+    with pytest.raises(ValidationError):
+        _ = watch_data.comment
+
+
+def test_lazy_watch_data_validates_unread_sections_before_dumping() -> None:
+    """Dumping or printing lazy watch data validates the sections not read yet instead of leaving them out."""
+    raw = {"client": {"nicosid": None, "watchId": "sm9", "watchTrackId": "track"}, "comment": {"broken": True}}
+    watch_data = LazyWatchData.from_raw(raw)
+
+    with pytest.raises(PydanticSerializationError, match="WatchComment"):
+        watch_data.model_dump()
+    with pytest.raises(PydanticSerializationError, match="WatchComment"):
+        watch_data.model_dump_json()
+    with pytest.raises(ValidationError):
+        repr(watch_data)
+    assert watch_data.client.watch_id == "sm9"
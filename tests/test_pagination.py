@@ -0,0 +1,70 @@
+"""Tests for the pagination helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from niconico.base.pagination import aiter_paged_items, iter_paged_items
+
+PAGE_SIZE = 3
+TOTAL_COUNT = 8
+
+
+def _fetch(page: int) -> list[int]:
+    """Return the numbers on a page of a listing of TOTAL_COUNT numbers."""
+    start = (page - 1) * PAGE_SIZE
+    return list(range(start, min(start + PAGE_SIZE, TOTAL_COUNT)))
+
+
+def _has_next(_: list[int], page: int) -> bool:
+    """Tell whether a page of the listing is followed by another one."""
+    return page * PAGE_SIZE < TOTAL_COUNT
+
+
+def test_iter_paged_items_walks_every_page() -> None:
+    """Items of every page are yielded in order."""
+    pages: list[int] = []
+
+    def fetch(page: int) -> list[int]:
+        pages.append(page)
+        return _fetch(page)
+
+    assert list(iter_paged_items(fetch, list, _has_next)) == list(range(TOTAL_COUNT))
+    assert pages == [1, 2, 3]
+
+
+def test_iter_paged_items_stops_on_missing_or_empty_pages() -> None:
+    """A failed or empty page ends the iteration even if more pages are announced."""
+    assert list(iter_paged_items(lambda page: None if page > 1 else [1], list, lambda *_: True)) == [1]
+    assert list(iter_paged_items(lambda page: [] if page > 1 else [1], list, lambda *_: True)) == [1]
+
+
+def test_iter_paged_items_prefetches_the_next_page() -> None:
+    """With prefetch, the next page is requested while the current one is processed."""
+    requested = threading.Event()
+
+    def fetch(page: int) -> list[int]:
+        if page > 1:
+            requested.set()
+        return _fetch(page)
+
+    items = iter_paged_items(fetch, list, _has_next, prefetch=1)
+
+    assert next(items) == 0
+    assert requested.wait(timeout=5)
+    assert list(items) == list(range(1, TOTAL_COUNT))
+
+
+def test_aiter_paged_items_walks_every_page() -> None:
+    """The asynchronous helper yields the same items with or without prefetch."""
+
+    async def fetch(page: int) -> list[int]:
+        await asyncio.sleep(0)
+        return _fetch(page)
+
+    async def collect(prefetch: int) -> list[int]:
+        return [item async for item in aiter_paged_items(fetch, list, _has_next, prefetch=prefetch)]
+
+    assert asyncio.run(collect(0)) == list(range(TOTAL_COUNT))
+    assert asyncio.run(collect(2)) == list(range(TOTAL_COUNT))
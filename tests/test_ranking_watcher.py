@@ -0,0 +1,154 @@
+"""Tests for the ranking watcher."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import requests
+
+from niconico.objects.nvapi import RankingData
+from niconico.video.ranking_watcher import RankEntry, RankingChange, RankingTarget, RankingWatcher, diff_rankings
+from tests.helpers import video_payload
+
+if TYPE_CHECKING:
+    import pytest
+
+TARGET = RankingTarget.genre("all", "hour")
+HOT_TOPICS = RankingTarget.hot_topics("24h")
+PAGES = 3
+INTERVAL = 60.0
+
+
+class DummyRankingClient:
+    """Serve rankings split into pages of (video ID, view count) pairs."""
+
+    def __init__(self, pages: list[list[tuple[str, int]]]) -> None:
+        """Initialize the pages of every ranking."""
+        self.pages = pages
+        self.failing: set[int] = set()
+        self.raising: set[tuple[str, int]] = set()
+        self.calls: list[tuple[str, int]] = []
+
+    def _page(self, kind: str, page: int) -> RankingData | None:
+        """Return a page of the ranking, or None past its end or when it fails."""
+        self.calls.append((kind, page))
+        if (kind, page) in self.raising:
+            msg = "connection reset"
+            raise requests.ConnectionError(msg)
+        if page > len(self.pages) or page in self.failing:
+            return None
+        items = [video_payload(video_id, view) for video_id, view in self.pages[page - 1]]
+        return RankingData.model_validate({"items": items, "hasNext": page < len(self.pages)})
+
+    def get_ranking(self, genre_key: str, term: str, **kwargs: Any) -> RankingData | None:  # noqa: ANN401
+        """Return a page of a genre ranking."""
+        _ = genre_key, term
+        return self._page("genre", kwargs["page"])
+
+    def get_hot_topics(self, term: str, **kwargs: Any) -> RankingData | None:  # noqa: ANN401
+        """Return a page of the hot topics."""
+        _ = term
+        return self._page("hot_topics", kwargs["page"])
+
+
+def _pages(ids: list[str], views: int = 10) -> list[list[tuple[str, int]]]:
+    """Split video IDs into pages of two."""
+    return [[(video_id, views) for video_id in ids[i : i + 2]] for i in range(0, len(ids), 2)]
+
+
+def test_diff_rankings_reports_entries_moves_counters_and_exits() -> None:
+    """Each kind of change is reported once per video."""
+    previous = {"sm1": RankEntry(1, 10, 0, 0, 0), "sm2": RankEntry(2, 10, 0, 0, 0), "sm3": RankEntry(3, 10, 0, 0, 0)}
+    current = {"sm2": RankEntry(1, 15, 0, 0, 1), "sm1": RankEntry(2, 10, 0, 0, 0), "sm4": RankEntry(3, 1, 0, 0, 0)}
+
+    changes = diff_rankings(TARGET, previous, current)
+
+    assert changes == [
+        RankingChange(TARGET, "moved", "sm2", 1, 2),
+        RankingChange(TARGET, "counters", "sm2", 1, 2, {"view": 5, "like": 1}),
+        RankingChange(TARGET, "moved", "sm1", 2, 1),
+        RankingChange(TARGET, "entered", "sm4", 3, None),
+        RankingChange(TARGET, "left", "sm3", None, 3),
+    ]
+    assert changes[0].moved == 1
+    assert changes[2].moved == -1
+
+
+def test_watcher_reports_only_the_changes_since_the_previous_poll() -> None:
+    """The first poll reports every video, and the next ones only what changed."""
+    client = DummyRankingClient(_pages(["sm1", "sm2", "sm3", "sm4", "sm5"]))
+    watcher = RankingWatcher(client, [TARGET])  # type: ignore[arg-type]
+
+    first = watcher.poll()
+    assert [change.kind for change in first] == ["entered"] * 5
+    assert watcher.poll() == []
+
+    client.pages = _pages(["sm2", "sm1", "sm3", "sm4", "sm6"])
+    changes = watcher.poll()
+
+    assert [(change.kind, change.video_id) for change in changes] == [
+        ("moved", "sm2"),
+        ("moved", "sm1"),
+        ("entered", "sm6"),
+        ("left", "sm5"),
+    ]
+
+
+def test_watcher_requests_the_known_pages_at_once() -> None:
+    """After the first poll, every page a ranking had is requested in the same round."""
+    client = DummyRankingClient(_pages(["sm1", "sm2", "sm3", "sm4", "sm5"]))
+    watcher = RankingWatcher(client, [TARGET, HOT_TOPICS])  # type: ignore[arg-type]
+
+    watcher.poll()
+    assert len(client.calls) == PAGES * 2
+    client.calls.clear()
+
+    client.pages = _pages(["sm1", "sm2"])
+    watcher.poll()
+
+    assert sorted(client.calls) == sorted((kind, page) for kind in ("genre", "hot_topics") for page in range(1, 4))
+    assert watcher.snapshots[TARGET] == {"sm1": RankEntry(1, 10, 2, 3, 4), "sm2": RankEntry(2, 10, 2, 3, 4)}
+
+
+def test_watcher_keeps_the_snapshot_of_a_ranking_that_failed() -> None:
+    """A failed page reports nothing instead of every video leaving."""
+    client = DummyRankingClient(_pages(["sm1", "sm2", "sm3"]))
+    watcher = RankingWatcher(client, [TARGET])  # type: ignore[arg-type]
+    watcher.poll()
+
+    client.failing = {2}
+    assert watcher.poll() == []
+    assert list(watcher.snapshots[TARGET]) == ["sm1", "sm2", "sm3"]
+
+
+def test_watcher_keeps_the_snapshot_of_a_ranking_whose_request_raised() -> None:
+    """A page whose request raises fails its ranking only, and the other rankings are compared."""
+    client = DummyRankingClient(_pages(["sm1", "sm2", "sm3"]))
+    watcher = RankingWatcher(client, [TARGET, HOT_TOPICS])  # type: ignore[arg-type]
+    watcher.poll()
+
+    client.pages = _pages(["sm2", "sm1", "sm3"])
+    client.raising = {("genre", 2)}
+    changes = watcher.poll()
+
+    assert watcher.failed == [TARGET]
+    assert {change.target for change in changes} == {HOT_TOPICS}
+    assert list(watcher.snapshots[TARGET]) == ["sm1", "sm2", "sm3"]
+    assert list(watcher.snapshots[HOT_TOPICS]) == ["sm2", "sm1", "sm3"]
+
+    client.raising = set()
+    assert {change.target for change in watcher.poll()} == {TARGET}
+    assert watcher.failed == []
+
+
+def test_watch_polls_on_a_fixed_schedule(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The watcher sleeps between polls, not before the first one."""
+    delays: list[float] = []
+    monkeypatch.setattr("niconico.video.ranking_watcher.time.sleep", delays.append)
+    watcher = RankingWatcher(DummyRankingClient(_pages(["sm1"])), [TARGET], interval=INTERVAL)  # type: ignore[arg-type]
+
+    polls = list(watcher.watch(polls=2))
+
+    assert len(polls) == 1 + 1
+    assert len(delays) == 1
+    assert 0 < delays[0] <= INTERVAL
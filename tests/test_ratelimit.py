@@ -0,0 +1,121 @@
+"""Tests for the per-host rate limiter."""
+
+from __future__ import annotations
+
+import time
+from email.utils import formatdate
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from niconico import NicoNico
+from niconico.ratelimit import FileLimiterState, RateLimiter, parse_retry_after
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+NVAPI_URL = "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9"
+RATE = 4.0
+RETRY_AFTER = 30
+
+
+class DummySession:
+    """Answer GET requests with a fixed status code."""
+
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None) -> None:
+        """Initialize the response to send."""
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def get(self, url: str, *, headers: dict[str, str]) -> requests.Response:
+        """Return an empty response."""
+        _ = headers
+        res = requests.Response()
+        res.url = url
+        res.status_code = self.status_code
+        res.headers.update(self.headers)
+        res._content = b""  # noqa: SLF001
+        return res
+
+
+def _state_of(limiter: RateLimiter, url: str = NVAPI_URL) -> tuple[float, float]:
+    """Return the current rate and block time of the host of a URL."""
+    limit = limiter.rate_for(url)
+    assert limit is not None
+    with limiter.state.transaction(limit[0], lambda: pytest.fail("the host has no state")) as state:
+        return state.rate, state.blocked_until
+
+
+def test_parse_retry_after_reads_seconds_and_dates() -> None:
+    """Both forms of the header become a number of seconds."""
+    now = time.time()
+
+    assert parse_retry_after("120") == float(120)
+    assert parse_retry_after(formatdate(now + RETRY_AFTER, usegmt=True), now) == pytest.approx(RETRY_AFTER, abs=1)
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_limiter_allows_a_burst_then_spaces_requests() -> None:
+    """A second of requests is sent at once, and the next one waits for a token."""
+    limiter = RateLimiter({"nvapi.nicovideo.jp": RATE})
+
+    delays = [limiter.reserve(NVAPI_URL) for _ in range(int(RATE) + 1)]
+
+    assert delays[:-1] == [0.0] * int(RATE)
+    assert delays[-1] == pytest.approx(1 / RATE, abs=0.01)
+    assert limiter.reserve("https://delivery.domand.nicovideo.jp/segment.cmf") == 0.0
+
+
+def test_limiter_backs_off_and_recovers() -> None:
+    """A throttled response halves the rate, and each other response adds a step back."""
+    limiter = RateLimiter({"nvapi.nicovideo.jp": RATE}, increase_step=1.0)
+    limiter.reserve(NVAPI_URL)
+
+    limiter.observe(NVAPI_URL, requests.codes.too_many_requests)
+    assert _state_of(limiter)[0] == RATE / 2
+
+    for _ in range(int(RATE)):
+        limiter.observe(NVAPI_URL, requests.codes.ok)
+    assert _state_of(limiter)[0] == RATE
+
+
+def test_limiter_honors_retry_after() -> None:
+    """No request is let through before the time given by Retry-After."""
+    limiter = RateLimiter({"nvapi.nicovideo.jp": RATE})
+
+    limiter.observe(NVAPI_URL, requests.codes.service_unavailable, str(RETRY_AFTER))
+
+    assert limiter.reserve(NVAPI_URL) == pytest.approx(RETRY_AFTER, abs=1)
+
+
+def test_file_state_is_shared_between_limiters(tmp_path: Path) -> None:
+    """Limiters sharing a state file, as separate processes would, share the back-off."""
+    path = tmp_path / "limits.json"
+    first = RateLimiter({"nvapi.nicovideo.jp": RATE}, state=FileLimiterState(path))
+    second = RateLimiter({"nvapi.nicovideo.jp": RATE}, state=FileLimiterState(path))
+
+    first.observe(NVAPI_URL, requests.codes.too_many_requests, str(RETRY_AFTER))
+
+    assert _state_of(second)[0] == RATE / 2
+    assert second.reserve(NVAPI_URL) == pytest.approx(RETRY_AFTER, abs=1)
+
+
+def test_limiter_rejects_a_non_positive_rate() -> None:
+    """A host that can never be requested is a configuration error."""
+    with pytest.raises(ValueError, match="rates"):
+        RateLimiter({"nvapi.nicovideo.jp": 0})
+
+
+def test_client_reports_responses_to_the_limiter() -> None:
+    """The client feeds the status code and Retry-After of each response to its limiter."""
+    limiter = RateLimiter({"nvapi.nicovideo.jp": RATE})
+    client = NicoNico(rate_limiter=limiter)
+    client.session = DummySession(requests.codes.too_many_requests, {"Retry-After": str(RETRY_AFTER)})  # type: ignore[assignment]
+
+    client.get(NVAPI_URL)
+
+    rate, blocked_until = _state_of(limiter)
+    assert rate == RATE / 2
+    assert blocked_until == pytest.approx(time.time() + RETRY_AFTER, abs=1)
@@ -0,0 +1,138 @@
+"""Tests for the retry policy."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+import requests
+
+from niconico import NicoNico
+from niconico.retry import RetryPolicy, RetrySettings
+
+NVAPI_URL = "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9"
+MYLIST_URL = "https://nvapi.nicovideo.jp/v1/users/me/mylists"
+MAX_ATTEMPTS = 3
+BASE_DELAY = 1.0
+
+
+class DummySession:
+    """Answer requests with a sequence of outcomes, then 200 OK."""
+
+    def __init__(self, outcomes: list[int | Exception]) -> None:
+        """Initialize the outcomes of the next requests."""
+        self.outcomes = outcomes
+        self.calls = 0
+
+    def _respond(self, url: str) -> requests.Response:
+        """Return the next outcome."""
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else requests.codes.ok
+        if isinstance(outcome, Exception):
+            raise outcome
+        res = requests.Response()
+        res.url = url
+        res.status_code = outcome
+        res._content = b""  # noqa: SLF001
+        return res
+
+    def get(self, url: str, *, headers: dict[str, str]) -> requests.Response:
+        """Answer a GET request."""
+        _ = headers
+        return self._respond(url)
+
+    def post(self, url: str, *, headers: dict[str, str], data: object = None) -> requests.Response:
+        """Answer a POST request."""
+        _ = headers, data
+        return self._respond(url)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Record the delays instead of sleeping."""
+    delays: list[float] = []
+    monkeypatch.setattr("niconico.retry.time.sleep", delays.append)
+    return delays
+
+
+def _client(outcomes: list[int | Exception], policy: RetryPolicy) -> tuple[NicoNico, DummySession]:
+    """Return a client answering with the given outcomes."""
+    client = NicoNico(retry_policy=policy)
+    session = DummySession(outcomes)
+    client.session = session  # type: ignore[assignment]
+    return client, session
+
+
+def test_get_is_retried_until_it_succeeds(no_sleep: list[float]) -> None:
+    """Transient status codes are retried with jittered, growing delays."""
+    policy = RetryPolicy(default=RetrySettings(base_delay=BASE_DELAY))
+    client, session = _client([requests.codes.service_unavailable, requests.codes.bad_gateway], policy)
+
+    res = client.get(NVAPI_URL)
+
+    assert res.status_code == requests.codes.ok
+    assert session.calls == MAX_ATTEMPTS
+    assert 0 <= no_sleep[0] <= BASE_DELAY
+    assert 0 <= no_sleep[1] <= BASE_DELAY * 2
+    assert policy.metrics.retries == MAX_ATTEMPTS - 1
+    assert policy.metrics.recovered == 1
+    assert policy.metrics.reasons == {"503": 1, "502": 1}
+
+
+def test_last_response_is_returned_when_attempts_run_out() -> None:
+    """A request that keeps failing returns its last response."""
+    policy = RetryPolicy()
+    client, session = _client([requests.codes.service_unavailable] * MAX_ATTEMPTS, policy)
+
+    res = client.get(NVAPI_URL)
+
+    assert res.status_code == requests.codes.service_unavailable
+    assert session.calls == MAX_ATTEMPTS
+    assert policy.metrics.exhausted == 1
+
+
+def test_connection_errors_are_retried_then_raised() -> None:
+    """A connection error is raised once the attempts run out."""
+    policy = RetryPolicy()
+    client, session = _client([requests.ConnectionError("reset")] * MAX_ATTEMPTS, policy)
+
+    with pytest.raises(requests.ConnectionError):
+        client.get(NVAPI_URL)
+
+    assert session.calls == MAX_ATTEMPTS
+    assert policy.metrics.reasons == {"ConnectionError": MAX_ATTEMPTS - 1}
+
+
+def test_mutations_are_only_retried_when_a_rule_opts_in() -> None:
+    """POST requests are sent once unless their rule allows retries."""
+    client, session = _client([requests.codes.service_unavailable], RetryPolicy())
+    assert client.post(MYLIST_URL).status_code == requests.codes.service_unavailable
+    assert session.calls == 1
+
+    policy = RetryPolicy(rules=[(r"/users/me/mylists", RetrySettings(methods=frozenset({"GET", "POST"})))])
+    client, session = _client([requests.codes.service_unavailable], policy)
+    assert client.post(MYLIST_URL).status_code == requests.codes.ok
+    assert session.calls == 1 + 1
+
+
+def test_deadline_stops_retries_that_would_end_too_late() -> None:
+    """A Retry-After beyond the deadline gives up at once."""
+    settings = RetrySettings(deadline=10)
+
+    assert settings.next_delay(1, time.monotonic(), retry_after=60) is None
+    assert settings.next_delay(1, time.monotonic(), retry_after=5) == pytest.approx(5)
+
+
+def test_acall_retries_coroutines() -> None:
+    """The asynchronous loop retries like the synchronous one."""
+    policy = RetryPolicy(default=RetrySettings(base_delay=0))
+    session = DummySession([requests.codes.too_many_requests])
+
+    async def send() -> requests.Response:
+        return session.get(NVAPI_URL, headers={})
+
+    res = asyncio.run(policy.acall("GET", NVAPI_URL, send))
+
+    assert res.status_code == requests.codes.ok
+    assert session.calls == 1 + 1
@@ -0,0 +1,189 @@
+"""Tests for the coalescing of identical requests in flight."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from niconico import NicoNico
+from niconico.objects.nvapi import NvAPIResponse
+from niconico.singleflight import AsyncSingleFlight, SingleFlight
+from niconico.utils import parse_response
+
+NVAPI_URL = "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9"
+THREADS = 8
+
+
+class DummySession:
+    """Answer GET requests once released, counting them."""
+
+    def __init__(self) -> None:
+        """Initialize the counter and the release event."""
+        self.calls = 0
+        self.release = threading.Event()
+
+    def get(self, url: str, *, headers: dict[str, str]) -> requests.Response:
+        """Return an empty response once released."""
+        _ = headers
+        self.calls += 1
+        self.release.wait(timeout=5)
+        res = requests.Response()
+        res.url = url
+        res.status_code = requests.codes.ok
+        res._content = b'{"meta": {"status": 200}, "data": null}'  # noqa: SLF001
+        return res
+
+
+def _get_concurrently(client: NicoNico, session: DummySession, urls: list[str]) -> list[requests.Response]:
+    """Send GET requests from several threads while the session holds the responses back."""
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        futures = [executor.submit(client.get, url) for url in urls]
+        time.sleep(0.05)
+        session.release.set()
+        return [future.result() for future in futures]
+
+
+def test_concurrent_identical_gets_share_one_request() -> None:
+    """Threads asking for the same URL at once get the same response from one request."""
+    client = NicoNico(single_flight=True)
+    session = DummySession()
+    client.session = session  # type: ignore[assignment]
+
+    responses = _get_concurrently(client, session, [NVAPI_URL] * THREADS)
+
+    assert session.calls == 1
+    assert all(res is responses[0] for res in responses)
+    assert client.single_flight is not None
+    assert client.single_flight.coalesced == THREADS - 1
+
+
+def test_coalesced_gets_parse_their_own_result() -> None:
+    """Threads sharing a response each get their own parsed object, so changes are not shared."""
+    client = NicoNico(single_flight=True)
+    session = DummySession()
+    client.session = session  # type: ignore[assignment]
+
+    responses = _get_concurrently(client, session, [NVAPI_URL] * THREADS)
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        parsed = list(executor.map(lambda res: parse_response(res, NvAPIResponse), responses))
+    parsed[0].meta.status = requests.codes.not_found
+
+    assert session.calls == 1
+    assert len({id(result) for result in parsed}) == THREADS
+    assert all(result.meta.status == requests.codes.ok for result in parsed[1:])
+
+
+def test_different_urls_and_later_gets_are_sent() -> None:
+    """Only identical requests in flight together are coalesced."""
+    client = NicoNico(single_flight=True)
+    session = DummySession()
+    client.session = session  # type: ignore[assignment]
+
+    _get_concurrently(client, session, [NVAPI_URL, NVAPI_URL.replace("sm9", "sm10")])
+    client.get(NVAPI_URL)
+
+    assert session.calls == 1 + 1 + 1
+
+
+def test_single_flight_is_off_by_default() -> None:
+    """Without single flight, each request is sent."""
+    client = NicoNico()
+    session = DummySession()
+    client.session = session  # type: ignore[assignment]
+
+    _get_concurrently(client, session, [NVAPI_URL] * 2)
+
+    assert session.calls == 1 + 1
+
+
+def test_errors_are_shared_with_the_waiting_threads() -> None:
+    """Threads waiting for a call that fails get its exception."""
+    flight: SingleFlight[int] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail() -> int:
+        started.set()
+        release.wait(timeout=5)
+        msg = "failed"
+        raise RuntimeError(msg)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", fail)
+        started.wait(timeout=5)
+        follower = executor.submit(flight.do, "key", lambda: 0)
+        time.sleep(0.05)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="failed"):
+                future.result()
+
+
+def test_async_single_flight_shares_one_coroutine() -> None:
+    """Tasks awaiting the same key share one coroutine."""
+    flight: AsyncSingleFlight[int] = AsyncSingleFlight()
+    calls: list[int] = []
+
+    async def fetch() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main() -> list[int]:
+        return await asyncio.gather(*(flight.do("key", fetch) for _ in range(THREADS)))
+
+    assert asyncio.run(main()) == [1] * THREADS
+    assert flight.coalesced == THREADS - 1
+
+
+def test_async_single_flight_survives_the_cancellation_of_the_first_task() -> None:
+    """Cancelling the task that started a call does not cancel it for the other tasks."""
+    flight: AsyncSingleFlight[int] = AsyncSingleFlight()
+    release = asyncio.Event()
+    calls: list[int] = []
+
+    async def fetch() -> int:
+        calls.append(1)
+        await release.wait()
+        return 1
+
+    async def main() -> int:
+        leader = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        release.set()
+        return await follower
+
+    assert asyncio.run(main()) == 1
+    assert calls == [1]
+
+
+def test_async_single_flight_cancels_a_call_nobody_awaits() -> None:
+    """The coroutine is cancelled once every task awaiting it was cancelled."""
+    flight: AsyncSingleFlight[int] = AsyncSingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fetch() -> int:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return 1
+
+    async def main() -> None:
+        task = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    asyncio.run(main())
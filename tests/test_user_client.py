@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 from typing import Any
 
 import requests
@@ -21,6 +22,11 @@ class DummyResponse:
         """Return a JSON payload."""
         return self._payload
 
+    @property
+    def content(self) -> bytes:
+        """Return the encoded JSON payload."""
+        return json.dumps(self._payload).encode()
+
 
 class DummyNicoNico:
     """Capture GET requests from UserClient."""
@@ -282,3 +288,19 @@ def test_copy_mylist_items_returns_processed_and_duplicated_ids() -> None:
             {"data": None, "json": None},
         ),
     ]
+
+
+def test_iter_user_followers_stops_when_summary_has_no_next_page() -> None:
+    """Follower iteration ends on the page whose summary has no next page."""
+    payload = {
+        "meta": {"status": 200},
+        "data": {
+            "items": [],
+            "summary": {"followees": 0, "followers": 0, "hasNext": False, "cursor": ""},
+        },
+    }
+    niconico = DummyNicoNico(payload)
+    client = UserClient(niconico)  # type: ignore[arg-type]
+
+    assert list(client.iter_user_followers("4", page_size=50)) == []
+    assert niconico.urls == ["https://nvapi.nicovideo.jp/v1/users/4/followed-by/users?pageSize=50&page=1"]
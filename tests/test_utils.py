@@ -2,7 +2,15 @@
 
 from __future__ import annotations
 
-from niconico.utils import add_optional_param, extract_video_id_from_url
+from typing import TYPE_CHECKING
+
+import requests
+
+from niconico.objects.nvapi import NvAPIResponse, ThreadKeyData
+from niconico.utils import add_optional_param, extract_video_id_from_url, loads_json, parse_response
+
+if TYPE_CHECKING:
+    import pytest
 
 
 def test_extract_video_id_from_url() -> None:
@@ -21,3 +29,24 @@ def test_add_optional_param_skips_none_and_stringifies_values() -> None:
     add_optional_param(query, "site", "nicovideo")
 
     assert query == {"limit": "10", "site": "nicovideo"}
+
+
+def test_parse_response_validates_the_raw_body() -> None:
+    """The body is validated into the model straight from its bytes."""
+    res = requests.Response()
+    res._content = b'{"meta": {"status": 200}, "data": {"threadKey": "key"}}'  # noqa: SLF001
+
+    parsed = parse_response(res, NvAPIResponse[ThreadKeyData])
+
+    assert parsed.data is not None
+    assert parsed.data.thread_key == "key"
+
+
+def test_loads_json_decodes_with_either_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Untyped bodies decode the same with orjson and with the standard library."""
+    body = '{"data": {"items": [1, 2]}, "title": "初音ミク"}'.encode()
+    expected = {"data": {"items": [1, 2]}, "title": "初音ミク"}
+
+    assert loads_json(body) == expected
+    monkeypatch.setattr("niconico.utils._orjson_loads", None)
+    assert loads_json(body) == expected
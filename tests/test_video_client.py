@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Any
+import json
+import logging
+from typing import TYPE_CHECKING, Any
 
 import requests
 
-from niconico.video import VideoClient
+from niconico.video import VIDEOS_BATCH_SIZE, VideoClient
+
+if TYPE_CHECKING:
+    import pytest
 
 
 class DummyResponse:
@@ -21,12 +26,18 @@ class DummyResponse:
         """Return a JSON payload."""
         return self._payload
 
+    @property
+    def content(self) -> bytes:
+        """Return the encoded JSON payload."""
+        return json.dumps(self._payload).encode()
+
 
 class DummyNicoNico:
     """Capture requests from VideoClient."""
 
     logined = True
     premium = False
+    logger = logging.getLogger("niconico.py")
 
     def __init__(
         self,
@@ -113,28 +124,43 @@ def _video_payload(video_id: str) -> dict[str, Any]:
     }
 
 
-def test_get_videos_fetches_each_video() -> None:
-    """Multiple video lookup fetches each ID."""
+def test_get_videos_batches_ids_and_keeps_input_order(caplog: pytest.LogCaptureFixture) -> None:
+    """Multiple video lookup sends one request per batch and reports missing IDs."""
     niconico = DummyNicoNico(
-        [
-            {
-                "meta": {"status": 200},
-                "data": {"items": [{"watchId": "sm9", "video": _video_payload("sm9")}]},
+        {
+            "meta": {"status": 200},
+            "data": {
+                "items": [
+                    {"watchId": "sm1097445", "video": _video_payload("sm1097445")},
+                    {"watchId": "sm9", "video": _video_payload("sm9")},
+                ],
             },
-            {
-                "meta": {"status": 200},
-                "data": {"items": [{"watchId": "sm1097445", "video": _video_payload("sm1097445")}]},
-            },
-        ],
+        },
     )
     client = VideoClient(niconico)  # type: ignore[arg-type]
 
-    result = client.get_videos(["sm9", "sm1097445"])
+    with caplog.at_level(logging.WARNING, logger="niconico.py"):
+        result = client.get_videos(["sm9", "sm404", "sm1097445", "sm9"])
 
-    assert [video.id_ for video in result] == ["sm9", "sm1097445"]
+    assert [video.id_ for video in result] == ["sm9", "sm1097445", "sm9"]
+    assert result.missing == ["sm404"]
     assert niconico.calls == [
-        ("GET", "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9"),
-        ("GET", "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm1097445"),
+        ("GET", "https://nvapi.nicovideo.jp/v1/videos?watchIds=sm9,sm404,sm1097445"),
+    ]
+    assert "sm404" in caplog.text
+
+
+def test_get_videos_splits_large_inputs_into_batches() -> None:
+    """IDs beyond the batch size are sent in a further request."""
+    niconico = DummyNicoNico({"meta": {"status": 200}, "data": {"items": []}})
+    client = VideoClient(niconico)  # type: ignore[arg-type]
+    video_ids = [f"sm{i}" for i in range(VIDEOS_BATCH_SIZE + 1)]
+
+    client.get_videos(video_ids)
+
+    assert niconico.calls == [
+        ("GET", f"https://nvapi.nicovideo.jp/v1/videos?watchIds={','.join(video_ids[:VIDEOS_BATCH_SIZE])}"),
+        ("GET", f"https://nvapi.nicovideo.jp/v1/videos?watchIds=sm{VIDEOS_BATCH_SIZE}"),
     ]
 
 
@@ -213,3 +239,66 @@ def test_get_shorts_feed_seeds_and_limits() -> None:
     assert "videoId=ss46649515" in url
     assert "currentVideoId=ss46649515" in url
     assert "pageSize=3" in url
+
+
+def _like_history_payload(video_ids: list[str], *, has_next: bool) -> dict[str, Any]:
+    """Return a like history page payload."""
+    return {
+        "meta": {"status": 200},
+        "data": {
+            "items": [
+                {
+                    "likedAt": "2026-01-01T00:00:00+09:00",
+                    "thanksMessage": None,
+                    "video": _video_payload(video_id),
+                    "status": "active",
+                }
+                for video_id in video_ids
+            ],
+            "summary": {"hasNext": has_next, "canGetNextPage": has_next, "getNextPageNgReason": None},
+        },
+    }
+
+
+def test_iter_like_history_requests_pages_lazily_until_has_next_is_false() -> None:
+    """Pages are requested only as the iterator is consumed."""
+    niconico = DummyNicoNico(
+        [
+            _like_history_payload(["sm1", "sm2"], has_next=True),
+            _like_history_payload(["sm3"], has_next=False),
+        ],
+    )
+    client = VideoClient(niconico)  # type: ignore[arg-type]
+
+    items = client.iter_like_history(page_size=2)
+
+    assert niconico.calls == []
+    assert next(items).video.id_ == "sm1"
+    assert [item.video.id_ for item in items] == ["sm2", "sm3"]
+    assert niconico.calls == [
+        ("GET", "https://nvapi.nicovideo.jp/v1/users/me/likes?pageSize=2&page=1"),
+        ("GET", "https://nvapi.nicovideo.jp/v1/users/me/likes?pageSize=2&page=2"),
+    ]
+
+
+def test_iter_history_stops_at_total_count() -> None:
+    """The history iterator stops once totalCount items have been paged through."""
+    page = {
+        "meta": {"status": 200},
+        "data": {
+            "items": [
+                {"isMaybeLikeUserItem": False, "watchId": "sm9", "video": _video_payload("sm9")},
+            ],
+            "totalCount": 2,
+        },
+    }
+    niconico = DummyNicoNico(page)
+    client = VideoClient(niconico)  # type: ignore[arg-type]
+
+    items = list(client.iter_history(page_size=1))
+
+    assert [item.video.id_ for item in items] == ["sm9", "sm9"]
+    assert [url for _, url in niconico.calls] == [
+        "https://nvapi.nicovideo.jp/v2/users/me/watch/history?pageSize=1&page=1",
+        "https://nvapi.nicovideo.jp/v2/users/me/watch/history?pageSize=1&page=2",
+    ]
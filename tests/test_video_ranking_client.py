@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import json
 from typing import Any
+from urllib.parse import parse_qs, urlparse
 
 import requests
 
 from niconico.video.ranking import VideoRankingClient
 
 TEIBAN_MAX_ITEM_COUNT = 1000
+CRAWL_PAGES = 2
 
 
 class DummyResponse:
@@ -23,6 +26,11 @@ class DummyResponse:
         """Return a JSON payload."""
         return self._payload
 
+    @property
+    def content(self) -> bytes:
+        """Return the encoded JSON payload."""
+        return json.dumps(self._payload).encode()
+
 
 class DummyNicoNico:
     """Capture requests from VideoRankingClient."""
@@ -112,3 +120,118 @@ def test_get_teiban_ranking_returns_none_on_error() -> None:
     client = VideoRankingClient(niconico)  # type: ignore[arg-type]
 
     assert client.get_teiban_ranking("nope", "24h") is None
+
+
+def _video_payload(video_id: str) -> dict[str, Any]:
+    """Return a minimal essential video payload."""
+    return {
+        "type": "essential",
+        "id": video_id,
+        "title": f"sample {video_id}",
+        "registeredAt": "2007-03-06T00:33:00+09:00",
+        "count": {"view": 1, "comment": 2, "mylist": 3, "like": 4},
+        "thumbnail": {
+            "url": "https://example.com/thumb.jpg",
+            "middleUrl": None,
+            "largeUrl": None,
+            "listingUrl": "https://example.com/thumb_list.jpg",
+            "nHdUrl": "https://example.com/thumb_nhd.jpg",
+        },
+        "duration": 1,
+        "shortDescription": "",
+        "latestCommentSummary": "",
+        "isChannelVideo": False,
+        "isPaymentRequired": False,
+        "playbackPosition": None,
+        "owner": {
+            "ownerType": "user",
+            "type": "user",
+            "visibility": "visible",
+            "id": "4",
+            "name": "sample",
+            "iconUrl": "https://example.com/icon.jpg",
+        },
+        "requireSensitiveMasking": False,
+        "videoLive": None,
+        "isMuted": False,
+    }
+
+
+class DummyCrawlNicoNico:
+    """Serve genres, popular tags and two-page rankings whose videos overlap."""
+
+    logined = False
+    premium = False
+
+    def __init__(self) -> None:
+        """Initialize captured requests."""
+        self.calls: list[str] = []
+        self.failing: set[str] = set()
+
+    def get(self, url: str, *, headers: dict[str, str] | None = None) -> DummyResponse:
+        """Answer a request by its path, failing the requests of the URLs in ``failing``."""
+        _ = headers
+        self.calls.append(url)
+        parsed = urlparse(url)
+        if url in self.failing:
+            msg = f"Failed to connect to {url}"
+            raise requests.ConnectionError(msg)
+        if parsed.path == "/v2/genres":
+            genres = [{"key": "game", "label": "ゲーム"}, {"key": "music", "label": "音楽"}]
+            return DummyResponse({"meta": {"status": 200}, "data": {"genres": genres}})
+        if parsed.path.endswith("/popular-tags"):
+            tags = {"startAt": "2026-10-18T00:00:00+09:00", "tags": ["tag"]}
+            return DummyResponse({"meta": {"status": 200}, "data": tags})
+        query = parse_qs(parsed.query)
+        page = int(query["page"][0])
+        genre = parsed.path.rsplit("/", 1)[-1]
+        items = [_video_payload(f"sm{page}"), _video_payload(f"sm{genre}{page}")]
+        return DummyResponse({"meta": {"status": 200}, "data": {"items": items, "hasNext": page < CRAWL_PAGES}})
+
+
+def test_crawl_rankings_fans_out_and_dedups_videos() -> None:
+    """Every (genre, tag, term, page) is requested once, and each video is attached once."""
+    niconico = DummyCrawlNicoNico()
+    client = VideoRankingClient(niconico)  # type: ignore[arg-type]
+
+    records = list(client.crawl_rankings(["hour", "24h"], page_size=25, max_workers=4))
+
+    rankings = 2 * 2 * 2  # genres x (whole genre + tag) x terms
+    assert len(records) == rankings * CRAWL_PAGES * 2
+    assert len(niconico.calls) == 1 + 2 + rankings * CRAWL_PAGES
+    attached = [record.video_id for record in records if record.video is not None]
+    assert sorted(attached) == sorted({record.video_id for record in records})
+    game_hour = [r for r in records if (r.genre_key, r.tag, r.term) == ("game", "tag", "hour")]
+    assert sorted((r.rank, r.video_id) for r in game_hour) == [(1, "sm1"), (2, "smgame1"), (26, "sm2"), (27, "smgame2")]
+
+
+def test_crawl_rankings_can_skip_tags_and_cap_pages() -> None:
+    """Without tags only the whole genres are ranked, up to max_pages each."""
+    niconico = DummyCrawlNicoNico()
+    client = VideoRankingClient(niconico)  # type: ignore[arg-type]
+
+    records = list(client.crawl_rankings(["hour"], genre_keys=["game"], include_tags=False, max_pages=1))
+
+    assert [(r.rank, r.video_id, r.tag) for r in records] == [(1, "sm1", None), (2, "smgame1", None)]
+    assert len(niconico.calls) == 1
+
+
+def test_crawl_rankings_skips_failed_genres_and_pages() -> None:
+    """A request raising an error is skipped, and the records already gathered are kept."""
+    niconico = DummyCrawlNicoNico()
+    niconico.failing = {
+        "https://nvapi.nicovideo.jp/v1/genres/music/popular-tags",
+        "https://nvapi.nicovideo.jp/v1/ranking/genre/game?term=hour&pageSize=100&page=2",
+    }
+    client = VideoRankingClient(niconico)  # type: ignore[arg-type]
+
+    records = list(client.crawl_rankings(["hour"], genre_keys=["game", "music"], max_workers=1))
+
+    assert sorted((r.tag or "", r.rank, r.video_id) for r in records) == [
+        ("", 1, "sm1"),
+        ("", 2, "smgame1"),
+        ("tag", 1, "sm1"),
+        ("tag", 2, "smgame1"),
+        ("tag", 101, "sm2"),
+        ("tag", 102, "smgame2"),
+    ]
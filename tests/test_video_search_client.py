@@ -2,13 +2,32 @@
 
 from __future__ import annotations
 
-from typing import Any
-
+import csv
+import json
+import logging
+import sys
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlparse
+
+import pytest
 import requests
 
+from niconico.__main__ import main
+from niconico.exceptions import NicoAPIError
+from niconico.utils import JST
 from niconico.video.search import VideoSearchClient
+from niconico.video.snapshot import SnapshotExporter
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 SNAPSHOT_TOTAL_COUNT = 2
+SNAPSHOT_VIDEO_COUNT = 50
+SNAPSHOT_MAX_OFFSET = 10
+SNAPSHOT_PAGE_SIZE = 4
+SNAPSHOT_START = datetime(2024, 1, 1, tzinfo=JST)
+USAGE_ERROR_STATUS = 2
 
 
 class DummyResponse:
@@ -23,6 +42,11 @@ class DummyResponse:
         """Return a JSON payload."""
         return self._payload
 
+    @property
+    def content(self) -> bytes:
+        """Return the encoded JSON payload."""
+        return json.dumps(self._payload).encode()
+
 
 class DummyNicoNico:
     """Capture requests from VideoSearchClient."""
@@ -43,6 +67,45 @@ class DummyNicoNico:
         return DummyResponse(self.payload, self.status_code)
 
 
+class DummySnapshotNicoNico:
+    """Answer the snapshot search API from a list of videos posted one minute apart."""
+
+    logined = False
+    premium = False
+    logger = logging.getLogger("niconico.py")
+
+    def __init__(self, start_times: list[datetime], *, max_offset: int = SNAPSHOT_MAX_OFFSET) -> None:
+        """Initialize the videos and the offset ceiling."""
+        self.start_times = start_times
+        self.max_offset = max_offset
+        self.queries: list[dict[str, list[str]]] = []
+
+    def get(self, url: str, *, headers: dict[str, str] | None = None) -> DummyResponse:
+        """Answer a search sorted by startTime, rejecting an offset above the ceiling."""
+        _ = headers
+        query = parse_qs(urlparse(url).query)
+        self.queries.append(query)
+        offset = int(query["_offset"][0])
+        if offset > self.max_offset:
+            return DummyResponse({"meta": {"status": 400}}, requests.codes.bad_request)
+        gte = datetime.fromisoformat(query["filters[startTime][gte]"][0])
+        lt = datetime.fromisoformat(query["filters[startTime][lt]"][0])
+        matches = [
+            {
+                "contentId": f"sm{number}",
+                "startTime": start_time.isoformat(),
+                "viewCounter": number,
+                "tags": f"tag{number % 2} common",
+            }
+            for number, start_time in enumerate(self.start_times)
+            if gte <= start_time < lt
+        ]
+        if query["_sort"] == ["-startTime"]:
+            matches.reverse()
+        page = matches[offset : offset + int(query["_limit"][0])]
+        return DummyResponse({"meta": {"status": 200, "totalCount": len(matches)}, "data": page})
+
+
 def _snapshot_payload() -> dict[str, Any]:
     """Return a minimal snapshot search payload."""
     return {
@@ -133,6 +196,217 @@ def test_snapshot_search_returns_none_on_error() -> None:
     assert client.search_videos_by_snapshot("sample") is None
 
 
+def test_iter_snapshot_search_splits_past_the_offset_ceiling() -> None:
+    """Every video is yielded once, with no request above the offset ceiling."""
+    start_times = [SNAPSHOT_START + timedelta(minutes=number) for number in range(SNAPSHOT_VIDEO_COUNT)]
+    niconico = DummySnapshotNicoNico(start_times)
+    client = VideoSearchClient(niconico)  # type: ignore[arg-type]
+
+    items = list(
+        client.iter_snapshot_search(
+            "sample",
+            sort_key="startTime",
+            sort_order="asc",
+            filters={"genre": ["ゲーム"]},
+            start_time=SNAPSHOT_START,
+            end_time=SNAPSHOT_START + timedelta(days=1),
+            page_size=SNAPSHOT_PAGE_SIZE,
+            max_workers=3,
+            requests_per_second=None,
+            max_offset=SNAPSHOT_MAX_OFFSET,
+        ),
+    )
+
+    assert [item.content_id for item in items] == [f"sm{number}" for number in range(SNAPSHOT_VIDEO_COUNT)]
+    assert all(int(query["_offset"][0]) <= SNAPSHOT_MAX_OFFSET for query in niconico.queries)
+    assert all(query["filters[genre][0]"] == ["ゲーム"] for query in niconico.queries)
+
+
+def test_iter_snapshot_search_walks_back_for_a_descending_start_time() -> None:
+    """The windows are walked from the latest one when sorting by startTime in descending order."""
+    start_times = [SNAPSHOT_START + timedelta(hours=number) for number in range(SNAPSHOT_VIDEO_COUNT)]
+    client = VideoSearchClient(DummySnapshotNicoNico(start_times))  # type: ignore[arg-type]
+
+    items = client.iter_snapshot_search(
+        "sample",
+        sort_key="startTime",
+        start_time=SNAPSHOT_START,
+        end_time=SNAPSHOT_START + timedelta(days=7),
+        requests_per_second=None,
+        max_offset=SNAPSHOT_MAX_OFFSET,
+    )
+
+    assert [item.content_id for item in items][:2] == [f"sm{SNAPSHOT_VIDEO_COUNT - 1}", f"sm{SNAPSHOT_VIDEO_COUNT - 2}"]
+
+
+def test_iter_snapshot_search_combines_the_json_filter() -> None:
+    """A JSON filter is combined with the startTime window."""
+    niconico = DummyNicoNico({"meta": {"status": 200, "totalCount": 0}, "data": []})
+    client = VideoSearchClient(niconico)  # type: ignore[arg-type]
+
+    items = list(
+        client.iter_snapshot_search(
+            "sample",
+            json_filter='{"type":"equal","field":"genre","value":"ゲーム"}',
+            requests_per_second=None,
+        ),
+    )
+
+    assert items == []
+    json_filter = json.loads(parse_qs(urlparse(niconico.calls[0]).query)["jsonFilter"][0])
+    assert json_filter["type"] == "and"
+    assert json_filter["filters"][1]["field"] == "startTime"
+
+
+def test_iter_snapshot_search_rejects_a_start_time_filter() -> None:
+    """The startTime filter belongs to the windows."""
+    client = VideoSearchClient(DummyNicoNico(_snapshot_payload()))  # type: ignore[arg-type]
+
+    with pytest.raises(ValueError, match="start_time"):
+        next(client.iter_snapshot_search("sample", filters={"startTime": {"gte": "2024-01-01T00:00:00+09:00"}}))
+
+
+def test_iter_snapshot_search_raises_on_error() -> None:
+    """A failed request stops the iteration with an error instead of a partial result."""
+    niconico = DummyNicoNico({"meta": {"status": 503}}, status_code=requests.codes.service_unavailable)
+    client = VideoSearchClient(niconico)  # type: ignore[arg-type]
+
+    with pytest.raises(NicoAPIError):
+        next(client.iter_snapshot_search("sample", requests_per_second=None))
+
+
+def _export(path: Path, *, batch_size: int = SNAPSHOT_PAGE_SIZE) -> int:
+    """Export the videos of a dummy snapshot search API to a file."""
+    start_times = [SNAPSHOT_START + timedelta(minutes=number) for number in range(SNAPSHOT_VIDEO_COUNT)]
+    client = VideoSearchClient(DummySnapshotNicoNico(start_times))  # type: ignore[arg-type]
+    with SnapshotExporter(path, ["contentId", "startTime", "viewCounter", "tags"], batch_size=batch_size) as exporter:
+        return client.export_snapshot_search(
+            exporter,
+            "sample",
+            sort_key="startTime",
+            sort_order="asc",
+            start_time=SNAPSHOT_START,
+            end_time=SNAPSHOT_START + timedelta(days=1),
+            page_size=SNAPSHOT_PAGE_SIZE,
+            requests_per_second=None,
+            max_offset=SNAPSHOT_MAX_OFFSET,
+        )
+
+
+def test_export_snapshot_search_writes_typed_parquet_columns(tmp_path: Path) -> None:
+    """Times become timestamps, counters integers and tags lists, in batches."""
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "videos.parquet"
+
+    assert _export(path) == SNAPSHOT_VIDEO_COUNT
+
+    table = pq.read_table(path)
+    assert table.column_names == ["content_id", "start_time", "view_counter", "tags"]
+    assert pa.types.is_timestamp(table.schema.field("start_time").type)
+    assert table.schema.field("view_counter").type == pa.int64()
+    assert table.column("start_time")[1].as_py() == SNAPSHOT_START + timedelta(minutes=1)
+    assert table.column("tags")[1].as_py() == ["tag1", "common"]
+    assert table.column("view_counter").to_pylist() == list(range(SNAPSHOT_VIDEO_COUNT))
+
+
+def test_export_snapshot_search_writes_csv(tmp_path: Path) -> None:
+    """A CSV export keeps the values as returned, without pyarrow."""
+    path = tmp_path / "videos.csv"
+
+    assert _export(path) == SNAPSHOT_VIDEO_COUNT
+
+    with path.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == SNAPSHOT_VIDEO_COUNT
+    assert rows[0] == {
+        "content_id": "sm0",
+        "start_time": SNAPSHOT_START.isoformat(),
+        "view_counter": "0",
+        "tags": "tag0 common",
+    }
+
+
+def test_snapshot_exporter_rejects_an_unknown_suffix(tmp_path: Path) -> None:
+    """The format must be given when it cannot be guessed from the path."""
+    with pytest.raises(ValueError, match="file_format"):
+        SnapshotExporter(tmp_path / "videos.txt")
+
+
+def test_snapshot_exporter_rejects_unknown_fields(tmp_path: Path) -> None:
+    """A misspelled field is reported before the file is created."""
+    with pytest.raises(ValueError, match="viewcount"):
+        SnapshotExporter(tmp_path / "videos.csv", ["contentId", "viewcount"])  # type: ignore[list-item]
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_snapshot_command_rejects_unknown_fields(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """The command exits with a usage error before sending any request."""
+    output = str(tmp_path / "videos.csv")
+    monkeypatch.setattr("sys.argv", ["niconico", "snapshot", "sample", "-o", output, "-f", "viewcount"])
+    monkeypatch.setattr("niconico.__main__.NicoNico", None)
+
+    with pytest.raises(SystemExit) as excinfo:
+        main()
+
+    assert excinfo.value.code == USAGE_ERROR_STATUS
+    assert "Unknown snapshot fields: viewcount" in capsys.readouterr().err
+
+
+class FailingSnapshotNicoNico:
+    """Write a row to the exporter, then fail like a snapshot search API error."""
+
+    def __init__(self) -> None:
+        """Initialize the search client."""
+        self.video = self
+        self.search = self
+
+    def export_snapshot_search(self, exporter: SnapshotExporter, *_args: object, **_kwargs: object) -> int:
+        """Write a row, then raise."""
+        exporter.write([{"contentId": "sm9"}])
+        exporter.flush()
+        msg = "Failed to get snapshot search results"
+        raise NicoAPIError(msg)
+
+
+def test_snapshot_command_leaves_no_file_when_the_export_fails(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A failed export removes the partial file and keeps an earlier export."""
+    output = tmp_path / "videos.csv"
+    output.write_text("earlier export\n", encoding="utf-8")
+    monkeypatch.setattr("sys.argv", ["niconico", "snapshot", "sample", "-o", str(output), "-f", "contentId"])
+    monkeypatch.setattr("niconico.__main__.NicoNico", FailingSnapshotNicoNico)
+
+    main()
+
+    assert list(tmp_path.iterdir()) == [output]
+    assert output.read_text(encoding="utf-8") == "earlier export\n"
+
+
+def test_snapshot_command_reports_a_missing_pyarrow(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Exporting to Parquet without pyarrow exits with the install hint."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setattr("sys.argv", ["niconico", "snapshot", "sample", "-o", str(tmp_path / "videos.parquet")])
+    monkeypatch.setattr("niconico.__main__.NicoNico", None)
+
+    with pytest.raises(SystemExit) as excinfo:
+        main()
+
+    assert excinfo.value.code == USAGE_ERROR_STATUS
+    assert "niconico.py[arrow]" in capsys.readouterr().err
+
+
 def _video_search_payload() -> dict[str, Any]:
     """Return a minimal video search payload."""
     return {